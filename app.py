@@ -1,6 +1,6 @@
 #app.py
 from flask import Flask, render_template, request, redirect
-from db import init_db
+from db import init_db, get_db, init_app as init_db_app
 from modules.tools import tools_bp
 from modules.holders import holders_bp
 from modules.collets import collets_bp
@@ -15,8 +15,16 @@ from modules.maintenance import maintenance_bp
 from modules.breakdown import breakdown_bp
 from modules.machine_history import machine_history_bp
 from modules.complaints import complaints_bp
+from modules.search import search_bp
+from modules.ledger_reports import ledger_bp
+from modules.analytics import analytics_bp
+from modules.reorder_queue import reorder_bp
+from modules.report_jobs import report_jobs_bp
+from modules.spreadsheet_exports import exports_bp
 
 import config
+import reorder
+from http_cache import CompressionMiddleware
 import os
 from db import app_data_dir
 from pathlib import Path
@@ -43,12 +51,22 @@ def allowed_file(filename: str) -> bool:
     return Path(filename).suffix.lower() in ALLOWED_EXT
 
 init_db()
+init_db_app(app)
+
+# gzip/brotli for large pages (LAN clients in multi-user mode)
+app.wsgi_app = CompressionMiddleware(app.wsgi_app)
 
 @app.route("/")
 def home():
     if app.config.get("LICENSE_ERROR"):
         return render_template("license.html", error=app.config["LICENSE_ERROR"])
-    return render_template("home.html")
+    db = get_db()
+    return render_template(
+        "home.html",
+        low_stock=reorder.queue(limit=8, db=db),
+        low_stock_count=reorder.queue_size(db=db),
+        kinds=reorder.KIND_NAMES,
+    )
 
 #def open_browser():
 #    time.sleep(1.5)  # give Flask time to start
@@ -68,11 +86,19 @@ app.register_blueprint(maintenance_bp)
 app.register_blueprint(breakdown_bp)
 app.register_blueprint(machine_history_bp)
 app.register_blueprint(complaints_bp)
+app.register_blueprint(search_bp)
+app.register_blueprint(ledger_bp)
+app.register_blueprint(analytics_bp)
+app.register_blueprint(reorder_bp)
+app.register_blueprint(report_jobs_bp)
+app.register_blueprint(exports_bp)
 
 if __name__ == "__main__":
     # Start browser in a background thread
     #threading.Thread(target=open_browser, daemon=True).start()
 
     # Run Flask (NO debug mode in EXE)
+    import scheduler
+    scheduler.start()
     app.run(host="127.0.0.1", port=5000, debug=False, use_reloader=False)
 
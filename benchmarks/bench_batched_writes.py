@@ -0,0 +1,165 @@
+# benchmarks/bench_batched_writes.py
+# --------------------------------------------
+# Multi-line form saves, 200 lines per submission:
+#   legacy  = old write path, one execute() per row
+#             (shift: INSERT per row; inward: SELECT then INSERT/UPDATE per line)
+#   batched = executemany per child table / ON CONFLICT upsert, one
+#             BEGIN IMMEDIATE transaction
+#   POST    = the real /shift/add and /materials/inward views end to end
+#             (form parsing, up-front validation, batched write)
+#
+#   python benchmarks/bench_batched_writes.py [submissions]
+# --------------------------------------------
+
+import sys
+
+from common import db, timed
+
+from app import app
+
+LINES = 200
+
+
+def seed(con):
+    con.executemany("INSERT INTO item_code_master (item_code) VALUES (?)",
+                    [(f"IC-{i:04d}",) for i in range(LINES)])
+    con.executemany("""
+        INSERT INTO machine_master (machine_code, machine_name, machine_type)
+        VALUES (?, ?, 'VMC')
+    """, [(f"M{i}", f"Machine {i}") for i in range(20)])
+    con.execute("INSERT INTO customer_master (customer_name) VALUES ('Bench Customer')")
+    con.commit()
+
+
+def production_rows():
+    return [(f"IC-{i:04d}", f"M{i % 20}", f"op{i % 15}", 100 + i, i % 3) for i in range(LINES)]
+
+
+# ---- shift ----
+
+def shift_legacy(con, n):
+    for s in range(n):
+        cur = con.execute("INSERT INTO shift_header (shift_date, shift, shift_incharge) VALUES (?, 'A', 'x')",
+                          (f"2001-01-{s:04d}",))
+        shift_id = cur.lastrowid
+        for r in production_rows():
+            con.execute("""
+                INSERT INTO shift_production (shift_id, item_code, machine, operator, ok_qty, rej_qty)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (shift_id, *r))
+        con.commit()
+
+
+def shift_batched(con, n):
+    for s in range(n):
+        with db.write_transaction(con):
+            shift_id = con.execute(
+                "INSERT INTO shift_header (shift_date, shift, shift_incharge) VALUES (?, 'B', 'x')",
+                (f"2001-01-{s:04d}",)).lastrowid
+            con.executemany("""
+                INSERT INTO shift_production (shift_id, item_code, machine, operator, ok_qty, rej_qty)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [(shift_id, *r) for r in production_rows()])
+
+
+def shift_post(client, n):
+    rows = production_rows()
+    for s in range(n):
+        resp = client.post("/shift/add", data={
+            "shift_date": f"2002-01-{s:04d}", "shift": "A", "shift_incharge": "x",
+            "item_code[]": [r[0] for r in rows],
+            "machine_code[]": [r[1] for r in rows],
+            "operator[]": [r[2] for r in rows],
+            "ok_qty[]": [str(r[3]) for r in rows],
+            "rej_qty[]": [str(r[4]) for r in rows],
+        })
+        assert resp.status_code == 302, resp.status_code
+
+
+# ---- inward (every submission hits existing lines, so all are updates) ----
+
+def inward_lines():
+    return [(f"IC-{i:04d}", "TURN", 10, 10, "B1") for i in range(LINES)]
+
+
+def inward_legacy(con, n, challan_id):
+    for _ in range(n):
+        for item, process, qty, _, box in inward_lines():
+            existing = con.execute("""
+                SELECT id FROM material_inward WHERE challan_id=? AND item_code=? AND process=?
+            """, (challan_id, item, process)).fetchone()
+            if existing:
+                con.execute("""
+                    UPDATE material_inward SET inward_qty = inward_qty + ?, available_qty = available_qty + ?
+                    WHERE id=?
+                """, (qty, qty, existing["id"]))
+            else:
+                con.execute("""
+                    INSERT INTO material_inward (challan_id, item_code, process, inward_qty, available_qty, box_tray)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (challan_id, item, process, qty, qty, box))
+        con.commit()
+
+
+def inward_batched(con, n, challan_id):
+    for _ in range(n):
+        with db.write_transaction(con):
+            con.executemany("""
+                INSERT INTO material_inward (challan_id, item_code, process, inward_qty, available_qty, box_tray)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (challan_id, item_code, process) DO UPDATE SET
+                    inward_qty = inward_qty + excluded.inward_qty,
+                    available_qty = available_qty + excluded.available_qty
+            """, [(challan_id, *ln) for ln in inward_lines()])
+
+
+def inward_post(client, n):
+    lines = inward_lines()
+    for _ in range(n):
+        resp = client.post("/materials/inward", data={
+            "customer_id": "1", "customer_challan_no": "POST-1", "customer_challan_date": "2001-01-01",
+            "item_code[]": [ln[0] for ln in lines],
+            "process[]": [ln[1] for ln in lines],
+            "qty[]": [str(ln[2]) for ln in lines],
+            "box_tray[]": [ln[4] for ln in lines],
+        })
+        assert resp.status_code == 302, resp.status_code
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    con = db.connect()
+    seed(con)
+    challans = [con.execute("""
+        INSERT INTO customer_challan (customer_id, customer_challan_no, customer_challan_date)
+        VALUES (1, ?, '2001-01-01')
+    """, (no,)).lastrowid for no in ("LEGACY", "BATCH")]
+    con.commit()
+    client = app.test_client()
+
+    print(f"{n} submissions x {LINES} lines")
+    r = {}
+    with timed("shift   legacy (execute per row)", r):
+        shift_legacy(con, n)
+    with timed("shift   batched (executemany)", r):
+        shift_batched(con, n)
+    with timed("shift   POST /shift/add", r):
+        shift_post(client, n)
+    with timed("inward  legacy (select + write per line)", r):
+        inward_legacy(con, n, challans[0])
+    with timed("inward  batched (ON CONFLICT upsert)", r):
+        inward_batched(con, n, challans[1])
+    with timed("inward  POST /materials/inward", r):
+        inward_post(client, n)
+
+    totals = con.execute("""
+        SELECT ch.customer_challan_no, SUM(mi.available_qty)
+        FROM material_inward mi JOIN customer_challan ch ON ch.id = mi.challan_id
+        GROUP BY ch.id ORDER BY ch.id
+    """).fetchall()
+    assert len({t[1] for t in totals}) == 1, "write paths disagree: " + str([tuple(t) for t in totals])
+    print(f"  inward totals match: {[tuple(t) for t in totals]}")
+    print(f"  shift speedup   {r['shift   legacy (execute per row)'] / r['shift   batched (executemany)']:.1f}x")
+    print(f"  inward speedup  {r['inward  legacy (select + write per line)'] / r['inward  batched (ON CONFLICT upsert)']:.1f}x")
+    con.close()
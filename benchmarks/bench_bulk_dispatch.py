@@ -0,0 +1,99 @@
+# benchmarks/bench_bulk_dispatch.py
+# --------------------------------------------
+# One ELTA challan covering 30 item / process lines:
+#   per-line  = 30 POSTs to /materials/dispatch, re-rendering the dispatch
+#               page (open challan query) after each, as the UI does
+#   bulk      = one POST /materials/dispatch/bulk with the 30 lines
+#   fifo      = one bulk POST per item code total, allocated over the
+#               open challans oldest first
+#
+#   python benchmarks/bench_bulk_dispatch.py [challans]
+# --------------------------------------------
+
+import sys
+
+from common import db, timed
+
+from app import app
+
+LINES = 30
+CHALLANS = 200          # open challans per item (FIFO spreads across them)
+
+
+def seed(con, challans):
+    with db.write_transaction(con):
+        con.executemany("INSERT INTO item_code_master (item_code) VALUES (?)",
+                        [(f"IC-{i:02d}",) for i in range(LINES)])
+        con.execute("INSERT INTO customer_master (customer_name) VALUES ('Bench Customer')")
+        for c in range(challans):
+            ch = con.execute("""
+                INSERT INTO customer_challan (customer_id, customer_challan_no, customer_challan_date)
+                VALUES (1, ?, date('2020-01-01', ?))
+            """, (f"CH-{c:05d}", f"+{c} days")).lastrowid
+            con.executemany("""
+                INSERT INTO material_inward (challan_id, item_code, process, inward_qty, available_qty)
+                VALUES (?, ?, 'TURN', 100, 100)
+            """, [(ch, f"IC-{i:02d}") for i in range(LINES)])
+
+
+def inward_ids(con, challan_no):
+    return [r[0] for r in con.execute("""
+        SELECT mi.id FROM material_inward mi JOIN customer_challan ch ON ch.id = mi.challan_id
+        WHERE ch.customer_challan_no = ? ORDER BY mi.id
+    """, (challan_no,))]
+
+
+def per_line(client, ids, elta):
+    for inward_id in ids:
+        resp = client.post("/materials/dispatch", data=dict(
+            work_type="JOBWORK", inward_id=str(inward_id), elta_challan_no=elta,
+            dispatch_date="2025-01-01", ok_qty="60", rej_qty="2"))
+        assert resp.status_code == 302, resp.data
+        assert client.get("/materials/dispatch").status_code == 200
+
+
+def bulk(client, ids, elta):
+    resp = client.post("/materials/dispatch/bulk", json={
+        "elta_challan_no": elta, "dispatch_date": "2025-01-01",
+        "lines": [{"inward_id": i, "ok_qty": 60, "rej_qty": 2} for i in ids],
+    })
+    assert resp.status_code == 201, resp.data
+    assert client.get("/materials/dispatch").status_code == 200
+
+
+def fifo(client, elta):
+    resp = client.post("/materials/dispatch/bulk", json={
+        "elta_challan_no": elta, "dispatch_date": "2025-01-01",
+        "lines": [{"item_code": f"IC-{i:02d}", "process": "TURN", "ok_qty": 250} for i in range(LINES)],
+    })
+    assert resp.status_code == 201, resp.data
+    return len(resp.get_json()["lines"])
+
+
+if __name__ == "__main__":
+    challans = int(sys.argv[1]) if len(sys.argv) > 1 else CHALLANS
+
+    con = db.connect()
+    seed(con, challans)
+    client = app.test_client()
+
+    print(f"{challans} open challans x {LINES} lines; one ELTA challan = {LINES} lines")
+    r = {}
+    with timed("per-line POST x30 + page reload", r):
+        per_line(client, inward_ids(con, "CH-00000"), "E-LINE")
+    with timed("bulk POST (executemany, one txn)", r):
+        bulk(client, inward_ids(con, "CH-00001"), "E-BULK")
+    with timed("bulk POST, FIFO by item total", r):
+        rows = fifo(client, "E-FIFO")
+
+    # FIFO took the 38 left on CH-00000 / CH-00001, all of CH-00002 and 74 of CH-00003 per item
+    left = dict(con.execute("""
+        SELECT ch.customer_challan_no, SUM(mi.available_qty)
+        FROM material_inward mi JOIN customer_challan ch ON ch.id = mi.challan_id
+        WHERE ch.customer_challan_no <= 'CH-00004' GROUP BY ch.id
+    """).fetchall())
+    assert left == {"CH-00000": 0, "CH-00001": 0, "CH-00002": 0,
+                    "CH-00003": 26 * LINES, "CH-00004": 100 * LINES}, left
+    print(f"  FIFO wrote {rows} dispatch rows; balances check out")
+    print(f"  speedup  {r['per-line POST x30 + page reload'] / r['bulk POST (executemany, one txn)']:.1f}x")
+    con.really_close()
@@ -0,0 +1,112 @@
+# benchmarks/bench_complaint_search.py
+# --------------------------------------------
+# Complaint text search with N synthetic complaints (+ 2 log lines each):
+#   like = LIKE '%...%' over the three text columns and the log notes
+#   fts  = complaint_search.search_sql() (FTS5, ranked, with snippets)
+# plus the cost the FTS sync triggers add to each insert.
+#
+#   python benchmarks/bench_complaint_search.py [complaints]
+# --------------------------------------------
+
+import random
+import sys
+import time
+
+from common import db, fresh_db_path
+
+import complaint_search
+
+WORDS = ("burr dent scratch oversize undersize thread chamfer rust crack bore face groove "
+         "insert tool fixture clamp coolant operator setup offset drawing gauge batch "
+         "found observed during inspection at customer end on first piece lot").split()
+FILLER = [f"w{i}" for i in range(3000)]        # stands in for the rest of the vocabulary
+
+QUERIES = ("burr", "burr thread", '"burr on thread"', "chamf*")
+
+# a LIKE search has to find every match before it can show any order
+LIKE_SQL = """
+    SELECT DISTINCT cc.id
+    FROM customer_complaint cc
+    LEFT JOIN complaint_action_log l ON l.complaint_id = cc.id
+    WHERE {cond}
+"""
+
+
+def like_cond(query):
+    """Same semantics as the FTS query, as LIKE terms (every term somewhere)."""
+    terms = [t.strip('"*') for t in (query.split('"')[1::2] or query.split())]
+    one = "(cc.issue_description LIKE ? OR cc.root_cause_5why LIKE ? OR cc.corrective_action LIKE ? OR l.notes LIKE ?)"
+    return " AND ".join([one] * len(terms)), [f"%{t}%" for t in terms for _ in range(4)]
+
+
+def sentence(rng, n=14):
+    words = [rng.choice(WORDS) if rng.random() < 0.1 else rng.choice(FILLER) for _ in range(n)]
+    if rng.random() < 0.005:
+        words[3:3] = ["burr", "on", "thread"]
+    return " ".join(words)
+
+
+def best_of(fn, n=5):
+    best = float("inf")
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def load(con, n, rng):
+    con.executemany("""
+        INSERT INTO customer_complaint (complaint_no, complaint_date, customer_id, item_code,
+                                        issue_category, issue_description, root_cause_5why, corrective_action)
+        VALUES (?, '2025-01-01', 1, 'IC-1', 'Other', ?, ?, ?)
+    """, ((f"B-{i}", sentence(rng), sentence(rng), sentence(rng, 8)) for i in range(n)))
+    con.executemany("""
+        INSERT INTO complaint_action_log (complaint_id, action_date, action_type, notes)
+        VALUES (?, '2025-01-02', 'NOTE', ?)
+    """, ((1 + i // 2, sentence(rng)) for i in range(2 * n)))
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    rng = random.Random(7)
+    con = db.connect(fresh_db_path("complaint_search"))
+    con.execute("INSERT INTO customer_master (customer_name) VALUES ('ACME')")
+    con.commit()
+
+    t0 = time.perf_counter()
+    with db.write_transaction(con):
+        load(con, n, rng)
+    with_fts = time.perf_counter() - t0
+
+    # same load into a DB without the FTS sync triggers
+    plain_con = db.connect(fresh_db_path("complaint_plain"))
+    plain_con.execute("INSERT INTO customer_master (customer_name) VALUES ('ACME')")
+    for t in ("complaint_fts", "complaint_log_fts"):
+        for suffix in ("ins", "upd", "del"):
+            plain_con.execute(f"DROP TRIGGER trg_{t}_{suffix}")
+    plain_con.commit()
+    t0 = time.perf_counter()
+    with db.write_transaction(plain_con):
+        load(plain_con, n, random.Random(7))
+    plain = time.perf_counter() - t0
+    plain_con.close()
+
+    con.execute("ANALYZE")
+
+    print(f"{n} complaints, {2 * n} log lines")
+    print(f"  load: {plain:.2f} s plain, {with_fts:.2f} s with FTS triggers")
+    sql = complaint_search.search_sql() + " ORDER BY neg_score DESC, id DESC LIMIT 50"
+
+    def fts_page(match):
+        return complaint_search.add_snippets(con, match, con.execute(sql, (match, match)).fetchall())
+
+    for q in QUERIES:
+        cond, params = like_cond(q)
+        like_rows = con.execute(LIKE_SQL.format(cond=cond), params).fetchall()
+        like_ms = best_of(lambda: con.execute(LIKE_SQL.format(cond=cond), params).fetchall(), 3)
+        match = complaint_search.fts_query(q)
+        fts_ms = best_of(lambda: fts_page(match))
+        print(f"  {q:<18} like {like_ms:8.1f} ms ({len(like_rows):5} rows, unranked)   "
+              f"fts top 50 + snippets {fts_ms:6.1f} ms")
+    con.close()
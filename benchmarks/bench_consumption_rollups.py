@@ -0,0 +1,99 @@
+# benchmarks/bench_consumption_rollups.py
+# --------------------------------------------
+# Consumption dashboard numbers with N tool transactions:
+#   raw    = GROUP BY over tool_issue_txn (what a report without rollups does)
+#   rollup = consumption.top() / weekly() / breakage_by_type() reads
+# plus the per-row cost the rollup triggers add to each txn insert.
+#
+#   python benchmarks/bench_consumption_rollups.py [txn_rows]
+# --------------------------------------------
+
+import sys
+import time
+
+from common import db, fresh_db_path
+
+import consumption
+
+RAW = {
+    "machine": """
+        SELECT machine, SUM(CASE WHEN action='ISSUE' THEN qty ELSE 0 END) AS issued
+        FROM tool_issue_txn GROUP BY machine ORDER BY issued DESC LIMIT 10
+    """,
+    "week": """
+        SELECT date(ts, 'weekday 0', '-6 days') AS wk, SUM(CASE WHEN action='ISSUE' THEN qty ELSE 0 END)
+        FROM tool_issue_txn GROUP BY wk ORDER BY wk DESC LIMIT 12
+    """,
+    "breakage": """
+        SELECT ct.tool_type || ' / ' || ct.material AS tm,
+               SUM(CASE WHEN t.action='RETURN' AND t.condition='Broken' THEN t.qty ELSE 0 END) * 1.0
+               / NULLIF(SUM(CASE WHEN t.action='RETURN' THEN t.qty ELSE 0 END), 0)
+        FROM tool_issue_txn t JOIN cutting_tools ct ON ct.id = t.tool_id GROUP BY tm
+    """,
+}
+
+
+def best_of(fn, n=5):
+    best = float("inf")
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def txn_rows(n, offset=0):
+    actions = [("ISSUE", None), ("RETURN", "Good"), ("RETURN", "Broken"), ("ISSUE", None), ("REGRIND", None)]
+    for i in range(offset, offset + n):
+        action, cond = actions[i % len(actions)]
+        yield (i % 60 + 1, action, 1 + i % 3, f"op{i % 25}", f"M{i % 40}", "A", f"JOB-{i % 300}", cond,
+               f"2023-01-01 +{i // 150} days")
+
+
+INSERT_SQL = """
+    INSERT INTO tool_issue_txn (tool_id, action, qty, operator, machine, shift, job_name, condition, ts)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, date(substr(?, 1, 10), substr(?, 12)))
+"""
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    con = db.connect(fresh_db_path("consumption"))
+    con.executemany("""
+        INSERT INTO cutting_tools (tool_type, cutting_diameter, cutting_length, shank_type, shank_diameter, material)
+        VALUES (?, ?, 20, 'Plain', 6, ?)
+    """, [(("End Mill", "Drill", "Reamer")[d % 3], d, ("Carbide", "HSS")[d % 2]) for d in range(1, 61)])
+    con.commit()
+
+    t0 = time.perf_counter()
+    with db.write_transaction(con):
+        con.executemany(INSERT_SQL, ((*r, r[-1]) for r in txn_rows(n)))
+    with_triggers = time.perf_counter() - t0
+
+    # same insert with the trigger dropped, rolled back afterwards (DDL is transactional)
+    con.execute("BEGIN IMMEDIATE")
+    con.execute("DROP TRIGGER trg_tool_issue_txn_rollup")
+    t0 = time.perf_counter()
+    con.executemany(INSERT_SQL, ((*r, r[-1]) for r in txn_rows(n, n)))
+    without = time.perf_counter() - t0
+    con.rollback()
+    con.execute("ANALYZE")
+
+    print(f"{n} tool transactions")
+    print(f"  insert cost per txn: {without / n * 1e6:.1f} us plain, {with_triggers / n * 1e6:.1f} us with rollup triggers")
+    for name, sql in RAW.items():
+        raw_ms = best_of(lambda: con.execute(sql).fetchall())
+        if name == "machine":
+            fast = lambda: consumption.top("tool", "machine", db=con)
+        elif name == "week":
+            fast = lambda: consumption.weekly("tool", db=con)
+        else:
+            fast = lambda: consumption.breakage_by_type(db=con)
+        print(f"  {name:<10} raw {raw_ms:8.1f} ms   rollup {best_of(fast):6.2f} ms")
+
+    live = sorted(tuple(r) for r in con.execute("SELECT * FROM consumption_rollup"))
+    with db.write_transaction(con):
+        consumption.rebuild_rollups(con)
+    assert live == sorted(tuple(r) for r in con.execute("SELECT * FROM consumption_rollup")), "rollup drift"
+    print("  incremental rollups == full rebuild")
+    con.close()
@@ -0,0 +1,85 @@
+# benchmarks/bench_exports.py
+# --------------------------------------------
+# Tool history export with N transactions:
+#   buffered = fetchall() + csv into one StringIO (what a plain view would do)
+#   csv      = GET /export/tool_history.csv, chunks consumed as they stream
+#   xlsx     = GET /export/tool_history.xlsx (write-only workbook, temp file)
+# Peak Python heap (tracemalloc) is reported next to the time; the streamed
+# exports should stay flat as N grows.
+#
+#   python benchmarks/bench_exports.py [transactions] [xlsx_transactions]
+# --------------------------------------------
+
+import csv
+import io
+import sys
+import time
+import tracemalloc
+
+from common import db
+
+from app import app
+import modules.tools
+
+QUERY, _ = modules.tools.HISTORY.ordered({})
+
+
+def seed(con, n):
+    with db.write_transaction(con):
+        con.executemany("""
+            INSERT INTO cutting_tools (tool_type, cutting_diameter, cutting_length, material, total_qty)
+            VALUES (?, ?, 40, 'Carbide', 1000)
+        """, [(("End Mill", "Drill", "Reamer")[i % 3], 2 + i) for i in range(50)])
+        con.executemany("""
+            INSERT INTO tool_issue_txn (tool_id, action, qty, operator, machine, shift, job_name, ts)
+            VALUES (?, ?, 1, ?, ?, 'A', ?, datetime('2020-01-01', ? || ' minutes'))
+        """, [(1 + i % 50, ("ISSUE", "RETURN")[i % 2], f"op{i % 30}", f"M{i % 20}", f"JOB-{i % 400}", str(i))
+              for i in range(n)])
+
+
+def buffered(con):
+    rows = con.execute(QUERY).fetchall()
+    buf = io.StringIO()
+    out = csv.writer(buf)
+    for r in rows:
+        out.writerow(tuple(r)[:13])
+    return f"{len(buf.getvalue()) / 2**20:.1f} MB csv in memory"
+
+
+def streamed(client, fmt, qs=""):
+    def run():
+        resp = client.get(f"/export/tool_history.{fmt}{qs}")
+        assert resp.status_code == 200, resp.status_code
+        size = sum(len(chunk) for chunk in resp.response)
+        resp.close()
+        return f"{size / 2**20:.1f} MB {fmt} streamed"
+    return run
+
+
+def measure(label, fn):
+    """Timed run, then a traced run for the peak heap (tracing slows it down)."""
+    t0 = time.perf_counter()
+    out = fn()
+    dt = time.perf_counter() - t0
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  {label:<9} {dt * 1000:9.1f} ms   peak heap {peak / 2**20:7.1f} MB   {out}")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    n_xlsx = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    con = db.connect()
+    seed(con, n)
+    client = app.test_client()
+
+    print(f"{n} tool transactions")
+    measure("buffered", lambda: buffered(con))
+    measure("csv", streamed(client, "csv"))
+    # date filter keeps the (slower) xlsx run to about n_xlsx rows
+    last = con.execute("SELECT date(ts) FROM tool_issue_txn ORDER BY ts DESC LIMIT 1 OFFSET ?",
+                       (min(n_xlsx, n) - 1,)).fetchone()[0]
+    measure("xlsx", streamed(client, "xlsx", f"?date_from={last}"))
+    con.really_close()
@@ -0,0 +1,82 @@
+# benchmarks/bench_keyset_pagination.py
+# --------------------------------------------
+# /tools/history latency as tool_issue_txn grows:
+#   full   = old behaviour, fetchall() of the whole joined history
+#   page 1 = first keyset page
+#   deep   = a keyset page from the middle of the history (?after=cursor)
+#
+#   python benchmarks/bench_keyset_pagination.py [max_rows]
+# --------------------------------------------
+
+import sys
+import time
+
+from common import db
+
+from app import app
+from pagination import encode_cursor
+
+FULL_QUERY = """
+    SELECT tx.ts, ct.tool_type, ct.material, ct.cutting_diameter, ct.cutting_length,
+           tx.action, tx.qty, tx.operator, tx.machine, tx.shift, tx.job_name,
+           tx.condition, tx.remarks
+    FROM tool_issue_txn tx
+    JOIN cutting_tools ct ON ct.id = tx.tool_id
+    ORDER BY tx.ts DESC
+"""
+
+
+def grow_to(con, target):
+    have = con.execute("SELECT COUNT(*) FROM tool_issue_txn").fetchone()[0]
+    con.executemany("""
+        INSERT INTO tool_issue_txn (tool_id, action, qty, operator, machine, shift, job_name, ts)
+        VALUES (?, 'ISSUE', 1, 'op', 'M1', 'A', 'JOB', date('2020-01-01', ? || ' minutes'))
+    """, [(i % 50 + 1, f"+{i * 7}") for i in range(have, target)])
+    con.commit()
+
+
+def best_of(fn, n=5):
+    best = float("inf")
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    sizes = [s for s in (10_000, 50_000, 200_000, 500_000) if s <= max_rows] or [max_rows]
+
+    con = db.connect()
+    con.executemany("""
+        INSERT INTO cutting_tools (tool_type, cutting_diameter, cutting_length, shank_type, shank_diameter, material)
+        VALUES ('End Mill', ?, 20, 'Plain', ?, 'Carbide')
+    """, [(d, d) for d in range(1, 51)])
+    con.commit()
+
+    client = app.test_client()
+    print(f"{'rows':>9} {'full fetch+render':>18} {'page 1':>9} {'deep page':>10}   (ms, best of 5)")
+    for size in sizes:
+        grow_to(con, size)
+        con.execute("ANALYZE")
+
+        mid = con.execute(
+            "SELECT ts, id FROM tool_issue_txn ORDER BY ts DESC, id DESC LIMIT 1 OFFSET ?", (size // 2,)
+        ).fetchone()
+        deep_url = "/tools/history?after=" + encode_cursor([mid["ts"], mid["id"]])
+
+        with app.test_request_context():
+            from flask import render_template
+
+            def full():
+                rows = db.get_db().execute(FULL_QUERY).fetchall()
+                render_template("tool_history.html", rows=rows, page=None, tools=[])
+
+            t_full = best_of(full, 2)
+
+        t_first = best_of(lambda: client.get("/tools/history"))
+        t_deep = best_of(lambda: client.get(deep_url))
+        print(f"{size:>9} {t_full:>18.1f} {t_first:>9.1f} {t_deep:>10.1f}")
+
+    con.close()
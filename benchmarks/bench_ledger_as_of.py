@@ -0,0 +1,70 @@
+# benchmarks/bench_ledger_as_of.py
+# --------------------------------------------
+# Crib stock as of a date from the unified inventory_ledger:
+#   full history = SUM over every ledger row up to the date
+#   snapshot     = ledger.balances_as_of(): latest snapshot + rows after it
+#
+#   python benchmarks/bench_ledger_as_of.py [ledger_rows]
+# --------------------------------------------
+
+import sys
+import time
+from datetime import date, timedelta
+
+from common import db, fresh_db_path
+
+import ledger
+
+ITEMS = 400
+MOVES = ["ISSUE", "RETURN", "ISSUE", "RETURN", "RETURN_BROKEN", "RECEIPT"]
+
+FULL_SQL = """
+    SELECT kind, item_id, SUM(d_available), SUM(d_out), SUM(d_broken)
+    FROM inventory_ledger
+    WHERE txn_date <= ?
+    GROUP BY kind, item_id
+"""
+
+
+def best_of(fn, n=5):
+    best = float("inf")
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    con = db.connect(fresh_db_path("ledger_as_of"))
+
+    start = date.today() - timedelta(days=3 * 365)
+    per_day = max(1, n_rows // (3 * 365))
+    kinds = ledger.KINDS
+    with db.write_transaction(con):
+        for i in range(n_rows):
+            ledger.record(con, kinds[i % 4], i % ITEMS + 1, MOVES[i % len(MOVES)], 1 + i % 3,
+                          (start + timedelta(days=i // per_day)).isoformat())
+    con.execute("ANALYZE")
+
+    as_of = (date.today() - timedelta(days=10)).isoformat()
+    print(f"{n_rows} ledger rows over 3 years, as of {as_of}")
+
+    full_ms = best_of(lambda: con.execute(FULL_SQL, (as_of,)).fetchall())
+    no_snap_ms = best_of(lambda: ledger.balances_as_of(as_of, db=con))
+
+    with db.write_transaction(con):
+        # weekly snapshots would exist in a live DB; the latest one is what matters
+        ledger.take_snapshot((date.today() - timedelta(days=14)).isoformat(), db=con)
+    snap_ms = best_of(lambda: ledger.balances_as_of(as_of, db=con))
+
+    full = {(r[0], r[1]): (r[2], r[3], r[4]) for r in con.execute(FULL_SQL, (as_of,))}
+    fast = {k: v[1:] for k, v in ledger.balances_as_of(as_of, db=con).items()}
+    assert full == fast, "snapshot + delta disagrees with full history"
+
+    print(f"  {'full history scan':<32} {full_ms:10.1f} ms")
+    print(f"  {'as_of, no snapshot yet':<32} {no_snap_ms:10.1f} ms")
+    print(f"  {'as_of, snapshot 4 days before':<32} {snap_ms:10.1f} ms")
+    print("  results identical")
+    con.close()
@@ -0,0 +1,104 @@
+# benchmarks/bench_pdf_reports.py
+# --------------------------------------------
+# Material inventory PDF with N inward lines:
+#   legacy = fetchall() + hand-placed canvas into a BytesIO (old view)
+#   engine = reports.render_to_file(): cursor streamed through PdfWriter
+#            into a file, compressed pages
+#   cached = the cache lookup a repeat request costs
+# Peak Python heap (tracemalloc) is reported next to the time. Both grow
+# with the page count; the engine's is lower, not constant.
+#
+#   python benchmarks/bench_pdf_reports.py [inward_lines]
+# --------------------------------------------
+
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+from common import db, fresh_db_path
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+import reports
+import modules.materials  # noqa: F401  (registers "material_inventory")
+
+QUERY = """
+    SELECT c.customer_name, ch.customer_challan_no, ch.status, mi.item_code, mi.process,
+           mi.inward_qty, mi.available_qty
+    FROM material_inward mi
+    JOIN customer_challan ch ON ch.id = mi.challan_id
+    JOIN customer_master c ON c.id = ch.customer_id
+    WHERE 1=1
+    ORDER BY c.customer_name, ch.customer_challan_no, mi.item_code
+"""
+
+
+def seed(con, n):
+    with db.write_transaction(con):
+        con.executemany("INSERT INTO customer_master (customer_name) VALUES (?)",
+                        [(f"Customer {i:02d}",) for i in range(20)])
+        con.executemany("INSERT INTO item_code_master (item_code) VALUES (?)",
+                        [(f"IC-{i:04d}",) for i in range(500)])
+        con.executemany("""
+            INSERT INTO customer_challan (customer_id, customer_challan_no, customer_challan_date, status)
+            VALUES (?, ?, '2025-01-01', ?)
+        """, [(1 + i % 20, f"CH-{i:06d}", ("OPEN", "CLOSED")[i % 3 == 0]) for i in range(n // 5)])
+        con.executemany("""
+            INSERT INTO material_inward (challan_id, item_code, process, inward_qty, available_qty)
+            VALUES (?, ?, ?, 100, ?)
+        """, [(1 + i // 5, f"IC-{i % 500:04d}", ("", "TURN", "MILL", "GRIND", "HT")[i % 5], i % 100)
+              for i in range(n // 5 * 5)])
+
+
+def legacy(con):
+    rows = con.execute(QUERY).fetchall()
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    y = height - 90
+    x = [40, 140, 220, 280, 350, 420, 470]
+    pdf.setFont("Helvetica", 9)
+    for r in rows:
+        if y < 50:
+            pdf.showPage()
+            pdf.setFont("Helvetica", 9)
+            y = height - 50
+        for i, v in enumerate(r):
+            pdf.drawString(x[i], y, str(v or ""))
+        y -= 14
+    pdf.save()
+    return len(buffer.getvalue())
+
+
+def measure(label, fn, before=None):
+    """Timed run, then a traced run for the peak heap (tracing slows it down)."""
+    if before:
+        before()
+    t0 = time.perf_counter()
+    out = fn()
+    dt = time.perf_counter() - t0
+    if before:
+        before()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  {label:<8} {dt * 1000:9.1f} ms   peak heap {peak / 2**20:7.1f} MB   {out}")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    con = db.connect(fresh_db_path("pdf_reports"))
+    seed(con, n)
+    rep = reports.REPORTS["material_inventory"]
+    params = {k: "" for k in modules.materials.INVENTORY_PDF_FILTERS}
+
+    print(f"{n} inward lines")
+    measure("legacy", lambda: f"{legacy(con) / 2**20:.1f} MB pdf in memory")
+    measure("engine", lambda: f"{os.path.getsize(reports.render_to_file(rep, params, con)) / 2**20:.1f} MB pdf on disk",
+            before=lambda: [os.remove(e.path) for e in os.scandir(reports.cache_dir())])
+    measure("cached", lambda: os.path.exists(reports._cache_path(reports.cache_key(rep, params, con))))
+    con.close()
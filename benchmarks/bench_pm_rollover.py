@@ -0,0 +1,86 @@
+# benchmarks/bench_pm_rollover.py
+# --------------------------------------------
+# PM dashboard cost with N PM plans (default 5,000):
+#   legacy refresh = old per-request _refresh_pm_statuses(): SELECT all,
+#                    UPDATE per row, commit -- on every /maintenance/pm hit
+#   rollover       = maintenance.rollover_pm_statuses(): one set-based
+#                    UPDATE, run by the scheduler at date change only
+#   GET /pm        = dashboard request now (read-only)
+#
+#   python benchmarks/bench_pm_rollover.py [plans]
+# --------------------------------------------
+
+import sys
+import time
+from datetime import date, timedelta
+
+from common import db, timed
+
+from app import app
+from modules import maintenance
+
+
+def legacy_refresh(con):
+    rows = con.execute("SELECT id, next_due_date FROM pm_schedule").fetchall()
+    for r in rows:
+        nd = maintenance._to_date(r["next_due_date"])
+        if not nd:
+            continue
+        st = maintenance._status_for(nd)
+        con.execute("UPDATE pm_schedule SET status=? WHERE id=?", (st, r["id"]))
+    con.commit()
+
+
+def seed(con, plans):
+    today = date.today()
+    con.executemany("""
+        INSERT INTO machine_master (machine_code, machine_name, machine_type) VALUES (?, ?, 'VMC')
+    """, [(f"M{i}", f"Machine {i}") for i in range(100)])
+    con.executemany("""
+        INSERT INTO pm_master (machine_code, pm_name, frequency_days) VALUES (?, ?, 30)
+    """, [(f"M{i % 100}", f"PM {i}") for i in range(plans)])
+    # due dates spread from 60 days ago to 60 days ahead, all stored as OK
+    con.executemany("""
+        INSERT INTO pm_schedule (pm_id, next_due_date, status) VALUES (?, ?, 'OK')
+    """, [(i + 1, (today + timedelta(days=i % 121 - 60)).isoformat()) for i in range(plans)])
+    con.commit()
+
+
+def best_of(fn, n=5):
+    best = float("inf")
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    plans = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    con = db.connect()
+    seed(con, plans)
+    today = date.today()
+
+    print(f"{plans} PM plans")
+    with timed("first rollover (statuses change)"):
+        with db.write_transaction(con):
+            changed = maintenance.rollover_pm_statuses(con, today)
+    print(f"  rows changed: {changed}")
+
+    legacy_ms = best_of(lambda: legacy_refresh(con))
+
+    def rollover():
+        with db.write_transaction(con):
+            maintenance.rollover_pm_statuses(con, today)
+    rollover_ms = best_of(rollover)
+
+
+    client = app.test_client()
+    client.get("/maintenance/pm")
+    get_ms = best_of(lambda: client.get("/maintenance/pm"))
+
+    print(f"  {'legacy refresh (per request)':<40} {legacy_ms:10.1f} ms")
+    print(f"  {'rollover, nothing changed':<40} {rollover_ms:10.1f} ms")
+    print(f"  {'GET /maintenance/pm (read-only)':<40} {get_ms:10.1f} ms")
+    print(f"  {'GET + legacy refresh (old request)':<40} {get_ms + legacy_ms:10.1f} ms")
+    con.close()
@@ -0,0 +1,128 @@
+# benchmarks/bench_wal_concurrency.py
+# --------------------------------------------
+# Concurrent readers + writers against the real schema:
+#   legacy = rollback journal, synchronous=FULL (old get_db())
+#   tuned  = db.PRAGMA_PROFILE (WAL, synchronous=NORMAL, ...)
+#
+#   python benchmarks/bench_wal_concurrency.py [seconds] [readers] [writers]
+# --------------------------------------------
+
+import random
+import sqlite3
+import sys
+import threading
+import time
+
+from common import db, fresh_db_path
+
+LEGACY_PROFILE = {"journal_mode": "DELETE", "synchronous": "FULL"}
+
+
+def seed(path):
+    con = db.connect(path)
+    con.executemany("""
+        INSERT INTO cutting_tools
+        (tool_type, cutting_diameter, cutting_length, shank_type, shank_diameter, material, total_qty)
+        VALUES ('End Mill', ?, ?, 'Plain', ?, 'Carbide', 1000000)
+    """, [(d, d * 3, d) for d in range(1, 301)])
+    con.execute("INSERT INTO customer_master (customer_name) VALUES ('ACME')")
+    con.executemany("""
+        INSERT INTO customer_challan (customer_id, customer_challan_no, customer_challan_date)
+        VALUES (1, ?, '2025-01-01')
+    """, [(f"CH-{i}",) for i in range(1, 501)])
+    con.executemany("""
+        INSERT INTO material_inward (challan_id, item_code, process, inward_qty, available_qty)
+        VALUES (?, ?, ?, 100, 50)
+    """, [(i % 500 + 1, f"IC-{i % 200}", f"OP{i // 1000}") for i in range(5000)])   # (challan, item, process) unique
+    con.executemany("""
+        INSERT INTO tool_issue_txn (tool_id, action, qty, operator, machine, shift, ts)
+        VALUES (?, 'ISSUE', 1, 'op', 'M1', 'A', '2025-01-01')
+    """, [(i % 300 + 1,) for i in range(20000)])
+    con.commit()
+    con.close()
+
+
+def session(profile):
+    """Per-thread PRAGMAs: the journal mode is set once on the file by run()."""
+    return {k: v for k, v in (db.PRAGMA_PROFILE if profile is None else profile).items() if k != "journal_mode"}
+
+
+def reader(path, profile, stop, counts, errors):
+    con = db.connect(path, session(profile))
+    n = 0
+    while not stop.is_set():
+        try:
+            con.execute("""
+                SELECT c.customer_name, ch.customer_challan_no, ch.status,
+                       mi.item_code, mi.process, mi.inward_qty, mi.available_qty
+                FROM material_inward mi
+                JOIN customer_challan ch ON ch.id = mi.challan_id
+                JOIN customer_master c ON c.id = ch.customer_id
+                WHERE mi.item_code = ?
+            """, (f"IC-{random.randrange(200)}",)).fetchall()
+            con.execute("""
+                SELECT id, tool_type, (total_qty - issued_qty - broken_qty)
+                FROM cutting_tools ORDER BY tool_type, material, cutting_diameter
+            """).fetchall()
+            n += 1
+        except sqlite3.OperationalError:
+            errors.append(1)
+    con.close()
+    counts.append(n)
+
+
+def writer(path, profile, stop, counts, errors):
+    con = db.connect(path, session(profile))
+    n = 0
+    while not stop.is_set():
+        tool_id = random.randint(1, 300)
+        try:
+            con.execute("UPDATE cutting_tools SET issued_qty = issued_qty + 1 WHERE id=?", (tool_id,))
+            con.execute("""
+                INSERT INTO tool_issue_txn (tool_id, action, qty, operator, machine, shift, ts)
+                VALUES (?, 'ISSUE', 1, 'op', 'M1', 'A', datetime('now'))
+            """, (tool_id,))
+            con.commit()
+            n += 1
+        except sqlite3.OperationalError:
+            con.rollback()
+            errors.append(1)
+    con.close()
+    counts.append(n)
+
+
+def run(label, profile, seconds, n_readers, n_writers):
+    path = fresh_db_path(label)
+    con = db.connect(path, profile)   # sets journal mode on the file
+    con.close()
+    seed(path)
+
+    stop = threading.Event()
+    r_counts, w_counts, errors = [], [], []
+    threads = (
+        [threading.Thread(target=reader, args=(path, profile, stop, r_counts, errors)) for _ in range(n_readers)]
+        + [threading.Thread(target=writer, args=(path, profile, stop, w_counts, errors)) for _ in range(n_writers)]
+    )
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    reads, writes = sum(r_counts) / seconds, sum(w_counts) / seconds
+    print(f"  {label:<8} reads/s {reads:9.1f}   writes/s {writes:8.1f}   lock errors {len(errors)}")
+    return reads, writes
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    n_readers = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    n_writers = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+
+    print(f"WAL concurrency benchmark: {n_readers} readers, {n_writers} writers, {seconds}s")
+    legacy = run("legacy", LEGACY_PROFILE, seconds, n_readers, n_writers)
+    tuned = run("tuned", None, seconds, n_readers, n_writers)
+
+    print(f"  speed-up: reads x{tuned[0] / max(legacy[0], 1e-9):.2f}, "
+          f"writes x{tuned[1] / max(legacy[1], 1e-9):.2f}")
@@ -0,0 +1,128 @@
+# benchmarks/bench_wip_rollups.py
+# --------------------------------------------
+# Material flow dashboard numbers with N dispatch rows:
+#   raw    = GROUP BY over material_dispatch joined to inward / challan
+#            (what the dashboard would do without rollups)
+#   rollup = wip.daily() / wip.ratios() reads of dispatch_daily
+# plus the per-row cost the rollup triggers add to each dispatch insert.
+#
+#   python benchmarks/bench_wip_rollups.py [dispatch_rows]
+# --------------------------------------------
+
+import sys
+import time
+
+from common import db, fresh_db_path
+
+import wip
+
+CUSTOMERS, ITEMS, PROCESSES = 20, 150, ("TURN", "MILL", "GRIND", "DRILL")
+CHALLANS = 3000
+
+RAW = {
+    "daily": """
+        SELECT date(md.dispatch_date) AS day, SUM(md.total_qty), SUM(md.ok_qty), SUM(md.rej_qty)
+        FROM material_dispatch md
+        WHERE md.dispatch_date > date('2026-01-01', '-30 days')
+        GROUP BY day ORDER BY day
+    """,
+    "process": """
+        SELECT mi.process, SUM(md.total_qty), 100.0 * SUM(md.ok_qty) / SUM(md.total_qty),
+               1.0 * SUM(md.total_qty * (julianday(md.dispatch_date) - julianday(ch.customer_challan_date)))
+               / SUM(md.total_qty)
+        FROM material_dispatch md
+        JOIN material_inward mi ON mi.id = md.inward_id
+        JOIN customer_challan ch ON ch.id = md.challan_id
+        WHERE md.dispatch_date > date('2026-01-01', '-90 days')
+        GROUP BY mi.process
+    """,
+    "customer": """
+        SELECT ch.customer_id, SUM(md.total_qty), 100.0 * SUM(md.rej_qty) / SUM(md.total_qty)
+        FROM material_dispatch md
+        JOIN customer_challan ch ON ch.id = md.challan_id
+        WHERE md.dispatch_date > date('2026-01-01', '-90 days')
+        GROUP BY ch.customer_id
+    """,
+}
+
+
+def best_of(fn, n=5):
+    best = float("inf")
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def seed(con):
+    with db.write_transaction(con):
+        con.executemany("INSERT INTO customer_master (customer_name) VALUES (?)",
+                        [(f"Customer {i}",) for i in range(CUSTOMERS)])
+        con.executemany("""
+            INSERT INTO customer_challan (customer_id, customer_challan_no, customer_challan_date)
+            VALUES (?, ?, date('2024-01-01', ?))
+        """, [(1 + c % CUSTOMERS, f"CH-{c:05d}", f"+{c * 730 // CHALLANS} days") for c in range(CHALLANS)])
+        con.executemany("""
+            INSERT INTO material_inward (challan_id, item_code, process, inward_qty, available_qty)
+            VALUES (?, ?, ?, 1000, 0)
+        """, [(1 + c, f"IC-{(c * 7 + p) % ITEMS:03d}", PROCESSES[p]) for c in range(CHALLANS) for p in range(4)])
+
+
+def dispatch_rows(n, offset=0):
+    lines = CHALLANS * 4
+    for i in range(offset, offset + n):
+        inward = 1 + i % lines
+        challan = 1 + (inward - 1) // 4
+        day = (challan - 1) * 730 // CHALLANS + 3 + i % 20
+        yield (challan, inward, f"E-{i // 10}", f"+{day} days", 8, i % 3, i % 2, 0, 0, 8 + i % 3 + i % 2)
+
+
+INSERT_SQL = """
+    INSERT INTO material_dispatch (challan_id, inward_id, elta_challan_no, dispatch_date,
+                                   ok_qty, rej_qty, cd_qty, nd_qty, nd_pw_qty, total_qty)
+    VALUES (?, ?, ?, date('2024-01-01', ?), ?, ?, ?, ?, ?, ?)
+"""
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    con = db.connect(fresh_db_path("wip"))
+    seed(con)
+
+    t0 = time.perf_counter()
+    with db.write_transaction(con):
+        con.executemany(INSERT_SQL, dispatch_rows(n))
+    with_triggers = time.perf_counter() - t0
+
+    # same insert with the triggers dropped, rolled back afterwards (DDL is transactional)
+    con.execute("BEGIN IMMEDIATE")
+    for suffix in ("ins", "del", "upd_old", "upd_new"):
+        con.execute(f"DROP TRIGGER trg_dispatch_daily_{suffix}")
+    t0 = time.perf_counter()
+    con.executemany(INSERT_SQL, dispatch_rows(n, n))
+    without = time.perf_counter() - t0
+    con.rollback()
+    con.execute("ANALYZE")
+
+    # the raw queries use a fixed "today"; point the rollup reads at the same window
+    days_back = con.execute("SELECT CAST(julianday('now', 'localtime') - julianday('2026-01-01') AS INTEGER)").fetchone()[0]
+    reads = {
+        "daily": lambda: wip.daily(30 + days_back, db=con),
+        "process": lambda: wip.ratios("process", 90 + days_back, db=con),
+        "customer": lambda: wip.ratios("customer", 90 + days_back, db=con),
+    }
+
+    print(f"{n} dispatch rows, {CHALLANS * 4} inward lines")
+    print(f"  insert cost per row: {without / n * 1e6:.1f} us plain, {with_triggers / n * 1e6:.1f} us with rollup triggers")
+    for name, sql in RAW.items():
+        raw_ms = best_of(lambda: con.execute(sql).fetchall())
+        print(f"  {name:<10} raw {raw_ms:8.1f} ms   rollup {best_of(reads[name]):6.2f} ms")
+    print(f"  aging      {best_of(lambda: wip.aging(db=con)):6.2f} ms (open lines only)")
+
+    live = sorted(tuple(r) for r in con.execute("SELECT * FROM dispatch_daily"))
+    with db.write_transaction(con):
+        wip.rebuild_rollups(con)
+    assert live == sorted(tuple(r) for r in con.execute("SELECT * FROM dispatch_daily")), "rollup drift"
+    print("  incremental rollups == full rebuild")
+    con.close()
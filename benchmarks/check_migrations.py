@@ -0,0 +1,154 @@
+# benchmarks/check_migrations.py
+# --------------------------------------------
+# Upgrade check: a baseline (v1) DB holding the kind of data older versions
+# accepted (empty / non-ISO dispatch dates, duplicate inward lines) must
+# migrate to the latest version without losing data, the backfills must
+# match a rebuild and the rollup triggers must keep working on those rows.
+#
+#   python benchmarks/check_migrations.py        (exit code 1 on failure)
+# --------------------------------------------
+
+import os
+import sqlite3
+import sys
+
+from common import BENCH_HOME, db
+
+import consumption
+import migrations
+import reorder
+import wip
+
+LEGACY_DATES = ("2024-03-05", "", "x", "05/03/2024", None)
+
+
+def baseline_db(path):
+    """v1 schema with one challan / inward line and a dispatch per LEGACY_DATES entry."""
+    con = sqlite3.connect(path)
+    con.executescript(migrations.BASELINE_SQL)
+    con.execute("INSERT INTO customer_master (customer_name) VALUES ('Legacy')")
+    con.execute("""
+        INSERT INTO customer_challan (customer_id, customer_challan_no, customer_challan_date)
+        VALUES (1, 'L-1', '2024-03-01')
+    """)
+    con.execute("""
+        INSERT INTO material_inward (challan_id, item_code, process, inward_qty, available_qty)
+        VALUES (1, 'IC-L', 'TURN', 100, 50)
+    """)
+    con.executemany("""
+        INSERT INTO material_dispatch (challan_id, inward_id, elta_challan_no, dispatch_date, ok_qty, total_qty)
+        VALUES (1, 1, 'E-L', ?, 10, 10)
+    """, [(d if d is not None else "",) for d in LEGACY_DATES])
+    # duplicate lines of one challan / item / process, folded by v9
+    con.execute("""
+        INSERT INTO customer_challan (customer_id, customer_challan_no, customer_challan_date)
+        VALUES (1, 'L-2', '2024-03-02')
+    """)
+    con.executemany("""
+        INSERT INTO material_inward (challan_id, item_code, process, inward_qty, available_qty, box_tray, remarks)
+        VALUES (2, 'IC-D', NULL, ?, ?, ?, ?)
+    """, [(10, 5, "B1", None), (20, 20, "B2", "rush"), (5, 5, "B1", "")])
+    # crib history, backfilled into consumption_rollup by v11
+    con.execute("""
+        INSERT INTO cutting_tools (tool_type, cutting_diameter, cutting_length, shank_type, shank_diameter, material,
+                                   total_qty, issued_qty, reorder_level)
+        VALUES ('Drill', 6, 20, 'Plain', 6, 'Carbide', 10, 1, 12)
+    """)
+    con.executemany("""
+        INSERT INTO tool_issue_txn (tool_id, action, qty, operator, machine, job_name, condition, ts)
+        VALUES (1, ?, ?, 'op', 'M1', 'J1', ?, ?)
+    """, [("ISSUE", 3, None, "2024-03-04 08:00:00"), ("RETURN", 2, "Broken", "2024-03-06 09:00:00"),
+          ("REGRIND", 1, None, None)])
+    con.execute("INSERT INTO inserts (insert_type, size, grade, edges, total_qty, available_qty) VALUES ('CNMG', '12', 'P25', 4, 10, 8)")
+    con.executemany("""
+        INSERT INTO insert_txn (insert_id, action, qty, edges_used, operator, machine, job, txn_date)
+        VALUES (1, ?, ?, ?, 'op', 'M1', NULL, '2024-03-04')
+    """, [("ISSUE", 2, 0), ("EDGE_USED", 0, 3), ("SCRAP", 1, 0)])
+    # complaint text, indexed by v14
+    con.execute("""
+        INSERT INTO customer_complaint (complaint_no, complaint_date, customer_id, item_code, issue_category,
+                                        issue_description, severity, status)
+        VALUES ('CC-2024-1', '2024-03-05', 1, 'IC-L', 'Dimensional', 'Burrs on the bore', 'Major', 'Open')
+    """)
+    con.execute("""
+        INSERT INTO complaint_action_log (complaint_id, action_date, action_type, notes)
+        VALUES (1, '2024-03-06', 'Containment', 'Sorted the lot, deburred')
+    """)
+    con.execute("PRAGMA user_version = 1")
+    con.commit()
+    con.close()
+
+
+def rows(con, table):
+    return sorted(tuple(r) for r in con.execute(f"SELECT * FROM {table}"))
+
+
+def matches_rebuild(con, table, rebuild):
+    """Live rows of a trigger-maintained table == rebuild(con), checked in a rolled-back transaction."""
+    live = rows(con, table)
+    con.execute("BEGIN IMMEDIATE")
+    rebuild(con)
+    fresh = rows(con, table)
+    con.rollback()
+    assert live == fresh, (table, live, fresh)
+
+
+def main() -> int:
+    path = os.path.join(BENCH_HOME, "legacy.db")
+    baseline_db(path)
+
+    version = db.init_db(path)
+    assert version == migrations.latest_version(), f"stopped at v{version}"
+
+    con = db.connect(path)
+    days = {r["day"]: r["lines"] for r in con.execute("SELECT day, lines FROM dispatch_daily")}
+    assert days == {"2024-03-05": 1, "": len(LEGACY_DATES) - 1}, days
+
+    folded = [tuple(r) for r in con.execute("""
+        SELECT inward_qty, available_qty, box_tray, remarks FROM material_inward WHERE challan_id = 2
+    """)]
+    assert folded == [(35, 30, "B1 / B2", "rush")], folded
+
+    # triggers on rows with bad dates: edit, insert, delete
+    with db.write_transaction(con):
+        con.execute("UPDATE material_dispatch SET ok_qty = 4, total_qty = 4 WHERE dispatch_date = 'x'")
+        con.execute("""
+            INSERT INTO material_dispatch (challan_id, inward_id, elta_challan_no, dispatch_date, ok_qty, total_qty)
+            VALUES (1, 1, 'E-L2', '', 1, 1)
+        """)
+        con.execute("DELETE FROM material_dispatch WHERE dispatch_date = '05/03/2024'")
+    matches_rebuild(con, "dispatch_daily", wip.rebuild_rollups)
+
+    # 5 dimensions per crib, the REGRIND row without a ts under week ''
+    assert len(rows(con, "consumption_rollup")) == 5 + 6, rows(con, "consumption_rollup")
+    with db.write_transaction(con):
+        con.execute("""
+            INSERT INTO tool_issue_txn (tool_id, action, qty, operator, machine, job_name, ts)
+            VALUES (1, 'ISSUE', 1, 'op2', 'M1', 'J1', '2024-03-07 10:00:00')
+        """)
+    matches_rebuild(con, "consumption_rollup", consumption.rebuild_rollups)
+
+    # the drill (9 of level 12) is queued by the v12 backfill; the insert joins it
+    assert [r[:2] for r in rows(con, "low_stock")] == [("tool", 1)], rows(con, "low_stock")
+    with db.write_transaction(con):
+        con.execute("UPDATE inserts SET reorder_level = 8 WHERE id = 1")
+        con.execute("UPDATE cutting_tools SET issued_qty = 4 WHERE id = 1")
+    matches_rebuild(con, "low_stock", reorder.rebuild_queue)
+    assert len(rows(con, "low_stock")) == 2, rows(con, "low_stock")
+
+    # the v14 index covers the legacy rows and follows later edits
+    def hits(table, word):
+        return [r[0] for r in con.execute(f"SELECT rowid FROM {table} WHERE {table} MATCH ?", (word,))]
+    assert hits("complaint_fts", "burr") == [1] and hits("complaint_log_fts", "sorted") == [1]
+    with db.write_transaction(con):
+        con.execute("UPDATE customer_complaint SET issue_description = 'Chatter marks' WHERE id = 1")
+    assert hits("complaint_fts", "burr") == [] and hits("complaint_fts", "chatter") == [1]
+    con.execute("INSERT INTO complaint_fts (complaint_fts) VALUES ('integrity-check')")
+    con.really_close()
+
+    print(f"legacy v1 DB migrated to v{version}; rollups / queue / search index match a rebuild")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+# benchmarks/check_query_plans.py
+# --------------------------------------------
+# Query-plan regression check.
+# Pulls every literal SQL statement out of modules/*.py, runs
+# EXPLAIN QUERY PLAN on it against the current schema and fails when a
+# statement plans a full table scan (SCAN without an index) of a table
+# that grows with production data.
+#
+#   python benchmarks/check_query_plans.py        (exit code 1 on failure)
+# --------------------------------------------
+
+import ast
+import importlib
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+from common import ROOT, db, fresh_db_path
+from pagination import keyset_sql
+from query_spec import QuerySpec
+
+# Tables that grow every month. Master tables (tools, machines, customers,
+# item codes, gauges ...) stay small and may be scanned.
+LARGE_TABLES = {
+    "tool_issue_txn", "holder_txn", "insert_txn", "collet_txn",
+    "gauge_issue_txn", "gauge_calibration_txn",
+    "customer_challan", "material_inward", "material_dispatch",
+    "shift_header", "shift_production", "shift_setup", "shift_attendance", "shift_downtime",
+    "pm_history", "breakdown_log",
+    "customer_complaint", "complaint_action_log",
+}
+
+# Statements that must read the whole table by design, with the reason.
+# Key: (module file name, first 60 chars of the normalised SQL).
+ALLOWED_SCANS = {
+    ("materials.py", "SELECT c.customer_name, ch.customer_challan_no, ch.status, m"):
+        "unfiltered inventory report lists every inward line",
+}
+
+PAGED_CALLS = ("page_from_request", "keyset_page")
+
+SQL_START = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b", re.I)
+SCAN_RE = re.compile(r"^SCAN (\w+)(.*)$")
+ALIAS_RE = re.compile(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.I)
+
+
+def normalise(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+def _sql_const(node):
+    if isinstance(node, ast.Constant) and isinstance(node.value, str) and SQL_START.match(node.value):
+        return node.value
+    return None
+
+
+class _Collector(ast.NodeVisitor):
+    """
+    Collects SQL passed straight to execute()/executemany(), plus queries
+    built incrementally (query = "..."; if x: query += " AND ...").
+    A built query is checked twice: with no optional filter (only the
+    unconditional += parts) and with every filter appended.
+    """
+
+    def __init__(self):
+        self.found = []      # (lineno, sql)
+        self._built = {}     # name -> [lineno, unfiltered, all_filters]
+        self._module = self._built   # module-level SQL constants (FOO_SQL = "...")
+        self._depth = 0      # nesting inside if/for/while
+
+    def visit_FunctionDef(self, node):
+        outer, self._built = self._built, {}
+        self.generic_visit(node)
+        for lineno, bare, full in self._built.values():
+            self.found.append((lineno, bare))
+            if full != bare:
+                self.found.append((lineno, full))
+        self._built = outer
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Attribute) and node.func.attr in ("execute", "executemany") and node.args:
+            sql = _sql_const(node.args[0])
+            if sql:
+                self.found.append((node.lineno, sql))
+        elif isinstance(node.func, ast.Name) and node.func.id in PAGED_CALLS and len(node.args) >= 4:
+            self._paged(node)
+        self.generic_visit(node)
+
+    def _paged(self, node):
+        # keyset pages: check the SQL pagination.py really runs (first page + seek)
+        arg = node.args[1]
+        if isinstance(arg, ast.Name) and arg.id in self._built:
+            variants = self._built.pop(arg.id)[1:]
+        elif isinstance(arg, ast.Name) and arg.id in self._module:
+            variants = self._module[arg.id][1:]
+        else:
+            variants = [_sql_const(arg)]
+        order_by = ast.literal_eval(node.args[3])
+        for query in dict.fromkeys(v for v in variants if v):
+            for seek in (None, "after"):
+                self.found.append((node.lineno, keyset_sql(query, order_by, seek)))
+
+    def visit_Assign(self, node):
+        sql = _sql_const(node.value)
+        if sql and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            self._built[node.targets[0].id] = [node.lineno, sql, sql]
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node):
+        if isinstance(node.target, ast.Name) and node.target.id in self._built:
+            if isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+                entry = self._built[node.target.id]
+                if self._depth == 0:
+                    entry[1] += node.value.value
+                entry[2] += node.value.value
+        self.generic_visit(node)
+
+    def _nested(self, node):
+        self._depth += 1
+        self.generic_visit(node)
+        self._depth -= 1
+
+    visit_If = visit_For = visit_While = _nested
+
+
+def extract_statements(path: Path):
+    """Yield (lineno, sql) for every SQL statement found in a module."""
+    collector = _Collector()
+    collector.visit(ast.parse(path.read_text(encoding="utf-8")))
+    for lineno, sql in collector.found:
+        if sqlite3.complete_statement(sql.strip() + ";"):
+            yield lineno, sql
+
+
+def spec_statements(path: Path):
+    """
+    Yield (lineno, sql) for the module's QuerySpec constants: with no filter
+    and with every filter active, each as the ordered list / export query
+    and, for keyset specs, as the first page and a seek page.
+    """
+    module = importlib.import_module(f"modules.{path.stem}")
+    lines = {t.id: node.lineno for node in ast.parse(path.read_text(encoding="utf-8")).body
+             if isinstance(node, ast.Assign) for t in node.targets if isinstance(t, ast.Name)}
+    for name, spec in vars(module).items():
+        if not isinstance(spec, QuerySpec) or name not in lines:
+            continue
+        for mask in dict.fromkeys((0, (1 << len(spec.filters)) - 1)):
+            yield lines[name], spec._text(mask, spec.order_by)
+            if spec.keyset:
+                for seek in (None, "after"):
+                    yield lines[name], keyset_sql(spec._text(mask, None), spec.keyset, seek)
+
+
+def alias_map(sql: str) -> dict:
+    out = {}
+    for table, alias in ALIAS_RE.findall(sql):
+        out[table] = table
+        if alias and alias.upper() not in ("ON", "WHERE", "SET", "JOIN", "LEFT", "INNER",
+                                            "ORDER", "GROUP", "VALUES", "SELECT", "LIMIT"):
+            out[alias] = table
+    return out
+
+
+def full_scans(con, sql: str):
+    params = (None,) * sql.count("?")
+    plan = con.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    aliases = alias_map(sql)
+    for row in plan:
+        m = SCAN_RE.match(row["detail"])
+        if not m or "USING" in m.group(2):
+            continue
+        table = aliases.get(m.group(1), m.group(1))
+        if table in LARGE_TABLES:
+            yield table, row["detail"]
+
+
+def main() -> int:
+    con = db.connect(fresh_db_path("query_plans"))
+    failures, checked, skipped = [], 0, []
+
+    for path in sorted(Path(ROOT, "modules").glob("*.py")):
+        for lineno, sql in [*extract_statements(path), *spec_statements(path)]:
+            try:
+                scans = list(full_scans(con, sql))
+            except sqlite3.Error as e:
+                skipped.append(f"{path.name}:{lineno}: {e}")
+                continue
+            checked += 1
+            key = (path.name, normalise(sql)[:60])
+            if scans and key not in ALLOWED_SCANS:
+                failures.append((path.name, lineno, scans, normalise(sql)))
+
+    con.close()
+
+    print(f"checked {checked} statements, {len(skipped)} not preparable")
+    for s in skipped:
+        print("  skip", s)
+    for name, lineno, scans, sql in failures:
+        print(f"FULL SCAN {name}:{lineno}")
+        for table, detail in scans:
+            print(f"    {table}: {detail}")
+        print(f"    {sql[:160]}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
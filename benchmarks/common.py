@@ -0,0 +1,42 @@
+# benchmarks/common.py  (ELTA Workshop Suite)
+# --------------------------------------------
+# Shared setup for the benchmark scripts.
+# Points the app data dir at a temp folder BEFORE db.py is imported,
+# so a benchmark never touches the real workshop.db.
+# --------------------------------------------
+
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+BENCH_HOME = tempfile.mkdtemp(prefix="elta_bench_")
+os.environ["HOME"] = BENCH_HOME
+os.environ["APPDATA"] = BENCH_HOME
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import db  # noqa: E402
+
+
+def fresh_db_path(name: str) -> str:
+    """New, fully initialised DB file inside the temp dir."""
+    path = os.path.join(BENCH_HOME, f"{name}.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    db.init_db(path)
+    return path
+
+
+@contextmanager
+def timed(label: str, results: dict | None = None):
+    t0 = time.perf_counter()
+    yield
+    dt = time.perf_counter() - t0
+    if results is not None:
+        results[label] = dt
+    print(f"  {label:<40} {dt * 1000:10.1f} ms")
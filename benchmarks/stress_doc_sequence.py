@@ -0,0 +1,97 @@
+# benchmarks/stress_doc_sequence.py
+# --------------------------------------------
+# Concurrency stress test for sequences.next_value(): many threads, each with
+# its own connection, add complaints the way complaints.add_complaint does
+# (number + insert in one write transaction; every 10th save fails and rolls
+# back). Afterwards the numbers must be unique and gap-free, 1..N.
+#
+# For contrast, "legacy" runs the old LIKE / ORDER BY DESC lookup followed by
+# a separate insert under the same load and counts the collisions.
+#
+#   python benchmarks/stress_doc_sequence.py [threads] [adds_per_thread]
+# --------------------------------------------
+
+import sqlite3
+import sys
+import threading
+
+from common import db, fresh_db_path, timed
+
+import sequences
+
+INSERT_SQL = """
+    INSERT INTO customer_complaint (complaint_no, complaint_date, customer_id, item_code,
+                                    issue_category, issue_description)
+    VALUES (?, '2025-01-01', 1, 'IC-1', 'Other', 'stress')
+"""
+
+
+def seed(path):
+    con = db.connect(path)
+    con.execute("INSERT INTO customer_master (customer_name) VALUES ('ACME')")
+    con.commit()
+    con.really_close()
+
+
+def worker(path, n_adds, seed_no, counts):
+    con = db.connect(path)
+    for i in range(n_adds):
+        try:
+            with db.write_transaction(con):
+                n = sequences.next_value(con, "CC", 2025)
+                con.execute(INSERT_SQL, (f"CC-2025-{n:03d}",))
+                if i % 10 == 9:
+                    raise ValueError("validation failed after numbering")
+            counts["ok"] += 1
+        except ValueError:
+            counts["failed"] += 1
+    con.really_close()
+
+
+def legacy_worker(path, n_adds, seed_no, counts):
+    con = db.connect(path)
+    for _ in range(n_adds):
+        row = con.execute("""
+            SELECT complaint_no FROM customer_complaint
+            WHERE complaint_no LIKE 'LG-2025-%' ORDER BY complaint_no DESC LIMIT 1
+        """).fetchone()
+        n = int(row[0].split("-")[-1]) + 1 if row else 1
+        try:
+            con.execute(INSERT_SQL, (f"LG-2025-{n:03d}",))
+            con.commit()
+            counts["ok"] += 1
+        except sqlite3.IntegrityError:
+            con.rollback()
+            counts["failed"] += 1
+    con.really_close()
+
+
+def run_threads(target, n_threads, path, n_adds):
+    counts = {"ok": 0, "failed": 0}
+    threads = [threading.Thread(target=target, args=(path, n_adds, i, counts)) for i in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return counts
+
+
+if __name__ == "__main__":
+    n_threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    n_adds = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    path = fresh_db_path("doc_sequence")
+    seed(path)
+
+    print(f"{n_threads} threads x {n_adds} adds")
+    with timed("sequence (number + insert, one txn)"):
+        counts = run_threads(worker, n_threads, path, n_adds)
+    con = db.connect(path)
+    numbers = sorted(int(r[0].split("-")[-1]) for r in con.execute(
+        "SELECT complaint_no FROM customer_complaint WHERE complaint_no LIKE 'CC-%'"))
+    assert numbers == list(range(1, counts["ok"] + 1)), "duplicate or missing complaint numbers"
+    print(f"  {counts['ok']} saved, {counts['failed']} rolled back, numbers 1..{numbers[-1]} gap-free")
+
+    with timed("legacy (LIKE lookup, then insert)"):
+        counts = run_threads(legacy_worker, n_threads, path, n_adds)
+    print(f"  {counts['ok']} saved, {counts['failed']} lost to duplicate numbers")
+    con.really_close()
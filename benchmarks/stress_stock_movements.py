@@ -0,0 +1,167 @@
+# benchmarks/stress_stock_movements.py
+# --------------------------------------------
+# Concurrency stress test for stock.move(): many threads, each with its own
+# connection (like waitress workers), hammer a handful of low-stock crib
+# items with random issues / returns / scraps. Afterwards every counter must
+# equal what its *_txn ledger says, agree with the unified inventory_ledger,
+# and no counter may be out of range.
+#
+# For contrast, "legacy" runs the old read-check-write holder issue
+# (SELECT available, then UPDATE) under the same load.
+#
+#   python benchmarks/stress_stock_movements.py [threads] [ops_per_thread]
+# --------------------------------------------
+
+import random
+import sys
+import threading
+
+from common import db, fresh_db_path, timed
+
+import ledger
+import stock
+
+ITEMS = 3           # per crib
+START_QTY = 20
+
+# counters that must be reproducible from the ledger
+CHECKS = {
+    "tool": """
+        SELECT c.id, c.issued_qty, c.broken_qty, c.total_qty,
+               COALESCE(SUM(CASE t.action WHEN 'ISSUE' THEN t.qty WHEN 'RETURN' THEN -t.qty END), 0) AS l_issued,
+               COALESCE(SUM(CASE WHEN t.action = 'RETURN' AND t.condition = 'Broken' THEN t.qty END), 0) AS l_broken
+        FROM cutting_tools c LEFT JOIN tool_issue_txn t ON t.tool_id = c.id
+        GROUP BY c.id
+        HAVING c.issued_qty != l_issued OR c.broken_qty != l_broken
+            OR c.issued_qty < 0 OR c.issued_qty + c.broken_qty > c.total_qty
+    """,
+    "holder": """
+        SELECT c.id, c.issued_qty, c.total_qty,
+               COALESCE(SUM(CASE t.action WHEN 'ISSUE' THEN t.qty WHEN 'RETURN' THEN -t.qty END), 0) AS l_issued
+        FROM holders c LEFT JOIN holder_txn t ON t.holder_id = c.id
+        GROUP BY c.id
+        HAVING c.issued_qty != l_issued OR c.issued_qty < 0 OR c.issued_qty > c.total_qty
+    """,
+    "insert": """
+        SELECT c.id, c.available_qty, c.total_qty,
+               c.total_qty - COALESCE(SUM(CASE WHEN t.action IN ('ISSUE', 'SCRAP') THEN t.qty END), 0) AS l_available
+        FROM inserts c LEFT JOIN insert_txn t ON t.insert_id = c.id
+        GROUP BY c.id
+        HAVING c.available_qty != l_available OR c.available_qty < 0
+    """,
+    "collet": """
+        SELECT c.id, c.available_qty, c.total_qty,
+               c.total_qty - COALESCE(SUM(CASE t.action WHEN 'ISSUE' THEN t.qty WHEN 'RETURN' THEN -t.qty END), 0) AS l_available
+        FROM collets c LEFT JOIN collet_txn t ON t.collet_id = c.id
+        GROUP BY c.id
+        HAVING c.available_qty != l_available OR c.available_qty < 0 OR c.available_qty > c.total_qty
+    """,
+}
+
+OPS = [
+    ("tool", "ISSUE", {"action": "ISSUE", "ts": "2025-01-01"}),
+    ("tool", "RETURN", {"action": "RETURN", "condition": "Good", "ts": "2025-01-01"}),
+    ("tool", "RETURN_BROKEN", {"action": "RETURN", "condition": "Broken", "ts": "2025-01-01"}),
+    ("holder", "ISSUE", {"action": "ISSUE", "ts": "2025-01-01"}),
+    ("holder", "RETURN", {"action": "RETURN", "ts": "2025-01-01"}),
+    ("insert", "ISSUE", {"action": "ISSUE", "txn_date": "2025-01-01"}),
+    ("insert", "SCRAP", {"action": "SCRAP", "txn_date": "2025-01-01"}),
+    ("collet", "ISSUE", {"action": "ISSUE", "txn_date": "2025-01-01"}),
+    ("collet", "RETURN", {"action": "RETURN", "txn_date": "2025-01-01"}),
+]
+
+
+def seed(path):
+    con = db.connect(path)
+    for i in range(ITEMS):
+        con.execute("""
+            INSERT INTO cutting_tools (tool_type, cutting_diameter, cutting_length, shank_type, shank_diameter,
+                                       material, total_qty)
+            VALUES ('End Mill', ?, 20, 'Plain', 6, 'Carbide', ?)
+        """, (i + 1, START_QTY))
+        con.execute("INSERT INTO holders (holder_type, interface, size, projection, total_qty) VALUES ('ER', 'BT40', ?, 60, ?)",
+                    (str(i), START_QTY))
+        con.execute("INSERT INTO inserts (insert_type, size, grade, edges, total_qty, available_qty) VALUES ('CNMG', ?, 'P25', 4, ?, ?)",
+                    (str(i), START_QTY * 50, START_QTY * 50))
+        con.execute("INSERT INTO collets (collet_type, interface, size_range, location, total_qty, available_qty) VALUES ('ER32', 'ER', ?, 'A', ?, ?)",
+                    (str(i), START_QTY, START_QTY))
+    for kind, qty in (("tool", START_QTY), ("holder", START_QTY), ("insert", START_QTY * 50), ("collet", START_QTY)):
+        for item_id in range(1, ITEMS + 1):
+            ledger.record(con, kind, item_id, "RECEIPT", qty, "2025-01-01")
+    con.commit()
+    con.really_close()
+
+
+def worker(path, n_ops, seed_no, counts):
+    rnd = random.Random(seed_no)
+    con = db.connect(path)
+    ok = refused = 0
+    for _ in range(n_ops):
+        kind, movement, txn = rnd.choice(OPS)
+        try:
+            stock.move(kind, movement, rnd.randint(1, ITEMS), rnd.randint(1, 4), dict(txn), db=con)
+            ok += 1
+        except stock.StockError:
+            refused += 1
+    con.really_close()
+    counts.append((ok, refused))
+
+
+def legacy_worker(path, n_ops, seed_no, oversold):
+    rnd = random.Random(seed_no)
+    con = db.connect(path)
+    for _ in range(n_ops):
+        holder_id, qty = rnd.randint(1, ITEMS), rnd.randint(1, 4)
+        available = con.execute("SELECT total_qty - issued_qty FROM holders WHERE id=?", (holder_id,)).fetchone()[0]
+        if qty > available:
+            # old page had no return flow in this test; put stock back so issues keep coming
+            con.execute("UPDATE holders SET issued_qty = 0 WHERE id=?", (holder_id,))
+            con.commit()
+            continue
+        con.execute("UPDATE holders SET issued_qty = issued_qty + ? WHERE id=?", (qty, holder_id))
+        con.commit()
+        if con.execute("SELECT issued_qty > total_qty FROM holders WHERE id=?", (holder_id,)).fetchone()[0]:
+            oversold.append(holder_id)
+    con.really_close()
+
+
+def run_threads(target, n_threads, *args):
+    threads = [threading.Thread(target=target, args=(*args[:2], i, args[2])) for i in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+if __name__ == "__main__":
+    n_threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    n_ops = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    path = fresh_db_path("stress_stock")
+    seed(path)
+
+    counts = []
+    with timed(f"stock.move  {n_threads} threads x {n_ops} ops"):
+        run_threads(worker, n_threads, path, n_ops, counts)
+    done = sum(c[0] for c in counts)
+    refused = sum(c[1] for c in counts)
+    print(f"  applied {done}, refused {refused}")
+
+    con = db.connect(path)
+    drift = {kind: [tuple(r) for r in con.execute(sql)] for kind, sql in CHECKS.items()}
+    drift["inventory_ledger"] = ledger.reconcile(con)
+    con.really_close()
+    for kind, rows in drift.items():
+        print(f"  {kind:<7} {'OK' if not rows else 'DRIFT ' + str(rows)}")
+    failed = any(drift.values())
+
+    path = fresh_db_path("stress_stock_legacy")
+    seed(path)
+    oversold = []
+    with timed(f"legacy read-check-write  {n_threads} threads x {n_ops} ops"):
+        run_threads(legacy_worker, n_threads, path, n_ops, oversold)
+    print(f"  legacy oversold observations: {len(oversold)}")
+
+    if failed:
+        sys.exit("counters drifted from the ledger")
+    print("counters match the ledger")
@@ -0,0 +1,167 @@
+# complaint_search.py  (ELTA Workshop Suite)
+# --------------------------------------------
+# Full-text search over customer complaints and their action logs (FTS5).
+#
+#   complaint_fts     : issue_description, root_cause_5why, corrective_action
+#                       of customer_complaint (rowid = complaint id)
+#   complaint_log_fts : notes of complaint_action_log (rowid = log id)
+#
+# Both are external-content tables: the text lives only in the base tables,
+# the FTS tables hold the index. Triggers (migration v14) keep them in sync
+# on insert / update / delete; rebuild() re-indexes everything from the
+# base tables (after a restore or a bulk import with the triggers off):
+#
+#   python complaint_search.py rebuild
+#
+# Query syntax: words are ANDed, "quoted words" are a phrase, word* is a
+# prefix. The porter stemmer makes "burrs" find "burr".
+# --------------------------------------------
+
+from markupsafe import Markup, escape
+
+from db import get_db
+from pagination import page_from_request
+
+# bm25 weights of the complaint_fts columns (issue_description,
+# root_cause_5why, corrective_action): a hit in the description counts
+# more than in the RCA
+COMPLAINT_WEIGHTS = (3.0, 1.5, 1.0)
+
+# snippet() markers, swapped for <mark> after HTML-escaping the text
+_HIT_ON, _HIT_OFF = "\x02", "\x03"
+SNIPPET_TOKENS = 12
+
+
+# ================= REBUILD =================
+
+def rebuild(con=None):
+    """Re-index both FTS tables from the base tables."""
+    con = con or get_db()
+    con.execute("INSERT INTO complaint_fts (complaint_fts) VALUES ('rebuild')")
+    con.execute("INSERT INTO complaint_log_fts (complaint_log_fts) VALUES ('rebuild')")
+    con.execute("INSERT INTO complaint_fts (complaint_fts) VALUES ('optimize')")
+    con.execute("INSERT INTO complaint_log_fts (complaint_log_fts) VALUES ('optimize')")
+
+
+# ================= QUERY =================
+
+def fts_query(text: str) -> str:
+    """
+    User text -> FTS5 MATCH expression. Every term is quoted, so operators
+    and punctuation in the input are searched as text, never parsed.
+    Returns "" when there is nothing to search for.
+    """
+    terms = []
+    parts = text.split('"')
+    for i, part in enumerate(parts):
+        if i % 2 and part.strip():                   # inside "quotes": phrase
+            terms.append('"' + part.strip() + '"')
+            continue
+        for word in part.split():
+            prefix = word.endswith("*")
+            word = word.rstrip("*")
+            if word:
+                terms.append('"' + word + '"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def search_sql():
+    """
+    Ranked matches, one row per complaint: the best-scoring hit (complaint
+    text or one of its log lines) gives the rank. Bind the MATCH expression
+    twice. Open-ended for keyset_page(). No snippets here: snippet() would
+    run for every hit, add_snippets() runs it for the page only.
+    """
+    weights = ", ".join(str(w) for w in COMPLAINT_WEIGHTS)
+    return f"""
+        SELECT * FROM (
+            SELECT cc.id, cc.complaint_no, cc.complaint_date, c.customer_name, cc.item_code,
+                   cc.issue_category, cc.severity, cc.status,
+                   hit.log_id,
+                   -MIN(hit.score) AS neg_score
+            FROM (
+                SELECT rowid AS complaint_id, NULL AS log_id,
+                       bm25(complaint_fts, {weights}) AS score
+                FROM complaint_fts
+                WHERE complaint_fts MATCH ?
+                UNION ALL
+                SELECT l.complaint_id, l.id, bm25(complaint_log_fts)
+                FROM complaint_log_fts
+                JOIN complaint_action_log l ON l.id = complaint_log_fts.rowid
+                WHERE complaint_log_fts MATCH ?
+            ) hit
+            JOIN customer_complaint cc ON cc.id = hit.complaint_id
+            JOIN customer_master c ON c.id = cc.customer_id
+            GROUP BY cc.id      -- bare hit.log_id comes from the MIN(score) row
+        ) WHERE 1=1"""
+
+
+def add_snippets(db, query, rows):
+    """rows of search_sql() -> dicts with `source` and `snip` of their best hit."""
+    rows = [dict(r) for r in rows]
+    complaint_ids = [r["id"] for r in rows if r["log_id"] is None]
+    log_ids = [r["log_id"] for r in rows if r["log_id"] is not None]
+    snips = {}
+
+    if complaint_ids:
+        marks = ", ".join("?" * len(complaint_ids))
+        for r in db.execute(f"""
+            SELECT rowid, snippet(complaint_fts, -1, char(2), char(3), '…', {SNIPPET_TOKENS})
+            FROM complaint_fts
+            WHERE complaint_fts MATCH ? AND rowid IN ({marks})
+        """, (query, *complaint_ids)):
+            snips[("complaint", r[0])] = ("complaint", r[1])
+
+    if log_ids:
+        marks = ", ".join("?" * len(log_ids))
+        for r in db.execute(f"""
+            SELECT f.rowid, 'log: ' || l.action_type || ' ' || l.action_date,
+                   snippet(complaint_log_fts, 0, char(2), char(3), '…', {SNIPPET_TOKENS})
+            FROM complaint_log_fts f
+            JOIN complaint_action_log l ON l.id = f.rowid
+            WHERE complaint_log_fts MATCH ? AND f.rowid IN ({marks})
+        """, (query, *log_ids)):
+            snips[("log", r[0])] = (r[1], r[2])
+
+    for r in rows:
+        key = ("complaint", r["id"]) if r["log_id"] is None else ("log", r["log_id"])
+        r["source"], r["snip"] = snips.get(key, ("", ""))
+    return rows
+
+
+def snippet_html(snip) -> Markup:
+    """Escape a snippet and turn the hit markers into <mark>."""
+    return Markup(
+        str(escape(snip or "")).replace(_HIT_ON, "<mark>").replace(_HIT_OFF, "</mark>")
+    )
+
+
+def search(text, db=None):
+    """
+    Current request's page of matches for `text`, best first, or None when
+    there is nothing to search for. page.rows are dicts (see add_snippets).
+    """
+    query = fts_query(text or "")
+    if not query:
+        return None
+    db = db or get_db()
+    # bm25 is lower-is-better; keyset_page sorts descending on -score
+    page = page_from_request(db, search_sql(), (query, query), [("neg_score", "neg_score"), ("id", "id")])
+    page.rows = add_snippets(db, query, page.rows)
+    return page
+
+
+if __name__ == "__main__":
+    import sys
+    import db as _db
+
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python complaint_search.py rebuild")
+    _db.init_db()
+    con = _db.connect()
+    with _db.write_transaction(con):
+        rebuild(con)
+    n = con.execute("SELECT COUNT(*) FROM customer_complaint").fetchone()[0]
+    m = con.execute("SELECT COUNT(*) FROM complaint_action_log").fetchone()[0]
+    con.really_close()
+    print(f"complaint search index rebuilt: {n} complaints, {m} log lines")
@@ -3,3 +3,28 @@ ADMIN_PIN_1 = "7091"
 ADMIN_PIN_2 = "8588"
 
 
+
+# SQLite PRAGMA overrides, merged over db.PRAGMA_PROFILE
+# e.g. DB_PRAGMAS = {"synchronous": "FULL", "busy_timeout": 10000}
+DB_PRAGMAS = {}
+
+# Seconds a cached master list (customers / item codes / machines) may be
+# reused even if its change counter did not move
+MASTER_CACHE_TTL = 600
+
+# Days between inventory ledger balance snapshots (see ledger.py)
+LEDGER_SNAPSHOT_DAYS = 7
+
+# Reorder suggestions (see reorder.py): usage is measured over the last
+# REORDER_USAGE_DAYS and the suggested order covers REORDER_COVER_DAYS of it
+REORDER_USAGE_DAYS = 90
+REORDER_COVER_DAYS = 30
+
+# PDF reports (see reports.py): worker threads, how long a request waits for
+# a report before showing the job page, and how many finished PDFs to keep
+REPORT_WORKERS = 2
+REPORT_WAIT_SECONDS = 5
+REPORT_CACHE_FILES = 50
+
+# CSV / XLSX exports (see exports.py): rows fetched from the cursor per chunk
+EXPORT_CHUNK_ROWS = 2000
@@ -0,0 +1,130 @@
+# consumption.py  (ELTA Workshop Suite)
+# --------------------------------------------
+# Tool / insert consumption analytics.
+#
+# consumption_rollup keeps running totals per (crib, dimension, value):
+#   tool   : machine, job, operator, week, tool type / material
+#   insert : machine, job, operator, week, insert
+# AFTER INSERT triggers on tool_issue_txn / insert_txn add each new row to
+# every dimension, so a dashboard reads a few pre-aggregated rows by primary
+# key instead of grouping the raw history. Table and triggers live in
+# migration v11 (a change to them ships as a new migration step);
+# rebuild_rollups() recomputes the same numbers from the raw tables.
+# --------------------------------------------
+
+from db import get_db
+
+MEASURES = ("issued", "returned", "regrind", "broken", "scrapped", "edges_used", "txn_count")
+
+# crib -> (txn table, {measure: SQL on the txn row `t`})
+SOURCES = {
+    "tool": ("tool_issue_txn", {
+        "issued": "CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END",
+        "returned": "CASE WHEN t.action = 'RETURN' THEN t.qty ELSE 0 END",
+        "regrind": "CASE WHEN t.action = 'REGRIND' THEN t.qty ELSE 0 END",
+        "broken": "CASE WHEN t.action = 'RETURN' AND t.condition = 'Broken' THEN t.qty ELSE 0 END",
+        "scrapped": "0",
+        "edges_used": "0",
+        "txn_count": "1",
+    }),
+    "insert": ("insert_txn", {
+        "issued": "CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END",
+        "returned": "0",
+        "regrind": "0",
+        "broken": "0",
+        "scrapped": "CASE WHEN t.action = 'SCRAP' THEN t.qty ELSE 0 END",
+        "edges_used": "CASE WHEN t.action = 'EDGE_USED' THEN t.edges_used ELSE 0 END",
+        "txn_count": "1",
+    }),
+}
+
+# crib -> {dimension: SQL for its value on txn row `t`}
+DIMENSIONS = {
+    "tool": {
+        "machine": "COALESCE(t.machine, '')",
+        "job": "COALESCE(t.job_name, '')",
+        "operator": "COALESCE(t.operator, '')",
+        "week": "COALESCE(date(t.ts, 'weekday 0', '-6 days'), '')",
+        "type_material": """COALESCE((SELECT ct.tool_type || ' / ' || ct.material
+                                      FROM cutting_tools ct WHERE ct.id = t.tool_id), '')""",
+    },
+    "insert": {
+        "machine": "COALESCE(t.machine, '')",
+        "job": "COALESCE(t.job, '')",
+        "operator": "COALESCE(t.operator, '')",
+        "week": "COALESCE(date(t.txn_date, 'weekday 0', '-6 days'), '')",
+        "insert": """COALESCE((SELECT i.insert_type || ' ' || i.size || ' ' || i.grade
+                               FROM inserts i WHERE i.id = t.insert_id), '')""",
+    },
+}
+
+
+# ================= REBUILD =================
+
+def rebuild_rollups(con=None):
+    """Recompute consumption_rollup from the raw txn tables (same totals as the v11 triggers)."""
+    con = con or get_db()
+    con.execute("DELETE FROM consumption_rollup")
+    cols = ", ".join(MEASURES)
+    for crib, (source, measures) in SOURCES.items():
+        sums = ", ".join(f"SUM({measures[m]})" for m in MEASURES)
+        for dim, value_sql in DIMENSIONS[crib].items():
+            con.execute(f"""
+                INSERT INTO consumption_rollup (crib, dim, dim_value, {cols})
+                SELECT '{crib}', '{dim}', {value_sql} AS v, {sums}
+                FROM {source} t
+                GROUP BY v
+            """)
+
+
+# ================= READ =================
+
+def top(crib, dim, order_by="issued", limit=10, db=None):
+    """Largest rows of one dimension (PK prefix read)."""
+    if order_by not in MEASURES:
+        raise ValueError(order_by)
+    db = db or get_db()
+    return db.execute(f"""
+        SELECT dim_value, {", ".join(MEASURES)}
+        FROM consumption_rollup
+        WHERE crib = ? AND dim = ?
+        ORDER BY {order_by} DESC, dim_value
+        LIMIT ?
+    """, (crib, dim, limit)).fetchall()
+
+
+def weekly(crib, weeks=12, db=None):
+    """Last `weeks` weeks (Monday dates), oldest first."""
+    db = db or get_db()
+    rows = db.execute(f"""
+        SELECT dim_value AS week_start, {", ".join(MEASURES)}
+        FROM consumption_rollup
+        WHERE crib = ? AND dim = 'week' AND dim_value != ''
+        ORDER BY dim_value DESC
+        LIMIT ?
+    """, (crib, weeks)).fetchall()
+    return rows[::-1]
+
+
+def breakage_by_type(db=None):
+    """[(tool type / material, returned, broken, breakage %)] worst first."""
+    db = db or get_db()
+    return db.execute("""
+        SELECT dim_value, returned, broken,
+               ROUND(100.0 * broken / NULLIF(returned, 0), 1) AS breakage_pct
+        FROM consumption_rollup
+        WHERE crib = 'tool' AND dim = 'type_material'
+        ORDER BY breakage_pct DESC NULLS LAST, broken DESC
+    """).fetchall()
+
+
+def edges_per_insert(db=None):
+    """[(insert, issued, edges_used, edges per insert issued)]"""
+    db = db or get_db()
+    return db.execute("""
+        SELECT dim_value, issued, edges_used, scrapped,
+               ROUND(1.0 * edges_used / NULLIF(issued, 0), 2) AS edges_per_insert
+        FROM consumption_rollup
+        WHERE crib = 'insert' AND dim = 'insert'
+        ORDER BY issued DESC, dim_value
+    """).fetchall()
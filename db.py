@@ -8,8 +8,16 @@ import os
 import sys
 import sqlite3
 import shutil
+import atexit
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
+from flask import g, has_app_context
+
+import config
+import migrations
+
 # ================= PATH HELPERS =================
 
 def app_data_dir(app_name: str = "ELTA_Workshop_Suite") -> str:
@@ -50,16 +58,283 @@ def get_db_path():
 
 DB_PATH = get_db_path()
 
+# ================= PRAGMA PROFILE =================
+# Applied once per connection when it is opened; pooled connections keep it
+# for their whole life. Override single values with DB_PRAGMAS in config.py.
+#   journal_mode=WAL    readers no longer block on a writer (and vice versa)
+#   synchronous=NORMAL  safe with WAL, fsync only at checkpoint
+#   busy_timeout        ms to wait for the write lock instead of failing
+#   cache_size          negative = KiB (~32 MB page cache per connection)
+#   mmap_size           bytes of the DB file read through mmap
+PRAGMA_PROFILE = {
+    "busy_timeout": 5000,
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -32000,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+    "wal_autocheckpoint": 1000,
+}
+PRAGMA_PROFILE.update(getattr(config, "DB_PRAGMAS", {}))
+
+
+def apply_pragmas(con: sqlite3.Connection, profile: dict | None = None):
+    profile = PRAGMA_PROFILE if profile is None else profile
+    for name, value in profile.items():
+        con.execute(f"PRAGMA {name} = {value};")
+
+
+def checkpoint(con: sqlite3.Connection | None = None, mode: str = "PASSIVE"):
+    """
+    Copy WAL pages back into the main DB file.
+    PASSIVE never blocks users; TRUNCATE (used at shutdown) also resets the
+    -wal file to zero bytes. Returns (busy, wal_pages, checkpointed_pages).
+    """
+    if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+        raise ValueError(f"Unknown checkpoint mode: {mode}")
+
+    close_me = False
+    if con is None:
+        con = connect()
+        close_me = True
+    try:
+        return tuple(con.execute(f"PRAGMA wal_checkpoint({mode});").fetchone())
+    finally:
+        if close_me:
+            con.close()
+
+
 # ================= CONNECTION =================
 
-def get_db() -> sqlite3.Connection:
-    con = sqlite3.connect(DB_PATH)
+class PooledConnection(sqlite3.Connection):
+    """
+    sqlite3 connection that can be owned by the request pool.
+    While a request holds it, close() is a no-op: older handlers still call
+    con.close() themselves, the teardown hook decides what really happens.
+    """
+    managed = False
+
+    def close(self):
+        if self.managed:
+            return
+        super().close()
+
+    def really_close(self):
+        self.managed = False
+        super().close()
+
+
+def connect(path: str | None = None, pragmas: dict | None = None) -> PooledConnection:
+    """
+    Open and configure a new connection (row factory, FK enforcement, PRAGMA profile).
+    check_same_thread is off so the pool can close connections of threads
+    that have exited; a connection is still only used by one thread at a time.
+    """
+    con = sqlite3.connect(
+        path or DB_PATH,
+        factory=PooledConnection,
+        check_same_thread=False,
+    )
     con.row_factory = sqlite3.Row
     # IMPORTANT: enforce FK constraints (needed for ON DELETE CASCADE)
     con.execute("PRAGMA foreign_keys = ON;")
+    apply_pragmas(con, pragmas)
     return con
 
 
+class ConnectionPool:
+    """
+    Bounded per-thread pool.
+    Every worker thread (waitress runs 8) keeps one open connection and reuses
+    it for each request it serves. Once max_size threads hold a connection,
+    extra threads get a throw-away connection that is closed on release.
+    """
+
+    def __init__(self, path: str, max_size: int = 16):
+        self.path = path
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._conns = {}   # thread ident -> PooledConnection
+        self._stats = {
+            "opened": 0,
+            "reused": 0,
+            "overflow": 0,
+            "closed": 0,
+            "rolled_back": 0,
+        }
+
+    def acquire(self) -> PooledConnection:
+        ident = threading.get_ident()
+        with self._lock:
+            con = self._conns.get(ident)
+            if con is not None:
+                self._stats["reused"] += 1
+                con.managed = True
+                return con
+            self._prune_dead_threads()
+            pooled = len(self._conns) < self.max_size
+
+        con = connect(self.path)
+        con.managed = True
+        with self._lock:
+            if pooled:
+                self._conns[ident] = con
+                self._stats["opened"] += 1
+            else:
+                self._stats["overflow"] += 1
+        return con
+
+    def release(self, con: PooledConnection):
+        # Anything a handler did not commit is discarded, same as the old
+        # "open a connection, close it without commit" behaviour.
+        if con.in_transaction:
+            con.rollback()
+            with self._lock:
+                self._stats["rolled_back"] += 1
+
+        with self._lock:
+            pooled = self._conns.get(threading.get_ident()) is con
+            if not pooled:
+                self._stats["closed"] += 1
+
+        if pooled:
+            con.managed = False
+        else:
+            con.really_close()
+
+    def _prune_dead_threads(self):
+        # caller holds self._lock
+        alive = {t.ident for t in threading.enumerate()}
+        for ident in [i for i in self._conns if i not in alive]:
+            self._conns.pop(ident).really_close()
+            self._stats["closed"] += 1
+
+    def close_all(self):
+        with self._lock:
+            conns = list(self._conns.values())
+            self._conns.clear()
+            self._stats["closed"] += len(conns)
+        for con in conns:
+            con.really_close()
+
+        # leave a clean, fully checkpointed DB file behind on shutdown
+        try:
+            con = connect(self.path)
+            try:
+                checkpoint(con, mode="TRUNCATE")
+            finally:
+                con.really_close()
+        except sqlite3.Error:
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._stats)
+            out["pooled"] = len(self._conns)
+            out["max_size"] = self.max_size
+        return out
+
+
+_pool = ConnectionPool(DB_PATH)
+atexit.register(_pool.close_all)
+
+
+def get_db() -> sqlite3.Connection:
+    """
+    Inside a request: the request's pooled connection (one per request, kept on flask.g).
+    Outside a request (init_db, scripts): a fresh connection the caller must close.
+    """
+    if not has_app_context():
+        return connect()
+
+    if "db" not in g:
+        g.db = _pool.acquire()
+    return g.db
+
+
+def close_db(exc=None):
+    con = g.pop("db", None)
+    if con is not None:
+        _pool.release(con)
+
+
+def pool_stats() -> dict:
+    return _pool.stats()
+
+
+def init_app(app):
+    """Register the per-request connection teardown on the Flask app."""
+    app.teardown_appcontext(close_db)
+
+
+# ================= TRANSACTIONS =================
+
+@contextmanager
+def write_transaction(con: sqlite3.Connection | None = None):
+    """
+    BEGIN IMMEDIATE ... COMMIT (ROLLBACK if the block raises, incl. abort()).
+    The write lock is taken up front, so checks made inside the block still
+    hold when the writes land. Inside an already open transaction the block
+    just joins it and the outer owner commits.
+    """
+    con = con or get_db()
+    if con.in_transaction:
+        yield con
+        return
+
+    con.execute("BEGIN IMMEDIATE")
+    try:
+        yield con
+    except BaseException:
+        con.rollback()
+        raise
+    con.commit()
+
+
+# ================= CHANGE VERSIONS =================
+# Every app table has a row in data_versions, bumped by triggers on each
+# insert / update / delete (see migrations.track_table). Triggers run in the
+# writer's transaction, so the counter covers every write path and every
+# process. Reading it is a primary-key lookup.
+
+def data_version(*tables, db: sqlite3.Connection | None = None) -> int:
+    """
+    Change counter for `tables` (all tables if none given). Counters only go
+    up, so the sum changes whenever any of the tables changed.
+    """
+    close_me = False
+    if db is None:
+        db = get_db()
+        close_me = not has_app_context()
+
+    if tables:
+        marks = ",".join("?" * len(tables))
+        row = db.execute(
+            f"SELECT COALESCE(SUM(version), 0) FROM data_versions WHERE table_name IN ({marks})",
+            tables,
+        ).fetchone()
+    else:
+        row = db.execute("SELECT COALESCE(SUM(version), 0) FROM data_versions").fetchone()
+
+    if close_me:
+        db.close()
+    return row[0]
+
+
+def table_versions(db: sqlite3.Connection | None = None) -> dict:
+    """{table_name: version} for every tracked table."""
+    close_me = False
+    if db is None:
+        db = get_db()
+        close_me = not has_app_context()
+
+    rows = db.execute("SELECT table_name, version FROM data_versions").fetchall()
+
+    if close_me:
+        db.close()
+    return {r["table_name"]: r["version"] for r in rows}
+
+
 def fetch_active_machines(db: sqlite3.Connection | None = None):
     """
     If db not supplied, creates a connection internally.
@@ -85,496 +360,10 @@ def fetch_active_machines(db: sqlite3.Connection | None = None):
 
 # ================= SCHEMA INIT =================
 
-def init_db():
-    con = get_db()
+def init_db(path: str | None = None):
+    """Bring the DB up to the latest schema version (see migrations.py)."""
+    con = connect(path)
     try:
-        # 1) Create all tables (safe for new DB; no-op for existing tables)
-        con.executescript("""
-        /* ================= CUTTING TOOL SPECS ================= */
-        CREATE TABLE IF NOT EXISTS cutting_tools (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tool_type TEXT,
-            tool_subtype TEXT,
-            cutting_diameter REAL,
-            cutting_length REAL,
-            overall_length REAL,
-            shank_type TEXT,
-            shank_diameter REAL,
-            material TEXT,
-            location TEXT,
-            remarks TEXT,
-            total_qty INTEGER DEFAULT 0,
-            issued_qty INTEGER DEFAULT 0,
-            broken_qty INTEGER DEFAULT 0,
-            reorder_level INTEGER DEFAULT 2,
-            UNIQUE (tool_type, cutting_diameter, cutting_length, shank_type, shank_diameter, material)
-        );
-
-        CREATE TABLE IF NOT EXISTS tool_issue_txn (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tool_id INTEGER,
-            action TEXT,
-            qty INTEGER,
-            operator TEXT,
-            machine TEXT,
-            shift TEXT,
-            job_name TEXT,
-            condition TEXT,
-            remarks TEXT,
-            ts DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-
-        /* ================= HOLDERS ================= */
-        CREATE TABLE IF NOT EXISTS holders (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            holder_type TEXT,
-            interface TEXT,
-            size TEXT,
-            projection REAL,
-            location TEXT,
-            remarks TEXT,
-            total_qty INTEGER DEFAULT 0,
-            issued_qty INTEGER DEFAULT 0,
-            reorder_level INTEGER DEFAULT 1,
-            UNIQUE (holder_type, interface, size, projection)
-        );
-
-        CREATE TABLE IF NOT EXISTS holder_txn (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            holder_id INTEGER,
-            action TEXT,
-            qty INTEGER,
-            operator TEXT,
-            machine TEXT,
-            shift TEXT,
-            remarks TEXT,
-            ts DATE
-        );
-
-        /* ================= INSERTS ================= */
-        CREATE TABLE IF NOT EXISTS inserts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            insert_type TEXT,
-            size TEXT,
-            grade TEXT,
-            edges INTEGER,
-            total_qty INTEGER,
-            available_qty INTEGER,
-            reorder_level INTEGER,
-            remarks TEXT,
-            UNIQUE(insert_type, size, grade)
-        );
-
-        CREATE TABLE IF NOT EXISTS insert_txn (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            insert_id INTEGER,
-            action TEXT,
-            qty INTEGER,
-            edges_used INTEGER,
-            operator TEXT,
-            machine TEXT,
-            job TEXT,
-            shift TEXT,
-            txn_date DATE
-        );
-
-        /* ================= COLLETS ================= */
-        CREATE TABLE IF NOT EXISTS collets (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            collet_type TEXT,
-            interface TEXT,
-            size_range TEXT,
-            location TEXT,
-            total_qty INTEGER DEFAULT 0,
-            available_qty INTEGER DEFAULT 0,
-            reorder_level INTEGER DEFAULT 2,
-            remarks TEXT,
-            UNIQUE (collet_type, interface, size_range, location)
-        );
-
-        CREATE TABLE IF NOT EXISTS collet_txn (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            collet_id INTEGER,
-            action TEXT,
-            qty INTEGER,
-            operator TEXT,
-            machine TEXT,
-            shift TEXT,
-            txn_date DATE
-        );
-
-        /* ================= GAUGES ================= */
-        CREATE TABLE IF NOT EXISTS gauges (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            gauge_code TEXT UNIQUE,
-            category TEXT,
-            subtype TEXT,
-            mechanism TEXT,
-            range TEXT,
-            least_count TEXT,
-            make TEXT,
-            serial_no TEXT,
-            location TEXT,
-            calibration_freq INTEGER DEFAULT 365,
-            last_calibration DATE,
-            next_calibration DATE,
-            status TEXT DEFAULT 'OK',
-            remarks TEXT
-        );
-
-        CREATE TABLE IF NOT EXISTS gauge_issue_txn (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            gauge_id INTEGER,
-            action TEXT,
-            operator TEXT,
-            machine TEXT,
-            job TEXT,
-            shift TEXT,
-            condition_on_return TEXT,
-            remarks TEXT,
-            txn_date DATE
-        );
-
-        CREATE TABLE IF NOT EXISTS gauge_calibration_txn (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            gauge_id INTEGER,
-            calibration_date DATE,
-            calibrated_by TEXT,
-            result TEXT,
-            certificate_no TEXT,
-            remarks TEXT
-        );
-
-        /* ================= CUSTOMER / MATERIAL ================= */
-        CREATE TABLE IF NOT EXISTS customer_master (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            customer_name TEXT UNIQUE NOT NULL,
-            short_code TEXT,
-            remarks TEXT
-        );
-
-        CREATE TABLE IF NOT EXISTS customer_challan (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            customer_id INTEGER NOT NULL,
-            customer_challan_no TEXT NOT NULL,
-            customer_challan_date DATE NOT NULL,
-            status TEXT DEFAULT 'OPEN',
-            remarks TEXT,
-            UNIQUE (customer_id, customer_challan_no)
-        );
-
-        CREATE TABLE IF NOT EXISTS material_inward (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            challan_id INTEGER NOT NULL,
-            item_code TEXT NOT NULL,
-            process TEXT,
-            inward_qty INTEGER NOT NULL,
-            available_qty INTEGER NOT NULL,
-            box_tray TEXT,
-            remarks TEXT
-        );
-
-        CREATE TABLE IF NOT EXISTS material_dispatch (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            challan_id INTEGER NOT NULL,
-            inward_id INTEGER NOT NULL,
-            elta_challan_no TEXT NOT NULL,
-            dispatch_date DATE NOT NULL,
-            ok_qty INTEGER DEFAULT 0,
-            rej_qty INTEGER DEFAULT 0,
-            cd_qty INTEGER DEFAULT 0,
-            nd_qty INTEGER DEFAULT 0,
-            nd_pw_qty INTEGER DEFAULT 0,
-            total_qty INTEGER NOT NULL,
-            remarks TEXT
-        );
-
-        /* ================= ITEM CODE MASTER ================= */
-        CREATE TABLE IF NOT EXISTS item_code_master (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            item_code TEXT UNIQUE NOT NULL,
-            description TEXT,
-            remarks TEXT
-        );
-
-        /* ================= SHIFT ================= */
-        CREATE TABLE IF NOT EXISTS shift_header (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            shift_date DATE NOT NULL,
-            shift TEXT NOT NULL,
-            shift_incharge TEXT NOT NULL,
-            remarks TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE (shift_date, shift)
-        );
-
-        CREATE TABLE IF NOT EXISTS shift_production (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            shift_id INTEGER NOT NULL,
-            item_code TEXT NOT NULL,
-            machine TEXT,
-            operator TEXT,
-            ok_qty INTEGER DEFAULT 0,
-            rej_qty INTEGER DEFAULT 0,
-            remarks TEXT
-        );
-
-        CREATE TABLE IF NOT EXISTS shift_setup (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            shift_id INTEGER NOT NULL,
-            machine TEXT,
-            from_item TEXT,
-            to_item TEXT,
-            setup_time_min INTEGER,
-            remarks TEXT
-        );
-
-        CREATE TABLE IF NOT EXISTS shift_attendance (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            shift_id INTEGER NOT NULL,
-            operator TEXT NOT NULL,
-            status TEXT NOT NULL
-        );
-
-        CREATE TABLE IF NOT EXISTS shift_downtime (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            shift_id INTEGER NOT NULL,
-            machine TEXT,
-            reason TEXT,
-            minutes INTEGER
-        );
-
-        /* ================= MACHINE ================= */
-        CREATE TABLE IF NOT EXISTS machine_master (
-            id              INTEGER PRIMARY KEY AUTOINCREMENT,
-            machine_code    TEXT UNIQUE NOT NULL,
-            machine_name    TEXT NOT NULL,
-            machine_type    TEXT NOT NULL,
-            controller      TEXT,
-            location        TEXT,
-            status          TEXT NOT NULL DEFAULT 'ACTIVE',
-            install_date    DATE,
-            notes           TEXT,
-            created_ts      DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-
-        /* ================= PM ================= */
-        CREATE TABLE IF NOT EXISTS pm_master (
-            id                INTEGER PRIMARY KEY AUTOINCREMENT,
-            machine_code      TEXT NOT NULL,
-            pm_name           TEXT NOT NULL,
-            frequency_days    INTEGER NOT NULL,
-            responsibility    TEXT,
-            checklist         TEXT,
-            active            INTEGER DEFAULT 1,
-            created_ts        DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY(machine_code) REFERENCES machine_master(machine_code)
-        );
-
-        CREATE TABLE IF NOT EXISTS pm_schedule (
-            id                INTEGER PRIMARY KEY AUTOINCREMENT,
-            pm_id             INTEGER NOT NULL,
-            last_done_date    DATE,
-            next_due_date     DATE NOT NULL,
-            status            TEXT NOT NULL DEFAULT 'DUE',
-            FOREIGN KEY(pm_id) REFERENCES pm_master(id)
-        );
-
-        CREATE TABLE IF NOT EXISTS pm_history (
-            id                INTEGER PRIMARY KEY AUTOINCREMENT,
-            pm_id             INTEGER NOT NULL,
-            done_date         DATE NOT NULL,
-            done_by           TEXT,
-            remarks           TEXT,
-            FOREIGN KEY(pm_id) REFERENCES pm_master(id)
-        );
-
-        /* ================= BREAKDOWN ================= */
-        CREATE TABLE IF NOT EXISTS breakdown_log (
-            id              INTEGER PRIMARY KEY AUTOINCREMENT,
-            machine_code    TEXT NOT NULL,
-            breakdown_date  DATE NOT NULL,
-            start_time      TEXT NOT NULL,
-            end_time        TEXT,
-            downtime_min    INTEGER NOT NULL DEFAULT 0,
-            problem         TEXT NOT NULL,
-            root_cause      TEXT,
-            action_taken    TEXT,
-            handled_by      TEXT,
-            status          TEXT NOT NULL DEFAULT 'OPEN',
-            created_ts      DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY(machine_code) REFERENCES machine_master(machine_code)
-        );
-
-        /* ================= COMPLAINTS ================= */
-        CREATE TABLE IF NOT EXISTS customer_complaint (
-            id                  INTEGER PRIMARY KEY AUTOINCREMENT,
-            complaint_no         TEXT UNIQUE NOT NULL,
-            complaint_date       TEXT NOT NULL,
-            customer_id          INTEGER NOT NULL,
-            customer_ref_no      TEXT,
-            item_code            TEXT NOT NULL,
-            batch_no             TEXT,
-            qty_affected         INTEGER DEFAULT 0,
-            issue_category       TEXT NOT NULL,
-            issue_description    TEXT NOT NULL,
-            severity             TEXT NOT NULL DEFAULT 'MED',
-            status               TEXT NOT NULL DEFAULT 'OPEN',
-            machine_code         TEXT,
-            job_no               TEXT,
-            shift_date           TEXT,
-            shift                TEXT,
-            assigned_to          TEXT,
-            containment_action   TEXT,
-            root_cause_5why      TEXT,
-            corrective_action    TEXT,
-            preventive_action    TEXT,
-            closure_date         TEXT,
-            closure_remarks      TEXT,
-            created_ts           TEXT NOT NULL DEFAULT (datetime('now')),
-            updated_ts           TEXT
-        );
-
-        CREATE TABLE IF NOT EXISTS complaint_action_log (
-            id              INTEGER PRIMARY KEY AUTOINCREMENT,
-            complaint_id    INTEGER NOT NULL,
-            action_date     TEXT NOT NULL,
-            action_type     TEXT NOT NULL,
-            notes           TEXT NOT NULL,
-            by_user         TEXT,
-            created_ts      TEXT NOT NULL DEFAULT (datetime('now'))
-        );
-
-        /* ================= INDEXES ================= */
-        CREATE INDEX IF NOT EXISTS idx_cc_customer ON customer_complaint(customer_id);
-        CREATE INDEX IF NOT EXISTS idx_cc_status   ON customer_complaint(status);
-        CREATE INDEX IF NOT EXISTS idx_cc_item     ON customer_complaint(item_code);
-        CREATE INDEX IF NOT EXISTS idx_cc_date     ON customer_complaint(complaint_date);
-        CREATE INDEX IF NOT EXISTS idx_cc_log_complaint ON complaint_action_log(complaint_id);
-
-        CREATE INDEX IF NOT EXISTS idx_breakdown_machine ON breakdown_log(machine_code);
-        CREATE INDEX IF NOT EXISTS idx_breakdown_status  ON breakdown_log(status);
-        CREATE INDEX IF NOT EXISTS idx_breakdown_date    ON breakdown_log(breakdown_date);
-
-        CREATE INDEX IF NOT EXISTS idx_pm_schedule_status ON pm_schedule(status);
-        CREATE INDEX IF NOT EXISTS idx_pm_master_machine  ON pm_master(machine_code);
-
-        CREATE INDEX IF NOT EXISTS idx_machine_master_type   ON machine_master(machine_type);
-        CREATE INDEX IF NOT EXISTS idx_machine_master_status ON machine_master(status);
-
-        /* ================= ITEM CODE PPAP / DRAWING DOCS (VERSIONED) ================= */
-        CREATE TABLE IF NOT EXISTS item_code_ppap_docs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            item_code_id INTEGER NOT NULL,
-            doc_name TEXT NOT NULL,
-            stored_name TEXT NOT NULL,
-            doc_type TEXT DEFAULT 'PPAP',
-            notes TEXT DEFAULT '',
-            uploaded_at TEXT NOT NULL,
-            doc_category TEXT DEFAULT 'PPAP',
-            version_no INTEGER DEFAULT 1,
-            is_current INTEGER DEFAULT 1,
-            FOREIGN KEY(item_code_id) REFERENCES item_code_master(id) ON DELETE CASCADE
-        );
-
-        CREATE INDEX IF NOT EXISTS idx_ppap_item_code_id
-            ON item_code_ppap_docs(item_code_id);
-        """)
-
-        # 2) Safe upgrades: add missing columns (older DBs)
-        def add_column_safe(sql: str):
-            try:
-                con.execute(sql)
-            except sqlite3.OperationalError:
-                # duplicate column name / table missing etc.
-                pass
-            except Exception:
-                pass
-
-        add_column_safe("ALTER TABLE item_code_ppap_docs ADD COLUMN doc_category TEXT DEFAULT 'PPAP'")
-        add_column_safe("ALTER TABLE item_code_ppap_docs ADD COLUMN version_no INTEGER DEFAULT 1")
-        add_column_safe("ALTER TABLE item_code_ppap_docs ADD COLUMN is_current INTEGER DEFAULT 1")
-
-        # 3) Fix wrong FK (item_codes -> item_code_master)
-        # IMPORTANT: _fix_ppap_fk(con) must NOT close/commit the connection
-        _fix_ppap_fk(con)
-
-        # 4) Indexes that depend on new columns (create after columns exist)
-        try:
-            con.execute("""
-                CREATE INDEX IF NOT EXISTS idx_ppap_item_code_cat
-                ON item_code_ppap_docs(item_code_id, doc_category)
-            """)
-        except Exception:
-            pass
-
-        try:
-            con.execute("""
-                CREATE INDEX IF NOT EXISTS idx_ppap_item_code_current
-                ON item_code_ppap_docs(item_code_id, doc_category, is_current)
-            """)
-        except Exception:
-            pass
-
-        con.commit()
-
+        return migrations.migrate(con)
     finally:
         con.close()
-    
-
-def _fix_ppap_fk(con):
-    cur = con.cursor()
-
-    fk = cur.execute(
-        "PRAGMA foreign_key_list(item_code_ppap_docs)"
-    ).fetchall()
-
-    if fk and fk[0]["table"] == "item_codes":
-        print("🔧 Fixing PPAP foreign key (item_codes → item_code_master)")
-
-        con.executescript("""
-        PRAGMA foreign_keys=OFF;
-
-        ALTER TABLE item_code_ppap_docs RENAME TO item_code_ppap_docs_old;
-
-        CREATE TABLE item_code_ppap_docs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            item_code_id INTEGER NOT NULL,
-            doc_name TEXT NOT NULL,
-            stored_name TEXT NOT NULL,
-            doc_type TEXT DEFAULT 'PPAP',
-            notes TEXT DEFAULT '',
-            uploaded_at TEXT NOT NULL,
-            doc_category TEXT DEFAULT 'PPAP',
-            version_no INTEGER DEFAULT 1,
-            is_current INTEGER DEFAULT 1,
-            FOREIGN KEY(item_code_id) REFERENCES item_code_master(id) ON DELETE CASCADE
-        );
-
-        INSERT INTO item_code_ppap_docs
-        (id, item_code_id, doc_name, stored_name, doc_type, notes, uploaded_at, doc_category, version_no, is_current)
-        SELECT
-            id, item_code_id, doc_name, stored_name, doc_type, notes, uploaded_at,
-            COALESCE(doc_category,'PPAP'),
-            COALESCE(version_no,1),
-            COALESCE(is_current,1)
-        FROM item_code_ppap_docs_old;
-
-        DROP TABLE item_code_ppap_docs_old;
-
-        CREATE INDEX IF NOT EXISTS idx_ppap_item_code_id
-            ON item_code_ppap_docs(item_code_id);
-
-        CREATE INDEX IF NOT EXISTS idx_ppap_item_code_cat
-            ON item_code_ppap_docs(item_code_id, doc_category);
-
-        CREATE INDEX IF NOT EXISTS idx_ppap_item_code_current
-            ON item_code_ppap_docs(item_code_id, doc_category, is_current);
-
-        PRAGMA foreign_keys=ON;
-        """)
-
-        print("✅ PPAP FK fixed")
-
-   
-
@@ -5,6 +5,7 @@ import sys
 import webview
 
 from app import app
+import scheduler
 
 HOST = "127.0.0.1"
 
@@ -43,6 +44,7 @@ def ensure_single_instance(host="127.0.0.1", port=45454):
 
 def run_server(host, port):
     from waitress import serve
+    scheduler.start()   # daily status rollovers (PM / gauges)
     serve(app, host=host, port=port, threads=8)
 
 
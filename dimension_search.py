@@ -0,0 +1,106 @@
+# dimension_search.py  (ELTA Workshop Suite)
+# --------------------------------------------
+# Parametric search over cutting_tools / holders: exact match on the text
+# attributes (type, material, interface ...) and range / tolerance match on
+# the numeric dimensions, ranked nearest-first.
+#
+# Every numeric dimension accepts, as request args:
+#   <col>=8 & <col>_tol=0.5    -> 7.5 .. 8.5, ranked by distance from 8
+#   <col>_min=20 / <col>_max=  -> open or closed range (no ranking)
+# e.g.  /api/search/tools?tool_type=End Mill&material=Carbide
+#           &cutting_diameter=8&cutting_diameter_tol=0.5&cutting_length_min=20
+#
+# The range on the leading dimension is an index range scan (migration v13:
+# type / material + diameter, and diameter alone when no type is given).
+# Rank = sum over targeted dimensions of |value - target| / tolerance, so a
+# hit on the edge of every tolerance band scores 1 per dimension; pages are
+# keyset-paginated on (rank, id).
+# --------------------------------------------
+
+from db import get_db
+from pagination import page_from_request
+
+# kind -> (select, {text filter arg: column}, numeric dimension columns)
+SPECS = {
+    "tool": (
+        """SELECT id, tool_type, tool_subtype, cutting_diameter, cutting_length, overall_length,
+                  shank_type, shank_diameter, material, location,
+                  (total_qty - issued_qty - broken_qty) AS available_qty
+           FROM cutting_tools""",
+        {"tool_type": "tool_type", "tool_subtype": "tool_subtype",
+         "material": "material", "shank_type": "shank_type"},
+        ("cutting_diameter", "cutting_length", "overall_length", "shank_diameter"),
+    ),
+    "holder": (
+        """SELECT id, holder_type, interface, size, projection, location,
+                  (total_qty - issued_qty) AS available_qty
+           FROM holders""",
+        {"holder_type": "holder_type", "interface": "interface", "size": "size"},
+        ("projection",),
+    ),
+}
+
+
+def _number(args, name):
+    text = (args.get(name) or "").strip()
+    if not text:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        raise ValueError(f"{name} must be a number") from None
+
+
+def build_query(kind, args):
+    """
+    (query, params) for SPECS[kind] filtered by `args`; the query exposes
+    `rank` (lower = nearer) and is open-ended for keyset_page().
+    Raises ValueError for a non-numeric dimension arg.
+    """
+    select, text_filters, dims = SPECS[kind]
+    where, params = [], []
+    rank_terms, rank_params = [], []
+
+    for arg, col in text_filters.items():
+        value = (args.get(arg) or "").strip()
+        if value:
+            where.append(f"{col} = ?")
+            params.append(value)
+
+    for col in dims:
+        target = _number(args, col)
+        tol = abs(_number(args, f"{col}_tol") or 0)
+        lo = _number(args, f"{col}_min")
+        hi = _number(args, f"{col}_max")
+
+        if target is not None:
+            lo = target - tol if lo is None else max(lo, target - tol)
+            hi = target + tol if hi is None else min(hi, target + tol)
+            rank_terms.append(f"ABS({col} - ?) / ?")
+            rank_params += [target, tol or 1]
+        if lo is not None and hi is not None:
+            where.append(f"{col} BETWEEN ? AND ?")
+            params += [lo, hi]
+        elif lo is not None:
+            where.append(f"{col} >= ?")
+            params.append(lo)
+        elif hi is not None:
+            where.append(f"{col} <= ?")
+            params.append(hi)
+
+    rank = " + ".join(rank_terms) or "0"
+    query = f"""
+        SELECT * FROM (
+            SELECT s.*, -({rank}) AS neg_rank
+            FROM ({select}) s
+            WHERE {" AND ".join(where) or "1=1"}
+        ) WHERE 1=1"""
+    return query, rank_params + params
+
+
+def search(kind, args, db=None):
+    """Current request's page of matches, nearest first (pagination.Page)."""
+    db = db or get_db()
+    query, params = build_query(kind, args)
+    # keyset_page sorts descending: highest -rank first = nearest first
+    return page_from_request(db, query, params, [("neg_rank", "neg_rank"), ("id", "id")])
@@ -0,0 +1,195 @@
+# dispatch.py  (ELTA Workshop Suite)
+# --------------------------------------------
+# Material dispatch against customer inward lines.
+#
+# post() writes one ELTA challan's dispatch in ONE BEGIN IMMEDIATE
+# transaction. Each requested line is either
+#
+#   {"inward_id": 12, "ok_qty": 40, "rej_qty": 2}     an explicit inward line
+#   {"item_code": "IC-1", "process": "TURN",           an item total, allocated
+#    "customer_id": 3, "ok_qty": 120}                  FIFO over open lines
+#
+# FIFO = oldest customer challan first (challan date, challan no, line id),
+# open challans only; process / customer_id narrow the candidates. The qty
+# buckets (OK, REJ, CD, ND, ND-PW) are filled in that order line by line.
+#
+# Everything is validated against the balances read under the write lock
+# before anything is written; then the dispatch rows go in with one
+# executemany and the balances with another (guarded, like stock.move).
+# Challan open / closed status follows from the triggers of migration v16.
+# --------------------------------------------
+
+from datetime import date
+
+from db import get_db, write_transaction
+
+QTY_FIELDS = ("ok_qty", "rej_qty", "cd_qty", "nd_qty", "nd_pw_qty")
+
+_LINE_SQL = """
+    SELECT mi.id, mi.challan_id, mi.item_code, mi.process, mi.available_qty,
+           ch.customer_challan_no, ch.customer_id
+    FROM material_inward mi
+    JOIN customer_challan ch ON ch.id = mi.challan_id
+"""
+
+
+class DispatchError(Exception):
+    """Dispatch refused (bad qty, unknown line, not enough balance); nothing written."""
+
+
+def parse_date(value):
+    """Dispatch date as YYYY-MM-DD; DispatchError when missing or not a date."""
+    text = str(value or "").strip()
+    if not text:
+        raise DispatchError("Dispatch date required")
+    try:
+        return date.fromisoformat(text).isoformat()
+    except ValueError:
+        raise DispatchError(f"Bad dispatch date '{text}', expected YYYY-MM-DD")
+
+
+def _quantities(line, n):
+    qtys = {}
+    for f in QTY_FIELDS:
+        raw = line.get(f)
+        if f == "ok_qty" and raw is None:
+            raw = line.get("qty")           # item totals may just say qty
+        try:
+            qtys[f] = int(raw or 0)
+        except (TypeError, ValueError):
+            raise DispatchError(f"Line {n}: {f} must be a number")
+        if qtys[f] < 0:
+            raise DispatchError(f"Line {n}: {f} cannot be negative")
+    if sum(qtys.values()) <= 0:
+        raise DispatchError(f"Line {n}: dispatch total must be > 0")
+    return qtys
+
+
+def _fifo_lines(db, item_code, process, customer_id):
+    sql = _LINE_SQL + """
+        WHERE mi.item_code = ? AND mi.available_qty > 0 AND ch.open_line_count > 0
+    """
+    params = [item_code]
+    if process is not None:
+        sql += " AND mi.process = ?"
+        params.append(process)
+    if customer_id:
+        sql += " AND ch.customer_id = ?"
+        params.append(customer_id)
+    sql += " ORDER BY ch.customer_challan_date, ch.customer_challan_no, mi.id"
+    return db.execute(sql, params).fetchall()
+
+
+def _take(inward, left, want):
+    """Split the `want` buckets over one line's balance; returns the dispatched buckets."""
+    got = {}
+    for f in QTY_FIELDS:
+        got[f] = min(want[f], left[inward["id"]])
+        want[f] -= got[f]
+        left[inward["id"]] -= got[f]
+    return got
+
+
+def allocate(db, lines):
+    """
+    Resolve request lines to dispatch rows [(inward row, buckets)] against
+    the current balances. Raises DispatchError; writes nothing.
+    """
+    if not lines:
+        raise DispatchError("No lines to dispatch")
+
+    left, known, out = {}, {}, []
+
+    def remember(row):
+        if row["id"] not in known:
+            known[row["id"]] = row
+            left[row["id"]] = int(row["available_qty"] or 0)
+        return known[row["id"]]
+
+    for n, line in enumerate(lines, 1):
+        if not isinstance(line, dict):
+            raise DispatchError(f"Line {n}: expected an object")
+        want = _quantities(line, n)
+        total = sum(want.values())
+
+        if line.get("inward_id"):
+            row = db.execute(_LINE_SQL + " WHERE mi.id = ?", (line["inward_id"],)).fetchone()
+            if row is None:
+                raise DispatchError(f"Line {n}: inward line {line['inward_id']} not found")
+            row = remember(row)
+            if total > left[row["id"]]:
+                raise DispatchError(
+                    f"Line {n}: {row['item_code']} on challan {row['customer_challan_no']} "
+                    f"has {left[row['id']]} left, asked for {total}"
+                )
+            out.append((row, _take(row, left, want)))
+            continue
+
+        item_code = str(line.get("item_code") or "").strip()
+        if not item_code:
+            raise DispatchError(f"Line {n}: inward_id or item_code required")
+        process = line.get("process")
+        process = None if process is None else str(process).strip()
+        label = f"{item_code} / {process}" if process else item_code
+
+        for row in _fifo_lines(db, item_code, process, line.get("customer_id")):
+            row = remember(row)
+            if left[row["id"]] > 0:
+                out.append((row, _take(row, left, want)))
+            if not any(want.values()):
+                break
+        short = sum(want.values())
+        if short:
+            raise DispatchError(
+                f"Line {n}: only {total - short} of {total} {label} open for dispatch"
+            )
+    return out
+
+
+def post(elta_challan_no, dispatch_date, lines, db=None):
+    """
+    Allocate and write one ELTA challan's dispatch atomically. Returns the
+    dispatch rows written (dicts). Raises DispatchError, nothing written.
+    """
+    elta_challan_no = str(elta_challan_no or "").strip()
+    if not elta_challan_no:
+        raise DispatchError("ELTA challan number required")
+    dispatch_date = parse_date(dispatch_date)
+
+    db = db or get_db()
+    with write_transaction(db):
+        rows = allocate(db, lines)
+
+        db.executemany(f"""
+            INSERT INTO material_dispatch
+            (challan_id, inward_id, elta_challan_no, dispatch_date, {", ".join(QTY_FIELDS)}, total_qty)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (row["challan_id"], row["id"], elta_challan_no, dispatch_date,
+             *(q[f] for f in QTY_FIELDS), sum(q.values()))
+            for row, q in rows
+        ])
+
+        taken = {}
+        for row, q in rows:
+            taken[row["id"]] = taken.get(row["id"], 0) + sum(q.values())
+        changed = db.executemany("""
+            UPDATE material_inward
+            SET available_qty = available_qty - ?
+            WHERE id = ? AND available_qty >= ?
+        """, [(qty, inward_id, qty) for inward_id, qty in taken.items()]).rowcount
+        if changed != len(taken):
+            raise DispatchError("Balances changed while dispatching, try again")
+
+    return [
+        {
+            "inward_id": row["id"],
+            "challan_id": row["challan_id"],
+            "customer_challan_no": row["customer_challan_no"],
+            "item_code": row["item_code"],
+            "process": row["process"] or "",
+            **q,
+            "total_qty": sum(q.values()),
+        }
+        for row, q in rows
+    ]
@@ -0,0 +1,151 @@
+# exports.py  (ELTA Workshop Suite)
+# --------------------------------------------
+# Spreadsheet exports (CSV / XLSX) that stream rows from the SQLite cursor.
+#
+#   register()   : registers query(args) -> (sql, params) under a name, with
+#                  its columns. The query is the view's own QuerySpec
+#                  (query_spec.py), so an export always matches what is on
+#                  screen for the same query string.
+#   respond()    : /export/<name>.csv  -> generator response, one chunk of
+#                                         EXPORT_CHUNK_ROWS rows at a time
+#                  /export/<name>.json -> same, as a JSON array of objects
+#                  /export/<name>.xlsx -> openpyxl write-only workbook into a
+#                                         temp file, then streamed from disk
+#
+# Rows are read with fetchmany() on a connection of its own inside one read
+# transaction (consistent snapshot), never fetchall(), so memory stays flat
+# however many rows the export has.
+# --------------------------------------------
+
+import csv
+import io
+import json
+import tempfile
+from dataclasses import dataclass
+from datetime import date
+from operator import itemgetter
+
+from flask import Response, abort, send_file, stream_with_context
+
+from openpyxl import Workbook
+
+import config
+import db as _db
+
+EXPORTS = {}            # name -> Export
+
+XLSX_MAX_ROWS = 1_048_575   # Excel sheet limit minus the header row
+
+
+@dataclass
+class Export:
+    name: str
+    title: str
+    columns: tuple          # ((header, row key), ...)
+    query: object           # query(args) -> (sql, params)
+
+
+def register(name, title, columns, query):
+    """Register query(args) -> (sql, params) (e.g. a QuerySpec's .ordered) as export `name`."""
+    EXPORTS[name] = Export(name, title, tuple(columns), query)
+
+
+def iter_chunks(exp, args):
+    """Yield the export's rows as lists of plain tuples, EXPORT_CHUNK_ROWS at a time, from one read snapshot."""
+    sql, params = exp.query(args)
+    con = _db.connect()
+    con.row_factory = None              # plain tuples: no per-row Row objects
+    try:
+        con.execute("BEGIN")
+        cur = con.execute(sql, params)
+        names = [d[0] for d in cur.description]
+        keys = [key for _, key in exp.columns]
+        pick = None if keys == names else itemgetter(*[names.index(k) for k in keys])
+        while True:
+            chunk = cur.fetchmany(config.EXPORT_CHUNK_ROWS)
+            if not chunk:
+                break
+            yield chunk if pick is None else [pick(r) for r in chunk]
+    finally:
+        con.rollback()
+        con.really_close()
+
+
+def _csv_chunks(exp, args):
+    buf = io.StringIO()
+    out = csv.writer(buf)
+    buf.write("\ufeff")            # BOM: Excel opens the file as UTF-8
+    out.writerow([h for h, _ in exp.columns])
+    for chunk in iter_chunks(exp, args):
+        out.writerows(chunk)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    yield buf.getvalue()
+
+
+def _json_chunks(exp, args):
+    """A JSON array of {column key: value} objects, one chunk per fetchmany()."""
+    keys = [key for _, key in exp.columns]
+    sep = "["
+    for chunk in iter_chunks(exp, args):
+        yield sep + ",".join(json.dumps(dict(zip(keys, r)), default=str) for r in chunk)
+        sep = ","
+    yield "[]" if sep == "[" else "]"
+
+
+def write_xlsx(exp, args, fileobj):
+    """Write-only workbook: rows go to disk as they are appended. Rolls over to a new sheet at Excel's limit."""
+    wb = Workbook(write_only=True)
+    headers = [h for h, _ in exp.columns]
+    ws, n, sheet = None, XLSX_MAX_ROWS, 0
+    for chunk in iter_chunks(exp, args):
+        for row in chunk:
+            if n == XLSX_MAX_ROWS:
+                sheet += 1
+                ws = wb.create_sheet(exp.title[:28] if sheet == 1 else f"{exp.title[:24]} ({sheet})")
+                ws.append(headers)
+                n = 0
+            ws.append(row)
+            n += 1
+    if ws is None:
+        wb.create_sheet(exp.title[:28]).append(headers)
+    wb.save(fileobj)
+
+
+def respond(name, fmt, args):
+    """View helper: the export as a streamed CSV / JSON or XLSX download."""
+    exp = EXPORTS.get(name)
+    if exp is None:
+        abort(404, "Unknown export")
+    try:
+        exp.query(args)                 # bad filter args fail here, before streaming
+    except ValueError as e:
+        abort(400, str(e))
+    filename = f"{name}_{date.today().isoformat()}.{fmt}"
+
+    if fmt == "csv":
+        return Response(
+            stream_with_context(_csv_chunks(exp, args)),
+            mimetype="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    if fmt == "xlsx":
+        tmp = tempfile.TemporaryFile()      # deleted when the response closes it
+        write_xlsx(exp, args, tmp)
+        tmp.seek(0)
+        return send_file(
+            tmp,
+            as_attachment=True,
+            download_name=filename,
+            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+
+    if fmt == "json":
+        return Response(
+            stream_with_context(_json_chunks(exp, args)),
+            mimetype="application/json",
+        )
+
+    abort(404, "Unknown export format")
@@ -0,0 +1,136 @@
+# http_cache.py  (ELTA Workshop Suite)
+# --------------------------------------------
+# HTTP-level speedups for LAN / multi-user use:
+#   - CompressionMiddleware: gzip (or brotli when installed) for large
+#     HTML / JSON / CSS / JS responses
+#   - conditional_get(): ETag from the per-table change counters, so an
+#     unchanged list page answers 304 without querying or rendering anything
+# --------------------------------------------
+
+import gzip
+import hashlib
+from datetime import date
+from functools import wraps
+
+from flask import request, make_response
+
+from db import data_version
+
+try:  # optional: pip install brotli
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = (
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/csv",
+    "application/json",
+    "application/javascript",
+    "text/javascript",
+    "image/svg+xml",
+)
+
+
+def _choose_encoding(accept_encoding: str):
+    accepted = {p.split(";")[0].strip().lower() for p in (accept_encoding or "").split(",")}
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    """
+    WSGI wrapper: compresses buffered responses >= min_size bytes.
+    Streamed responses (no Content-Length, e.g. file downloads / exports)
+    and responses that are already encoded pass through untouched.
+    """
+
+    def __init__(self, wsgi_app, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+        self.wsgi_app = wsgi_app
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def __call__(self, environ, start_response):
+        encoding = _choose_encoding(environ.get("HTTP_ACCEPT_ENCODING", ""))
+        # HEAD: Content-Length is the GET body's, the body itself is empty
+        if encoding is None or environ.get("REQUEST_METHOD") == "HEAD":
+            return self.wsgi_app(environ, start_response)
+
+        captured = {}
+
+        def capture(status, headers, exc_info=None):
+            captured["status"] = status
+            captured["headers"] = headers
+            captured["exc_info"] = exc_info
+            # body is written through the returned iterable by Flask/Werkzeug
+            return lambda data: None
+
+        app_iter = self.wsgi_app(environ, capture)
+        headers = captured["headers"]
+        names = {k.lower(): v for k, v in headers}
+
+        compressible = (
+            names.get("content-type", "").split(";")[0].strip() in COMPRESSIBLE_TYPES
+            and "content-encoding" not in names
+            and int(names.get("content-length") or -1) >= self.min_size
+        )
+        if not compressible:
+            start_response(captured["status"], headers, captured["exc_info"])
+            return app_iter
+
+        try:
+            body = b"".join(app_iter)
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
+
+        if encoding == "br":
+            body = brotli.compress(body, quality=self.brotli_quality)
+        else:
+            body = gzip.compress(body, compresslevel=self.gzip_level)
+
+        headers = [(k, v) for k, v in headers if k.lower() not in ("content-length", "vary")]
+        vary = names.get("vary")
+        headers.append(("Vary", f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"))
+        headers.append(("Content-Encoding", encoding))
+        headers.append(("Content-Length", str(len(body))))
+        start_response(captured["status"], headers, captured["exc_info"])
+        return [body]
+
+
+def conditional_get(*tables):
+    """
+    Decorator for GET list views that only depend on `tables`.
+    The ETag covers the URL (filters), today's date (DUE/OVERDUE style
+    statuses) and the data_versions counters of those tables. A matching
+    If-None-Match returns 304 before the view runs.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != "GET":
+                return view(*args, **kwargs)
+
+            # taken before the view runs: a write that lands while rendering
+            # gives the next request a new tag instead of a stale 304
+            key = f"{request.full_path}|{date.today().isoformat()}|{data_version(*tables)}"
+            etag = hashlib.sha1(key.encode()).hexdigest()
+
+            if request.if_none_match.contains_weak(etag):
+                resp = make_response("", 304)
+            else:
+                resp = make_response(view(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+
+            resp.set_etag(etag, weak=True)
+            resp.headers["Cache-Control"] = "no-cache"   # always revalidate
+            return resp
+        return wrapper
+    return decorator
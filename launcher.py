@@ -2,6 +2,7 @@ import os, sys, webbrowser
 from threading import Timer
 from license import load_license
 from app import app
+import scheduler
 import traceback, os
 from datetime import datetime
 
@@ -16,6 +17,7 @@ def log_crash(e):
 if __name__ == "__main__":
     try:
         from app import app
+        scheduler.start()   # daily status rollovers (PM / gauges)
         app.run(host="127.0.0.1", port=5000)
     except Exception as e:
         log_crash(e)
@@ -32,5 +34,6 @@ else:
     app.config["LICENSE_OK"] = True
 
 Timer(1, open_browser).start()
+scheduler.start()   # daily status rollovers (PM / gauges); no-op if already running
 app.run(host="127.0.0.1", port=5000)
 
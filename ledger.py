@@ -0,0 +1,181 @@
+# ledger.py  (ELTA Workshop Suite)
+# --------------------------------------------
+# Unified inventory ledger for the tool crib (tools, holders, inserts, collets).
+#
+# Every movement becomes one inventory_ledger row with signed deltas on
+# three buckets (available / out / broken); total is always their sum, so
+# the four cribs share one schema regardless of how their own counters and
+# *_txn tables look.
+#
+# inventory_snapshot holds per-item balances at the end of a day. The
+# balance at any date is "latest snapshot on or before it + the ledger rows
+# after the snapshot" -- only the delta is read, never the whole history.
+# A back-dated movement deletes the snapshots it would falsify (trigger in
+# migration v10); the next snapshot run rebuilds them.
+# --------------------------------------------
+
+from datetime import date, timedelta
+
+import config
+import scheduler
+from db import get_db
+
+KINDS = ("tool", "holder", "insert", "collet")
+
+# movement -> (available, out, broken) sign per unit
+DELTAS = {
+    "RECEIPT": (1, 0, 0),
+    "ISSUE": (-1, 1, 0),
+    "RETURN": (1, -1, 0),
+    "REGRIND": (1, -1, 0),
+    "RETURN_BROKEN": (0, -1, 1),
+    "SCRAP": (-1, 0, 1),
+}
+
+# live counters per kind as (id, total, available); compared by reconcile()
+COUNTERS = {
+    "tool": """
+        SELECT id, COALESCE(total_qty, 0) AS total,
+               COALESCE(total_qty, 0) - COALESCE(issued_qty, 0) - COALESCE(broken_qty, 0) AS available
+        FROM cutting_tools
+    """,
+    "holder": """
+        SELECT id, COALESCE(total_qty, 0) AS total,
+               COALESCE(total_qty, 0) - COALESCE(issued_qty, 0) AS available
+        FROM holders
+    """,
+    "insert": """
+        SELECT id, COALESCE(total_qty, 0) AS total, COALESCE(available_qty, 0) AS available
+        FROM inserts
+    """,
+    "collet": """
+        SELECT id, COALESCE(total_qty, 0) AS total, COALESCE(available_qty, 0) AS available
+        FROM collets
+    """,
+}
+
+ITEM_LABELS = {
+    "tool": "SELECT id, tool_type || ' Ø' || cutting_diameter || ' x ' || cutting_length || ' ' || material FROM cutting_tools",
+    "holder": "SELECT id, holder_type || ' ' || interface || ' ' || size || ' / ' || projection FROM holders",
+    "insert": "SELECT id, insert_type || ' ' || size || ' ' || grade FROM inserts",
+    "collet": "SELECT id, collet_type || ' ' || interface || ' ' || size_range FROM collets",
+}
+
+
+def _day(value) -> str:
+    """Form date / timestamp -> 'YYYY-MM-DD' (today when missing)."""
+    text = str(value or "").strip()[:10]
+    try:
+        return date.fromisoformat(text).isoformat()
+    except ValueError:
+        return date.today().isoformat()
+
+
+# ================= WRITE =================
+
+def record(db, kind, item_id, movement, qty, txn_date=None, source=None, source_id=None):
+    """Append one movement. Call inside the transaction that changes the counters."""
+    da, do, db_ = DELTAS[movement]
+    qty = int(qty)
+    db.execute("""
+        INSERT INTO inventory_ledger
+        (kind, item_id, movement, txn_date, qty, d_available, d_out, d_broken, source, source_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (kind, int(item_id), movement, _day(txn_date), qty, da * qty, do * qty, db_ * qty, source, source_id))
+
+
+# ================= READ =================
+
+def _latest_snapshot(db, on_or_before: str):
+    row = db.execute("""
+        SELECT MAX(snapshot_date) FROM inventory_snapshot WHERE snapshot_date <= ?
+    """, (on_or_before,)).fetchone()
+    return row[0]
+
+
+def balances_as_of(as_of=None, kind=None, db=None):
+    """
+    {(kind, item_id): (total, available, out, broken)} at the end of `as_of`
+    (default: everything recorded, incl. future-dated rows).
+    """
+    db = db or get_db()
+    as_of = _day(as_of) if as_of else "9999-12-31"
+    snap = _latest_snapshot(db, as_of) or "0000-00-00"
+
+    kind_sql, params = "", [snap]
+    if kind:
+        kind_sql = " AND kind = ?"
+        params.append(kind)
+    params += [snap, as_of]
+    if kind:
+        params.append(kind)
+
+    rows = db.execute(f"""
+        SELECT kind, item_id, SUM(a) AS available, SUM(o) AS out_qty, SUM(b) AS broken
+        FROM (
+            SELECT kind, item_id, available AS a, out_qty AS o, broken AS b
+            FROM inventory_snapshot
+            WHERE snapshot_date = ?{kind_sql}
+            UNION ALL
+            SELECT kind, item_id, d_available, d_out, d_broken
+            FROM inventory_ledger
+            WHERE txn_date > ? AND txn_date <= ?{kind_sql}
+        )
+        GROUP BY kind, item_id
+    """, params).fetchall()
+
+    return {
+        (r["kind"], r["item_id"]): (r["available"] + r["out_qty"] + r["broken"], r["available"], r["out_qty"], r["broken"])
+        for r in rows
+    }
+
+
+def item_labels(kinds=KINDS, db=None):
+    db = db or get_db()
+    return {(k, r[0]): r[1] for k in kinds for r in db.execute(ITEM_LABELS[k])}
+
+
+def reconcile(db=None):
+    """
+    Items whose live counters disagree with the ledger:
+    [(kind, item_id, counter_total, ledger_total, counter_available, ledger_available)]
+    """
+    db = db or get_db()
+    ledger_now = balances_as_of(db=db)
+    mismatches = []
+    for kind in KINDS:
+        for r in db.execute(COUNTERS[kind]):
+            total, available, _, _ = ledger_now.pop((kind, r["id"]), (0, 0, 0, 0))
+            if (total, available) != (r["total"], r["available"]):
+                mismatches.append((kind, r["id"], r["total"], total, r["available"], available))
+    # ledger rows for items that no longer exist
+    for (kind, item_id), (total, available, _, _) in ledger_now.items():
+        if total or available:
+            mismatches.append((kind, item_id, None, total, None, available))
+    return mismatches
+
+
+# ================= SNAPSHOTS =================
+
+def take_snapshot(snapshot_date=None, db=None):
+    """Store balances at the end of `snapshot_date` (default yesterday). Returns rows written."""
+    db = db or get_db()
+    snapshot_date = _day(snapshot_date or (date.today() - timedelta(days=1)))
+    balances = balances_as_of(snapshot_date, db=db)
+
+    db.execute("DELETE FROM inventory_snapshot WHERE snapshot_date = ?", (snapshot_date,))
+    db.executemany("""
+        INSERT INTO inventory_snapshot (snapshot_date, kind, item_id, available, out_qty, broken)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, [(snapshot_date, k, i, a, o, b) for (k, i), (_, a, o, b) in balances.items()])
+    return len(balances)
+
+
+@scheduler.daily("inventory snapshot")
+def _snapshot_job(db, today):
+    """Snapshot yesterday once the last snapshot is LEDGER_SNAPSHOT_DAYS old."""
+    yesterday = today - timedelta(days=1)
+    last = _latest_snapshot(db, yesterday.isoformat())
+    if last and date.fromisoformat(last) > yesterday - timedelta(days=config.LEDGER_SNAPSHOT_DAYS):
+        return
+    take_snapshot(yesterday, db=db)
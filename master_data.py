@@ -0,0 +1,139 @@
+# master_data.py  (ELTA Workshop Suite)
+# --------------------------------------------
+# Process-wide cache for the master lists every form page needs:
+#   customers, item codes, active machines
+#
+# Each entry remembers the data_versions counter of its table. The counter is
+# bumped by triggers on every INSERT / UPDATE / DELETE, so a write from the
+# Customers / Item Codes / Machines pages (or anywhere else) makes the next
+# read reload; otherwise the cached rows are reused. MASTER_CACHE_TTL is only
+# a safety net (e.g. someone editing the .db file with an external tool
+# while triggers are missing).
+# --------------------------------------------
+
+import threading
+import time
+
+from db import get_db, data_version, fetch_active_machines
+from config import MASTER_CACHE_TTL
+
+
+_lock = threading.Lock()
+_cache = {}     # name -> (version, loaded_at, rows)
+
+
+def _load_customers(db):
+    return db.execute("""
+        SELECT id, customer_name
+        FROM customer_master
+        ORDER BY customer_name
+    """).fetchall()
+
+
+def _load_item_codes(db):
+    return db.execute("""
+        SELECT item_code
+        FROM item_code_master
+        ORDER BY item_code
+    """).fetchall()
+
+
+# name -> (table, loader)
+SOURCES = {
+    "customers": ("customer_master", _load_customers),
+    "item_codes": ("item_code_master", _load_item_codes),
+    "machines": ("machine_master", fetch_active_machines),
+}
+
+
+def _get(name, db=None):
+    table, loader = SOURCES[name]
+    if db is None:
+        db = get_db()
+
+    version = data_version(table, db=db)
+    now = time.monotonic()
+
+    entry = _cache.get(name)
+    if entry and entry[0] == version and now - entry[1] < MASTER_CACHE_TTL:
+        return entry[2]
+
+    rows = loader(db)
+    with _lock:
+        # keep whichever copy is newer if two threads reloaded at once
+        current = _cache.get(name)
+        if current is None or current[0] <= version:
+            _cache[name] = (version, now, rows)
+    return rows
+
+
+def customers(db=None):
+    """[(id, customer_name)] ordered by name."""
+    return _get("customers", db)
+
+
+def item_codes(db=None):
+    """[(item_code,)] ordered by code."""
+    return _get("item_codes", db)
+
+
+def active_machines(db=None):
+    """[(machine_code, machine_name)] of ACTIVE machines, ordered by code."""
+    return _get("machines", db)
+
+
+# ---- single-value checks for typed-in (typeahead) form values ----
+
+def item_code_exists(code, db=None):
+    db = db or get_db()
+    return db.execute("SELECT 1 FROM item_code_master WHERE item_code=?", (code,)).fetchone() is not None
+
+
+def missing_item_codes(codes, db=None):
+    """The subset of `codes` that is not in item_code_master (one query per 500)."""
+    db = db or get_db()
+    wanted = sorted(set(codes))
+    found = set()
+    for i in range(0, len(wanted), 500):
+        chunk = wanted[i:i + 500]
+        marks = ",".join("?" * len(chunk))
+        found.update(r[0] for r in db.execute(
+            f"SELECT item_code FROM item_code_master WHERE item_code IN ({marks})", chunk
+        ))
+    return [c for c in wanted if c not in found]
+
+
+def inactive_machines(machine_codes, db=None):
+    """The subset of `machine_codes` that is not an ACTIVE machine."""
+    active = {r["machine_code"] for r in active_machines(db)}
+    return sorted(set(machine_codes) - active)
+
+
+def customer_exists(customer_id, db=None):
+    db = db or get_db()
+    return db.execute("SELECT 1 FROM customer_master WHERE id=?", (customer_id,)).fetchone() is not None
+
+
+def machine_is_active(machine_code, db=None):
+    db = db or get_db()
+    return db.execute(
+        "SELECT 1 FROM machine_master WHERE machine_code=? AND status='ACTIVE'", (machine_code,)
+    ).fetchone() is not None
+
+
+def invalidate(name=None):
+    """Drop one cached list (or all of them)."""
+    with _lock:
+        if name is None:
+            _cache.clear()
+        else:
+            _cache.pop(name, None)
+
+
+def cache_info():
+    """{name: (version, age_seconds, row_count)} for diagnostics."""
+    now = time.monotonic()
+    return {
+        name: (version, round(now - loaded_at, 1), len(rows))
+        for name, (version, loaded_at, rows) in list(_cache.items())
+    }
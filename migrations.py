@@ -0,0 +1,1877 @@
+# migrations.py  (ELTA Workshop Suite)
+# --------------------------------------------
+# Versioned schema migrations keyed on PRAGMA user_version.
+# Each step runs once, inside its own transaction, and bumps user_version.
+# A DB that is already current costs one PRAGMA read at startup.
+#
+# To change the schema: append a new step with the next version number.
+# Never edit a step that has already shipped.
+# --------------------------------------------
+
+import sqlite3
+
+MIGRATIONS = []   # [(version, name, step(con))], kept in version order
+
+
+def migration(version: int, name: str):
+    """Register step(con) as schema version `version`."""
+    def register(step):
+        if MIGRATIONS and version <= MIGRATIONS[-1][0]:
+            raise ValueError(f"Migration {version} registered out of order")
+        MIGRATIONS.append((version, name, step))
+        return step
+    return register
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def current_version(con: sqlite3.Connection) -> int:
+    return con.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_script(con: sqlite3.Connection, script: str):
+    """
+    Execute a multi-statement SQL script statement by statement.
+    (executescript() would COMMIT first and break the step transaction.)
+    """
+    stmt = ""
+    for line in script.splitlines(keepends=True):
+        stmt += line
+        if sqlite3.complete_statement(stmt):
+            con.execute(stmt)
+            stmt = ""
+    if stmt.strip():
+        raise ValueError(f"Incomplete SQL statement in migration: {stmt.strip()[:80]}")
+
+
+def table_columns(con: sqlite3.Connection, table: str) -> set:
+    return {r[1] for r in con.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def add_column(con: sqlite3.Connection, table: str, column: str, decl: str):
+    """ALTER TABLE ADD COLUMN only when the column is missing."""
+    if column not in table_columns(con, table):
+        con.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+def track_table(con: sqlite3.Connection, table: str):
+    """
+    Register `table` in data_versions and (re)create the triggers that bump
+    its counter on every insert / update / delete. Call it for every new
+    table, and again after a table is rebuilt (rebuilds drop triggers).
+    """
+    con.execute("INSERT OR IGNORE INTO data_versions (table_name) VALUES (?)", (table,))
+    for suffix, event in (("ins", "INSERT"), ("upd", "UPDATE"), ("del", "DELETE")):
+        con.execute(f"DROP TRIGGER IF EXISTS trg_{table}_dv_{suffix}")
+        con.execute(f"""
+            CREATE TRIGGER trg_{table}_dv_{suffix} AFTER {event} ON {table}
+            BEGIN
+                UPDATE data_versions SET version = version + 1 WHERE table_name = '{table}';
+            END
+        """)
+
+
+def migrate(con: sqlite3.Connection) -> int:
+    """
+    Apply every pending step in order. Returns the schema version afterwards.
+    foreign_keys is switched off while migrating so table rebuilds are safe
+    (it cannot be changed inside a transaction).
+    """
+    applied = current_version(con)
+    if applied >= latest_version():
+        return applied
+
+    old_isolation = con.isolation_level
+    con.isolation_level = None          # explicit BEGIN/COMMIT below
+    con.execute("PRAGMA foreign_keys = OFF")
+    try:
+        for version, name, step in MIGRATIONS:
+            if version <= applied:
+                continue
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                # re-check under the write lock: another process may have won
+                if current_version(con) >= version:
+                    con.execute("COMMIT")
+                    continue
+                step(con)
+                con.execute(f"PRAGMA user_version = {int(version)}")
+                con.execute("COMMIT")
+                print(f"DB migrated to v{version}: {name}")
+            except Exception:
+                con.execute("ROLLBACK")
+                raise
+    finally:
+        con.execute("PRAGMA foreign_keys = ON")
+        con.isolation_level = old_isolation
+
+    return current_version(con)
+
+
+# ================= STEPS =================
+
+@migration(1, "baseline schema")
+def _baseline_schema(con):
+    # IF NOT EXISTS everywhere: DBs created before versioning start at v0
+    # and already have (most of) these tables.
+    run_script(con, BASELINE_SQL)
+
+
+@migration(2, "PPAP doc category / versioning columns")
+def _ppap_doc_columns(con):
+    add_column(con, "item_code_ppap_docs", "doc_category", "TEXT DEFAULT 'PPAP'")
+    add_column(con, "item_code_ppap_docs", "version_no", "INTEGER DEFAULT 1")
+    add_column(con, "item_code_ppap_docs", "is_current", "INTEGER DEFAULT 1")
+
+
+@migration(3, "PPAP FK item_codes -> item_code_master")
+def _fix_ppap_fk(con):
+    fk = con.execute("PRAGMA foreign_key_list(item_code_ppap_docs)").fetchall()
+    if not (fk and fk[0]["table"] == "item_codes"):
+        return
+
+    print("🔧 Fixing PPAP foreign key (item_codes → item_code_master)")
+    run_script(con, """
+        ALTER TABLE item_code_ppap_docs RENAME TO item_code_ppap_docs_old;
+
+        CREATE TABLE item_code_ppap_docs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_code_id INTEGER NOT NULL,
+            doc_name TEXT NOT NULL,
+            stored_name TEXT NOT NULL,
+            doc_type TEXT DEFAULT 'PPAP',
+            notes TEXT DEFAULT '',
+            uploaded_at TEXT NOT NULL,
+            doc_category TEXT DEFAULT 'PPAP',
+            version_no INTEGER DEFAULT 1,
+            is_current INTEGER DEFAULT 1,
+            FOREIGN KEY(item_code_id) REFERENCES item_code_master(id) ON DELETE CASCADE
+        );
+
+        INSERT INTO item_code_ppap_docs
+        (id, item_code_id, doc_name, stored_name, doc_type, notes, uploaded_at, doc_category, version_no, is_current)
+        SELECT
+            id, item_code_id, doc_name, stored_name, doc_type, notes, uploaded_at,
+            COALESCE(doc_category,'PPAP'),
+            COALESCE(version_no,1),
+            COALESCE(is_current,1)
+        FROM item_code_ppap_docs_old;
+
+        DROP TABLE item_code_ppap_docs_old;
+
+        CREATE INDEX IF NOT EXISTS idx_ppap_item_code_id
+            ON item_code_ppap_docs(item_code_id);
+    """)
+    print("✅ PPAP FK fixed")
+
+
+@migration(4, "PPAP category / current-version indexes")
+def _ppap_indexes(con):
+    run_script(con, """
+        CREATE INDEX IF NOT EXISTS idx_ppap_item_code_cat
+            ON item_code_ppap_docs(item_code_id, doc_category);
+
+        CREATE INDEX IF NOT EXISTS idx_ppap_item_code_current
+            ON item_code_ppap_docs(item_code_id, doc_category, is_current);
+    """)
+
+
+
+@migration(5, "indexes for transaction / history tables")
+def _history_indexes(con):
+    # Matched to the access paths in modules/: per-item history ordered by
+    # date, the global history ordered by date, and child-row lookups by FK.
+    run_script(con, """
+        /* ---- tool crib ledgers ---- */
+        CREATE INDEX IF NOT EXISTS idx_tool_txn_tool_ts     ON tool_issue_txn(tool_id, ts);
+        CREATE INDEX IF NOT EXISTS idx_tool_txn_ts          ON tool_issue_txn(ts);
+        CREATE INDEX IF NOT EXISTS idx_holder_txn_holder_ts ON holder_txn(holder_id, ts);
+        CREATE INDEX IF NOT EXISTS idx_holder_txn_ts        ON holder_txn(ts);
+        CREATE INDEX IF NOT EXISTS idx_insert_txn_insert_dt ON insert_txn(insert_id, txn_date);
+        CREATE INDEX IF NOT EXISTS idx_insert_txn_dt        ON insert_txn(txn_date);
+        CREATE INDEX IF NOT EXISTS idx_collet_txn_collet_dt ON collet_txn(collet_id, txn_date);
+        CREATE INDEX IF NOT EXISTS idx_collet_txn_dt        ON collet_txn(txn_date);
+
+        /* ---- gauges ---- */
+        CREATE INDEX IF NOT EXISTS idx_gauge_txn_gauge_dt   ON gauge_issue_txn(gauge_id, txn_date);
+        CREATE INDEX IF NOT EXISTS idx_gauge_txn_dt         ON gauge_issue_txn(txn_date);
+        CREATE INDEX IF NOT EXISTS idx_gauge_cal_gauge_dt   ON gauge_calibration_txn(gauge_id, calibration_date);
+
+        /* ---- material job-work ---- */
+        CREATE INDEX IF NOT EXISTS idx_inward_challan_avail ON material_inward(challan_id, available_qty);
+        CREATE INDEX IF NOT EXISTS idx_inward_item          ON material_inward(item_code, process);
+        CREATE INDEX IF NOT EXISTS idx_inward_open_item     ON material_inward(item_code) WHERE available_qty > 0;
+        CREATE INDEX IF NOT EXISTS idx_dispatch_inward      ON material_dispatch(inward_id);
+        CREATE INDEX IF NOT EXISTS idx_dispatch_elta        ON material_dispatch(elta_challan_no);
+        CREATE INDEX IF NOT EXISTS idx_dispatch_challan_dt  ON material_dispatch(challan_id, dispatch_date);
+        CREATE INDEX IF NOT EXISTS idx_challan_date         ON customer_challan(customer_challan_date, customer_challan_no);
+
+        /* ---- shift child tables ---- */
+        CREATE INDEX IF NOT EXISTS idx_shift_prod_shift     ON shift_production(shift_id);
+        CREATE INDEX IF NOT EXISTS idx_shift_setup_shift    ON shift_setup(shift_id);
+        CREATE INDEX IF NOT EXISTS idx_shift_att_shift      ON shift_attendance(shift_id);
+        CREATE INDEX IF NOT EXISTS idx_shift_down_shift     ON shift_downtime(shift_id);
+
+        /* ---- PM ---- */
+        CREATE INDEX IF NOT EXISTS idx_pm_history_pm_date   ON pm_history(pm_id, done_date);
+        CREATE INDEX IF NOT EXISTS idx_pm_schedule_pm       ON pm_schedule(pm_id);
+    """)
+
+
+
+@migration(6, "keyset pagination sort indexes")
+def _pagination_indexes(con):
+    # (date, rowid) order for the paginated list pages; see pagination.py
+    run_script(con, """
+        CREATE INDEX IF NOT EXISTS idx_shift_header_date ON shift_header(shift_date);
+        CREATE INDEX IF NOT EXISTS idx_breakdown_status_date ON breakdown_log(status, breakdown_date);
+    """)
+
+
+
+@migration(7, "per-table change counters (data_versions)")
+def _data_versions(con):
+    # Read through db.data_version(); basis for ETags and in-process caches.
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS data_versions (
+            table_name TEXT PRIMARY KEY,
+            version    INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    tables = [r[0] for r in con.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type='table' AND name NOT LIKE 'sqlite_%' AND name != 'data_versions'
+    """)]
+    for table in tables:
+        track_table(con, table)
+
+
+@migration(8, "case-insensitive indexes for typeahead search")
+def _search_indexes(con):
+    # prefix LIKE 'abc%' can seek these (LIKE is case-insensitive); see modules/search.py
+    run_script(con, """
+        CREATE INDEX IF NOT EXISTS idx_item_code_nocase ON item_code_master(item_code COLLATE NOCASE);
+        CREATE INDEX IF NOT EXISTS idx_customer_name_nocase ON customer_master(customer_name COLLATE NOCASE);
+        CREATE INDEX IF NOT EXISTS idx_machine_status_code_nocase
+            ON machine_master(status, machine_code COLLATE NOCASE);
+    """)
+
+
+@migration(9, "unique inward line per challan / item / process")
+def _inward_line_key(con):
+    # materials.inward_entry upserts on this key (ON CONFLICT ... DO UPDATE).
+    # Older rows may have a NULL process or duplicate lines from concurrent
+    # saves: normalise and fold duplicates into the oldest line first.
+    con.execute("UPDATE material_inward SET process='' WHERE process IS NULL")
+
+    dupes = con.execute("""
+        SELECT challan_id, item_code, process, MIN(id) AS keep_id
+        FROM material_inward
+        GROUP BY challan_id, item_code, process
+        HAVING COUNT(*) > 1
+    """).fetchall()
+    for challan_id, item_code, process, keep_id in dupes:
+        others = [r[0] for r in con.execute("""
+            SELECT id FROM material_inward
+            WHERE challan_id=? AND item_code=? AND process=? AND id != ?
+        """, (challan_id, item_code, process, keep_id))]
+        marks = ",".join("?" * len(others))
+        # box / tray and remarks of every folded line are kept, " / "-joined
+        notes = con.execute(f"""
+            SELECT box_tray, remarks FROM material_inward WHERE id IN (?, {marks}) ORDER BY id
+        """, (keep_id, *others)).fetchall()
+        box_tray, remarks = (
+            " / ".join(dict.fromkeys(str(r[i]).strip() for r in notes if r[i] and str(r[i]).strip())) or None
+            for i in (0, 1)
+        )
+        con.execute(f"""
+            UPDATE material_inward
+            SET inward_qty = inward_qty + (SELECT SUM(inward_qty) FROM material_inward WHERE id IN ({marks})),
+                available_qty = available_qty + (SELECT SUM(available_qty) FROM material_inward WHERE id IN ({marks})),
+                box_tray = ?,
+                remarks = ?
+            WHERE id=?
+        """, (*others, *others, box_tray, remarks, keep_id))
+        con.execute(f"UPDATE material_dispatch SET inward_id=? WHERE inward_id IN ({marks})", (keep_id, *others))
+        con.execute(f"DELETE FROM material_inward WHERE id IN ({marks})", others)
+
+    con.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_inward_line
+        ON material_inward(challan_id, item_code, process)
+    """)
+
+
+@migration(10, "unified inventory ledger + balance snapshots")
+def _inventory_ledger(con):
+    # One row per crib movement, written by ledger.record(); see ledger.py.
+    # total = available + out + broken for every kind.
+    run_script(con, """
+        CREATE TABLE IF NOT EXISTS inventory_ledger (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind        TEXT NOT NULL,              -- tool / holder / insert / collet
+            item_id     INTEGER NOT NULL,
+            movement    TEXT NOT NULL,              -- OPENING / RECEIPT / ISSUE / RETURN / ...
+            txn_date    DATE NOT NULL,
+            qty         INTEGER NOT NULL,
+            d_available INTEGER NOT NULL DEFAULT 0,
+            d_out       INTEGER NOT NULL DEFAULT 0, -- issued / consumed
+            d_broken    INTEGER NOT NULL DEFAULT 0, -- broken / scrapped
+            source      TEXT,                       -- *_txn table of the detail row
+            source_id   INTEGER,
+            created_ts  DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_ledger_date      ON inventory_ledger(txn_date);
+        CREATE INDEX IF NOT EXISTS idx_ledger_item_date ON inventory_ledger(kind, item_id, txn_date);
+
+        -- balance per item at the END of snapshot_date
+        CREATE TABLE IF NOT EXISTS inventory_snapshot (
+            snapshot_date DATE NOT NULL,
+            kind          TEXT NOT NULL,
+            item_id       INTEGER NOT NULL,
+            available     INTEGER NOT NULL,
+            out_qty       INTEGER NOT NULL,
+            broken        INTEGER NOT NULL,
+            PRIMARY KEY (snapshot_date, kind, item_id)
+        ) WITHOUT ROWID;
+
+        -- a back-dated movement invalidates the snapshots it falls before
+        CREATE TRIGGER IF NOT EXISTS trg_ledger_backdated AFTER INSERT ON inventory_ledger
+        WHEN NEW.txn_date <= (SELECT MAX(snapshot_date) FROM inventory_snapshot)
+        BEGIN
+            DELETE FROM inventory_snapshot WHERE snapshot_date >= NEW.txn_date;
+        END;
+
+        -- opening balances from the current counters (history before this
+        -- point stays in the per-crib *_txn tables)
+        INSERT INTO inventory_ledger (kind, item_id, movement, txn_date, qty, d_available, d_out, d_broken)
+        SELECT 'tool', id, 'OPENING', date('now', 'localtime'), COALESCE(total_qty, 0),
+               COALESCE(total_qty, 0) - COALESCE(issued_qty, 0) - COALESCE(broken_qty, 0),
+               COALESCE(issued_qty, 0), COALESCE(broken_qty, 0)
+        FROM cutting_tools;
+
+        INSERT INTO inventory_ledger (kind, item_id, movement, txn_date, qty, d_available, d_out, d_broken)
+        SELECT 'holder', id, 'OPENING', date('now', 'localtime'), COALESCE(total_qty, 0),
+               COALESCE(total_qty, 0) - COALESCE(issued_qty, 0), COALESCE(issued_qty, 0), 0
+        FROM holders;
+
+        INSERT INTO inventory_ledger (kind, item_id, movement, txn_date, qty, d_available, d_out, d_broken)
+        SELECT 'insert', id, 'OPENING', date('now', 'localtime'), COALESCE(total_qty, 0),
+               COALESCE(available_qty, 0), COALESCE(total_qty, 0) - COALESCE(available_qty, 0), 0
+        FROM inserts;
+
+        INSERT INTO inventory_ledger (kind, item_id, movement, txn_date, qty, d_available, d_out, d_broken)
+        SELECT 'collet', id, 'OPENING', date('now', 'localtime'), COALESCE(total_qty, 0),
+               COALESCE(available_qty, 0), COALESCE(total_qty, 0) - COALESCE(available_qty, 0), 0
+        FROM collets;
+    """)
+    track_table(con, "inventory_ledger")
+    track_table(con, "inventory_snapshot")
+
+
+@migration(11, "tool / insert consumption rollups")
+def _consumption_rollups(con):
+    # Running totals per (crib, dimension, value); see consumption.py for
+    # the reads. One AFTER INSERT trigger per txn table adds the new row to
+    # every dimension. The backfill at the end is what
+    # consumption.rebuild_rollups() recomputes.
+    run_script(con, """
+        CREATE TABLE IF NOT EXISTS consumption_rollup (
+            crib       TEXT NOT NULL,
+            dim        TEXT NOT NULL,
+            dim_value  TEXT NOT NULL,
+            issued     INTEGER NOT NULL DEFAULT 0,
+            returned   INTEGER NOT NULL DEFAULT 0,
+            regrind    INTEGER NOT NULL DEFAULT 0,
+            broken     INTEGER NOT NULL DEFAULT 0,
+            scrapped   INTEGER NOT NULL DEFAULT 0,
+            edges_used INTEGER NOT NULL DEFAULT 0,
+            txn_count  INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (crib, dim, dim_value)
+        ) WITHOUT ROWID;
+
+        DROP TRIGGER IF EXISTS trg_tool_issue_txn_rollup;
+        CREATE TRIGGER trg_tool_issue_txn_rollup AFTER INSERT ON tool_issue_txn
+        BEGIN
+            INSERT INTO consumption_rollup (crib, dim, dim_value, issued, returned, regrind, broken, scrapped, edges_used, txn_count)
+            SELECT 'tool', 'machine', COALESCE(t.machine, ''),
+                   CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END,
+                   CASE WHEN t.action = 'RETURN' THEN t.qty ELSE 0 END,
+                   CASE WHEN t.action = 'REGRIND' THEN t.qty ELSE 0 END,
+                   CASE WHEN t.action = 'RETURN' AND t.condition = 'Broken' THEN t.qty ELSE 0 END,
+                   0,
+                   0,
+                   1
+            FROM tool_issue_txn t
+            WHERE t.id = NEW.id
+            ON CONFLICT (crib, dim, dim_value) DO UPDATE SET
+                issued = issued + excluded.issued,
+                returned = returned + excluded.returned,
+                regrind = regrind + excluded.regrind,
+                broken = broken + excluded.broken,
+                scrapped = scrapped + excluded.scrapped,
+                edges_used = edges_used + excluded.edges_used,
+                txn_count = txn_count + excluded.txn_count;
+            INSERT INTO consumption_rollup (crib, dim, dim_value, issued, returned, regrind, broken, scrapped, edges_used, txn_count)
+            SELECT 'tool', 'job', COALESCE(t.job_name, ''),
+                   CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END,
+                   CASE WHEN t.action = 'RETURN' THEN t.qty ELSE 0 END,
+                   CASE WHEN t.action = 'REGRIND' THEN t.qty ELSE 0 END,
+                   CASE WHEN t.action = 'RETURN' AND t.condition = 'Broken' THEN t.qty ELSE 0 END,
+                   0,
+                   0,
+                   1
+            FROM tool_issue_txn t
+            WHERE t.id = NEW.id
+            ON CONFLICT (crib, dim, dim_value) DO UPDATE SET
+                issued = issued + excluded.issued,
+                returned = returned + excluded.returned,
+                regrind = regrind + excluded.regrind,
+                broken = broken + excluded.broken,
+                scrapped = scrapped + excluded.scrapped,
+                edges_used = edges_used + excluded.edges_used,
+                txn_count = txn_count + excluded.txn_count;
+            INSERT INTO consumption_rollup (crib, dim, dim_value, issued, returned, regrind, broken, scrapped, edges_used, txn_count)
+            SELECT 'tool', 'operator', COALESCE(t.operator, ''),
+                   CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END,
+                   CASE WHEN t.action = 'RETURN' THEN t.qty ELSE 0 END,
+                   CASE WHEN t.action = 'REGRIND' THEN t.qty ELSE 0 END,
+                   CASE WHEN t.action = 'RETURN' AND t.condition = 'Broken' THEN t.qty ELSE 0 END,
+                   0,
+                   0,
+                   1
+            FROM tool_issue_txn t
+            WHERE t.id = NEW.id
+            ON CONFLICT (crib, dim, dim_value) DO UPDATE SET
+                issued = issued + excluded.issued,
+                returned = returned + excluded.returned,
+                regrind = regrind + excluded.regrind,
+                broken = broken + excluded.broken,
+                scrapped = scrapped + excluded.scrapped,
+                edges_used = edges_used + excluded.edges_used,
+                txn_count = txn_count + excluded.txn_count;
+            INSERT INTO consumption_rollup (crib, dim, dim_value, issued, returned, regrind, broken, scrapped, edges_used, txn_count)
+            SELECT 'tool', 'week', COALESCE(date(t.ts, 'weekday 0', '-6 days'), ''),
+                   CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END,
+                   CASE WHEN t.action = 'RETURN' THEN t.qty ELSE 0 END,
+                   CASE WHEN t.action = 'REGRIND' THEN t.qty ELSE 0 END,
+                   CASE WHEN t.action = 'RETURN' AND t.condition = 'Broken' THEN t.qty ELSE 0 END,
+                   0,
+                   0,
+                   1
+            FROM tool_issue_txn t
+            WHERE t.id = NEW.id
+            ON CONFLICT (crib, dim, dim_value) DO UPDATE SET
+                issued = issued + excluded.issued,
+                returned = returned + excluded.returned,
+                regrind = regrind + excluded.regrind,
+                broken = broken + excluded.broken,
+                scrapped = scrapped + excluded.scrapped,
+                edges_used = edges_used + excluded.edges_used,
+                txn_count = txn_count + excluded.txn_count;
+            INSERT INTO consumption_rollup (crib, dim, dim_value, issued, returned, regrind, broken, scrapped, edges_used, txn_count)
+            SELECT 'tool', 'type_material', COALESCE((SELECT ct.tool_type || ' / ' || ct.material
+                                                      FROM cutting_tools ct WHERE ct.id = t.tool_id), ''),
+                   CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END,
+                   CASE WHEN t.action = 'RETURN' THEN t.qty ELSE 0 END,
+                   CASE WHEN t.action = 'REGRIND' THEN t.qty ELSE 0 END,
+                   CASE WHEN t.action = 'RETURN' AND t.condition = 'Broken' THEN t.qty ELSE 0 END,
+                   0,
+                   0,
+                   1
+            FROM tool_issue_txn t
+            WHERE t.id = NEW.id
+            ON CONFLICT (crib, dim, dim_value) DO UPDATE SET
+                issued = issued + excluded.issued,
+                returned = returned + excluded.returned,
+                regrind = regrind + excluded.regrind,
+                broken = broken + excluded.broken,
+                scrapped = scrapped + excluded.scrapped,
+                edges_used = edges_used + excluded.edges_used,
+                txn_count = txn_count + excluded.txn_count;
+        END;
+
+        DROP TRIGGER IF EXISTS trg_insert_txn_rollup;
+        CREATE TRIGGER trg_insert_txn_rollup AFTER INSERT ON insert_txn
+        BEGIN
+            INSERT INTO consumption_rollup (crib, dim, dim_value, issued, returned, regrind, broken, scrapped, edges_used, txn_count)
+            SELECT 'insert', 'machine', COALESCE(t.machine, ''),
+                   CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END,
+                   0,
+                   0,
+                   0,
+                   CASE WHEN t.action = 'SCRAP' THEN t.qty ELSE 0 END,
+                   CASE WHEN t.action = 'EDGE_USED' THEN t.edges_used ELSE 0 END,
+                   1
+            FROM insert_txn t
+            WHERE t.id = NEW.id
+            ON CONFLICT (crib, dim, dim_value) DO UPDATE SET
+                issued = issued + excluded.issued,
+                returned = returned + excluded.returned,
+                regrind = regrind + excluded.regrind,
+                broken = broken + excluded.broken,
+                scrapped = scrapped + excluded.scrapped,
+                edges_used = edges_used + excluded.edges_used,
+                txn_count = txn_count + excluded.txn_count;
+            INSERT INTO consumption_rollup (crib, dim, dim_value, issued, returned, regrind, broken, scrapped, edges_used, txn_count)
+            SELECT 'insert', 'job', COALESCE(t.job, ''),
+                   CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END,
+                   0,
+                   0,
+                   0,
+                   CASE WHEN t.action = 'SCRAP' THEN t.qty ELSE 0 END,
+                   CASE WHEN t.action = 'EDGE_USED' THEN t.edges_used ELSE 0 END,
+                   1
+            FROM insert_txn t
+            WHERE t.id = NEW.id
+            ON CONFLICT (crib, dim, dim_value) DO UPDATE SET
+                issued = issued + excluded.issued,
+                returned = returned + excluded.returned,
+                regrind = regrind + excluded.regrind,
+                broken = broken + excluded.broken,
+                scrapped = scrapped + excluded.scrapped,
+                edges_used = edges_used + excluded.edges_used,
+                txn_count = txn_count + excluded.txn_count;
+            INSERT INTO consumption_rollup (crib, dim, dim_value, issued, returned, regrind, broken, scrapped, edges_used, txn_count)
+            SELECT 'insert', 'operator', COALESCE(t.operator, ''),
+                   CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END,
+                   0,
+                   0,
+                   0,
+                   CASE WHEN t.action = 'SCRAP' THEN t.qty ELSE 0 END,
+                   CASE WHEN t.action = 'EDGE_USED' THEN t.edges_used ELSE 0 END,
+                   1
+            FROM insert_txn t
+            WHERE t.id = NEW.id
+            ON CONFLICT (crib, dim, dim_value) DO UPDATE SET
+                issued = issued + excluded.issued,
+                returned = returned + excluded.returned,
+                regrind = regrind + excluded.regrind,
+                broken = broken + excluded.broken,
+                scrapped = scrapped + excluded.scrapped,
+                edges_used = edges_used + excluded.edges_used,
+                txn_count = txn_count + excluded.txn_count;
+            INSERT INTO consumption_rollup (crib, dim, dim_value, issued, returned, regrind, broken, scrapped, edges_used, txn_count)
+            SELECT 'insert', 'week', COALESCE(date(t.txn_date, 'weekday 0', '-6 days'), ''),
+                   CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END,
+                   0,
+                   0,
+                   0,
+                   CASE WHEN t.action = 'SCRAP' THEN t.qty ELSE 0 END,
+                   CASE WHEN t.action = 'EDGE_USED' THEN t.edges_used ELSE 0 END,
+                   1
+            FROM insert_txn t
+            WHERE t.id = NEW.id
+            ON CONFLICT (crib, dim, dim_value) DO UPDATE SET
+                issued = issued + excluded.issued,
+                returned = returned + excluded.returned,
+                regrind = regrind + excluded.regrind,
+                broken = broken + excluded.broken,
+                scrapped = scrapped + excluded.scrapped,
+                edges_used = edges_used + excluded.edges_used,
+                txn_count = txn_count + excluded.txn_count;
+            INSERT INTO consumption_rollup (crib, dim, dim_value, issued, returned, regrind, broken, scrapped, edges_used, txn_count)
+            SELECT 'insert', 'insert', COALESCE((SELECT i.insert_type || ' ' || i.size || ' ' || i.grade
+                                                 FROM inserts i WHERE i.id = t.insert_id), ''),
+                   CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END,
+                   0,
+                   0,
+                   0,
+                   CASE WHEN t.action = 'SCRAP' THEN t.qty ELSE 0 END,
+                   CASE WHEN t.action = 'EDGE_USED' THEN t.edges_used ELSE 0 END,
+                   1
+            FROM insert_txn t
+            WHERE t.id = NEW.id
+            ON CONFLICT (crib, dim, dim_value) DO UPDATE SET
+                issued = issued + excluded.issued,
+                returned = returned + excluded.returned,
+                regrind = regrind + excluded.regrind,
+                broken = broken + excluded.broken,
+                scrapped = scrapped + excluded.scrapped,
+                edges_used = edges_used + excluded.edges_used,
+                txn_count = txn_count + excluded.txn_count;
+        END;
+
+        DELETE FROM consumption_rollup;
+        INSERT INTO consumption_rollup (crib, dim, dim_value, issued, returned, regrind, broken, scrapped, edges_used, txn_count)
+        SELECT 'tool', 'machine', COALESCE(t.machine, '') AS v,
+               SUM(CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END),
+               SUM(CASE WHEN t.action = 'RETURN' THEN t.qty ELSE 0 END),
+               SUM(CASE WHEN t.action = 'REGRIND' THEN t.qty ELSE 0 END),
+               SUM(CASE WHEN t.action = 'RETURN' AND t.condition = 'Broken' THEN t.qty ELSE 0 END),
+               SUM(0),
+               SUM(0),
+               SUM(1)
+        FROM tool_issue_txn t
+        GROUP BY v;
+        INSERT INTO consumption_rollup (crib, dim, dim_value, issued, returned, regrind, broken, scrapped, edges_used, txn_count)
+        SELECT 'tool', 'job', COALESCE(t.job_name, '') AS v,
+               SUM(CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END),
+               SUM(CASE WHEN t.action = 'RETURN' THEN t.qty ELSE 0 END),
+               SUM(CASE WHEN t.action = 'REGRIND' THEN t.qty ELSE 0 END),
+               SUM(CASE WHEN t.action = 'RETURN' AND t.condition = 'Broken' THEN t.qty ELSE 0 END),
+               SUM(0),
+               SUM(0),
+               SUM(1)
+        FROM tool_issue_txn t
+        GROUP BY v;
+        INSERT INTO consumption_rollup (crib, dim, dim_value, issued, returned, regrind, broken, scrapped, edges_used, txn_count)
+        SELECT 'tool', 'operator', COALESCE(t.operator, '') AS v,
+               SUM(CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END),
+               SUM(CASE WHEN t.action = 'RETURN' THEN t.qty ELSE 0 END),
+               SUM(CASE WHEN t.action = 'REGRIND' THEN t.qty ELSE 0 END),
+               SUM(CASE WHEN t.action = 'RETURN' AND t.condition = 'Broken' THEN t.qty ELSE 0 END),
+               SUM(0),
+               SUM(0),
+               SUM(1)
+        FROM tool_issue_txn t
+        GROUP BY v;
+        INSERT INTO consumption_rollup (crib, dim, dim_value, issued, returned, regrind, broken, scrapped, edges_used, txn_count)
+        SELECT 'tool', 'week', COALESCE(date(t.ts, 'weekday 0', '-6 days'), '') AS v,
+               SUM(CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END),
+               SUM(CASE WHEN t.action = 'RETURN' THEN t.qty ELSE 0 END),
+               SUM(CASE WHEN t.action = 'REGRIND' THEN t.qty ELSE 0 END),
+               SUM(CASE WHEN t.action = 'RETURN' AND t.condition = 'Broken' THEN t.qty ELSE 0 END),
+               SUM(0),
+               SUM(0),
+               SUM(1)
+        FROM tool_issue_txn t
+        GROUP BY v;
+        INSERT INTO consumption_rollup (crib, dim, dim_value, issued, returned, regrind, broken, scrapped, edges_used, txn_count)
+        SELECT 'tool', 'type_material', COALESCE((SELECT ct.tool_type || ' / ' || ct.material
+                                                  FROM cutting_tools ct WHERE ct.id = t.tool_id), '') AS v,
+               SUM(CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END),
+               SUM(CASE WHEN t.action = 'RETURN' THEN t.qty ELSE 0 END),
+               SUM(CASE WHEN t.action = 'REGRIND' THEN t.qty ELSE 0 END),
+               SUM(CASE WHEN t.action = 'RETURN' AND t.condition = 'Broken' THEN t.qty ELSE 0 END),
+               SUM(0),
+               SUM(0),
+               SUM(1)
+        FROM tool_issue_txn t
+        GROUP BY v;
+        INSERT INTO consumption_rollup (crib, dim, dim_value, issued, returned, regrind, broken, scrapped, edges_used, txn_count)
+        SELECT 'insert', 'machine', COALESCE(t.machine, '') AS v,
+               SUM(CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END),
+               SUM(0),
+               SUM(0),
+               SUM(0),
+               SUM(CASE WHEN t.action = 'SCRAP' THEN t.qty ELSE 0 END),
+               SUM(CASE WHEN t.action = 'EDGE_USED' THEN t.edges_used ELSE 0 END),
+               SUM(1)
+        FROM insert_txn t
+        GROUP BY v;
+        INSERT INTO consumption_rollup (crib, dim, dim_value, issued, returned, regrind, broken, scrapped, edges_used, txn_count)
+        SELECT 'insert', 'job', COALESCE(t.job, '') AS v,
+               SUM(CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END),
+               SUM(0),
+               SUM(0),
+               SUM(0),
+               SUM(CASE WHEN t.action = 'SCRAP' THEN t.qty ELSE 0 END),
+               SUM(CASE WHEN t.action = 'EDGE_USED' THEN t.edges_used ELSE 0 END),
+               SUM(1)
+        FROM insert_txn t
+        GROUP BY v;
+        INSERT INTO consumption_rollup (crib, dim, dim_value, issued, returned, regrind, broken, scrapped, edges_used, txn_count)
+        SELECT 'insert', 'operator', COALESCE(t.operator, '') AS v,
+               SUM(CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END),
+               SUM(0),
+               SUM(0),
+               SUM(0),
+               SUM(CASE WHEN t.action = 'SCRAP' THEN t.qty ELSE 0 END),
+               SUM(CASE WHEN t.action = 'EDGE_USED' THEN t.edges_used ELSE 0 END),
+               SUM(1)
+        FROM insert_txn t
+        GROUP BY v;
+        INSERT INTO consumption_rollup (crib, dim, dim_value, issued, returned, regrind, broken, scrapped, edges_used, txn_count)
+        SELECT 'insert', 'week', COALESCE(date(t.txn_date, 'weekday 0', '-6 days'), '') AS v,
+               SUM(CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END),
+               SUM(0),
+               SUM(0),
+               SUM(0),
+               SUM(CASE WHEN t.action = 'SCRAP' THEN t.qty ELSE 0 END),
+               SUM(CASE WHEN t.action = 'EDGE_USED' THEN t.edges_used ELSE 0 END),
+               SUM(1)
+        FROM insert_txn t
+        GROUP BY v;
+        INSERT INTO consumption_rollup (crib, dim, dim_value, issued, returned, regrind, broken, scrapped, edges_used, txn_count)
+        SELECT 'insert', 'insert', COALESCE((SELECT i.insert_type || ' ' || i.size || ' ' || i.grade
+                                             FROM inserts i WHERE i.id = t.insert_id), '') AS v,
+               SUM(CASE WHEN t.action = 'ISSUE' THEN t.qty ELSE 0 END),
+               SUM(0),
+               SUM(0),
+               SUM(0),
+               SUM(CASE WHEN t.action = 'SCRAP' THEN t.qty ELSE 0 END),
+               SUM(CASE WHEN t.action = 'EDGE_USED' THEN t.edges_used ELSE 0 END),
+               SUM(1)
+        FROM insert_txn t
+        GROUP BY v;
+    """)
+    track_table(con, "consumption_rollup")
+
+
+@migration(12, "crib reorder queue")
+def _reorder_queue(con):
+    # low_stock = crib items at / below their reorder level; see reorder.py.
+    # Insert / update triggers on each crib table upsert or drop the item's
+    # row from the same counters; reorder_rate is filled by the daily job.
+    # The backfill at the end is what reorder.rebuild_queue() recomputes.
+    run_script(con, """
+        CREATE TABLE IF NOT EXISTS reorder_rate (
+            kind        TEXT NOT NULL,
+            item_id     INTEGER NOT NULL,
+            used_qty    INTEGER NOT NULL,   -- used in the usage window
+            daily_usage REAL NOT NULL,
+            cover_qty   INTEGER NOT NULL,   -- usage over REORDER_COVER_DAYS
+            computed_on DATE NOT NULL,
+            PRIMARY KEY (kind, item_id)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS low_stock (
+            kind          TEXT NOT NULL,
+            item_id       INTEGER NOT NULL,
+            label         TEXT NOT NULL,
+            available     INTEGER NOT NULL,
+            reorder_level INTEGER NOT NULL,
+            shortfall     INTEGER NOT NULL,     -- reorder_level - available
+            suggested_qty INTEGER NOT NULL,
+            flagged_on    DATE NOT NULL DEFAULT (date('now', 'localtime')),
+            PRIMARY KEY (kind, item_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_low_stock_shortfall ON low_stock(shortfall DESC);
+
+        -- tool: cutting_tools
+        DROP TRIGGER IF EXISTS trg_cutting_tools_low_stock_ins;
+        CREATE TRIGGER trg_cutting_tools_low_stock_ins AFTER INSERT ON cutting_tools
+        BEGIN
+            DELETE FROM low_stock
+            WHERE kind = 'tool' AND item_id = NEW.id
+              AND COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0) - COALESCE(NEW.broken_qty, 0) > COALESCE(NEW.reorder_level, 0);
+            INSERT INTO low_stock (kind, item_id, label, available, reorder_level, shortfall, suggested_qty)
+            SELECT 'tool', NEW.id,
+                   COALESCE(NEW.tool_type || ' Ø' || NEW.cutting_diameter || ' x ' || NEW.cutting_length || ' ' || NEW.material, '#' || NEW.id),
+                   COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0) - COALESCE(NEW.broken_qty, 0),
+                   COALESCE(NEW.reorder_level, 0),
+                   COALESCE(NEW.reorder_level, 0) - (COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0) - COALESCE(NEW.broken_qty, 0)),
+                   MAX(COALESCE(NEW.reorder_level, 0) + 1 - (COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0) - COALESCE(NEW.broken_qty, 0)),
+                       COALESCE(NEW.reorder_level, 0) - (COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0) - COALESCE(NEW.broken_qty, 0)) + COALESCE(r.cover_qty, 0))
+            FROM (SELECT 1) LEFT JOIN reorder_rate r ON r.kind = 'tool' AND r.item_id = NEW.id
+            WHERE COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0) - COALESCE(NEW.broken_qty, 0) <= COALESCE(NEW.reorder_level, 0)
+            ON CONFLICT (kind, item_id) DO UPDATE SET
+                label = excluded.label,
+                available = excluded.available,
+                reorder_level = excluded.reorder_level,
+                shortfall = excluded.shortfall,
+                suggested_qty = excluded.suggested_qty;
+        END;
+
+        DROP TRIGGER IF EXISTS trg_cutting_tools_low_stock_upd;
+        CREATE TRIGGER trg_cutting_tools_low_stock_upd AFTER UPDATE ON cutting_tools
+        BEGIN
+            DELETE FROM low_stock
+            WHERE kind = 'tool' AND item_id = NEW.id
+              AND COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0) - COALESCE(NEW.broken_qty, 0) > COALESCE(NEW.reorder_level, 0);
+            INSERT INTO low_stock (kind, item_id, label, available, reorder_level, shortfall, suggested_qty)
+            SELECT 'tool', NEW.id,
+                   COALESCE(NEW.tool_type || ' Ø' || NEW.cutting_diameter || ' x ' || NEW.cutting_length || ' ' || NEW.material, '#' || NEW.id),
+                   COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0) - COALESCE(NEW.broken_qty, 0),
+                   COALESCE(NEW.reorder_level, 0),
+                   COALESCE(NEW.reorder_level, 0) - (COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0) - COALESCE(NEW.broken_qty, 0)),
+                   MAX(COALESCE(NEW.reorder_level, 0) + 1 - (COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0) - COALESCE(NEW.broken_qty, 0)),
+                       COALESCE(NEW.reorder_level, 0) - (COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0) - COALESCE(NEW.broken_qty, 0)) + COALESCE(r.cover_qty, 0))
+            FROM (SELECT 1) LEFT JOIN reorder_rate r ON r.kind = 'tool' AND r.item_id = NEW.id
+            WHERE COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0) - COALESCE(NEW.broken_qty, 0) <= COALESCE(NEW.reorder_level, 0)
+            ON CONFLICT (kind, item_id) DO UPDATE SET
+                label = excluded.label,
+                available = excluded.available,
+                reorder_level = excluded.reorder_level,
+                shortfall = excluded.shortfall,
+                suggested_qty = excluded.suggested_qty;
+        END;
+
+        DROP TRIGGER IF EXISTS trg_cutting_tools_low_stock_del;
+        CREATE TRIGGER trg_cutting_tools_low_stock_del AFTER DELETE ON cutting_tools
+        BEGIN
+            DELETE FROM low_stock WHERE kind = 'tool' AND item_id = OLD.id;
+        END;
+
+        -- holder: holders
+        DROP TRIGGER IF EXISTS trg_holders_low_stock_ins;
+        CREATE TRIGGER trg_holders_low_stock_ins AFTER INSERT ON holders
+        BEGIN
+            DELETE FROM low_stock
+            WHERE kind = 'holder' AND item_id = NEW.id
+              AND COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0) > COALESCE(NEW.reorder_level, 0);
+            INSERT INTO low_stock (kind, item_id, label, available, reorder_level, shortfall, suggested_qty)
+            SELECT 'holder', NEW.id,
+                   COALESCE(NEW.holder_type || ' ' || NEW.interface || ' ' || NEW.size || ' / ' || NEW.projection, '#' || NEW.id),
+                   COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0),
+                   COALESCE(NEW.reorder_level, 0),
+                   COALESCE(NEW.reorder_level, 0) - (COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0)),
+                   MAX(COALESCE(NEW.reorder_level, 0) + 1 - (COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0)),
+                       COALESCE(NEW.reorder_level, 0) - (COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0)) + COALESCE(r.cover_qty, 0))
+            FROM (SELECT 1) LEFT JOIN reorder_rate r ON r.kind = 'holder' AND r.item_id = NEW.id
+            WHERE COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0) <= COALESCE(NEW.reorder_level, 0)
+            ON CONFLICT (kind, item_id) DO UPDATE SET
+                label = excluded.label,
+                available = excluded.available,
+                reorder_level = excluded.reorder_level,
+                shortfall = excluded.shortfall,
+                suggested_qty = excluded.suggested_qty;
+        END;
+
+        DROP TRIGGER IF EXISTS trg_holders_low_stock_upd;
+        CREATE TRIGGER trg_holders_low_stock_upd AFTER UPDATE ON holders
+        BEGIN
+            DELETE FROM low_stock
+            WHERE kind = 'holder' AND item_id = NEW.id
+              AND COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0) > COALESCE(NEW.reorder_level, 0);
+            INSERT INTO low_stock (kind, item_id, label, available, reorder_level, shortfall, suggested_qty)
+            SELECT 'holder', NEW.id,
+                   COALESCE(NEW.holder_type || ' ' || NEW.interface || ' ' || NEW.size || ' / ' || NEW.projection, '#' || NEW.id),
+                   COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0),
+                   COALESCE(NEW.reorder_level, 0),
+                   COALESCE(NEW.reorder_level, 0) - (COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0)),
+                   MAX(COALESCE(NEW.reorder_level, 0) + 1 - (COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0)),
+                       COALESCE(NEW.reorder_level, 0) - (COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0)) + COALESCE(r.cover_qty, 0))
+            FROM (SELECT 1) LEFT JOIN reorder_rate r ON r.kind = 'holder' AND r.item_id = NEW.id
+            WHERE COALESCE(NEW.total_qty, 0) - COALESCE(NEW.issued_qty, 0) <= COALESCE(NEW.reorder_level, 0)
+            ON CONFLICT (kind, item_id) DO UPDATE SET
+                label = excluded.label,
+                available = excluded.available,
+                reorder_level = excluded.reorder_level,
+                shortfall = excluded.shortfall,
+                suggested_qty = excluded.suggested_qty;
+        END;
+
+        DROP TRIGGER IF EXISTS trg_holders_low_stock_del;
+        CREATE TRIGGER trg_holders_low_stock_del AFTER DELETE ON holders
+        BEGIN
+            DELETE FROM low_stock WHERE kind = 'holder' AND item_id = OLD.id;
+        END;
+
+        -- insert: inserts
+        DROP TRIGGER IF EXISTS trg_inserts_low_stock_ins;
+        CREATE TRIGGER trg_inserts_low_stock_ins AFTER INSERT ON inserts
+        BEGIN
+            DELETE FROM low_stock
+            WHERE kind = 'insert' AND item_id = NEW.id
+              AND COALESCE(NEW.available_qty, 0) > COALESCE(NEW.reorder_level, 0);
+            INSERT INTO low_stock (kind, item_id, label, available, reorder_level, shortfall, suggested_qty)
+            SELECT 'insert', NEW.id,
+                   COALESCE(NEW.insert_type || ' ' || NEW.size || ' ' || NEW.grade, '#' || NEW.id),
+                   COALESCE(NEW.available_qty, 0),
+                   COALESCE(NEW.reorder_level, 0),
+                   COALESCE(NEW.reorder_level, 0) - (COALESCE(NEW.available_qty, 0)),
+                   MAX(COALESCE(NEW.reorder_level, 0) + 1 - (COALESCE(NEW.available_qty, 0)),
+                       COALESCE(NEW.reorder_level, 0) - (COALESCE(NEW.available_qty, 0)) + COALESCE(r.cover_qty, 0))
+            FROM (SELECT 1) LEFT JOIN reorder_rate r ON r.kind = 'insert' AND r.item_id = NEW.id
+            WHERE COALESCE(NEW.available_qty, 0) <= COALESCE(NEW.reorder_level, 0)
+            ON CONFLICT (kind, item_id) DO UPDATE SET
+                label = excluded.label,
+                available = excluded.available,
+                reorder_level = excluded.reorder_level,
+                shortfall = excluded.shortfall,
+                suggested_qty = excluded.suggested_qty;
+        END;
+
+        DROP TRIGGER IF EXISTS trg_inserts_low_stock_upd;
+        CREATE TRIGGER trg_inserts_low_stock_upd AFTER UPDATE ON inserts
+        BEGIN
+            DELETE FROM low_stock
+            WHERE kind = 'insert' AND item_id = NEW.id
+              AND COALESCE(NEW.available_qty, 0) > COALESCE(NEW.reorder_level, 0);
+            INSERT INTO low_stock (kind, item_id, label, available, reorder_level, shortfall, suggested_qty)
+            SELECT 'insert', NEW.id,
+                   COALESCE(NEW.insert_type || ' ' || NEW.size || ' ' || NEW.grade, '#' || NEW.id),
+                   COALESCE(NEW.available_qty, 0),
+                   COALESCE(NEW.reorder_level, 0),
+                   COALESCE(NEW.reorder_level, 0) - (COALESCE(NEW.available_qty, 0)),
+                   MAX(COALESCE(NEW.reorder_level, 0) + 1 - (COALESCE(NEW.available_qty, 0)),
+                       COALESCE(NEW.reorder_level, 0) - (COALESCE(NEW.available_qty, 0)) + COALESCE(r.cover_qty, 0))
+            FROM (SELECT 1) LEFT JOIN reorder_rate r ON r.kind = 'insert' AND r.item_id = NEW.id
+            WHERE COALESCE(NEW.available_qty, 0) <= COALESCE(NEW.reorder_level, 0)
+            ON CONFLICT (kind, item_id) DO UPDATE SET
+                label = excluded.label,
+                available = excluded.available,
+                reorder_level = excluded.reorder_level,
+                shortfall = excluded.shortfall,
+                suggested_qty = excluded.suggested_qty;
+        END;
+
+        DROP TRIGGER IF EXISTS trg_inserts_low_stock_del;
+        CREATE TRIGGER trg_inserts_low_stock_del AFTER DELETE ON inserts
+        BEGIN
+            DELETE FROM low_stock WHERE kind = 'insert' AND item_id = OLD.id;
+        END;
+
+        -- collet: collets
+        DROP TRIGGER IF EXISTS trg_collets_low_stock_ins;
+        CREATE TRIGGER trg_collets_low_stock_ins AFTER INSERT ON collets
+        BEGIN
+            DELETE FROM low_stock
+            WHERE kind = 'collet' AND item_id = NEW.id
+              AND COALESCE(NEW.available_qty, 0) > COALESCE(NEW.reorder_level, 0);
+            INSERT INTO low_stock (kind, item_id, label, available, reorder_level, shortfall, suggested_qty)
+            SELECT 'collet', NEW.id,
+                   COALESCE(NEW.collet_type || ' ' || NEW.interface || ' ' || NEW.size_range, '#' || NEW.id),
+                   COALESCE(NEW.available_qty, 0),
+                   COALESCE(NEW.reorder_level, 0),
+                   COALESCE(NEW.reorder_level, 0) - (COALESCE(NEW.available_qty, 0)),
+                   MAX(COALESCE(NEW.reorder_level, 0) + 1 - (COALESCE(NEW.available_qty, 0)),
+                       COALESCE(NEW.reorder_level, 0) - (COALESCE(NEW.available_qty, 0)) + COALESCE(r.cover_qty, 0))
+            FROM (SELECT 1) LEFT JOIN reorder_rate r ON r.kind = 'collet' AND r.item_id = NEW.id
+            WHERE COALESCE(NEW.available_qty, 0) <= COALESCE(NEW.reorder_level, 0)
+            ON CONFLICT (kind, item_id) DO UPDATE SET
+                label = excluded.label,
+                available = excluded.available,
+                reorder_level = excluded.reorder_level,
+                shortfall = excluded.shortfall,
+                suggested_qty = excluded.suggested_qty;
+        END;
+
+        DROP TRIGGER IF EXISTS trg_collets_low_stock_upd;
+        CREATE TRIGGER trg_collets_low_stock_upd AFTER UPDATE ON collets
+        BEGIN
+            DELETE FROM low_stock
+            WHERE kind = 'collet' AND item_id = NEW.id
+              AND COALESCE(NEW.available_qty, 0) > COALESCE(NEW.reorder_level, 0);
+            INSERT INTO low_stock (kind, item_id, label, available, reorder_level, shortfall, suggested_qty)
+            SELECT 'collet', NEW.id,
+                   COALESCE(NEW.collet_type || ' ' || NEW.interface || ' ' || NEW.size_range, '#' || NEW.id),
+                   COALESCE(NEW.available_qty, 0),
+                   COALESCE(NEW.reorder_level, 0),
+                   COALESCE(NEW.reorder_level, 0) - (COALESCE(NEW.available_qty, 0)),
+                   MAX(COALESCE(NEW.reorder_level, 0) + 1 - (COALESCE(NEW.available_qty, 0)),
+                       COALESCE(NEW.reorder_level, 0) - (COALESCE(NEW.available_qty, 0)) + COALESCE(r.cover_qty, 0))
+            FROM (SELECT 1) LEFT JOIN reorder_rate r ON r.kind = 'collet' AND r.item_id = NEW.id
+            WHERE COALESCE(NEW.available_qty, 0) <= COALESCE(NEW.reorder_level, 0)
+            ON CONFLICT (kind, item_id) DO UPDATE SET
+                label = excluded.label,
+                available = excluded.available,
+                reorder_level = excluded.reorder_level,
+                shortfall = excluded.shortfall,
+                suggested_qty = excluded.suggested_qty;
+        END;
+
+        DROP TRIGGER IF EXISTS trg_collets_low_stock_del;
+        CREATE TRIGGER trg_collets_low_stock_del AFTER DELETE ON collets
+        BEGIN
+            DELETE FROM low_stock WHERE kind = 'collet' AND item_id = OLD.id;
+        END;
+
+        DELETE FROM low_stock;
+        INSERT INTO low_stock (kind, item_id, label, available, reorder_level, shortfall, suggested_qty)
+        SELECT 'tool', t.id,
+               COALESCE(t.tool_type || ' Ø' || t.cutting_diameter || ' x ' || t.cutting_length || ' ' || t.material, '#' || t.id),
+               COALESCE(t.total_qty, 0) - COALESCE(t.issued_qty, 0) - COALESCE(t.broken_qty, 0),
+               COALESCE(t.reorder_level, 0),
+               COALESCE(t.reorder_level, 0) - (COALESCE(t.total_qty, 0) - COALESCE(t.issued_qty, 0) - COALESCE(t.broken_qty, 0)),
+               MAX(COALESCE(t.reorder_level, 0) + 1 - (COALESCE(t.total_qty, 0) - COALESCE(t.issued_qty, 0) - COALESCE(t.broken_qty, 0)),
+                   COALESCE(t.reorder_level, 0) - (COALESCE(t.total_qty, 0) - COALESCE(t.issued_qty, 0) - COALESCE(t.broken_qty, 0)) + COALESCE(r.cover_qty, 0))
+        FROM cutting_tools t
+        LEFT JOIN reorder_rate r ON r.kind = 'tool' AND r.item_id = t.id
+        WHERE COALESCE(t.total_qty, 0) - COALESCE(t.issued_qty, 0) - COALESCE(t.broken_qty, 0) <= COALESCE(t.reorder_level, 0);
+        INSERT INTO low_stock (kind, item_id, label, available, reorder_level, shortfall, suggested_qty)
+        SELECT 'holder', t.id,
+               COALESCE(t.holder_type || ' ' || t.interface || ' ' || t.size || ' / ' || t.projection, '#' || t.id),
+               COALESCE(t.total_qty, 0) - COALESCE(t.issued_qty, 0),
+               COALESCE(t.reorder_level, 0),
+               COALESCE(t.reorder_level, 0) - (COALESCE(t.total_qty, 0) - COALESCE(t.issued_qty, 0)),
+               MAX(COALESCE(t.reorder_level, 0) + 1 - (COALESCE(t.total_qty, 0) - COALESCE(t.issued_qty, 0)),
+                   COALESCE(t.reorder_level, 0) - (COALESCE(t.total_qty, 0) - COALESCE(t.issued_qty, 0)) + COALESCE(r.cover_qty, 0))
+        FROM holders t
+        LEFT JOIN reorder_rate r ON r.kind = 'holder' AND r.item_id = t.id
+        WHERE COALESCE(t.total_qty, 0) - COALESCE(t.issued_qty, 0) <= COALESCE(t.reorder_level, 0);
+        INSERT INTO low_stock (kind, item_id, label, available, reorder_level, shortfall, suggested_qty)
+        SELECT 'insert', t.id,
+               COALESCE(t.insert_type || ' ' || t.size || ' ' || t.grade, '#' || t.id),
+               COALESCE(t.available_qty, 0),
+               COALESCE(t.reorder_level, 0),
+               COALESCE(t.reorder_level, 0) - (COALESCE(t.available_qty, 0)),
+               MAX(COALESCE(t.reorder_level, 0) + 1 - (COALESCE(t.available_qty, 0)),
+                   COALESCE(t.reorder_level, 0) - (COALESCE(t.available_qty, 0)) + COALESCE(r.cover_qty, 0))
+        FROM inserts t
+        LEFT JOIN reorder_rate r ON r.kind = 'insert' AND r.item_id = t.id
+        WHERE COALESCE(t.available_qty, 0) <= COALESCE(t.reorder_level, 0);
+        INSERT INTO low_stock (kind, item_id, label, available, reorder_level, shortfall, suggested_qty)
+        SELECT 'collet', t.id,
+               COALESCE(t.collet_type || ' ' || t.interface || ' ' || t.size_range, '#' || t.id),
+               COALESCE(t.available_qty, 0),
+               COALESCE(t.reorder_level, 0),
+               COALESCE(t.reorder_level, 0) - (COALESCE(t.available_qty, 0)),
+               MAX(COALESCE(t.reorder_level, 0) + 1 - (COALESCE(t.available_qty, 0)),
+                   COALESCE(t.reorder_level, 0) - (COALESCE(t.available_qty, 0)) + COALESCE(r.cover_qty, 0))
+        FROM collets t
+        LEFT JOIN reorder_rate r ON r.kind = 'collet' AND r.item_id = t.id
+        WHERE COALESCE(t.available_qty, 0) <= COALESCE(t.reorder_level, 0);
+    """)
+    track_table(con, "low_stock")
+    track_table(con, "reorder_rate")
+
+
+@migration(13, "dimension search indexes for tools / holders")
+def _dimension_search_indexes(con):
+    # type + material equality, then a range on the diameter; dimension-only
+    # searches (no type) range-scan the diameter / projection alone
+    run_script(con, """
+        CREATE INDEX IF NOT EXISTS idx_tools_type_material_dia ON cutting_tools(tool_type, material, cutting_diameter);
+        CREATE INDEX IF NOT EXISTS idx_tools_dia_length        ON cutting_tools(cutting_diameter, cutting_length);
+        CREATE INDEX IF NOT EXISTS idx_holders_projection      ON holders(projection);
+    """)
+
+
+@migration(14, "full-text search over complaints / action logs")
+def _complaint_fts(con):
+    # External-content FTS5 indexes (the text stays in the base tables);
+    # see complaint_search.py for the queries. The triggers keep them in
+    # sync, the last four statements index the existing rows (what
+    # complaint_search.rebuild() does).
+    run_script(con, """
+        CREATE VIRTUAL TABLE IF NOT EXISTS complaint_fts USING fts5(
+            issue_description, root_cause_5why, corrective_action,
+            content='customer_complaint', content_rowid='id',
+            tokenize='porter unicode61'
+        );
+
+        CREATE VIRTUAL TABLE IF NOT EXISTS complaint_log_fts USING fts5(
+            notes,
+            content='complaint_action_log', content_rowid='id',
+            tokenize='porter unicode61'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS trg_complaint_fts_ins AFTER INSERT ON customer_complaint
+        BEGIN
+            INSERT INTO complaint_fts (rowid, issue_description, root_cause_5why, corrective_action)
+            VALUES (NEW.id, NEW.issue_description, NEW.root_cause_5why, NEW.corrective_action);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_complaint_fts_del AFTER DELETE ON customer_complaint
+        BEGIN
+            INSERT INTO complaint_fts (complaint_fts, rowid, issue_description, root_cause_5why, corrective_action)
+            VALUES ('delete', OLD.id, OLD.issue_description, OLD.root_cause_5why, OLD.corrective_action);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_complaint_fts_upd
+        AFTER UPDATE OF id, issue_description, root_cause_5why, corrective_action ON customer_complaint
+        BEGIN
+            INSERT INTO complaint_fts (complaint_fts, rowid, issue_description, root_cause_5why, corrective_action)
+            VALUES ('delete', OLD.id, OLD.issue_description, OLD.root_cause_5why, OLD.corrective_action);
+            INSERT INTO complaint_fts (rowid, issue_description, root_cause_5why, corrective_action)
+            VALUES (NEW.id, NEW.issue_description, NEW.root_cause_5why, NEW.corrective_action);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_complaint_log_fts_ins AFTER INSERT ON complaint_action_log
+        BEGIN
+            INSERT INTO complaint_log_fts (rowid, notes) VALUES (NEW.id, NEW.notes);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_complaint_log_fts_del AFTER DELETE ON complaint_action_log
+        BEGIN
+            INSERT INTO complaint_log_fts (complaint_log_fts, rowid, notes) VALUES ('delete', OLD.id, OLD.notes);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_complaint_log_fts_upd AFTER UPDATE OF id, notes ON complaint_action_log
+        BEGIN
+            INSERT INTO complaint_log_fts (complaint_log_fts, rowid, notes) VALUES ('delete', OLD.id, OLD.notes);
+            INSERT INTO complaint_log_fts (rowid, notes) VALUES (NEW.id, NEW.notes);
+        END;
+
+        INSERT INTO complaint_fts (complaint_fts) VALUES ('rebuild');
+        INSERT INTO complaint_log_fts (complaint_log_fts) VALUES ('rebuild');
+        INSERT INTO complaint_fts (complaint_fts) VALUES ('optimize');
+        INSERT INTO complaint_log_fts (complaint_log_fts) VALUES ('optimize');
+    """)
+
+
+@migration(15, "document number sequences")
+def _doc_sequences(con):
+    # seeded with the highest number already used, compared as numbers
+    # (string order put CC-2025-1000 before CC-2025-999)
+    run_script(con, """
+        CREATE TABLE IF NOT EXISTS doc_sequence (
+            prefix  TEXT NOT NULL,
+            year    INTEGER NOT NULL DEFAULT 0,     -- 0 = never resets
+            last_no INTEGER NOT NULL,
+            PRIMARY KEY (prefix, year)
+        ) WITHOUT ROWID;
+
+        INSERT OR REPLACE INTO doc_sequence (prefix, year, last_no)
+        SELECT 'CC', CAST(substr(complaint_no, 4, 4) AS INTEGER) AS yr,
+               MAX(CAST(substr(complaint_no, 9) AS INTEGER))
+        FROM customer_complaint
+        WHERE complaint_no GLOB 'CC-[0-9][0-9][0-9][0-9]-[0-9]*'
+        GROUP BY yr;
+
+        INSERT OR REPLACE INTO doc_sequence (prefix, year, last_no)
+        SELECT substr(gauge_code, 1, instr(gauge_code, '-') - 1) AS pfx, 0,
+               MAX(CAST(substr(gauge_code, instr(gauge_code, '-') + 1) AS INTEGER))
+        FROM gauges
+        WHERE gauge_code GLOB '?*-[0-9]*'
+        GROUP BY pfx;
+    """)
+    track_table(con, "doc_sequence")
+
+
+@migration(16, "challan open line counter + status triggers")
+def _challan_open_lines(con):
+    # open_line_count = inward lines of the challan with available_qty > 0.
+    # The triggers move it only when a line crosses zero (or changes
+    # challan) and set status from it in the same UPDATE, so dispatch /
+    # edit / delete no longer recount the challan's lines.
+    add_column(con, "customer_challan", "open_line_count", "INTEGER NOT NULL DEFAULT 0")
+
+    def bump(delta, challan, qty):
+        return f"""
+            UPDATE customer_challan
+            SET open_line_count = open_line_count {delta},
+                status = CASE WHEN open_line_count {delta} > 0 THEN 'OPEN' ELSE 'CLOSED' END
+            WHERE id = {challan} AND {qty} > 0;"""
+
+    run_script(con, f"""
+        UPDATE customer_challan
+        SET open_line_count = (SELECT COUNT(*) FROM material_inward mi
+                               WHERE mi.challan_id = customer_challan.id AND mi.available_qty > 0);
+        UPDATE customer_challan
+        SET status = CASE WHEN open_line_count > 0 THEN 'OPEN' ELSE 'CLOSED' END;
+
+        DROP TRIGGER IF EXISTS trg_inward_open_ins;
+        CREATE TRIGGER trg_inward_open_ins AFTER INSERT ON material_inward
+        BEGIN{bump("+ 1", "NEW.challan_id", "NEW.available_qty")}
+        END;
+
+        DROP TRIGGER IF EXISTS trg_inward_open_del;
+        CREATE TRIGGER trg_inward_open_del AFTER DELETE ON material_inward
+        BEGIN{bump("- 1", "OLD.challan_id", "OLD.available_qty")}
+        END;
+
+        DROP TRIGGER IF EXISTS trg_inward_open_upd;
+        CREATE TRIGGER trg_inward_open_upd AFTER UPDATE OF available_qty, challan_id ON material_inward
+        WHEN OLD.challan_id IS NOT NEW.challan_id
+          OR (OLD.available_qty > 0) IS NOT (NEW.available_qty > 0)
+        BEGIN{bump("- 1", "OLD.challan_id", "OLD.available_qty")}{bump("+ 1", "NEW.challan_id", "NEW.available_qty")}
+        END;
+
+        CREATE INDEX IF NOT EXISTS idx_challan_open
+            ON customer_challan(customer_challan_date, customer_challan_no)
+            WHERE open_line_count > 0;
+    """)
+
+
+@migration(17, "dispatch register date index")
+def _dispatch_date_index(con):
+    # the dispatch register export streams in (dispatch_date, id) order and
+    # filters by date range without a sort
+    con.execute("CREATE INDEX IF NOT EXISTS idx_dispatch_date ON material_dispatch(dispatch_date)")
+
+
+@migration(18, "daily dispatch / lead time rollups")
+def _dispatch_rollups(con):
+    # Running totals per (day, process, customer, item); see wip.py for the
+    # reads. Each trigger subtracts the affected dispatch rows BEFORE the
+    # change and adds them back AFTER it. Rows with an empty / non-ISO
+    # dispatch_date roll up under day ''. The backfill at the end is what
+    # wip.rebuild_rollups() recomputes.
+    run_script(con, """
+        CREATE TABLE IF NOT EXISTS dispatch_daily (
+            day           TEXT NOT NULL,
+            process       TEXT NOT NULL,
+            customer_id   INTEGER NOT NULL,
+            item_code     TEXT NOT NULL,
+            ok_qty        INTEGER NOT NULL DEFAULT 0,
+            rej_qty       INTEGER NOT NULL DEFAULT 0,
+            cd_qty        INTEGER NOT NULL DEFAULT 0,
+            nd_qty        INTEGER NOT NULL DEFAULT 0,
+            nd_pw_qty     INTEGER NOT NULL DEFAULT 0,
+            total_qty     INTEGER NOT NULL DEFAULT 0,
+            lines         INTEGER NOT NULL DEFAULT 0,
+            lead_qty_days INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, process, customer_id, item_code)
+        ) WITHOUT ROWID;
+
+        DROP TRIGGER IF EXISTS trg_dispatch_daily_upd_old;
+        CREATE TRIGGER trg_dispatch_daily_upd_old BEFORE UPDATE OF dispatch_date, inward_id, challan_id,
+            ok_qty, rej_qty, cd_qty, nd_qty, nd_pw_qty, total_qty ON material_dispatch
+        BEGIN
+            INSERT INTO dispatch_daily (day, process, customer_id, item_code, ok_qty, rej_qty, cd_qty, nd_qty,
+                                        nd_pw_qty, total_qty, lines, lead_qty_days)
+            SELECT COALESCE(date(md.dispatch_date), ''), COALESCE(mi.process, ''), ch.customer_id, mi.item_code,
+                   -SUM(COALESCE(md.ok_qty, 0)),
+                   -SUM(COALESCE(md.rej_qty, 0)),
+                   -SUM(COALESCE(md.cd_qty, 0)),
+                   -SUM(COALESCE(md.nd_qty, 0)),
+                   -SUM(COALESCE(md.nd_pw_qty, 0)),
+                   -SUM(COALESCE(md.total_qty, 0)),
+                   -SUM(1),
+                   -SUM(COALESCE(md.total_qty * MAX(0, CAST(julianday(date(md.dispatch_date))
+                                                          - julianday(date(ch.customer_challan_date)) AS INTEGER)), 0))
+            FROM material_dispatch md
+            JOIN material_inward mi ON mi.id = md.inward_id
+            JOIN customer_challan ch ON ch.id = md.challan_id
+            WHERE md.id = OLD.id
+            GROUP BY 1, 2, 3, 4
+            ON CONFLICT (day, process, customer_id, item_code) DO UPDATE SET
+                ok_qty = ok_qty + excluded.ok_qty,
+                rej_qty = rej_qty + excluded.rej_qty,
+                cd_qty = cd_qty + excluded.cd_qty,
+                nd_qty = nd_qty + excluded.nd_qty,
+                nd_pw_qty = nd_pw_qty + excluded.nd_pw_qty,
+                total_qty = total_qty + excluded.total_qty,
+                lines = lines + excluded.lines,
+                lead_qty_days = lead_qty_days + excluded.lead_qty_days;
+            DELETE FROM dispatch_daily
+            WHERE lines <= 0
+              AND day IN (SELECT COALESCE(date(md.dispatch_date), '')
+                          FROM material_dispatch md WHERE md.id = OLD.id);
+        END;
+
+        DROP TRIGGER IF EXISTS trg_dispatch_daily_upd_new;
+        CREATE TRIGGER trg_dispatch_daily_upd_new AFTER UPDATE OF dispatch_date, inward_id, challan_id,
+            ok_qty, rej_qty, cd_qty, nd_qty, nd_pw_qty, total_qty ON material_dispatch
+        BEGIN
+            INSERT INTO dispatch_daily (day, process, customer_id, item_code, ok_qty, rej_qty, cd_qty, nd_qty,
+                                        nd_pw_qty, total_qty, lines, lead_qty_days)
+            SELECT COALESCE(date(md.dispatch_date), ''), COALESCE(mi.process, ''), ch.customer_id, mi.item_code,
+                   SUM(COALESCE(md.ok_qty, 0)),
+                   SUM(COALESCE(md.rej_qty, 0)),
+                   SUM(COALESCE(md.cd_qty, 0)),
+                   SUM(COALESCE(md.nd_qty, 0)),
+                   SUM(COALESCE(md.nd_pw_qty, 0)),
+                   SUM(COALESCE(md.total_qty, 0)),
+                   SUM(1),
+                   SUM(COALESCE(md.total_qty * MAX(0, CAST(julianday(date(md.dispatch_date))
+                                                         - julianday(date(ch.customer_challan_date)) AS INTEGER)), 0))
+            FROM material_dispatch md
+            JOIN material_inward mi ON mi.id = md.inward_id
+            JOIN customer_challan ch ON ch.id = md.challan_id
+            WHERE md.id = NEW.id
+            GROUP BY 1, 2, 3, 4
+            ON CONFLICT (day, process, customer_id, item_code) DO UPDATE SET
+                ok_qty = ok_qty + excluded.ok_qty,
+                rej_qty = rej_qty + excluded.rej_qty,
+                cd_qty = cd_qty + excluded.cd_qty,
+                nd_qty = nd_qty + excluded.nd_qty,
+                nd_pw_qty = nd_pw_qty + excluded.nd_pw_qty,
+                total_qty = total_qty + excluded.total_qty,
+                lines = lines + excluded.lines,
+                lead_qty_days = lead_qty_days + excluded.lead_qty_days;
+        END;
+
+        DROP TRIGGER IF EXISTS trg_dispatch_daily_ins;
+        CREATE TRIGGER trg_dispatch_daily_ins AFTER INSERT ON material_dispatch
+        BEGIN
+            INSERT INTO dispatch_daily (day, process, customer_id, item_code, ok_qty, rej_qty, cd_qty, nd_qty,
+                                        nd_pw_qty, total_qty, lines, lead_qty_days)
+            SELECT COALESCE(date(md.dispatch_date), ''), COALESCE(mi.process, ''), ch.customer_id, mi.item_code,
+                   SUM(COALESCE(md.ok_qty, 0)),
+                   SUM(COALESCE(md.rej_qty, 0)),
+                   SUM(COALESCE(md.cd_qty, 0)),
+                   SUM(COALESCE(md.nd_qty, 0)),
+                   SUM(COALESCE(md.nd_pw_qty, 0)),
+                   SUM(COALESCE(md.total_qty, 0)),
+                   SUM(1),
+                   SUM(COALESCE(md.total_qty * MAX(0, CAST(julianday(date(md.dispatch_date))
+                                                         - julianday(date(ch.customer_challan_date)) AS INTEGER)), 0))
+            FROM material_dispatch md
+            JOIN material_inward mi ON mi.id = md.inward_id
+            JOIN customer_challan ch ON ch.id = md.challan_id
+            WHERE md.id = NEW.id
+            GROUP BY 1, 2, 3, 4
+            ON CONFLICT (day, process, customer_id, item_code) DO UPDATE SET
+                ok_qty = ok_qty + excluded.ok_qty,
+                rej_qty = rej_qty + excluded.rej_qty,
+                cd_qty = cd_qty + excluded.cd_qty,
+                nd_qty = nd_qty + excluded.nd_qty,
+                nd_pw_qty = nd_pw_qty + excluded.nd_pw_qty,
+                total_qty = total_qty + excluded.total_qty,
+                lines = lines + excluded.lines,
+                lead_qty_days = lead_qty_days + excluded.lead_qty_days;
+        END;
+
+        DROP TRIGGER IF EXISTS trg_dispatch_daily_del;
+        CREATE TRIGGER trg_dispatch_daily_del BEFORE DELETE ON material_dispatch
+        BEGIN
+            INSERT INTO dispatch_daily (day, process, customer_id, item_code, ok_qty, rej_qty, cd_qty, nd_qty,
+                                        nd_pw_qty, total_qty, lines, lead_qty_days)
+            SELECT COALESCE(date(md.dispatch_date), ''), COALESCE(mi.process, ''), ch.customer_id, mi.item_code,
+                   -SUM(COALESCE(md.ok_qty, 0)),
+                   -SUM(COALESCE(md.rej_qty, 0)),
+                   -SUM(COALESCE(md.cd_qty, 0)),
+                   -SUM(COALESCE(md.nd_qty, 0)),
+                   -SUM(COALESCE(md.nd_pw_qty, 0)),
+                   -SUM(COALESCE(md.total_qty, 0)),
+                   -SUM(1),
+                   -SUM(COALESCE(md.total_qty * MAX(0, CAST(julianday(date(md.dispatch_date))
+                                                          - julianday(date(ch.customer_challan_date)) AS INTEGER)), 0))
+            FROM material_dispatch md
+            JOIN material_inward mi ON mi.id = md.inward_id
+            JOIN customer_challan ch ON ch.id = md.challan_id
+            WHERE md.id = OLD.id
+            GROUP BY 1, 2, 3, 4
+            ON CONFLICT (day, process, customer_id, item_code) DO UPDATE SET
+                ok_qty = ok_qty + excluded.ok_qty,
+                rej_qty = rej_qty + excluded.rej_qty,
+                cd_qty = cd_qty + excluded.cd_qty,
+                nd_qty = nd_qty + excluded.nd_qty,
+                nd_pw_qty = nd_pw_qty + excluded.nd_pw_qty,
+                total_qty = total_qty + excluded.total_qty,
+                lines = lines + excluded.lines,
+                lead_qty_days = lead_qty_days + excluded.lead_qty_days;
+            DELETE FROM dispatch_daily
+            WHERE lines <= 0
+              AND day IN (SELECT COALESCE(date(md.dispatch_date), '')
+                          FROM material_dispatch md WHERE md.id = OLD.id);
+        END;
+
+        DROP TRIGGER IF EXISTS trg_inward_dispatch_daily_upd_old;
+        CREATE TRIGGER trg_inward_dispatch_daily_upd_old BEFORE UPDATE OF item_code, process ON material_inward
+        WHEN OLD.item_code IS NOT NEW.item_code OR OLD.process IS NOT NEW.process
+        BEGIN
+            INSERT INTO dispatch_daily (day, process, customer_id, item_code, ok_qty, rej_qty, cd_qty, nd_qty,
+                                        nd_pw_qty, total_qty, lines, lead_qty_days)
+            SELECT COALESCE(date(md.dispatch_date), ''), COALESCE(mi.process, ''), ch.customer_id, mi.item_code,
+                   -SUM(COALESCE(md.ok_qty, 0)),
+                   -SUM(COALESCE(md.rej_qty, 0)),
+                   -SUM(COALESCE(md.cd_qty, 0)),
+                   -SUM(COALESCE(md.nd_qty, 0)),
+                   -SUM(COALESCE(md.nd_pw_qty, 0)),
+                   -SUM(COALESCE(md.total_qty, 0)),
+                   -SUM(1),
+                   -SUM(COALESCE(md.total_qty * MAX(0, CAST(julianday(date(md.dispatch_date))
+                                                          - julianday(date(ch.customer_challan_date)) AS INTEGER)), 0))
+            FROM material_dispatch md
+            JOIN material_inward mi ON mi.id = md.inward_id
+            JOIN customer_challan ch ON ch.id = md.challan_id
+            WHERE md.inward_id = OLD.id
+            GROUP BY 1, 2, 3, 4
+            ON CONFLICT (day, process, customer_id, item_code) DO UPDATE SET
+                ok_qty = ok_qty + excluded.ok_qty,
+                rej_qty = rej_qty + excluded.rej_qty,
+                cd_qty = cd_qty + excluded.cd_qty,
+                nd_qty = nd_qty + excluded.nd_qty,
+                nd_pw_qty = nd_pw_qty + excluded.nd_pw_qty,
+                total_qty = total_qty + excluded.total_qty,
+                lines = lines + excluded.lines,
+                lead_qty_days = lead_qty_days + excluded.lead_qty_days;
+            DELETE FROM dispatch_daily
+            WHERE lines <= 0
+              AND day IN (SELECT COALESCE(date(md.dispatch_date), '')
+                          FROM material_dispatch md WHERE md.inward_id = OLD.id);
+        END;
+
+        DROP TRIGGER IF EXISTS trg_inward_dispatch_daily_upd_new;
+        CREATE TRIGGER trg_inward_dispatch_daily_upd_new AFTER UPDATE OF item_code, process ON material_inward
+        WHEN OLD.item_code IS NOT NEW.item_code OR OLD.process IS NOT NEW.process
+        BEGIN
+            INSERT INTO dispatch_daily (day, process, customer_id, item_code, ok_qty, rej_qty, cd_qty, nd_qty,
+                                        nd_pw_qty, total_qty, lines, lead_qty_days)
+            SELECT COALESCE(date(md.dispatch_date), ''), COALESCE(mi.process, ''), ch.customer_id, mi.item_code,
+                   SUM(COALESCE(md.ok_qty, 0)),
+                   SUM(COALESCE(md.rej_qty, 0)),
+                   SUM(COALESCE(md.cd_qty, 0)),
+                   SUM(COALESCE(md.nd_qty, 0)),
+                   SUM(COALESCE(md.nd_pw_qty, 0)),
+                   SUM(COALESCE(md.total_qty, 0)),
+                   SUM(1),
+                   SUM(COALESCE(md.total_qty * MAX(0, CAST(julianday(date(md.dispatch_date))
+                                                         - julianday(date(ch.customer_challan_date)) AS INTEGER)), 0))
+            FROM material_dispatch md
+            JOIN material_inward mi ON mi.id = md.inward_id
+            JOIN customer_challan ch ON ch.id = md.challan_id
+            WHERE md.inward_id = NEW.id
+            GROUP BY 1, 2, 3, 4
+            ON CONFLICT (day, process, customer_id, item_code) DO UPDATE SET
+                ok_qty = ok_qty + excluded.ok_qty,
+                rej_qty = rej_qty + excluded.rej_qty,
+                cd_qty = cd_qty + excluded.cd_qty,
+                nd_qty = nd_qty + excluded.nd_qty,
+                nd_pw_qty = nd_pw_qty + excluded.nd_pw_qty,
+                total_qty = total_qty + excluded.total_qty,
+                lines = lines + excluded.lines,
+                lead_qty_days = lead_qty_days + excluded.lead_qty_days;
+        END;
+
+        DROP TRIGGER IF EXISTS trg_challan_dispatch_daily_upd_old;
+        CREATE TRIGGER trg_challan_dispatch_daily_upd_old BEFORE UPDATE OF customer_id, customer_challan_date ON customer_challan
+        WHEN OLD.customer_id IS NOT NEW.customer_id
+          OR OLD.customer_challan_date IS NOT NEW.customer_challan_date
+        BEGIN
+            INSERT INTO dispatch_daily (day, process, customer_id, item_code, ok_qty, rej_qty, cd_qty, nd_qty,
+                                        nd_pw_qty, total_qty, lines, lead_qty_days)
+            SELECT COALESCE(date(md.dispatch_date), ''), COALESCE(mi.process, ''), ch.customer_id, mi.item_code,
+                   -SUM(COALESCE(md.ok_qty, 0)),
+                   -SUM(COALESCE(md.rej_qty, 0)),
+                   -SUM(COALESCE(md.cd_qty, 0)),
+                   -SUM(COALESCE(md.nd_qty, 0)),
+                   -SUM(COALESCE(md.nd_pw_qty, 0)),
+                   -SUM(COALESCE(md.total_qty, 0)),
+                   -SUM(1),
+                   -SUM(COALESCE(md.total_qty * MAX(0, CAST(julianday(date(md.dispatch_date))
+                                                          - julianday(date(ch.customer_challan_date)) AS INTEGER)), 0))
+            FROM material_dispatch md
+            JOIN material_inward mi ON mi.id = md.inward_id
+            JOIN customer_challan ch ON ch.id = md.challan_id
+            WHERE md.challan_id = OLD.id
+            GROUP BY 1, 2, 3, 4
+            ON CONFLICT (day, process, customer_id, item_code) DO UPDATE SET
+                ok_qty = ok_qty + excluded.ok_qty,
+                rej_qty = rej_qty + excluded.rej_qty,
+                cd_qty = cd_qty + excluded.cd_qty,
+                nd_qty = nd_qty + excluded.nd_qty,
+                nd_pw_qty = nd_pw_qty + excluded.nd_pw_qty,
+                total_qty = total_qty + excluded.total_qty,
+                lines = lines + excluded.lines,
+                lead_qty_days = lead_qty_days + excluded.lead_qty_days;
+            DELETE FROM dispatch_daily
+            WHERE lines <= 0
+              AND day IN (SELECT COALESCE(date(md.dispatch_date), '')
+                          FROM material_dispatch md WHERE md.challan_id = OLD.id);
+        END;
+
+        DROP TRIGGER IF EXISTS trg_challan_dispatch_daily_upd_new;
+        CREATE TRIGGER trg_challan_dispatch_daily_upd_new AFTER UPDATE OF customer_id, customer_challan_date ON customer_challan
+        WHEN OLD.customer_id IS NOT NEW.customer_id
+          OR OLD.customer_challan_date IS NOT NEW.customer_challan_date
+        BEGIN
+            INSERT INTO dispatch_daily (day, process, customer_id, item_code, ok_qty, rej_qty, cd_qty, nd_qty,
+                                        nd_pw_qty, total_qty, lines, lead_qty_days)
+            SELECT COALESCE(date(md.dispatch_date), ''), COALESCE(mi.process, ''), ch.customer_id, mi.item_code,
+                   SUM(COALESCE(md.ok_qty, 0)),
+                   SUM(COALESCE(md.rej_qty, 0)),
+                   SUM(COALESCE(md.cd_qty, 0)),
+                   SUM(COALESCE(md.nd_qty, 0)),
+                   SUM(COALESCE(md.nd_pw_qty, 0)),
+                   SUM(COALESCE(md.total_qty, 0)),
+                   SUM(1),
+                   SUM(COALESCE(md.total_qty * MAX(0, CAST(julianday(date(md.dispatch_date))
+                                                         - julianday(date(ch.customer_challan_date)) AS INTEGER)), 0))
+            FROM material_dispatch md
+            JOIN material_inward mi ON mi.id = md.inward_id
+            JOIN customer_challan ch ON ch.id = md.challan_id
+            WHERE md.challan_id = NEW.id
+            GROUP BY 1, 2, 3, 4
+            ON CONFLICT (day, process, customer_id, item_code) DO UPDATE SET
+                ok_qty = ok_qty + excluded.ok_qty,
+                rej_qty = rej_qty + excluded.rej_qty,
+                cd_qty = cd_qty + excluded.cd_qty,
+                nd_qty = nd_qty + excluded.nd_qty,
+                nd_pw_qty = nd_pw_qty + excluded.nd_pw_qty,
+                total_qty = total_qty + excluded.total_qty,
+                lines = lines + excluded.lines,
+                lead_qty_days = lead_qty_days + excluded.lead_qty_days;
+        END;
+
+        DELETE FROM dispatch_daily;
+        INSERT INTO dispatch_daily (day, process, customer_id, item_code, ok_qty, rej_qty, cd_qty, nd_qty,
+                                    nd_pw_qty, total_qty, lines, lead_qty_days)
+        SELECT COALESCE(date(md.dispatch_date), ''), COALESCE(mi.process, ''), ch.customer_id, mi.item_code,
+               SUM(COALESCE(md.ok_qty, 0)),
+               SUM(COALESCE(md.rej_qty, 0)),
+               SUM(COALESCE(md.cd_qty, 0)),
+               SUM(COALESCE(md.nd_qty, 0)),
+               SUM(COALESCE(md.nd_pw_qty, 0)),
+               SUM(COALESCE(md.total_qty, 0)),
+               SUM(1),
+               SUM(COALESCE(md.total_qty * MAX(0, CAST(julianday(date(md.dispatch_date))
+                                                     - julianday(date(ch.customer_challan_date)) AS INTEGER)), 0))
+        FROM material_dispatch md
+        JOIN material_inward mi ON mi.id = md.inward_id
+        JOIN customer_challan ch ON ch.id = md.challan_id
+        GROUP BY 1, 2, 3, 4;
+    """)
+    track_table(con, "dispatch_daily")
+
+
+# ================= BASELINE SCHEMA (v1) =================
+
+BASELINE_SQL = """
+/* ================= CUTTING TOOL SPECS ================= */
+CREATE TABLE IF NOT EXISTS cutting_tools (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tool_type TEXT,
+    tool_subtype TEXT,
+    cutting_diameter REAL,
+    cutting_length REAL,
+    overall_length REAL,
+    shank_type TEXT,
+    shank_diameter REAL,
+    material TEXT,
+    location TEXT,
+    remarks TEXT,
+    total_qty INTEGER DEFAULT 0,
+    issued_qty INTEGER DEFAULT 0,
+    broken_qty INTEGER DEFAULT 0,
+    reorder_level INTEGER DEFAULT 2,
+    UNIQUE (tool_type, cutting_diameter, cutting_length, shank_type, shank_diameter, material)
+);
+
+CREATE TABLE IF NOT EXISTS tool_issue_txn (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tool_id INTEGER,
+    action TEXT,
+    qty INTEGER,
+    operator TEXT,
+    machine TEXT,
+    shift TEXT,
+    job_name TEXT,
+    condition TEXT,
+    remarks TEXT,
+    ts DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+/* ================= HOLDERS ================= */
+CREATE TABLE IF NOT EXISTS holders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    holder_type TEXT,
+    interface TEXT,
+    size TEXT,
+    projection REAL,
+    location TEXT,
+    remarks TEXT,
+    total_qty INTEGER DEFAULT 0,
+    issued_qty INTEGER DEFAULT 0,
+    reorder_level INTEGER DEFAULT 1,
+    UNIQUE (holder_type, interface, size, projection)
+);
+
+CREATE TABLE IF NOT EXISTS holder_txn (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    holder_id INTEGER,
+    action TEXT,
+    qty INTEGER,
+    operator TEXT,
+    machine TEXT,
+    shift TEXT,
+    remarks TEXT,
+    ts DATE
+);
+
+/* ================= INSERTS ================= */
+CREATE TABLE IF NOT EXISTS inserts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    insert_type TEXT,
+    size TEXT,
+    grade TEXT,
+    edges INTEGER,
+    total_qty INTEGER,
+    available_qty INTEGER,
+    reorder_level INTEGER,
+    remarks TEXT,
+    UNIQUE(insert_type, size, grade)
+);
+
+CREATE TABLE IF NOT EXISTS insert_txn (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    insert_id INTEGER,
+    action TEXT,
+    qty INTEGER,
+    edges_used INTEGER,
+    operator TEXT,
+    machine TEXT,
+    job TEXT,
+    shift TEXT,
+    txn_date DATE
+);
+
+/* ================= COLLETS ================= */
+CREATE TABLE IF NOT EXISTS collets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    collet_type TEXT,
+    interface TEXT,
+    size_range TEXT,
+    location TEXT,
+    total_qty INTEGER DEFAULT 0,
+    available_qty INTEGER DEFAULT 0,
+    reorder_level INTEGER DEFAULT 2,
+    remarks TEXT,
+    UNIQUE (collet_type, interface, size_range, location)
+);
+
+CREATE TABLE IF NOT EXISTS collet_txn (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    collet_id INTEGER,
+    action TEXT,
+    qty INTEGER,
+    operator TEXT,
+    machine TEXT,
+    shift TEXT,
+    txn_date DATE
+);
+
+/* ================= GAUGES ================= */
+CREATE TABLE IF NOT EXISTS gauges (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    gauge_code TEXT UNIQUE,
+    category TEXT,
+    subtype TEXT,
+    mechanism TEXT,
+    range TEXT,
+    least_count TEXT,
+    make TEXT,
+    serial_no TEXT,
+    location TEXT,
+    calibration_freq INTEGER DEFAULT 365,
+    last_calibration DATE,
+    next_calibration DATE,
+    status TEXT DEFAULT 'OK',
+    remarks TEXT
+);
+
+CREATE TABLE IF NOT EXISTS gauge_issue_txn (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    gauge_id INTEGER,
+    action TEXT,
+    operator TEXT,
+    machine TEXT,
+    job TEXT,
+    shift TEXT,
+    condition_on_return TEXT,
+    remarks TEXT,
+    txn_date DATE
+);
+
+CREATE TABLE IF NOT EXISTS gauge_calibration_txn (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    gauge_id INTEGER,
+    calibration_date DATE,
+    calibrated_by TEXT,
+    result TEXT,
+    certificate_no TEXT,
+    remarks TEXT
+);
+
+/* ================= CUSTOMER / MATERIAL ================= */
+CREATE TABLE IF NOT EXISTS customer_master (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer_name TEXT UNIQUE NOT NULL,
+    short_code TEXT,
+    remarks TEXT
+);
+
+CREATE TABLE IF NOT EXISTS customer_challan (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer_id INTEGER NOT NULL,
+    customer_challan_no TEXT NOT NULL,
+    customer_challan_date DATE NOT NULL,
+    status TEXT DEFAULT 'OPEN',
+    remarks TEXT,
+    UNIQUE (customer_id, customer_challan_no)
+);
+
+CREATE TABLE IF NOT EXISTS material_inward (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    challan_id INTEGER NOT NULL,
+    item_code TEXT NOT NULL,
+    process TEXT,
+    inward_qty INTEGER NOT NULL,
+    available_qty INTEGER NOT NULL,
+    box_tray TEXT,
+    remarks TEXT
+);
+
+CREATE TABLE IF NOT EXISTS material_dispatch (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    challan_id INTEGER NOT NULL,
+    inward_id INTEGER NOT NULL,
+    elta_challan_no TEXT NOT NULL,
+    dispatch_date DATE NOT NULL,
+    ok_qty INTEGER DEFAULT 0,
+    rej_qty INTEGER DEFAULT 0,
+    cd_qty INTEGER DEFAULT 0,
+    nd_qty INTEGER DEFAULT 0,
+    nd_pw_qty INTEGER DEFAULT 0,
+    total_qty INTEGER NOT NULL,
+    remarks TEXT
+);
+
+/* ================= ITEM CODE MASTER ================= */
+CREATE TABLE IF NOT EXISTS item_code_master (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_code TEXT UNIQUE NOT NULL,
+    description TEXT,
+    remarks TEXT
+);
+
+/* ================= SHIFT ================= */
+CREATE TABLE IF NOT EXISTS shift_header (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    shift_date DATE NOT NULL,
+    shift TEXT NOT NULL,
+    shift_incharge TEXT NOT NULL,
+    remarks TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (shift_date, shift)
+);
+
+CREATE TABLE IF NOT EXISTS shift_production (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    shift_id INTEGER NOT NULL,
+    item_code TEXT NOT NULL,
+    machine TEXT,
+    operator TEXT,
+    ok_qty INTEGER DEFAULT 0,
+    rej_qty INTEGER DEFAULT 0,
+    remarks TEXT
+);
+
+CREATE TABLE IF NOT EXISTS shift_setup (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    shift_id INTEGER NOT NULL,
+    machine TEXT,
+    from_item TEXT,
+    to_item TEXT,
+    setup_time_min INTEGER,
+    remarks TEXT
+);
+
+CREATE TABLE IF NOT EXISTS shift_attendance (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    shift_id INTEGER NOT NULL,
+    operator TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS shift_downtime (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    shift_id INTEGER NOT NULL,
+    machine TEXT,
+    reason TEXT,
+    minutes INTEGER
+);
+
+/* ================= MACHINE ================= */
+CREATE TABLE IF NOT EXISTS machine_master (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    machine_code    TEXT UNIQUE NOT NULL,
+    machine_name    TEXT NOT NULL,
+    machine_type    TEXT NOT NULL,
+    controller      TEXT,
+    location        TEXT,
+    status          TEXT NOT NULL DEFAULT 'ACTIVE',
+    install_date    DATE,
+    notes           TEXT,
+    created_ts      DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+/* ================= PM ================= */
+CREATE TABLE IF NOT EXISTS pm_master (
+    id                INTEGER PRIMARY KEY AUTOINCREMENT,
+    machine_code      TEXT NOT NULL,
+    pm_name           TEXT NOT NULL,
+    frequency_days    INTEGER NOT NULL,
+    responsibility    TEXT,
+    checklist         TEXT,
+    active            INTEGER DEFAULT 1,
+    created_ts        DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY(machine_code) REFERENCES machine_master(machine_code)
+);
+
+CREATE TABLE IF NOT EXISTS pm_schedule (
+    id                INTEGER PRIMARY KEY AUTOINCREMENT,
+    pm_id             INTEGER NOT NULL,
+    last_done_date    DATE,
+    next_due_date     DATE NOT NULL,
+    status            TEXT NOT NULL DEFAULT 'DUE',
+    FOREIGN KEY(pm_id) REFERENCES pm_master(id)
+);
+
+CREATE TABLE IF NOT EXISTS pm_history (
+    id                INTEGER PRIMARY KEY AUTOINCREMENT,
+    pm_id             INTEGER NOT NULL,
+    done_date         DATE NOT NULL,
+    done_by           TEXT,
+    remarks           TEXT,
+    FOREIGN KEY(pm_id) REFERENCES pm_master(id)
+);
+
+/* ================= BREAKDOWN ================= */
+CREATE TABLE IF NOT EXISTS breakdown_log (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    machine_code    TEXT NOT NULL,
+    breakdown_date  DATE NOT NULL,
+    start_time      TEXT NOT NULL,
+    end_time        TEXT,
+    downtime_min    INTEGER NOT NULL DEFAULT 0,
+    problem         TEXT NOT NULL,
+    root_cause      TEXT,
+    action_taken    TEXT,
+    handled_by      TEXT,
+    status          TEXT NOT NULL DEFAULT 'OPEN',
+    created_ts      DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY(machine_code) REFERENCES machine_master(machine_code)
+);
+
+/* ================= COMPLAINTS ================= */
+CREATE TABLE IF NOT EXISTS customer_complaint (
+    id                  INTEGER PRIMARY KEY AUTOINCREMENT,
+    complaint_no         TEXT UNIQUE NOT NULL,
+    complaint_date       TEXT NOT NULL,
+    customer_id          INTEGER NOT NULL,
+    customer_ref_no      TEXT,
+    item_code            TEXT NOT NULL,
+    batch_no             TEXT,
+    qty_affected         INTEGER DEFAULT 0,
+    issue_category       TEXT NOT NULL,
+    issue_description    TEXT NOT NULL,
+    severity             TEXT NOT NULL DEFAULT 'MED',
+    status               TEXT NOT NULL DEFAULT 'OPEN',
+    machine_code         TEXT,
+    job_no               TEXT,
+    shift_date           TEXT,
+    shift                TEXT,
+    assigned_to          TEXT,
+    containment_action   TEXT,
+    root_cause_5why      TEXT,
+    corrective_action    TEXT,
+    preventive_action    TEXT,
+    closure_date         TEXT,
+    closure_remarks      TEXT,
+    created_ts           TEXT NOT NULL DEFAULT (datetime('now')),
+    updated_ts           TEXT
+);
+
+CREATE TABLE IF NOT EXISTS complaint_action_log (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    complaint_id    INTEGER NOT NULL,
+    action_date     TEXT NOT NULL,
+    action_type     TEXT NOT NULL,
+    notes           TEXT NOT NULL,
+    by_user         TEXT,
+    created_ts      TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+/* ================= INDEXES ================= */
+CREATE INDEX IF NOT EXISTS idx_cc_customer ON customer_complaint(customer_id);
+CREATE INDEX IF NOT EXISTS idx_cc_status   ON customer_complaint(status);
+CREATE INDEX IF NOT EXISTS idx_cc_item     ON customer_complaint(item_code);
+CREATE INDEX IF NOT EXISTS idx_cc_date     ON customer_complaint(complaint_date);
+CREATE INDEX IF NOT EXISTS idx_cc_log_complaint ON complaint_action_log(complaint_id);
+
+CREATE INDEX IF NOT EXISTS idx_breakdown_machine ON breakdown_log(machine_code);
+CREATE INDEX IF NOT EXISTS idx_breakdown_status  ON breakdown_log(status);
+CREATE INDEX IF NOT EXISTS idx_breakdown_date    ON breakdown_log(breakdown_date);
+
+CREATE INDEX IF NOT EXISTS idx_pm_schedule_status ON pm_schedule(status);
+CREATE INDEX IF NOT EXISTS idx_pm_master_machine  ON pm_master(machine_code);
+
+CREATE INDEX IF NOT EXISTS idx_machine_master_type   ON machine_master(machine_type);
+CREATE INDEX IF NOT EXISTS idx_machine_master_status ON machine_master(status);
+
+/* ================= ITEM CODE PPAP / DRAWING DOCS (VERSIONED) ================= */
+CREATE TABLE IF NOT EXISTS item_code_ppap_docs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_code_id INTEGER NOT NULL,
+    doc_name TEXT NOT NULL,
+    stored_name TEXT NOT NULL,
+    doc_type TEXT DEFAULT 'PPAP',
+    notes TEXT DEFAULT '',
+    uploaded_at TEXT NOT NULL,
+    doc_category TEXT DEFAULT 'PPAP',
+    version_no INTEGER DEFAULT 1,
+    is_current INTEGER DEFAULT 1,
+    FOREIGN KEY(item_code_id) REFERENCES item_code_master(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_ppap_item_code_id
+    ON item_code_ppap_docs(item_code_id);
+"""
@@ -0,0 +1,110 @@
+from flask import Blueprint, render_template, request
+from db import get_db
+import consumption
+from http_cache import conditional_get
+import exports
+import wip
+from query_spec import QuerySpec, Filter, eq
+
+analytics_bp = Blueprint("analytics", __name__, url_prefix="/analytics")
+
+
+# ================= TOOL / INSERT CONSUMPTION =================
+
+@analytics_bp.route("/")
+@analytics_bp.route("/consumption")
+@conditional_get("consumption_rollup")
+def consumption_dashboard():
+    db = get_db()
+    crib = request.args.get("crib", "tool")
+    if crib not in consumption.SOURCES:
+        crib = "tool"
+
+    return render_template(
+        "analytics/consumption.html",
+        crib=crib,
+        by_machine=consumption.top(crib, "machine", db=db),
+        by_job=consumption.top(crib, "job", db=db),
+        by_operator=consumption.top(crib, "operator", db=db),
+        weeks=consumption.weekly(crib, db=db),
+        breakage=consumption.breakage_by_type(db=db) if crib == "tool" else [],
+        edges=consumption.edges_per_insert(db=db) if crib == "insert" else [],
+    )
+
+
+# ================= MATERIAL FLOW / WIP =================
+
+LEAD_TIMES = QuerySpec(
+    # one row per inward line; the correlated subqueries read only that
+    # line's dispatch rows (idx_dispatch_inward)
+    """
+    SELECT c.customer_name,
+           ch.customer_challan_no,
+           ch.customer_challan_date,
+           mi.item_code,
+           mi.process,
+           mi.inward_qty,
+           mi.inward_qty - mi.available_qty AS dispatched_qty,
+           mi.available_qty,
+           (SELECT CAST(MIN(julianday(date(md.dispatch_date))) - julianday(date(ch.customer_challan_date)) AS INTEGER)
+            FROM material_dispatch md WHERE md.inward_id = mi.id) AS days_to_first,
+           CASE WHEN mi.available_qty = 0 THEN
+               (SELECT CAST(MAX(julianday(date(md.dispatch_date))) - julianday(date(ch.customer_challan_date)) AS INTEGER)
+                FROM material_dispatch md WHERE md.inward_id = mi.id)
+           END AS turnaround_days,
+           (SELECT ROUND(SUM(md.total_qty * MAX(0, julianday(date(md.dispatch_date))
+                                                - julianday(date(ch.customer_challan_date))))
+                         / NULLIF(SUM(md.total_qty), 0), 1)
+            FROM material_dispatch md WHERE md.inward_id = mi.id) AS avg_lead_days,
+           CASE WHEN mi.available_qty > 0 THEN
+               CAST(julianday('now', 'localtime') - julianday(date(ch.customer_challan_date)) AS INTEGER)
+           END AS open_days
+    FROM customer_challan ch
+    JOIN material_inward mi ON mi.challan_id = ch.id
+    JOIN customer_master c ON c.id = ch.customer_id
+    """,
+    filters=[
+        eq("ch.customer_id", "customer_id"),
+        eq("mi.item_code", "item_code"),
+        eq("mi.process", "process"),
+        Filter("ch.customer_challan_date >= ?", "from_date"),
+        Filter("ch.customer_challan_date <= ?", "to_date"),
+    ],
+    order_by="ch.customer_challan_date, ch.customer_challan_no, mi.id",
+)
+
+exports.register("material_lead_times", "Material Lead Times", [
+    ("Customer", "customer_name"),
+    ("Challan No", "customer_challan_no"),
+    ("Challan Date", "customer_challan_date"),
+    ("Item Code", "item_code"),
+    ("Process", "process"),
+    ("Inward", "inward_qty"),
+    ("Dispatched", "dispatched_qty"),
+    ("Open", "available_qty"),
+    ("Days to First Dispatch", "days_to_first"),
+    ("Turnaround Days", "turnaround_days"),
+    ("Avg Lead Days", "avg_lead_days"),
+    ("Open Days", "open_days"),
+], LEAD_TIMES.ordered)
+
+
+@analytics_bp.route("/wip")
+@conditional_get("dispatch_daily", "material_inward", "customer_challan", "customer_master")
+def wip_dashboard():
+    db = get_db()
+    try:
+        days = min(max(int(request.args.get("days", 90)), 7), 366)
+    except ValueError:
+        days = 90
+
+    return render_template(
+        "analytics/wip.html",
+        days=days,
+        daily=wip.daily(30, db=db),
+        by_process=wip.ratios("process", days, db=db),
+        by_customer=wip.ratios("customer", days, db=db),
+        by_item=wip.ratios("item", days, db=db),
+        aging=wip.aging(db=db),
+        buckets=[label for label, _ in wip.AGING_BUCKETS],
+    )
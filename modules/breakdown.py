@@ -1,7 +1,10 @@
 from flask import Blueprint, render_template, request, redirect, abort
 from datetime import date, datetime
 from flask import current_app
-from db import get_db, fetch_active_machines
+from db import get_db
+import master_data
+import exports
+from query_spec import QuerySpec, eq, date_from, date_to
 
 breakdown_bp = Blueprint("breakdown", __name__, url_prefix="/breakdown")
 
@@ -35,58 +38,57 @@ def bd_home():
 
 
 # ================= LIST =================
-@breakdown_bp.route("/list")
-def bd_list():
-    db = get_db()
-    machines = fetch_active_machines(db)
-
-    machine_code = (request.args.get("machine_code") or "").strip()
-    status = (request.args.get("status") or "").strip()
-    from_date = (request.args.get("from_date") or "").strip()
-    to_date = (request.args.get("to_date") or "").strip()
-
-    query = """
-        SELECT
-            b.id,
-            b.breakdown_date,
-            b.machine_code,
-            mm.machine_name,
-            b.start_time,
-            b.end_time,
-            b.downtime_min,
-            b.problem,
-            b.status,
-            b.handled_by
-        FROM breakdown_log b
-        LEFT JOIN machine_master mm ON mm.machine_code = b.machine_code
-        WHERE 1=1
+BREAKDOWNS = QuerySpec(
     """
-    params = []
+    SELECT
+        b.id,
+        b.breakdown_date,
+        b.machine_code,
+        mm.machine_name,
+        b.start_time,
+        b.end_time,
+        b.downtime_min,
+        b.problem,
+        b.status,
+        b.handled_by
+    FROM breakdown_log b
+    LEFT JOIN machine_master mm ON mm.machine_code = b.machine_code
+    """,
+    filters=[
+        eq("b.machine_code", "machine_code"),
+        eq("b.status", "status"),
+        date_from("b.breakdown_date"),
+        date_to("b.breakdown_date"),
+    ],
+    order_by="b.status DESC, b.breakdown_date DESC, b.id DESC",
+    # status DESC puts OPEN before CLOSED, then newest first
+    # (walks idx_breakdown_status_date)
+    keyset=[
+        ("b.status", "status"),
+        ("b.breakdown_date", "breakdown_date"),
+        ("b.id", "id"),
+    ],
+)
+
+exports.register("breakdowns", "Breakdown Log", [
+    ("Date", "breakdown_date"),
+    ("Machine", "machine_code"),
+    ("Machine Name", "machine_name"),
+    ("Start", "start_time"),
+    ("End", "end_time"),
+    ("Downtime (min)", "downtime_min"),
+    ("Problem", "problem"),
+    ("Status", "status"),
+    ("Handled By", "handled_by"),
+], BREAKDOWNS.ordered)
 
-    if machine_code:
-        query += " AND b.machine_code=?"
-        params.append(machine_code)
 
-    if status:
-        query += " AND b.status=?"
-        params.append(status)
-
-    if from_date:
-        query += " AND date(b.breakdown_date) >= date(?)"
-        params.append(from_date)
-
-    if to_date:
-        query += " AND date(b.breakdown_date) <= date(?)"
-        params.append(to_date)
-
-    query += """
-        ORDER BY
-            CASE b.status WHEN 'OPEN' THEN 1 ELSE 2 END,
-            date(b.breakdown_date) DESC,
-            b.start_time DESC
-    """
+@breakdown_bp.route("/list")
+def bd_list():
+    db = get_db()
+    machines = master_data.active_machines(db)
 
-    rows = db.execute(query, params).fetchall()
+    page = BREAKDOWNS.page(db, request.args)
 
     counts = db.execute("""
         SELECT
@@ -97,7 +99,8 @@ def bd_list():
 
     return render_template(
         "breakdown/bd_list.html",
-        rows=rows,
+        rows=page.rows,
+        page=page,
         machines=machines,
         counts=counts,
         today=date.today().isoformat()
@@ -108,7 +111,7 @@ def bd_list():
 @breakdown_bp.route("/add", methods=["GET", "POST"])
 def bd_add():
     db = get_db()
-    machines = fetch_active_machines(db)
+    machines = master_data.active_machines(db)
 
     if request.method == "POST":
         f = request.form
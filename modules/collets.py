@@ -1,6 +1,10 @@
 from flask import Blueprint, render_template, request, redirect, abort
 from datetime import date
-from db import get_db, fetch_active_machines
+from db import get_db, fetch_active_machines, write_transaction
+import stock
+import ledger
+from pagination import page_from_request
+from http_cache import conditional_get
 
 collets_bp = Blueprint("collets", __name__, url_prefix="/collets")
 
@@ -8,6 +12,7 @@ collets_bp = Blueprint("collets", __name__, url_prefix="/collets")
 # ================= INVENTORY =================
 
 @collets_bp.route("/")
+@conditional_get("collets")
 def collets():
     db = get_db()
     rows = db.execute("""
@@ -44,21 +49,24 @@ def add_collet():
 
     available_qty = total_qty
 
-    db.execute("""
-        INSERT INTO collets
-        (collet_type, interface, size_range, location,
-         total_qty, available_qty, reorder_level, remarks)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(collet_type, interface, size_range, location)
-        DO UPDATE SET
-            total_qty = total_qty + excluded.total_qty,
-            available_qty = available_qty + excluded.total_qty,
-            reorder_level = excluded.reorder_level,
-            remarks = excluded.remarks
-    """, (collet_type, interface, size_range, location,
-          total_qty, available_qty, reorder_level, remarks))
-
-    db.commit()
+    with write_transaction(db):
+        collet_id = db.execute("""
+            INSERT INTO collets
+            (collet_type, interface, size_range, location,
+             total_qty, available_qty, reorder_level, remarks)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(collet_type, interface, size_range, location)
+            DO UPDATE SET
+                total_qty = total_qty + excluded.total_qty,
+                available_qty = available_qty + excluded.total_qty,
+                reorder_level = excluded.reorder_level,
+                remarks = excluded.remarks
+            RETURNING id
+        """, (collet_type, interface, size_range, location,
+              total_qty, available_qty, reorder_level, remarks)).fetchone()[0]
+
+        ledger.record(db, "collet", collet_id, "RECEIPT", total_qty)
+
     return redirect("/collets")
 
 
@@ -69,48 +77,17 @@ def issue_collet():
     db = get_db()
 
     if request.method == "POST":
-        collet_id = request.form["collet_id"]
-        qty = int(request.form.get("qty") or 0)
-
-        if qty <= 0:
-            abort(400, "Quantity must be > 0")
-
-        # ---- HARD CHECK: qty must be <= available_qty ----
-        row = db.execute(
-            "SELECT available_qty FROM collets WHERE id = ?",
-            (collet_id,)
-        ).fetchone()
-
-        available = int(row[0]) if row and row[0] is not None else 0
-
-        if qty > available:
-            abort(400, f"Insufficient stock. Available: {available}")
-
-        # log txn
-        db.execute("""
-            INSERT INTO collet_txn
-            (collet_id, action, qty, operator, machine, shift, txn_date)
-            VALUES (?, 'ISSUE', ?, ?, ?, ?, ?)
-        """, (
-            collet_id,
-            qty,
-            request.form.get("operator", ""),
-            request.form.get("machine", ""),
-            request.form.get("shift", ""),
-            request.form.get("issue_date", str(date.today()))
-        ))
-
-        # safe stock update (extra guard in WHERE)
-        cur = db.execute("""
-            UPDATE collets
-            SET available_qty = available_qty - ?
-            WHERE id = ? AND available_qty >= ?
-        """, (qty, collet_id, qty))
-
-        if cur.rowcount == 0:
-            abort(400, "Stock changed. Try again.")
-
-        db.commit()
+        try:
+            stock.move("collet", "ISSUE", request.form["collet_id"], request.form.get("qty") or 0, {
+                "action": "ISSUE",
+                "operator": request.form.get("operator", ""),
+                "machine": request.form.get("machine", ""),
+                "shift": request.form.get("shift", ""),
+                "txn_date": request.form.get("issue_date", str(date.today())),
+            }, db=db)
+        except stock.StockError as e:
+            abort(400, str(e))
+
         return redirect("/collets")
 
     rows = db.execute("""
@@ -139,31 +116,16 @@ def return_collet():
     db = get_db()
 
     if request.method == "POST":
-        collet_id = request.form["collet_id"]
-        qty = int(request.form.get("qty") or 0)
-
-        if qty <= 0:
-            abort(400, "Quantity must be > 0")
-
-        db.execute("""
-            INSERT INTO collet_txn
-            (collet_id, action, qty, operator, shift, txn_date)
-            VALUES (?, 'RETURN', ?, ?, ?, ?)
-        """, (
-            collet_id,
-            qty,
-            request.form.get("operator", ""),
-            request.form.get("shift", ""),
-            request.form.get("return_date", str(date.today()))
-        ))
-
-        db.execute("""
-            UPDATE collets
-            SET available_qty = available_qty + ?
-            WHERE id = ?
-        """, (qty, collet_id))
-
-        db.commit()
+        try:
+            stock.move("collet", "RETURN", request.form["collet_id"], request.form.get("qty") or 0, {
+                "action": "RETURN",
+                "operator": request.form.get("operator", ""),
+                "shift": request.form.get("shift", ""),
+                "txn_date": request.form.get("return_date", str(date.today())),
+            }, db=db)
+        except stock.StockError as e:
+            abort(400, str(e))
+
         return redirect("/collets")
 
     rows = db.execute("""
@@ -189,7 +151,7 @@ def return_collet():
 @collets_bp.route("/history")
 def collet_history():
     db = get_db()
-    rows = db.execute("""
+    page = page_from_request(db, """
         SELECT
             c.collet_type,
             c.interface,
@@ -199,11 +161,12 @@ def collet_history():
             t.operator,
             t.machine,
             t.shift,
-            t.txn_date
+            t.txn_date,
+            t.id AS txn_id
         FROM collet_txn t
         JOIN collets c ON c.id = t.collet_id
-        ORDER BY t.txn_date DESC
-    """).fetchall()
+        WHERE 1=1
+    """, [], [("t.txn_date", "txn_date"), ("t.id", "txn_id")])
 
-    return render_template("collet_history.html", rows=rows)
+    return render_template("collet_history.html", rows=page.rows, page=page)
 
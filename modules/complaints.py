@@ -1,10 +1,12 @@
 from flask import Blueprint, render_template, request, redirect, abort, current_app
 from datetime import date, datetime
-from db import get_db
-from flask import send_file
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-import io
+from db import get_db, write_transaction
+import master_data
+import sequences
+import complaint_search
+from query_spec import QuerySpec, eq, date_from, date_to
+import reports
+import exports
 
 
 complaints_bp = Blueprint("complaints", __name__, url_prefix="/complaints")
@@ -52,111 +54,71 @@ def check_two_pins(pin1, pin2) -> bool:
     )
 
 
-def _next_complaint_no(db) -> str:
-    """
-    CC-YYYY-###  (resets every year)
-    """
-    year = date.today().year
-    prefix = f"CC-{year}-"
-
-    row = db.execute(
-        """
-        SELECT complaint_no
-        FROM customer_complaint
-        WHERE complaint_no LIKE ?
-        ORDER BY complaint_no DESC
-        LIMIT 1
-        """,
-        (prefix + "%",),
-    ).fetchone()
-
-    if not row:
-        return f"{prefix}001"
+COMPLAINT_PREFIX = "CC"
 
-    last = row["complaint_no"]  # e.g. CC-2025-014
-    try:
-        last_num = int(last.split("-")[-1])
-    except Exception:
-        last_num = 0
 
-    return f"{prefix}{last_num + 1:03d}"
+def _complaint_no(year: int, number: int) -> str:
+    """CC-YYYY-###  (resets every year, 4+ digits after 999)"""
+    return f"{COMPLAINT_PREFIX}-{year}-{number:03d}"
 
 
 # -------------------------
 # List
 # -------------------------
 
-@complaints_bp.route("/")
-def list_complaints():
-    db = get_db()
-
-    customer_id = request.args.get("customer_id", "")
-    item_code = request.args.get("item_code", "")
-    status = request.args.get("status", "")
-    severity = request.args.get("severity", "")
-    from_date = request.args.get("from_date", "")
-    to_date = request.args.get("to_date", "")
-
-    query = """
-        SELECT
-            cc.id,
-            cc.complaint_no,
-            cc.complaint_date,
-            c.customer_name,
-            cc.item_code,
-            cc.issue_category,
-            cc.severity,
-            cc.status,
-            cc.assigned_to
-        FROM customer_complaint cc
-        JOIN customer_master c ON c.id = cc.customer_id
-        WHERE 1=1
+COMPLAINTS = QuerySpec(
     """
-    params = []
-
-    if customer_id:
-        query += " AND cc.customer_id=?"
-        params.append(customer_id)
-
-    if item_code:
-        query += " AND cc.item_code=?"
-        params.append(item_code)
-
-    if status:
-        query += " AND cc.status=?"
-        params.append(status)
-
-    if severity:
-        query += " AND cc.severity=?"
-        params.append(severity)
+    SELECT
+        cc.id,
+        cc.complaint_no,
+        cc.complaint_date,
+        c.customer_name,
+        cc.item_code,
+        cc.issue_category,
+        cc.severity,
+        cc.status,
+        cc.assigned_to
+    FROM customer_complaint cc
+    JOIN customer_master c ON c.id = cc.customer_id
+    """,
+    filters=[
+        eq("cc.customer_id", "customer_id"),
+        eq("cc.item_code", "item_code"),
+        eq("cc.status", "status"),
+        eq("cc.severity", "severity"),
+        date_from("cc.complaint_date"),
+        date_to("cc.complaint_date"),
+    ],
+    order_by="cc.complaint_date DESC, cc.id DESC",
+    keyset=[("cc.complaint_date", "complaint_date"), ("cc.id", "id")],
+)
+
+exports.register("complaints", "Customer Complaints", [
+    ("Complaint No", "complaint_no"),
+    ("Date", "complaint_date"),
+    ("Customer", "customer_name"),
+    ("Item Code", "item_code"),
+    ("Category", "issue_category"),
+    ("Severity", "severity"),
+    ("Status", "status"),
+    ("Assigned To", "assigned_to"),
+], COMPLAINTS.ordered)
 
-    if from_date:
-        query += " AND date(cc.complaint_date) >= date(?)"
-        params.append(from_date)
 
-    if to_date:
-        query += " AND date(cc.complaint_date) <= date(?)"
-        params.append(to_date)
-
-    query += " ORDER BY date(cc.complaint_date) DESC, cc.id DESC"
+@complaints_bp.route("/")
+def list_complaints():
+    db = get_db()
 
-    rows = db.execute(query, params).fetchall()
+    page = COMPLAINTS.page(db, request.args)
 
-    customers = db.execute("""
-        SELECT id, customer_name
-        FROM customer_master
-        ORDER BY customer_name
-    """).fetchall()
+    customers = master_data.customers(db)
 
-    item_codes = db.execute("""
-        SELECT item_code
-        FROM item_code_master
-        ORDER BY item_code
-    """).fetchall()
+    item_codes = master_data.item_codes(db)
 
     return render_template(
         "complaints/complaints.html",
-        rows=rows,
+        rows=page.rows,
+        page=page,
         customers=customers,
         item_codes=item_codes,
         statuses=STATUSES,
@@ -165,33 +127,31 @@ def list_complaints():
 
 
 # -------------------------
-# Add complaint
+# Full-text search
 # -------------------------
 
-@complaints_bp.route("/add", methods=["GET", "POST"])
-def add_complaint():
-    db = get_db()
+@complaints_bp.route("/search")
+def search_complaints():
+    q = (request.args.get("q") or "").strip()
+    page = complaint_search.search(q)
 
-    customers = db.execute("""
-        SELECT id, customer_name
-        FROM customer_master
-        ORDER BY customer_name
-    """).fetchall()
+    return render_template(
+        "complaints/search.html",
+        q=q,
+        rows=page.rows if page else [],
+        page=page,
+        snippet=complaint_search.snippet_html,
+    )
 
-    item_codes = db.execute("""
-        SELECT item_code
-        FROM item_code_master
-        ORDER BY item_code
-    """).fetchall()
 
-    machines = db.execute("""
-        SELECT machine_code, machine_name
-        FROM machine_master
-        WHERE status='ACTIVE'
-        ORDER BY machine_code
-    """).fetchall()
+# -------------------------
+# Add complaint
+# -------------------------
 
-    complaint_no = _next_complaint_no(db)
+@complaints_bp.route("/add", methods=["GET", "POST"])
+def add_complaint():
+    db = get_db()
+    year = date.today().year
 
     if request.method == "POST":
         complaint_date = request.form.get("complaint_date") or ""
@@ -217,10 +177,14 @@ def add_complaint():
 
         if not complaint_date:
             abort(400, "Complaint date required")
-        if not customer_id:
+        if not customer_id or not master_data.customer_exists(customer_id, db):
             abort(400, "Customer required")
         if not item_code:
             abort(400, "Item code required")
+        if not master_data.item_code_exists(item_code, db):
+            abort(400, f"Unknown item code: {item_code}")
+        if machine_code and not master_data.machine_is_active(machine_code, db):
+            abort(400, f"Unknown or inactive machine: {machine_code}")
         if issue_category not in ISSUE_CATEGORIES:
             abort(400, "Invalid category")
         if not issue_description:
@@ -228,63 +192,59 @@ def add_complaint():
         if severity not in SEVERITIES:
             abort(400, "Invalid severity")
 
-        # allocate complaint_no at save time (in case multiple users add simultaneously)
-        complaint_no_final = _next_complaint_no(db)
-
-        db.execute("""
-            INSERT INTO customer_complaint
-            (complaint_no, complaint_date, customer_id, customer_ref_no,
-             item_code, batch_no, qty_affected,
-             issue_category, issue_description, severity,
-             status, machine_code, job_no, shift_date, shift,
-             assigned_to, containment_action, updated_ts)
-            VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-        """, (
-            complaint_no_final,
-            complaint_date,
-            customer_id,
-            customer_ref_no,
-            item_code,
-            batch_no,
-            qty_affected,
-            issue_category,
-            issue_description,
-            severity,
-            "OPEN",
-            machine_code,
-            job_no,
-            shift_date,
-            shift,
-            assigned_to,
-            containment_action,
-            datetime.now().isoformat(timespec="seconds")
-        ))
-
-        complaint_id = db.execute("SELECT last_insert_rowid()").fetchone()[0]
-
-        # auto-log creation
-        db.execute("""
-            INSERT INTO complaint_action_log
-            (complaint_id, action_date, action_type, notes, by_user)
-            VALUES (?,?,?,?,?)
-        """, (
-            complaint_id,
-            complaint_date,
-            "NOTE",
-            f"Complaint registered: {issue_category}",
-            assigned_to or ""
-        ))
-
-        db.commit()
+        with write_transaction(db):
+            # allocated at save time, in the same transaction as the insert
+            complaint_no = _complaint_no(year, sequences.next_value(db, COMPLAINT_PREFIX, year))
+
+            complaint_id = db.execute("""
+                INSERT INTO customer_complaint
+                (complaint_no, complaint_date, customer_id, customer_ref_no,
+                 item_code, batch_no, qty_affected,
+                 issue_category, issue_description, severity,
+                 status, machine_code, job_no, shift_date, shift,
+                 assigned_to, containment_action, updated_ts)
+                VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+                RETURNING id
+            """, (
+                complaint_no,
+                complaint_date,
+                customer_id,
+                customer_ref_no,
+                item_code,
+                batch_no,
+                qty_affected,
+                issue_category,
+                issue_description,
+                severity,
+                "OPEN",
+                machine_code,
+                job_no,
+                shift_date,
+                shift,
+                assigned_to,
+                containment_action,
+                datetime.now().isoformat(timespec="seconds")
+            )).fetchone()[0]
+
+            # auto-log creation
+            db.execute("""
+                INSERT INTO complaint_action_log
+                (complaint_id, action_date, action_type, notes, by_user)
+                VALUES (?,?,?,?,?)
+            """, (
+                complaint_id,
+                complaint_date,
+                "NOTE",
+                f"Complaint registered: {issue_category}",
+                assigned_to or ""
+            ))
+
         return redirect(f"/complaints/view/{complaint_id}")
 
     return render_template(
         "complaints/complaint_add.html",
         today=date.today().isoformat(),
-        complaint_no=complaint_no,
-        customers=customers,
-        item_codes=item_codes,
-        machines=machines,
+        complaint_no=_complaint_no(year, sequences.peek_value(COMPLAINT_PREFIX, year, db=db)),
         categories=ISSUE_CATEGORIES,
         severities=SEVERITIES
     )
@@ -317,24 +277,11 @@ def view_complaint(cid: int):
         ORDER BY date(action_date) DESC, id DESC
     """, (cid,)).fetchall()
 
-    customers = db.execute("""
-        SELECT id, customer_name
-        FROM customer_master
-        ORDER BY customer_name
-    """).fetchall()
-
-    item_codes = db.execute("""
-        SELECT item_code
-        FROM item_code_master
-        ORDER BY item_code
-    """).fetchall()
-
-    machines = db.execute("""
-        SELECT machine_code, machine_name
-        FROM machine_master
-        WHERE status='ACTIVE'
-        ORDER BY machine_code
-    """).fetchall()
+    customers = master_data.customers(db)
+
+    item_codes = master_data.item_codes(db)
+
+    machines = master_data.active_machines(db)
 
     return render_template(
         "complaints/complaint_view.html",
@@ -351,11 +298,13 @@ def view_complaint(cid: int):
     )
 
 
-@complaints_bp.route("/view/<int:cid>/pdf")
-@complaints_bp.route("/view/<int:cid>/pdf")
-def complaint_pdf(cid: int):
-    db = get_db()
-
+@reports.report(
+    "complaint",
+    title="Customer Complaint Report",
+    tables=("customer_complaint", "complaint_action_log", "customer_master"),
+    filename="complaint_{cid}.pdf",
+)
+def render_complaint_pdf(pdf, db, params):
     header = db.execute("""
         SELECT
             cc.*,
@@ -363,177 +312,63 @@ def complaint_pdf(cid: int):
         FROM customer_complaint cc
         JOIN customer_master c ON c.id = cc.customer_id
         WHERE cc.id=?
-    """, (cid,)).fetchone()
-
-    if not header:
-        abort(404)
+    """, (params["cid"],)).fetchone()
 
-    logs = db.execute("""
-        SELECT *
-        FROM complaint_action_log
-        WHERE complaint_id=?
-        ORDER BY date(action_date) DESC, id DESC
-    """, (cid,)).fetchall()
-
-    # ---- sqlite3.Row safe getter ----
-    def rget(row, key, default=""):
-        try:
-            return row[key]
-        except Exception:
-            return default
-
-    buffer = io.BytesIO()
-    pdf = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-
-    def wrap_text(text, max_width, font="Helvetica", size=9):
-        pdf.setFont(font, size)
-        if text is None or str(text).strip() == "":
-            return ["-"]
-        words = str(text).split()
-        lines, cur = [], ""
-        for w in words:
-            test = (cur + " " + w).strip()
-            if pdf.stringWidth(test, font, size) <= max_width:
-                cur = test
-            else:
-                if cur:
-                    lines.append(cur)
-                cur = w
-        if cur:
-            lines.append(cur)
-        return lines
-
-    y = height - 40
-    pdf.setFont("Helvetica-Bold", 14)
-    pdf.drawString(40, y, "Customer Complaint Report")
-    y -= 18
-    pdf.setFont("Helvetica", 9)
-    pdf.drawString(40, y, f"Generated on: {date.today().isoformat()}")
-    y -= 18
-    pdf.line(40, y, width - 40, y)
-    y -= 18
+    pdf.title("Customer Complaint Report", f"Generated on: {date.today().isoformat()}")
+    pdf.rule()
 
     # Header fields
-    pdf.setFont("Helvetica-Bold", 11)
-    pdf.drawString(40, y, f"Complaint ID: {rget(header, 'id')}")
-    y -= 16
-
-    fields = [
-        ("Customer", rget(header, "customer_name")),
-        ("Complaint Date", rget(header, "complaint_date")),
-        ("Status", rget(header, "status")),
-        ("Category", rget(header, "issue_category")),
-        ("Severity", rget(header, "severity")),
-        ("Assigned To", rget(header, "assigned_to")),
-        ("Machine", rget(header, "machine_code")),
-        ("Item Code", rget(header, "item_code")),
-        ("ELTA Ref / Challan", rget(header, "elta_ref") or rget(header, "elta_challan_no") or ""),
-    ]
-
-    pdf.setFont("Helvetica", 9)
-    for k, v in fields:
-        if y < 80:
-            pdf.showPage()
-            y = height - 60
-            pdf.setFont("Helvetica", 9)
-
-        pdf.setFont("Helvetica-Bold", 9)
-        pdf.drawString(40, y, f"{k}:")
-        pdf.setFont("Helvetica", 9)
-        pdf.drawString(160, y, (str(v) if v else "-"))
-        y -= 14
-
-    y -= 6
-    pdf.line(40, y, width - 40, y)
-    y -= 18
+    pdf.heading(f"Complaint No: {header['complaint_no']}", size=11)
+    pdf.fields([
+        ("Customer", header["customer_name"]),
+        ("Customer Ref", header["customer_ref_no"]),
+        ("Complaint Date", header["complaint_date"]),
+        ("Status", header["status"]),
+        ("Category", header["issue_category"]),
+        ("Severity", header["severity"]),
+        ("Assigned To", header["assigned_to"]),
+        ("Machine", header["machine_code"]),
+        ("Item Code", header["item_code"]),
+        ("Batch No", header["batch_no"]),
+        ("Qty Affected", header["qty_affected"]),
+    ])
+    pdf.down(6)
+    pdf.rule()
 
     # Long text sections
-    problem = rget(header, "problem_desc") or rget(header, "problem_description")
-    sections = [
-        ("Problem Description", problem),
-        ("Root Cause", rget(header, "root_cause")),
-        ("Corrective Action", rget(header, "corrective_action")),
-        ("Preventive Action", rget(header, "preventive_action")),
-        ("Remarks", rget(header, "remarks")),
-    ]
-
-    for title, text in sections:
-        if y < 120:
-            pdf.showPage()
-            y = height - 60
-
-        pdf.setFont("Helvetica-Bold", 10)
-        pdf.drawString(40, y, title)
-        y -= 14
-        pdf.setFont("Helvetica", 9)
-
-        for line in wrap_text(text, max_width=width - 80):
-            if y < 60:
-                pdf.showPage()
-                y = height - 60
-                pdf.setFont("Helvetica", 9)
-            pdf.drawString(40, y, line)
-            y -= 12
-
-        y -= 8
+    for title, key in (
+        ("Problem Description", "issue_description"),
+        ("Containment Action", "containment_action"),
+        ("Root Cause (5-Why)", "root_cause_5why"),
+        ("Corrective Action", "corrective_action"),
+        ("Preventive Action", "preventive_action"),
+        ("Closure Remarks", "closure_remarks"),
+    ):
+        pdf.heading(title)
+        pdf.paragraph(header[key])
+        pdf.down(8)
 
     # Logs section
-    if y < 120:
-        pdf.showPage()
-        y = height - 60
-
-    pdf.setFont("Helvetica-Bold", 11)
-    pdf.drawString(40, y, "Action Log")
-    y -= 16
-
-    pdf.setFont("Helvetica-Bold", 9)
-    pdf.drawString(40, y, "Date")
-    pdf.drawString(120, y, "Type")
-    pdf.drawString(200, y, "By")
-    pdf.drawString(290, y, "Notes")
-    y -= 12
-    pdf.setFont("Helvetica", 9)
-
-    for r in logs:
-        if y < 60:
-            pdf.showPage()
-            y = height - 60
-            pdf.setFont("Helvetica", 9)
-
-        action_date = (rget(r, "action_date") or "")[:10]
-        action_type = (rget(r, "action_type") or rget(r, "log_type") or "-")[:12]
-        action_by = (rget(r, "action_by") or rget(r, "owner") or "-")[:12]
-        notes = rget(r, "notes") or rget(r, "remark") or ""
-
-        pdf.drawString(40, y, action_date or "-")
-        pdf.drawString(120, y, action_type)
-        pdf.drawString(200, y, action_by)
-
-        note_lines = wrap_text(notes, max_width=width - 290 - 40)
-        pdf.drawString(290, y, note_lines[0] if note_lines else "-")
-        y -= 12
-
-        for extra in note_lines[1:]:
-            if y < 60:
-                pdf.showPage()
-                y = height - 60
-                pdf.setFont("Helvetica", 9)
-            pdf.drawString(290, y, extra)
-            y -= 12
-
-        y -= 2
-
-    pdf.save()
-    buffer.seek(0)
-
-    return send_file(
-        buffer,
-        as_attachment=True,
-        download_name=f"complaint_{rget(header, 'id')}.pdf",
-        mimetype="application/pdf"
-    )
+    pdf.heading("Action Log", size=11, keep_with=120)
+    pdf.table([
+        reports.Column("Date", 40, lambda r: (r["action_date"] or "-")[:10]),
+        reports.Column("Type", 120, lambda r: (r["action_type"] or "-")[:12]),
+        reports.Column("By", 200, lambda r: (r["by_user"] or "-")[:12]),
+        reports.Column("Notes", 290, "notes", width=pdf.width - 290 - 40),
+    ], db.execute("""
+        SELECT action_date, action_type, by_user, notes
+        FROM complaint_action_log
+        WHERE complaint_id=?
+        ORDER BY date(action_date) DESC, id DESC
+    """, (params["cid"],)), leading=14)
+
 
+@complaints_bp.route("/view/<int:cid>/pdf")
+def complaint_pdf(cid: int):
+    db = get_db()
+    if not db.execute("SELECT 1 FROM customer_complaint WHERE id=?", (cid,)).fetchone():
+        abort(404)
+    return reports.respond("complaint", {"cid": cid})
 
 
 # -------------------------
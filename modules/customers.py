@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, request, redirect, abort
 from db import get_db
+from http_cache import conditional_get
 
 customers_bp = Blueprint("customers", __name__, url_prefix="/customers")
 
@@ -8,6 +9,7 @@ ADMIN_PIN = "1234"   # 🔐 change later or move to config
 # ================= LIST =================
 
 @customers_bp.route("/")
+@conditional_get("customer_master")
 def customers():
     db = get_db()
     rows = db.execute("""
@@ -1,7 +1,12 @@
 from flask import Blueprint, render_template, request, redirect
-from db import get_db
+from db import get_db, data_version, write_transaction
 from datetime import date, timedelta
+import threading
+import scheduler
+import sequences
 from db import fetch_active_machines
+from pagination import page_from_request
+from http_cache import conditional_get
 
 gauges_bp = Blueprint("gauges", __name__, url_prefix="/gauges")
 
@@ -27,70 +32,78 @@ PREFIX_MAP = {
 }
 
 def generate_gauge_code(db, subtype):
+    """PFX-###: next number of the subtype's prefix. Call inside the insert transaction."""
     prefix = PREFIX_MAP.get(subtype, "CUS")
-    row = db.execute("""
-        SELECT gauge_code FROM gauges
-        WHERE gauge_code LIKE ?
-        ORDER BY gauge_code DESC LIMIT 1
-    """, (f"{prefix}-%",)).fetchone()
+    return f"{prefix}-{sequences.next_value(db, prefix):03d}"
 
-    if row:
-        last_num = int(row[0].split("-")[1])
-        return f"{prefix}-{last_num + 1:03d}"
-    else:
-        return f"{prefix}-001"
 
+# ================= STATUS ENGINE =================
+# OVERDUE / DUE / OK follow next_calibration; DAMAGED is set by a damaged
+# return and stays until the gauge is calibrated again.
 
-def update_gauge_status(row):
-    if not row["next_calibration"]:
-        return "OK"
+DUE_WINDOW_DAYS = 30
 
+STATUS_CASE = """
+    CASE
+        WHEN next_calibration IS NULL OR next_calibration = '' THEN 'OK'
+        WHEN next_calibration < :today THEN 'OVERDUE'
+        WHEN next_calibration <= :due_by THEN 'DUE'
+        ELSE 'OK'
+    END
+"""
+
+STATUS_ORDER_SQL = """
+    CASE status WHEN 'OVERDUE' THEN 1 WHEN 'DUE' THEN 2 WHEN 'OK' THEN 3 WHEN 'DAMAGED' THEN 4 ELSE 99 END,
+    COALESCE(next_calibration, '9999-12-31'),
+    id
+"""
+
+_status_lock = threading.Lock()
+_status_checked = None      # (date, gauges data_version) of the last refresh
+
+
+def refresh_gauge_statuses(db, force=False):
+    """
+    One set-based UPDATE for all gauges whose stored status is stale.
+    Skipped unless the day changed or the gauges table was written since
+    the last run, so a page view normally pays one counter lookup.
+    """
+    global _status_checked
     today = date.today()
-    next_cal = date.fromisoformat(row["next_calibration"])
+    key = (today, data_version("gauges", db=db))
+    if not force and key == _status_checked:
+        return 0
+
+    with _status_lock, write_transaction(db):
+        params = {
+            "today": today.isoformat(),
+            "due_by": (today + timedelta(days=DUE_WINDOW_DAYS)).isoformat(),
+        }
+        changed = db.execute(f"""
+            UPDATE gauges
+            SET status = {STATUS_CASE}
+            WHERE status IS NOT 'DAMAGED'
+              AND status IS NOT {STATUS_CASE}
+        """, params).rowcount
+        # our own UPDATE bumped the counter; remember the post-refresh value
+        _status_checked = (today, data_version("gauges", db=db))
+    return changed
 
-    if today > next_cal:
-        return "OVERDUE"
-    elif today + timedelta(days=30) >= next_cal:
-        return "DUE"
-    return "OK"
+
+@scheduler.daily("gauge status rollover")
+def _gauge_status_rollover(db, today):
+    refresh_gauge_statuses(db, force=True)
 
 
 # ================= MASTER LIST =================
 @gauges_bp.route("/")
+@conditional_get("gauges")
 def gauges():
     db = get_db()
-    rows = db.execute("SELECT * FROM gauges").fetchall()
-
-    # Update status based on calibration date
-    updated = False
-    for r in rows:
-        new_status = update_gauge_status(r)
-        if new_status != r["status"]:
-            db.execute(
-                "UPDATE gauges SET status=? WHERE id=?",
-                (new_status, r["id"])
-            )
-            updated = True
-
-    if updated:
-        db.commit()
-        rows = db.execute("SELECT * FROM gauges").fetchall()
+    refresh_gauge_statuses(db)
 
     # ---- AUTO SORT: OVERDUE → DUE → OK ----
-    status_order = {
-        "OVERDUE": 1,
-        "DUE": 2,
-        "OK": 3,
-        "DAMAGED": 4
-    }
-
-    rows = sorted(
-        rows,
-        key=lambda r: (
-            status_order.get(r["status"], 99),
-            r["next_calibration"] or "9999-12-31"
-        )
-    )
+    rows = db.execute(f"SELECT * FROM gauges ORDER BY {STATUS_ORDER_SQL}").fetchall()
 
     return render_template(
         "gauges.html",
@@ -107,7 +120,6 @@ def add_gauge():
 
     if request.method == "POST":
         subtype = request.form["subtype"]
-        gauge_code = generate_gauge_code(db, subtype)
 
         last_cal = request.form.get("last_calibration") or None
         freq = int(request.form.get("calibration_freq", 365))
@@ -119,29 +131,30 @@ def add_gauge():
                 timedelta(days=freq)
             )
 
-        db.execute("""
-            INSERT INTO gauges
-            (gauge_code, category, subtype, mechanism, range,
-             least_count, make, serial_no, location,
-             calibration_freq, last_calibration, next_calibration, remarks)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            gauge_code,
-            request.form["category"],
-            subtype,
-            request.form["mechanism"],
-            request.form["range"],
-            request.form.get("least_count"),
-            request.form.get("make"),
-            request.form.get("serial_no"),
-            request.form.get("location"),
-            freq,
-            last_cal,
-            next_cal,
-            request.form.get("remarks")
-        ))
+        with write_transaction(db):
+            gauge_code = generate_gauge_code(db, subtype)
+            db.execute("""
+                INSERT INTO gauges
+                (gauge_code, category, subtype, mechanism, range,
+                 least_count, make, serial_no, location,
+                 calibration_freq, last_calibration, next_calibration, remarks)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                gauge_code,
+                request.form["category"],
+                subtype,
+                request.form["mechanism"],
+                request.form["range"],
+                request.form.get("least_count"),
+                request.form.get("make"),
+                request.form.get("serial_no"),
+                request.form.get("location"),
+                freq,
+                last_cal,
+                next_cal,
+                request.form.get("remarks")
+            ))
 
-        db.commit()
         return redirect("/gauges")
 
     return render_template("gauge_add.html")
@@ -169,6 +182,7 @@ def issue_gauge():
         db.commit()
         return redirect("/gauges")
 
+    refresh_gauge_statuses(db)
     rows = db.execute("""
         SELECT * FROM gauges
         WHERE status IN ('OK', 'DUE')
@@ -268,14 +282,15 @@ def calibrate_gauge():
 @gauges_bp.route("/history")
 def gauge_history():
     db = get_db()
-    rows = db.execute("""
+    page = page_from_request(db, """
         SELECT g.gauge_code, g.subtype,
                t.action, t.operator, t.machine,
-               t.job, t.shift, t.condition_on_return, t.txn_date
+               t.job, t.shift, t.condition_on_return, t.txn_date,
+               t.id AS txn_id
         FROM gauge_issue_txn t
         JOIN gauges g ON g.id = t.gauge_id
-        ORDER BY t.txn_date DESC
-    """).fetchall()
+        WHERE 1=1
+    """, [], [("t.txn_date", "txn_date"), ("t.id", "txn_id")])
 
-    return render_template("gauge_history.html", rows=rows)
+    return render_template("gauge_history.html", rows=page.rows, page=page)
 
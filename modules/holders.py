@@ -1,12 +1,18 @@
-from flask import Blueprint, render_template, request, redirect
-from db import get_db
+from flask import Blueprint, render_template, request, redirect, abort
+from db import get_db, write_transaction
 from datetime import date
 from db import fetch_active_machines
+import stock
+import ledger
+import exports
+from http_cache import conditional_get
+from query_spec import QuerySpec
 
 holders_bp = Blueprint("holders", __name__, url_prefix="/holders")
 
 
 @holders_bp.route("/")
+@conditional_get("holders")
 def holders():
     con = get_db()
     rows = con.execute("""
@@ -25,29 +31,34 @@ def add_holder():
     f = request.form
     con = get_db()
 
-    con.execute("""
-        INSERT INTO holders
-        (holder_type, interface, size, projection, location, remarks,
-         total_qty, reorder_level)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(holder_type, interface, size, projection)
-        DO UPDATE SET
-            total_qty = total_qty + excluded.total_qty,
-            reorder_level = excluded.reorder_level,
-            location = excluded.location,
-            remarks = excluded.remarks
-    """, (
-        f["holder_type"],
-        f["interface"],
-        f["size"],
-        f["projection"],
-        f["location"],
-        f.get("remarks",""),
-        int(f["total_qty"]),
-        int(f["reorder_level"])
-    ))
-
-    con.commit()
+    qty = int(f["total_qty"])
+
+    with write_transaction(con):
+        holder_id = con.execute("""
+            INSERT INTO holders
+            (holder_type, interface, size, projection, location, remarks,
+             total_qty, reorder_level)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(holder_type, interface, size, projection)
+            DO UPDATE SET
+                total_qty = total_qty + excluded.total_qty,
+                reorder_level = excluded.reorder_level,
+                location = excluded.location,
+                remarks = excluded.remarks
+            RETURNING id
+        """, (
+            f["holder_type"],
+            f["interface"],
+            f["size"],
+            f["projection"],
+            f["location"],
+            f.get("remarks",""),
+            qty,
+            int(f["reorder_level"])
+        )).fetchone()[0]
+
+        ledger.record(con, "holder", holder_id, "RECEIPT", qty)
+
     con.close()
     return redirect("/holders")
 
@@ -58,29 +69,17 @@ def holder_issue():
 
     if request.method == "POST":
         f = request.form
-        qty = int(f["qty"])
-        holder_id = int(f["holder_id"])
-
-        con.execute("""
-            UPDATE holders
-            SET issued_qty = issued_qty + ?
-            WHERE id=?
-        """, (qty, holder_id))
-
-        con.execute("""
-            INSERT INTO holder_txn
-            (holder_id, action, qty, operator, machine, shift, ts)
-            VALUES (?, 'ISSUE', ?, ?, ?, ?, ?)
-        """, (
-            holder_id, qty,
-            f["operator"],
-            f["machine"],
-            f["shift"],
-            f["issue_date"]
-        ))
-
-        con.commit()
-        con.close()
+        try:
+            stock.move("holder", "ISSUE", int(f["holder_id"]), f["qty"], {
+                "action": "ISSUE",
+                "operator": f["operator"],
+                "machine": f["machine"],
+                "shift": f["shift"],
+                "ts": f["issue_date"],
+            }, db=con)
+        except stock.StockError as e:
+            abort(400, str(e))
+
         return redirect("/holders")
 
     holders = con.execute("""
@@ -103,29 +102,17 @@ def holder_return():
 
     if request.method == "POST":
         f = request.form
-        qty = int(f["qty"])
-        holder_id = int(f["holder_id"])
-
-        con.execute("""
-            UPDATE holders
-            SET issued_qty = issued_qty - ?
-            WHERE id=?
-        """, (qty, holder_id))
-
-        con.execute("""
-            INSERT INTO holder_txn
-            (holder_id, action, qty, operator, shift, remarks, ts)
-            VALUES (?, 'RETURN', ?, ?, ?, ?, ?)
-        """, (
-            holder_id, qty,
-            f["operator"],
-            f["shift"],
-            f.get("remarks",""),
-            f["return_date"]
-        ))
+        try:
+            stock.move("holder", "RETURN", int(f["holder_id"]), f["qty"], {
+                "action": "RETURN",
+                "operator": f["operator"],
+                "shift": f["shift"],
+                "remarks": f.get("remarks", ""),
+                "ts": f["return_date"],
+            }, db=con)
+        except stock.StockError as e:
+            abort(400, str(e))
 
-        con.commit()
-        con.close()
         return redirect("/holders")
 
     holders = con.execute("""
@@ -142,17 +129,30 @@ def holder_return():
     )
 
 
+HISTORY = QuerySpec(
+    """
+    SELECT h.holder_type, h.interface, h.size, h.projection,
+           t.action, t.qty, t.operator, t.machine, t.shift, t.ts,
+           t.id AS txn_id
+    FROM holder_txn t
+    JOIN holders h ON h.id = t.holder_id
+    """,
+    order_by="t.ts DESC, t.id DESC",
+    keyset=[("t.ts", "ts"), ("t.id", "txn_id")],
+)
+
+exports.register("holder_history", "Holder History", (
+    ("Date", "ts"), ("Holder", "holder_type"), ("Interface", "interface"), ("Size", "size"),
+    ("Projection", "projection"), ("Action", "action"), ("Qty", "qty"),
+    ("Operator", "operator"), ("Machine", "machine"), ("Shift", "shift"),
+), HISTORY.ordered)
+
+
 @holders_bp.route("/history")
 def holder_history():
     con = get_db()
-    rows = con.execute("""
-        SELECT h.holder_type, h.interface, h.size, h.projection,
-               t.action, t.qty, t.operator, t.machine, t.shift, t.ts
-        FROM holder_txn t
-        JOIN holders h ON h.id = t.holder_id
-        ORDER BY t.ts DESC
-    """).fetchall()
+    page = HISTORY.page(con, request.args)
     con.close()
 
-    return render_template("holder_history.html", rows=rows)
+    return render_template("holder_history.html", rows=page.rows, page=page)
 
@@ -1,13 +1,19 @@
-from flask import Blueprint, render_template, request, redirect
-from db import get_db
+from flask import Blueprint, render_template, request, redirect, abort
+from db import get_db, write_transaction
 from datetime import date
 from db import fetch_active_machines
+import stock
+import ledger
+import exports
+from http_cache import conditional_get
+from query_spec import QuerySpec
 
 inserts_bp = Blueprint("inserts", __name__, url_prefix="/inserts")
 
 # ================= INVENTORY =================
 
 @inserts_bp.route("/")
+@conditional_get("inserts")
 def inserts():
     db = get_db()
     rows = db.execute("""
@@ -42,21 +48,24 @@ def add_insert():
     # available_qty should start same as total_qty for a new add
     available_qty = total_qty
 
-    db.execute("""
-        INSERT INTO inserts
-        (insert_type, size, grade, edges,
-         total_qty, available_qty, reorder_level, remarks)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(insert_type, size, grade)
-        DO UPDATE SET
-            total_qty = total_qty + excluded.total_qty,
-            available_qty = available_qty + excluded.total_qty,
-            reorder_level = excluded.reorder_level,
-            edges = excluded.edges,
-            remarks = excluded.remarks
-    """, (insert_type, size, grade, edges, total_qty, available_qty, reorder_level, remarks))
+    with write_transaction(db):
+        insert_id = db.execute("""
+            INSERT INTO inserts
+            (insert_type, size, grade, edges,
+             total_qty, available_qty, reorder_level, remarks)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(insert_type, size, grade)
+            DO UPDATE SET
+                total_qty = total_qty + excluded.total_qty,
+                available_qty = available_qty + excluded.total_qty,
+                reorder_level = excluded.reorder_level,
+                edges = excluded.edges,
+                remarks = excluded.remarks
+            RETURNING id
+        """, (insert_type, size, grade, edges, total_qty, available_qty, reorder_level, remarks)).fetchone()[0]
+
+        ledger.record(db, "insert", insert_id, "RECEIPT", total_qty)
 
-    db.commit()
     return redirect("/inserts")
 
 
@@ -67,27 +76,18 @@ def issue_insert():
     db = get_db()
 
     if request.method == "POST":
-        db.execute("""
-            INSERT INTO insert_txn
-            (insert_id, action, qty, operator, machine, job, shift, txn_date)
-            VALUES (?, 'ISSUE', ?, ?, ?, ?, ?, ?)
-        """, (
-            request.form["insert_id"],
-            request.form["qty"],
-            request.form["operator"],
-            request.form["machine"],
-            request.form["job"],
-            request.form["shift"],
-            request.form["issue_date"]
-        ))
-
-        db.execute("""
-            UPDATE inserts
-            SET available_qty = available_qty - ?
-            WHERE id = ?
-        """, (request.form["qty"], request.form["insert_id"]))
-
-        db.commit()
+        try:
+            stock.move("insert", "ISSUE", request.form["insert_id"], request.form["qty"], {
+                "action": "ISSUE",
+                "operator": request.form["operator"],
+                "machine": request.form["machine"],
+                "job": request.form["job"],
+                "shift": request.form["shift"],
+                "txn_date": request.form["issue_date"],
+            }, db=db)
+        except stock.StockError as e:
+            abort(400, str(e))
+
         return redirect("/inserts")
 
     rows = db.execute("SELECT * FROM inserts WHERE available_qty > 0").fetchall()
@@ -133,31 +133,17 @@ def scrap_insert():
             return "Missing required fields", 400
 
         try:
-            qty_i = int(qty)
-        except ValueError:
-            return "Invalid qty", 400
-
-        db.execute("""
-            INSERT INTO insert_txn
-            (insert_id, action, qty, operator, machine, job, shift, txn_date)
-            VALUES (?, 'SCRAP', ?, ?, ?, ?, ?, ?)
-        """, (
-            insert_id,
-            qty_i,
-            operator,
-            "",   # machine
-            "",   # job
-            "",   # shift
-            txn_date
-        ))
-
-        db.execute("""
-            UPDATE inserts
-            SET available_qty = available_qty - ?
-            WHERE id = ?
-        """, (qty_i, insert_id))
-
-        db.commit()
+            stock.move("insert", "SCRAP", insert_id, qty, {
+                "action": "SCRAP",
+                "operator": operator,
+                "machine": "",
+                "job": "",
+                "shift": "",
+                "txn_date": txn_date,
+            }, db=db)
+        except stock.StockError as e:
+            return str(e), 400
+
         return redirect("/inserts")
 
     rows = db.execute("SELECT * FROM inserts").fetchall()
@@ -167,17 +153,30 @@ def scrap_insert():
 
 # ================= HISTORY =================
 
+HISTORY = QuerySpec(
+    """
+    SELECT i.insert_type, i.size, i.grade,
+           t.action, t.qty, t.edges_used,
+           t.operator, t.machine, t.job, t.shift, t.txn_date,
+           t.id AS txn_id
+    FROM insert_txn t
+    JOIN inserts i ON i.id = t.insert_id
+    """,
+    order_by="t.txn_date DESC, t.id DESC",
+    keyset=[("t.txn_date", "txn_date"), ("t.id", "txn_id")],
+)
+
+exports.register("insert_history", "Insert History", (
+    ("Date", "txn_date"), ("Insert", "insert_type"), ("Size", "size"), ("Grade", "grade"),
+    ("Action", "action"), ("Qty", "qty"), ("Edges Used", "edges_used"),
+    ("Operator", "operator"), ("Machine", "machine"), ("Job", "job"), ("Shift", "shift"),
+), HISTORY.ordered)
+
+
 @inserts_bp.route("/history")
 def insert_history():
     db = get_db()
-    rows = db.execute("""
-        SELECT i.insert_type, i.size, i.grade,
-               t.action, t.qty, t.edges_used,
-               t.operator, t.machine, t.job, t.shift, t.txn_date
-        FROM insert_txn t
-        JOIN inserts i ON i.id = t.insert_id
-        ORDER BY t.txn_date DESC
-    """).fetchall()
+    page = HISTORY.page(db, request.args)
 
-    return render_template("insert_history.html", rows=rows)
+    return render_template("insert_history.html", rows=page.rows, page=page)
 
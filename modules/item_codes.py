@@ -5,6 +5,7 @@ import os
 import uuid
 
 from db import get_db
+from http_cache import conditional_get
 
 item_codes_bp = Blueprint("item_codes", __name__, url_prefix="/item-codes")
 
@@ -27,6 +28,7 @@ def allowed_file(filename: str) -> bool:
 # ================= LIST =================
 
 @item_codes_bp.route("/")
+@conditional_get("item_code_master", "item_code_ppap_docs")
 def item_codes():
     db = get_db()
     rows = db.execute("""
@@ -0,0 +1,59 @@
+from flask import Blueprint, render_template, request
+from datetime import date
+import ledger
+from db import get_db
+
+ledger_bp = Blueprint("ledger", __name__, url_prefix="/ledger")
+
+KIND_NAMES = {
+    "tool": "Cutting Tool",
+    "holder": "Holder",
+    "insert": "Insert",
+    "collet": "Collet",
+}
+
+
+# ================= STOCK AS OF DATE =================
+
+@ledger_bp.route("/")
+@ledger_bp.route("/stock")
+def stock_as_of():
+    db = get_db()
+    as_of = (request.args.get("as_of") or date.today().isoformat()).strip()
+    kind = (request.args.get("kind") or "").strip()
+    if kind not in KIND_NAMES:
+        kind = ""
+
+    balances = ledger.balances_as_of(as_of, kind or None, db=db)
+    labels = ledger.item_labels((kind,) if kind else ledger.KINDS, db=db)
+
+    rows = sorted(
+        (
+            (KIND_NAMES[k], labels.get((k, item_id), f"#{item_id} (deleted)"), total, available, out_qty, broken)
+            for (k, item_id), (total, available, out_qty, broken) in balances.items()
+        ),
+        key=lambda r: (r[0], r[1]),
+    )
+
+    return render_template(
+        "ledger/stock_as_of.html",
+        rows=rows,
+        as_of=as_of,
+        kind=kind,
+        kinds=KIND_NAMES,
+    )
+
+
+# ================= RECONCILIATION =================
+
+@ledger_bp.route("/reconcile")
+def reconcile():
+    db = get_db()
+    labels = ledger.item_labels(db=db)
+
+    rows = [
+        (KIND_NAMES[k], labels.get((k, item_id), f"#{item_id} (deleted)"), c_total, l_total, c_avail, l_avail)
+        for k, item_id, c_total, l_total, c_avail, l_avail in ledger.reconcile(db=db)
+    ]
+
+    return render_template("ledger/reconcile.html", rows=rows)
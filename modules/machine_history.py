@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, request, abort
 from datetime import date, datetime, timedelta
 from db import get_db, fetch_active_machines
+from query_spec import QuerySpec, Filter, eq, contains
 
 machine_history_bp = Blueprint("machine_history", __name__, url_prefix="/machine-history")
 
@@ -15,15 +16,30 @@ def _to_date(s: str):
         return None
 
 
+MACHINES = QuerySpec(
+    """
+    SELECT
+        mm.machine_code,
+        mm.machine_name,
+        mm.machine_type,
+        mm.controller,
+        mm.location,
+        mm.status
+    FROM machine_master mm
+    """,
+    filters=[
+        Filter("mm.status = ?", "status", default="ACTIVE"),
+        eq("mm.machine_type", "machine_type"),
+        contains(["mm.machine_code", "mm.machine_name", "mm.controller"]),
+    ],
+    order_by="mm.machine_code",
+)
+
+
 @machine_history_bp.route("/")
 def mh_list():
     db = get_db()
 
-    # Filters
-    status = (request.args.get("status") or "ACTIVE").strip()  # default ACTIVE
-    machine_type = (request.args.get("machine_type") or "").strip()
-    q = (request.args.get("q") or "").strip()
-
     # Get machine types for dropdown
     types = db.execute("""
         SELECT DISTINCT machine_type
@@ -32,35 +48,7 @@ def mh_list():
         ORDER BY machine_type
     """).fetchall()
 
-    query = """
-        SELECT
-            mm.machine_code,
-            mm.machine_name,
-            mm.machine_type,
-            mm.controller,
-            mm.location,
-            mm.status
-        FROM machine_master mm
-        WHERE 1=1
-    """
-    params = []
-
-    if status:
-        query += " AND mm.status=?"
-        params.append(status)
-
-    if machine_type:
-        query += " AND mm.machine_type=?"
-        params.append(machine_type)
-
-    if q:
-        query += " AND (mm.machine_code LIKE ? OR mm.machine_name LIKE ? OR mm.controller LIKE ?)"
-        like = f"%{q}%"
-        params.extend([like, like, like])
-
-    query += " ORDER BY mm.machine_code"
-
-    machines = db.execute(query, params).fetchall()
+    machines = MACHINES.rows(db, request.args)
 
     return render_template(
         "machine_history/mh_list.html",
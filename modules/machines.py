@@ -3,6 +3,7 @@ from datetime import date
 from db import get_db
 from flask import current_app
 from db import fetch_active_machines
+from query_spec import QuerySpec, eq
 
 machines_bp = Blueprint("machines", __name__, url_prefix="/machines")
 
@@ -15,31 +16,24 @@ def _norm(s: str) -> str:
     return (s or "").strip()
 
 
-@machines_bp.route("/", methods=["GET"])
-def machines_list():
-    db = get_db()
-
-    machine_type = _norm(request.args.get("machine_type", ""))
-    status = _norm(request.args.get("status", ""))
-
-    query = """
-        SELECT *
-        FROM machine_master
-        WHERE 1=1
+MACHINES = QuerySpec(
     """
-    params = []
-
-    if machine_type:
-        query += " AND machine_type = ?"
-        params.append(machine_type)
+    SELECT *
+    FROM machine_master
+    """,
+    filters=[
+        eq("machine_type", "machine_type"),
+        eq("status", "status"),
+    ],
+    order_by="machine_code",
+)
 
-    if status:
-        query += " AND status = ?"
-        params.append(status)
 
-    query += " ORDER BY machine_code"
+@machines_bp.route("/", methods=["GET"])
+def machines_list():
+    db = get_db()
 
-    rows = db.execute(query, params).fetchall()
+    rows = MACHINES.rows(db, request.args)
 
     types = db.execute("""
         SELECT DISTINCT machine_type
@@ -1,7 +1,9 @@
 from flask import Blueprint, render_template, request, redirect, abort
 from datetime import date, datetime, timedelta
 from flask import current_app
-from db import get_db, fetch_active_machines
+from db import get_db
+import master_data
+import scheduler
 
 maintenance_bp = Blueprint("maintenance", __name__, url_prefix="/maintenance")
 
@@ -29,20 +31,31 @@ def _status_for(next_due: date, due_soon_days: int = 7) -> str:
     return "OK"
 
 
-def _refresh_pm_statuses(db):
-    """Update status in DB based on next_due_date."""
-    rows = db.execute("""
-        SELECT id, next_due_date
-        FROM pm_schedule
-    """).fetchall()
+PM_STATUS_CASE = """
+    CASE
+        WHEN date(next_due_date) < :today THEN 'OVERDUE'
+        WHEN date(next_due_date) <= :due_by THEN 'DUE'
+        ELSE 'OK'
+    END
+"""
 
-    for r in rows:
-        nd = _to_date(r["next_due_date"])
-        if not nd:
-            continue
-        st = _status_for(nd)
-        db.execute("UPDATE pm_schedule SET status=? WHERE id=?", (st, r["id"]))
-    db.commit()
+
+@scheduler.daily("pm status rollover")
+def rollover_pm_statuses(db, today: date, due_soon_days: int = 7):
+    """
+    DUE / OVERDUE transition at date change, one set-based UPDATE.
+    Saves (add / done) already store the right status, so only the
+    passing of days needs this; rows without a valid date are left alone.
+    """
+    return db.execute(f"""
+        UPDATE pm_schedule
+        SET status = {PM_STATUS_CASE}
+        WHERE date(next_due_date) IS NOT NULL
+          AND status IS NOT {PM_STATUS_CASE}
+    """, {
+        "today": today.isoformat(),
+        "due_by": (today + timedelta(days=due_soon_days)).isoformat(),
+    }).rowcount
 
 
 @maintenance_bp.route("/")
@@ -55,8 +68,7 @@ def maintenance_home():
 # =========================
 @maintenance_bp.route("/pm")
 def pm_list():
-    db = get_db()
-    _refresh_pm_statuses(db)
+    db = get_db()   # read-only: statuses roll over in rollover_pm_statuses()
 
     # Optional filters
     machine_code = (request.args.get("machine_code") or "").strip()
@@ -102,7 +114,7 @@ def pm_list():
 
     rows = db.execute(query, params).fetchall()
 
-    machines = fetch_active_machines(db)
+    machines = master_data.active_machines(db)
 
     # counts for header tiles
     counts = db.execute("""
@@ -129,7 +141,7 @@ def pm_list():
 @maintenance_bp.route("/pm/add", methods=["GET", "POST"])
 def pm_add():
     db = get_db()
-    machines = fetch_active_machines(db)
+    machines = master_data.active_machines(db)
 
     if request.method == "POST":
         f = request.form
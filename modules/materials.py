@@ -1,10 +1,14 @@
-from flask import Blueprint, render_template, request, redirect, abort, current_app, send_file
-from db import get_db
+from flask import Blueprint, render_template, request, redirect, abort, current_app
+from db import get_db, write_transaction
+import master_data
+import dispatch
 from datetime import date
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-import io
+import reports
+import exports
+import sqlite3
 from flask import jsonify
+from http_cache import conditional_get
+from query_spec import QuerySpec, Filter, eq
 
 
 materials_bp = Blueprint("materials", __name__, url_prefix="/materials")
@@ -38,85 +42,72 @@ def calc_total_dispatch(form):
 def inward_entry():
     db = get_db()
 
-    customers = db.execute("""
-        SELECT id, customer_name
-        FROM customer_master
-        ORDER BY customer_name
-    """).fetchall()
-
-    item_codes_master = db.execute("""
-        SELECT item_code
-        FROM item_code_master
-        ORDER BY item_code
-    """).fetchall()
-    
     if request.method == "POST":
         customer_id = request.form["customer_id"]
         challan_no = (request.form["customer_challan_no"] or "").strip()
         challan_date = request.form["customer_challan_date"]
 
+        if not customer_id or not master_data.customer_exists(customer_id, db):
+            abort(400, "Customer required")
         if not challan_no:
             abort(400, "Customer challan number required")
 
-        # ---- create or fetch challan header ----
-        row = db.execute("""
-            SELECT id FROM customer_challan
-            WHERE customer_id=? AND customer_challan_no=?
-        """, (customer_id, challan_no)).fetchone()
-
-        if row:
-            challan_id = row["id"]
-        else:
-            db.execute("""
-                INSERT INTO customer_challan
-                (customer_id, customer_challan_no, customer_challan_date, status)
-                VALUES (?, ?, ?, 'OPEN')
-            """, (customer_id, challan_no, challan_date))
-            challan_id = db.execute("SELECT last_insert_rowid()").fetchone()[0]
-
-        # ---- multiple line items ----
+        # ---- validate all line items before writing ----
         item_codes = request.form.getlist("item_code[]")
         processes = request.form.getlist("process[]")
         qtys = request.form.getlist("qty[]")
         boxes = request.form.getlist("box_tray[]")
 
+        lines = []
         for i in range(len(item_codes)):
             item = (item_codes[i] or "").strip()
-            process = (processes[i] or "").strip()
-            qty_raw = (qtys[i] or "").strip()
+            process = (processes[i] if i < len(processes) else "").strip()
+            qty_raw = (qtys[i] if i < len(qtys) else "").strip()
 
             # skip empty rows safely
             if not item or not qty_raw:
                 continue
 
-            qty = int(qty_raw)
+            try:
+                qty = int(qty_raw)
+            except ValueError:
+                abort(400, f"Qty must be a number (row {i + 1})")
             if qty <= 0:
                 continue
 
-            existing = db.execute("""
-                SELECT id
-                FROM material_inward
-                WHERE challan_id=? AND item_code=? AND process=?
-            """, (challan_id, item, process)).fetchone()
-
-            if existing:
-                db.execute("""
-                    UPDATE material_inward
-                    SET inward_qty = inward_qty + ?,
-                        available_qty = available_qty + ?
-                    WHERE id=?
-                """, (qty, qty, existing["id"]))
-            else:
-                db.execute("""
-                    INSERT INTO material_inward
-                    (challan_id, item_code, process, inward_qty, available_qty, box_tray)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (challan_id, item, process, qty, qty, boxes[i] if i < len(boxes) else ""))
-
-        db.commit()
+            lines.append((item, process, qty, qty, boxes[i] if i < len(boxes) else ""))
+
+        unknown = master_data.missing_item_codes([ln[0] for ln in lines], db)
+        if unknown:
+            abort(400, f"Unknown item code: {', '.join(unknown)}")
+
+        with write_transaction(db):
+            # ---- create or fetch challan header ----
+            db.execute("""
+                INSERT INTO customer_challan
+                (customer_id, customer_challan_no, customer_challan_date, status)
+                VALUES (?, ?, ?, 'OPEN')
+                ON CONFLICT (customer_id, customer_challan_no) DO NOTHING
+            """, (customer_id, challan_no, challan_date))
+
+            challan_id = db.execute("""
+                SELECT id FROM customer_challan
+                WHERE customer_id=? AND customer_challan_no=?
+            """, (customer_id, challan_no)).fetchone()["id"]
+
+            # ---- line items: same challan + item + process adds to the existing line ----
+            db.executemany("""
+                INSERT INTO material_inward
+                (challan_id, item_code, process, inward_qty, available_qty, box_tray)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (challan_id, item_code, process) DO UPDATE SET
+                    inward_qty = inward_qty + excluded.inward_qty,
+                    available_qty = available_qty + excluded.available_qty
+            """, [(challan_id, *ln) for ln in lines])
+
         return redirect("/materials/inventory")
 
-    return render_template("material_inward.html", customers=customers, item_codes=item_codes_master, today=date.today())
+    return render_template("material_inward.html", today=date.today())
 
 
 # ================= DISPATCH =================
@@ -158,57 +149,14 @@ def dispatch_material():
         if total <= 0:
             abort(400, "Dispatch total must be > 0")
 
-        inward = db.execute("""
-            SELECT id, challan_id, available_qty
-            FROM material_inward
-            WHERE id=?
-        """, (inward_id,)).fetchone()
-
-        if not inward:
-            abort(404, "Selected inward line not found")
-
-        if total > int(inward["available_qty"] or 0):
-            abort(400, "Invalid dispatch quantity (exceeds available)")
-
-        # Insert dispatch
-        db.execute("""
-            INSERT INTO material_dispatch
-            (challan_id, inward_id, elta_challan_no, dispatch_date,
-             ok_qty, rej_qty, cd_qty, nd_qty, nd_pw_qty, total_qty)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            inward["challan_id"],
-            inward["id"],
-            elta_challan,
-            dispatch_date,
-            int(request.form.get("ok_qty", 0) or 0),
-            int(request.form.get("rej_qty", 0) or 0),
-            int(request.form.get("cd_qty", 0) or 0),
-            int(request.form.get("nd_qty", 0) or 0),
-            int(request.form.get("nd_pw_qty", 0) or 0),
-            total
-        ))
-
-        # Reduce available
-        db.execute("""
-            UPDATE material_inward
-            SET available_qty = available_qty - ?
-            WHERE id=?
-        """, (total, inward["id"]))
+        # same write path as the bulk API: checked + written under the write lock
+        line = {f: request.form.get(f, 0) for f in dispatch.QTY_FIELDS}
+        line["inward_id"] = inward_id
+        try:
+            dispatch.post(elta_challan, dispatch_date, [line], db=db)
+        except dispatch.DispatchError as e:
+            abort(400, str(e))
 
-        # Auto open/close challan based on remaining available lines in that challan
-        remaining = db.execute("""
-            SELECT COUNT(*) AS cnt
-            FROM material_inward
-            WHERE challan_id=? AND available_qty > 0
-        """, (inward["challan_id"],)).fetchone()["cnt"]
-
-        if remaining == 0:
-            db.execute("UPDATE customer_challan SET status='CLOSED' WHERE id=?", (inward["challan_id"],))
-        else:
-            db.execute("UPDATE customer_challan SET status='OPEN' WHERE id=?", (inward["challan_id"],))
-
-        db.commit()
         return redirect("/materials/inventory")
 
     # ---------------- GET ----------------
@@ -221,21 +169,12 @@ def dispatch_material():
             ch.customer_challan_date
         FROM customer_challan ch
         JOIN customer_master c ON c.id = ch.customer_id
-        WHERE EXISTS (
-            SELECT 1
-            FROM material_inward mi
-            WHERE mi.challan_id = ch.id
-              AND mi.available_qty > 0
-        )
+        WHERE ch.open_line_count > 0
         ORDER BY ch.customer_challan_date DESC, ch.customer_challan_no DESC
     """).fetchall()
 
     # For PRODUCT UI (optional master dropdown)
-    item_codes = db.execute("""
-        SELECT item_code
-        FROM item_code_master
-        ORDER BY item_code
-    """).fetchall()
+    item_codes = master_data.item_codes(db)
 
     return render_template(
         "material_dispatch.html",
@@ -244,6 +183,36 @@ def dispatch_material():
         today=date.today()
     )
 
+@materials_bp.post("/dispatch/bulk")
+def dispatch_bulk():
+    """
+    JSON API: one ELTA challan, many lines, one transaction.
+      {"elta_challan_no": "E-101", "dispatch_date": "2025-03-02",
+       "lines": [{"inward_id": 12, "ok_qty": 40},
+                 {"item_code": "IC-1", "process": "TURN", "ok_qty": 120, "rej_qty": 3}]}
+    Item-code lines are allocated FIFO over open challans (see dispatch.py).
+    201 with the dispatch rows written, or 400 {"error"} and nothing written.
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify({"error": "JSON object expected"}), 400
+
+    lines = body.get("lines")
+    if not isinstance(lines, list):
+        return jsonify({"error": "lines must be a list"}), 400
+
+    try:
+        rows = dispatch.post(body.get("elta_challan_no"), body.get("dispatch_date"), lines)
+    except dispatch.DispatchError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "elta_challan_no": str(body["elta_challan_no"]).strip(),
+        "lines": rows,
+        "total_qty": sum(r["total_qty"] for r in rows),
+    }), 201
+
+
 @materials_bp.get("/dispatch/items/<int:challan_id>")
 def dispatch_items_for_challan(challan_id):
     db = get_db()
@@ -271,72 +240,63 @@ def dispatch_items_for_challan(challan_id):
 
 # ================= INVENTORY DISPLAY =================
 
+INVENTORY_COLUMNS = (
+    ("Customer", "customer_name"),
+    ("Challan", "customer_challan_no"),
+    ("Status", "status"),
+    ("Item", "item_code"),
+    ("Process", "process"),
+    ("Inward", "inward_qty"),
+    ("Available", "available_qty"),
+)
+
+
+def _closed_dispatch_window(args):
+    # CLOSED challans filtered by ELTA dispatch date
+    if args.get("status") == "CLOSED" and args.get("from_date") and args.get("to_date"):
+        return (args["from_date"], args["to_date"])
+    return None
+
+
+INVENTORY = QuerySpec(
+    """
+    SELECT c.customer_name,
+           ch.customer_challan_no,
+           ch.status,
+           mi.item_code,
+           mi.process,
+           mi.inward_qty,
+           mi.available_qty
+    FROM material_inward mi
+    JOIN customer_challan ch ON ch.id = mi.challan_id
+    JOIN customer_master c ON c.id = ch.customer_id
+    """,
+    filters=[
+        eq("c.id", "customer_id"),
+        eq("mi.item_code", "item_code"),
+        eq("ch.status", "status"),
+        Filter("""EXISTS (
+            SELECT 1 FROM material_dispatch md
+            WHERE md.challan_id = ch.id
+              AND md.dispatch_date BETWEEN ? AND ?
+        )""", bind=_closed_dispatch_window),
+    ],
+    order_by="c.customer_name, ch.customer_challan_no, mi.item_code",
+)
+
+exports.register("material_inventory", "Material Inventory", INVENTORY_COLUMNS, INVENTORY.ordered)
+
+
 @materials_bp.route("/inventory")
+@conditional_get("material_inward", "customer_challan", "customer_master", "item_code_master", "material_dispatch")
 def inventory():
     db = get_db()
 
-    customer_id = request.args.get("customer_id", "")
-    item_code = request.args.get("item_code", "")
-    status = request.args.get("status", "")
-    from_date = request.args.get("from_date", "")
-    to_date = request.args.get("to_date", "")
-
-
-    query = """
-        SELECT c.customer_name,
-               ch.customer_challan_no,
-               ch.status,
-               mi.item_code,
-               mi.process,
-               mi.inward_qty,
-               mi.available_qty
-        FROM material_inward mi
-        JOIN customer_challan ch ON ch.id = mi.challan_id
-        JOIN customer_master c ON c.id = ch.customer_id
-        WHERE 1=1
-    """
-    params = []
-
-    if customer_id:
-        query += " AND c.id=?"
-        params.append(customer_id)
-
-    if item_code:
-        query += " AND mi.item_code=?"
-        params.append(item_code)
-
-    if status:
-        query += " AND ch.status=?"
-        params.append(status)
-
-        # CLOSED challans filtered by ELTA dispatch date
-        if status == "CLOSED" and from_date and to_date:
-            query += """
-                AND EXISTS (
-                    SELECT 1 FROM material_dispatch md
-                    WHERE md.challan_id = ch.id
-                      AND md.dispatch_date BETWEEN ? AND ?
-                )
-            """
-            params.extend([from_date, to_date])
-
-    query += """
-        ORDER BY c.customer_name, ch.customer_challan_no, mi.item_code
-    """
-
-    rows = db.execute(query, params).fetchall()
+    rows = INVENTORY.rows(db, request.args)
 
-    customers = db.execute("""
-        SELECT id, customer_name
-        FROM customer_master
-        ORDER BY customer_name
-    """).fetchall()
+    customers = master_data.customers(db)
 
-    item_codes = db.execute("""
-        SELECT item_code
-        FROM item_code_master
-        ORDER BY item_code
-    """).fetchall()
+    item_codes = master_data.item_codes(db)
 
     return render_template(
         "material_inventory.html",
@@ -348,104 +308,83 @@ def inventory():
 
 # ================= PDF EXPORT (MUST MATCH FILTERS) =================
 
+INVENTORY_PDF_FILTERS = ("customer_id", "item_code", "status", "from_date", "to_date")
+
+
+@reports.report(
+    "material_inventory",
+    title="Material Inventory Report",
+    tables=("material_inward", "customer_challan", "customer_master", "material_dispatch"),
+    filename="material_inventory.pdf",
+)
+def render_inventory_pdf(pdf, db, params):
+    pdf.title("Material Inventory Report", f"Generated on: {date.today()}")
+    pdf.down(12)
+
+    # rows stream from the cursor straight onto the pages
+    pdf.table([
+        reports.Column("Customer", 40, "customer_name"),
+        reports.Column("Challan", 140, "customer_challan_no"),
+        reports.Column("Status", 220, "status"),
+        reports.Column("Item", 280, "item_code"),
+        reports.Column("Process", 350, "process"),
+        reports.Column("Inward", 420, "inward_qty"),
+        reports.Column("Available", 470, "available_qty"),
+    ], db.execute(*INVENTORY.ordered(params)))
+
+
 @materials_bp.route("/inventory/pdf")
 def inventory_pdf():
-    db = get_db()
+    return reports.respond(
+        "material_inventory",
+        {k: request.args.get(k, "") for k in INVENTORY_PDF_FILTERS},
+    )
 
-    customer_id = request.args.get("customer_id", "")
-    item_code = request.args.get("item_code", "")
-    status = request.args.get("status", "")
-    from_date = request.args.get("from_date", "")
-    to_date = request.args.get("to_date", "")
-
-    query = """
-        SELECT c.customer_name,
-               ch.customer_challan_no,
-               ch.status,
-               mi.item_code,
-               mi.process,
-               mi.inward_qty,
-               mi.available_qty
-        FROM material_inward mi
-        JOIN customer_challan ch ON ch.id = mi.challan_id
-        JOIN customer_master c ON c.id = ch.customer_id
-        WHERE 1=1
+
+# ================= DISPATCH REGISTER =================
+
+DISPATCH_REGISTER_COLUMNS = (
+    ("Dispatch Date", "dispatch_date"),
+    ("ELTA Challan", "elta_challan_no"),
+    ("Customer", "customer_name"),
+    ("Customer Challan", "customer_challan_no"),
+    ("Challan Date", "customer_challan_date"),
+    ("Item", "item_code"),
+    ("Process", "process"),
+    ("OK", "ok_qty"),
+    ("REJ", "rej_qty"),
+    ("CD", "cd_qty"),
+    ("ND", "nd_qty"),
+    ("ND-PW", "nd_pw_qty"),
+    ("Total", "total_qty"),
+)
+
+
+DISPATCHES = QuerySpec(
     """
-    params = []
-
-    if customer_id:
-        query += " AND c.id=?"
-        params.append(customer_id)
-
-    if item_code:
-        query += " AND mi.item_code=?"
-        params.append(item_code)
-
-    if status:
-        query += " AND ch.status=?"
-        params.append(status)
-
-        # MUST MATCH inventory() exists filter
-        if status == "CLOSED" and from_date and to_date:
-            query += """
-                AND EXISTS (
-                    SELECT 1 FROM material_dispatch md
-                    WHERE md.challan_id = ch.id
-                      AND md.dispatch_date BETWEEN ? AND ?
-                )
-            """
-            params.extend([from_date, to_date])
-
-    query += " ORDER BY c.customer_name, ch.customer_challan_no, mi.item_code"
-
-    rows = db.execute(query, params).fetchall()
-
-    buffer = io.BytesIO()
-    pdf = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-
-    pdf.setFont("Helvetica-Bold", 14)
-    pdf.drawString(40, height - 40, "Material Inventory Report")
-
-    pdf.setFont("Helvetica", 9)
-    pdf.drawString(40, height - 60, f"Generated on: {date.today()}")
-
-    y = height - 90
-
-    headers = ["Customer", "Challan", "Status", "Item", "Process", "Inward", "Available"]
-    x = [40, 140, 220, 280, 350, 420, 470]
-
-    pdf.setFont("Helvetica-Bold", 9)
-    for i, h in enumerate(headers):
-        pdf.drawString(x[i], y, h)
-
-    y -= 15
-    pdf.setFont("Helvetica", 9)
-
-    for r in rows:
-        if y < 50:
-            pdf.showPage()
-            pdf.setFont("Helvetica", 9)
-            y = height - 50
-
-        pdf.drawString(x[0], y, r["customer_name"])
-        pdf.drawString(x[1], y, r["customer_challan_no"])
-        pdf.drawString(x[2], y, r["status"] or "")
-        pdf.drawString(x[3], y, r["item_code"])
-        pdf.drawString(x[4], y, r["process"] or "")
-        pdf.drawString(x[5], y, str(r["inward_qty"]))
-        pdf.drawString(x[6], y, str(r["available_qty"]))
-        y -= 14
-
-    pdf.save()
-    buffer.seek(0)
-
-    return send_file(
-        buffer,
-        as_attachment=True,
-        download_name="material_inventory.pdf",
-        mimetype="application/pdf"
-    )
+    SELECT md.id, md.dispatch_date, md.elta_challan_no,
+           c.customer_name, ch.customer_challan_no, ch.customer_challan_date,
+           mi.item_code, mi.process,
+           md.ok_qty, md.rej_qty, md.cd_qty, md.nd_qty, md.nd_pw_qty, md.total_qty
+    FROM material_dispatch md
+    JOIN material_inward mi ON mi.id = md.inward_id
+    JOIN customer_challan ch ON ch.id = md.challan_id
+    JOIN customer_master c ON c.id = ch.customer_id
+    """,
+    filters=[
+        eq("md.elta_challan_no", "elta_challan_no"),
+        eq("ch.customer_id", "customer_id"),
+        eq("mi.item_code", "item_code"),
+        Filter("md.dispatch_date >= ?", "date_from"),     # plain compare: idx_dispatch_date
+        Filter("md.dispatch_date <= ?", "date_to"),
+    ],
+    order_by="md.dispatch_date, md.id",
+)
+
+# manage screens: newest dispatch first
+DISPATCHES_NEWEST = "date(md.dispatch_date) DESC, md.id DESC"
+
+exports.register("dispatch_register", "ELTA Dispatch Register", DISPATCH_REGISTER_COLUMNS, DISPATCHES.ordered)
 
 
 # ================= MANAGE (PIN) =================
@@ -510,24 +449,7 @@ def manage_dispatch_load():
     if not elta:
         abort(400, "ELTA challan required")
 
-    rows = db.execute("""
-        SELECT
-            md.id,
-            c.customer_name,
-            ch.customer_challan_no,
-            ch.customer_challan_date,
-            md.elta_challan_no,
-            md.dispatch_date,
-            mi.item_code,
-            mi.process,
-            md.ok_qty, md.rej_qty, md.cd_qty, md.nd_qty, md.nd_pw_qty, md.total_qty
-        FROM material_dispatch md
-        JOIN material_inward mi ON mi.id = md.inward_id
-        JOIN customer_challan ch ON ch.id = md.challan_id
-        JOIN customer_master c ON c.id = ch.customer_id
-        WHERE md.elta_challan_no=?
-        ORDER BY date(md.dispatch_date) DESC, md.id DESC
-    """, (elta,)).fetchall()
+    rows = DISPATCHES.rows(db, {"elta_challan_no": elta}, DISPATCHES_NEWEST)
 
     return render_template("material_manage_dispatch_table.html", rows=rows)
 
@@ -554,11 +476,14 @@ def manage_inward_edit(inward_id):
     if available_qty > inward_qty:
         abort(400, "Available cannot exceed inward")
 
-    db.execute("""
-        UPDATE material_inward
-        SET item_code=?, process=?, inward_qty=?, available_qty=?, box_tray=?
-        WHERE id=?
-    """, (item_code, process, inward_qty, available_qty, box_tray, inward_id))
+    try:
+        db.execute("""
+            UPDATE material_inward
+            SET item_code=?, process=?, inward_qty=?, available_qty=?, box_tray=?
+            WHERE id=?
+        """, (item_code, process, inward_qty, available_qty, box_tray, inward_id))
+    except sqlite3.IntegrityError:
+        abort(400, "This challan already has a line with that item code and process")
 
     db.commit()
     return redirect("/materials/manage")
@@ -596,7 +521,10 @@ def manage_dispatch_edit(dispatch_id):
         abort(403, "Invalid PINs")
 
     elta_challan_no = (request.form.get("elta_challan_no") or "").strip()
-    dispatch_date = request.form.get("dispatch_date") or ""
+    try:
+        dispatch_date = dispatch.parse_date(request.form.get("dispatch_date"))
+    except dispatch.DispatchError as e:
+        abort(400, str(e))
 
     ok_qty = int(request.form.get("ok_qty") or 0)
     rej_qty = int(request.form.get("rej_qty") or 0)
@@ -655,37 +583,9 @@ def manage_dispatch_edit(dispatch_id):
         WHERE id=?
     """, (delta, old["inward_id"]))
 
-    remaining = db.execute("""
-        SELECT COUNT(*) AS cnt
-        FROM material_inward
-        WHERE challan_id=? AND available_qty > 0
-    """, (old["challan_id"],)).fetchone()["cnt"]
-
-    if remaining == 0:
-        db.execute("UPDATE customer_challan SET status='CLOSED' WHERE id=?", (old["challan_id"],))
-    else:
-        db.execute("UPDATE customer_challan SET status='OPEN' WHERE id=?", (old["challan_id"],))
-
     db.commit()
 
-    rows = db.execute("""
-        SELECT
-            md.id,
-            c.customer_name,
-            ch.customer_challan_no,
-            ch.customer_challan_date,
-            md.elta_challan_no,
-            md.dispatch_date,
-            mi.item_code,
-            mi.process,
-            md.ok_qty, md.rej_qty, md.cd_qty, md.nd_qty, md.nd_pw_qty, md.total_qty
-        FROM material_dispatch md
-        JOIN material_inward mi ON mi.id = md.inward_id
-        JOIN customer_challan ch ON ch.id = md.challan_id
-        JOIN customer_master c ON c.id = ch.customer_id
-        WHERE md.elta_challan_no=?
-        ORDER BY date(md.dispatch_date) DESC, md.id DESC
-    """, (elta_challan_no,)).fetchall()
+    rows = DISPATCHES.rows(db, {"elta_challan_no": elta_challan_no}, DISPATCHES_NEWEST)
 
     return render_template("material_manage_dispatch_table.html", rows=rows)
 
@@ -719,37 +619,9 @@ def manage_dispatch_delete(dispatch_id):
 
     db.execute("DELETE FROM material_dispatch WHERE id=?", (dispatch_id,))
 
-    remaining = db.execute("""
-        SELECT COUNT(*) AS cnt
-        FROM material_inward
-        WHERE challan_id=? AND available_qty > 0
-    """, (d["challan_id"],)).fetchone()["cnt"]
-
-    if remaining == 0:
-        db.execute("UPDATE customer_challan SET status='CLOSED' WHERE id=?", (d["challan_id"],))
-    else:
-        db.execute("UPDATE customer_challan SET status='OPEN' WHERE id=?", (d["challan_id"],))
-
     db.commit()
 
-    rows = db.execute("""
-        SELECT
-            md.id,
-            c.customer_name,
-            ch.customer_challan_no,
-            ch.customer_challan_date,
-            md.elta_challan_no,
-            md.dispatch_date,
-            mi.item_code,
-            mi.process,
-            md.ok_qty, md.rej_qty, md.cd_qty, md.nd_qty, md.nd_pw_qty, md.total_qty
-        FROM material_dispatch md
-        JOIN material_inward mi ON mi.id = md.inward_id
-        JOIN customer_challan ch ON ch.id = md.challan_id
-        JOIN customer_master c ON c.id = ch.customer_id
-        WHERE md.elta_challan_no=?
-        ORDER BY date(md.dispatch_date) DESC, md.id DESC
-    """, (d["elta_challan_no"],)).fetchall()
+    rows = DISPATCHES.rows(db, {"elta_challan_no": d["elta_challan_no"]}, DISPATCHES_NEWEST)
 
     return render_template("material_manage_dispatch_table.html", rows=rows)
 
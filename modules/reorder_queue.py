@@ -0,0 +1,26 @@
+from flask import Blueprint, render_template, request
+import config
+import reorder
+from db import get_db
+from http_cache import conditional_get
+
+reorder_bp = Blueprint("reorder", __name__, url_prefix="/reorder")
+
+
+# ================= REORDER QUEUE =================
+
+@reorder_bp.route("/")
+@conditional_get("low_stock", "reorder_rate")
+def reorder_list():
+    db = get_db()
+    kind = (request.args.get("kind") or "").strip()
+    if kind not in reorder.KIND_NAMES:
+        kind = ""
+
+    return render_template(
+        "reorder/queue.html",
+        rows=reorder.queue(kind or None, db=db),
+        kind=kind,
+        kinds=reorder.KIND_NAMES,
+        cover_days=config.REORDER_COVER_DAYS,
+    )
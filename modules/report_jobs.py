@@ -0,0 +1,33 @@
+from flask import Blueprint, render_template, request, jsonify, abort
+import reports
+
+report_jobs_bp = Blueprint("report_jobs", __name__, url_prefix="/reports")
+
+
+# ================= BACKGROUND REPORT JOBS =================
+
+@report_jobs_bp.route("/jobs/<job_id>")
+def job_status(job_id):
+    job = reports.get_job(job_id)
+    if job is None:
+        abort(404, "Report job not found (finished jobs are kept for an hour)")
+
+    if request.args.get("format") == "json" or request.accept_mimetypes.best == "application/json":
+        return jsonify(job.as_dict())
+
+    return render_template(
+        "reports/job_status.html",
+        job=job.as_dict(),
+        title=reports.REPORTS[job.report].title,
+    )
+
+
+@report_jobs_bp.route("/jobs/<job_id>/download")
+def job_download(job_id):
+    job = reports.get_job(job_id)
+    if job is None or job.status != "done":
+        abort(404)
+    try:
+        return reports.send(job.report, job.params, job.path)
+    except FileNotFoundError:          # pruned from the cache: render it again
+        return reports.respond(job.report, job.params)
@@ -0,0 +1,139 @@
+from flask import Blueprint, request, jsonify
+from db import get_db
+import dimension_search
+import complaint_search
+
+
+search_bp = Blueprint("search", __name__, url_prefix="/api/search")
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+
+
+# ================= HELPERS =================
+
+def _like_escape(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _args():
+    q = (request.args.get("q") or "").strip()
+    try:
+        limit = int(request.args.get("limit") or DEFAULT_LIMIT)
+    except ValueError:
+        limit = DEFAULT_LIMIT
+    return q, max(1, min(limit, MAX_LIMIT))
+
+
+def _search(db, select, column, q, limit, where="1=1", extra_match=()):
+    """
+    Prefix hits first (index seek on `column` COLLATE NOCASE), then substring
+    hits to fill up the limit (scans the same narrow index, stops at LIMIT).
+    extra_match: more columns that may contain the text (substring pass only).
+    """
+    esc = _like_escape(q)
+    rows = db.execute(f"""
+        {select}
+        WHERE {where} AND {column} LIKE ? ESCAPE '\\'
+        ORDER BY {column} COLLATE NOCASE
+        LIMIT ?
+    """, (esc + "%", limit)).fetchall()
+
+    if len(rows) < limit and q:
+        contains = " OR ".join(f"{c} LIKE ? ESCAPE '\\'" for c in (column, *extra_match))
+        rows += db.execute(f"""
+            {select}
+            WHERE {where} AND ({contains}) AND {column} NOT LIKE ? ESCAPE '\\'
+            ORDER BY {column} COLLATE NOCASE
+            LIMIT ?
+        """, (*["%" + esc + "%"] * (1 + len(extra_match)), esc + "%", limit - len(rows))).fetchall()
+    return rows
+
+
+# ================= ENDPOINTS =================
+# All return [{"value": ..., "label": ...}, ...]
+
+@search_bp.route("/item-codes")
+def search_item_codes():
+    q, limit = _args()
+    rows = _search(
+        get_db(),
+        "SELECT item_code FROM item_code_master",
+        "item_code", q, limit,
+    )
+    return jsonify([{"value": r["item_code"], "label": r["item_code"]} for r in rows])
+
+
+@search_bp.route("/customers")
+def search_customers():
+    q, limit = _args()
+    rows = _search(
+        get_db(),
+        "SELECT id, customer_name FROM customer_master",
+        "customer_name", q, limit,
+    )
+    return jsonify([{"value": r["id"], "label": r["customer_name"]} for r in rows])
+
+
+@search_bp.route("/machines")
+def search_machines():
+    q, limit = _args()
+    rows = _search(
+        get_db(),
+        "SELECT machine_code, machine_name FROM machine_master",
+        "machine_code", q, limit,
+        where="status='ACTIVE'",
+        extra_match=("machine_name",),
+    )
+    return jsonify([
+        {"value": r["machine_code"], "label": f"{r['machine_code']} | {r['machine_name']}"}
+        for r in rows
+    ])
+
+
+# ================= PARAMETRIC (DIMENSION) SEARCH =================
+# Range / tolerance search, see dimension_search.py for the arguments.
+# Returns {"results": [...], "next": url, "prev": url}
+
+def _dimension_search(kind):
+    try:
+        page = dimension_search.search(kind, request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    results = []
+    for r in page.rows:
+        row = dict(r)
+        row["rank"] = round(0 - row.pop("neg_rank"), 4)
+        results.append(row)
+    return jsonify({"results": results, "next": page.next_url, "prev": page.prev_url})
+
+
+@search_bp.route("/tools")
+def search_tools():
+    return _dimension_search("tool")
+
+
+@search_bp.route("/holders")
+def search_holders():
+    return _dimension_search("holder")
+
+
+# ================= COMPLAINT FULL-TEXT SEARCH =================
+# {"results": [{id, complaint_no, ..., source, snippet, score}], "next", "prev"}
+# score: -bm25, higher = better match
+
+@search_bp.route("/complaints")
+def search_complaints():
+    page = complaint_search.search((request.args.get("q") or "").strip())
+    if page is None:
+        return jsonify({"results": [], "next": None, "prev": None})
+
+    results = []
+    for r in page.rows:
+        row = dict(r)
+        del row["log_id"]
+        row["snippet"] = str(complaint_search.snippet_html(row.pop("snip")))
+        row["score"] = round(row.pop("neg_score"), 4)
+        results.append(row)
+    return jsonify({"results": results, "next": page.next_url, "prev": page.prev_url})
@@ -1,7 +1,8 @@
 from flask import Blueprint, render_template, request, redirect, abort
-from db import get_db
+from db import get_db, write_transaction
 from datetime import date
-from db import fetch_active_machines
+import master_data
+from pagination import page_from_request
 
 shift_bp = Blueprint("shift", __name__, url_prefix="/shift")
 
@@ -11,18 +12,100 @@ shift_bp = Blueprint("shift", __name__, url_prefix="/shift")
 def shift_home():
     return redirect("/shift/add")
 
+# ================= FORM PARSING =================
+
+def _int_field(value, label, row):
+    try:
+        return int(value or 0)
+    except ValueError:
+        abort(400, f"{label} must be a number (row {row})")
+
+
+def _column(form, name, n):
+    values = form.getlist(name)
+    return values + [""] * (n - len(values))
+
+
+def _parse_shift_rows(form):
+    """
+    Shift form -> (production, setups, attendance, downtime) lists of tuples
+    ready for executemany (without shift_id). Blank rows are skipped; a bad
+    number aborts with 400 before anything is written.
+    """
+    # ---- production ----
+    items = form.getlist("item_code[]")
+    n = len(items)
+    machine_codes = _column(form, "machine_code[]", n)
+    operators = _column(form, "operator[]", n)
+    oks = _column(form, "ok_qty[]", n)
+    rejs = _column(form, "rej_qty[]", n)
+
+    production = []
+    for i in range(n):
+        item = (items[i] or "").strip()
+        if not item:
+            continue
+
+        ok = _int_field(oks[i], "OK qty", i + 1)
+        rej = _int_field(rejs[i], "Reject qty", i + 1)
+        if ok == 0 and rej == 0:
+            continue
+        if ok < 0 or rej < 0:
+            abort(400, f"Quantities cannot be negative (row {i + 1})")
+
+        production.append((
+            item,
+            (machine_codes[i] or "").strip(),   # machine_code stored in 'machine'
+            (operators[i] or "").strip(),
+            ok,
+            rej,
+        ))
+
+    # ---- setup change ----
+    setup_job = form.getlist("setup_job[]")
+    n = len(setup_job)
+    setup_change_time = _column(form, "setup_change_time[]", n)
+    setup_machine = _column(form, "setup_machine[]", n)
+    setup_start_time = _column(form, "setup_start_time[]", n)
+
+    setups = [
+        (
+            setup_machine[i],
+            setup_job[i],              # store Job & Setup No. here
+            setup_change_time[i],      # store Change Time
+            setup_start_time[i],       # store Production Start Time
+        )
+        for i in range(n) if setup_job[i]
+    ]
+
+    # ---- attendance ----
+    att_operator = form.getlist("att_operator[]")
+    att_status = _column(form, "att_status[]", len(att_operator))
+
+    attendance = [
+        (att_operator[i], att_status[i])
+        for i in range(len(att_operator)) if att_operator[i]
+    ]
+
+    # ---- downtime ----
+    down_machine_code = form.getlist("down_machine_code[]")
+    n = len(down_machine_code)
+    dt_reason = _column(form, "dt_reason[]", n)
+    dt_minutes = _column(form, "dt_minutes[]", n)
+
+    downtime = [
+        (down_machine_code[i].strip(), dt_reason[i], _int_field(dt_minutes[i], "Downtime minutes", i + 1))
+        for i in range(n) if down_machine_code[i].strip()
+    ]
+
+    return production, setups, attendance, downtime
+
+
 # ================= ADD SHIFT =================
 
 @shift_bp.route("/add", methods=["GET", "POST"])
 def shift_add():
     db = get_db()
-    machines = fetch_active_machines(db)
-
-    item_codes = db.execute("""
-        SELECT item_code
-        FROM item_code_master
-        ORDER BY item_code
-    """).fetchall()
 
     if request.method == "POST":
         shift_date = request.form["shift_date"]
@@ -33,126 +116,64 @@ def shift_add():
         if not shift_date or not shift or not incharge:
             abort(400, "Missing header fields")
 
-        # ---- create shift header ----
-        row = db.execute("""
-            SELECT id FROM shift_header
-            WHERE shift_date=? AND shift=?
-        """, (shift_date, shift)).fetchone()
-
-        if row:
-            abort(400, "Shift already exists")
-
-        db.execute("""
-            INSERT INTO shift_header
-            (shift_date, shift, shift_incharge, remarks)
-            VALUES (?, ?, ?, ?)
-        """, (shift_date, shift, incharge, remarks))
-
-        shift_id = db.execute(
-            "SELECT last_insert_rowid()"
-        ).fetchone()[0]
+        # validate every row before anything is written
+        production, setups, attendance, downtime = _parse_shift_rows(request.form)
 
-        # ================= PRODUCTION =================
-        items = request.form.getlist("item_code[]")
-        machine_codes = request.form.getlist("machine_code[]")
-        operators = request.form.getlist("operator[]")
-        oks = request.form.getlist("ok_qty[]")
-        rejs = request.form.getlist("rej_qty[]")
+        unknown = master_data.missing_item_codes([r[0] for r in production], db)
+        if unknown:
+            abort(400, f"Unknown item code: {', '.join(unknown)}")
 
-        n = min(len(items), len(machine_codes), len(operators), len(oks), len(rejs))
+        machines = [r[1] for r in production if r[1]] + [r[0] for r in downtime]
+        inactive = master_data.inactive_machines(machines, db)
+        if inactive:
+            abort(400, f"Unknown or inactive machine: {', '.join(inactive)}")
 
-        for i in range(n):
-            item = (items[i] or "").strip()
-            if not item:
-                continue
+        with write_transaction(db):
+            # ---- create shift header ----
+            row = db.execute("""
+                SELECT id FROM shift_header
+                WHERE shift_date=? AND shift=?
+            """, (shift_date, shift)).fetchone()
 
-            ok = int(oks[i] or 0)
-            rej = int(rejs[i] or 0)
+            if row:
+                abort(400, "Shift already exists")
 
-            if ok == 0 and rej == 0:
-                continue
+            shift_id = db.execute("""
+                INSERT INTO shift_header
+                (shift_date, shift, shift_incharge, remarks)
+                VALUES (?, ?, ?, ?)
+            """, (shift_date, shift, incharge, remarks)).lastrowid
 
-            db.execute("""
+            # ---- child rows, one executemany per table ----
+            db.executemany("""
                 INSERT INTO shift_production
                 (shift_id, item_code, machine, operator, ok_qty, rej_qty)
                 VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                shift_id,
-                item,
-                (machine_codes[i] or "").strip(),   # machine_code stored in 'machine'
-                (operators[i] or "").strip(),
-                ok,
-                rej
-            ))
-
-        # ================= SETUP CHANGE =================
-        setup_job = request.form.getlist("setup_job[]")
-        setup_change_time = request.form.getlist("setup_change_time[]")
-        setup_machine = request.form.getlist("setup_machine[]")
-        setup_start_time = request.form.getlist("setup_start_time[]")
-
-        for i in range(len(setup_job)):
-            if not setup_job[i]:
-                continue
-
-            db.execute("""
+            """, [(shift_id, *r) for r in production])
+
+            db.executemany("""
                 INSERT INTO shift_setup
                 (shift_id, machine, from_item, to_item, remarks)
                 VALUES (?, ?, ?, ?, ?)
-            """, (
-                shift_id,
-                setup_machine[i],
-                setup_job[i],              #- store Job & Setup No. here
-                setup_change_time[i],      #-- store Change Time
-                setup_start_time[i]        #-- store Production Start Time
-            ))
-
-        # ================= ATTENDANCE =================
-        att_operator = request.form.getlist("att_operator[]")
-        att_status = request.form.getlist("att_status[]")
-
-        for i in range(len(att_operator)):
-            if not att_operator[i]:
-                continue
-
-            db.execute("""
+            """, [(shift_id, *r) for r in setups])
+
+            db.executemany("""
                 INSERT INTO shift_attendance
                 (shift_id, operator, status)
                 VALUES (?, ?, ?)
-            """, (
-                shift_id,
-                att_operator[i],
-                att_status[i]
-            ))
-
-        # ================= DOWNTIME =================
-        down_machine_code = request.form.getlist("down_machine_code[]")
-        dt_reason = request.form.getlist("dt_reason[]")
-        dt_minutes = request.form.getlist("dt_minutes[]")
-
-        for i in range(len(down_machine_code)):
-            if not down_machine_code[i]:
-                continue
-
-            db.execute("""
+            """, [(shift_id, *r) for r in attendance])
+
+            db.executemany("""
                 INSERT INTO shift_downtime
                 (shift_id, machine, reason, minutes)
                 VALUES (?, ?, ?, ?)
-            """, (
-                shift_id,
-                down_machine_code[i],
-                dt_reason[i],
-                int(dt_minutes[i] or 0)
-            ))
-
-        db.commit()
+            """, [(shift_id, *r) for r in downtime])
+
         return redirect("/shift/view")
 
     return render_template(
         "shift/shift_entry.html",
-        machines=machines,
-        today=date.today(),
-        item_codes=item_codes
+        today=date.today()
     )
 
 # ================= VIEW (SUPERVISOR) =================
@@ -161,13 +182,13 @@ def shift_add():
 def shift_view():
     db = get_db()
 
-    rows = db.execute("""
+    page = page_from_request(db, """
         SELECT id, shift_date, shift, shift_incharge
         FROM shift_header
-        ORDER BY shift_date DESC, shift
-    """).fetchall()
+        WHERE 1=1
+    """, [], [("shift_date", "shift_date"), ("id", "id")])
 
-    return render_template("shift/shift_list.html", rows=rows)
+    return render_template("shift/shift_list.html", rows=page.rows, page=page)
 
 @shift_bp.route("/view/<int:shift_id>")
 def shift_detail(shift_id):
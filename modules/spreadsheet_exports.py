@@ -0,0 +1,12 @@
+from flask import Blueprint, request
+import exports
+
+exports_bp = Blueprint("exports", __name__, url_prefix="/export")
+
+
+# ================= CSV / XLSX EXPORTS =================
+# /export/<name>.csv|xlsx?<same filters as the page>; see exports.py
+
+@exports_bp.route("/<name>.<fmt>")
+def export_file(name, fmt):
+    return exports.respond(name, fmt, request.args)
@@ -1,12 +1,19 @@
 from flask import Blueprint, render_template, request, redirect
-from db import get_db
-from datetime import date
+from db import get_db, write_transaction
+from datetime import date, datetime
 from constants import TOOL_TYPES
-from db import fetch_active_machines
+import master_data
+import stock
+import ledger
+import dimension_search
+import exports
+from http_cache import conditional_get
+from query_spec import QuerySpec, eq, date_from, date_to
 
 tools_bp = Blueprint("tools", __name__, url_prefix="/tools")
 
 @tools_bp.route("/")
+@conditional_get("cutting_tools")
 def tools():
     con = get_db()
     rows = con.execute("""
@@ -38,109 +45,77 @@ def tools():
     )
 @tools_bp.route("/search")
 def search():
-    q = request.args
-    con = get_db()
-
-    rows = con.execute("""
-        SELECT *,
-        (total_qty - issued_qty - broken_qty) AS available_qty
-        FROM cutting_tools
-        WHERE tool_type = ?
-          AND cutting_diameter = ?
-          AND material = ?
-          AND cutting_length = ?
-    """, (
-        q["tool_type"],
-        q["cutting_diameter"],
-        q["material"],
-        q["cutting_length"]
-    )).fetchall()
-
-    con.close()
-    return render_template("search.html", results=rows)
+    """Availability by dimensions; exact unless *_tol / *_min / *_max are given."""
+    try:
+        page = dimension_search.search("tool", request.args)
+    except ValueError as e:
+        return str(e), 400
+    return render_template("search.html", results=page.rows, page=page)
 
 
 @tools_bp.post("/add")
 def add_tool():
     f = request.form
     con = get_db()
+    qty = int(f["total_qty"])
+
+    with write_transaction(con):
+        tool_id = con.execute("""
+            INSERT INTO cutting_tools (
+                tool_type, tool_subtype,
+                cutting_diameter, cutting_length, overall_length,
+                shank_type, shank_diameter,
+                material, location, remarks,
+                total_qty, reorder_level
+            )
+            VALUES (?,?,?,?,?,?,?,?,?,?,?,?)
+            ON CONFLICT (
+                tool_type, cutting_diameter, cutting_length,
+                shank_type, shank_diameter, material
+            )
+            DO UPDATE SET
+                total_qty = total_qty + excluded.total_qty,
+                reorder_level = excluded.reorder_level
+            RETURNING id
+        """, (
+            f["tool_type"],
+            f["tool_subtype"],
+            f["cutting_diameter"],
+            f["cutting_length"],
+            f["overall_length"],
+            f["shank_type"],
+            f["shank_diameter"],
+            f["material"],
+            f["location"],
+            f["remarks"],
+            qty,
+            int(f.get("reorder_level", 2))
+        )).fetchone()[0]
+
+        ledger.record(con, "tool", tool_id, "RECEIPT", qty)
 
-    con.execute("""
-    INSERT INTO cutting_tools (
-        tool_type, tool_subtype,
-        cutting_diameter, cutting_length, overall_length,
-        shank_type, shank_diameter,
-        material, location, remarks,
-        total_qty, reorder_level
-    )
-    VALUES (?,?,?,?,?,?,?,?,?,?,?,?)
-    ON CONFLICT (
-        tool_type, cutting_diameter, cutting_length,
-        shank_type, shank_diameter, material
-    )
-    DO UPDATE SET
-        total_qty = total_qty + excluded.total_qty,
-        reorder_level = excluded.reorder_level
-""", (
-    f["tool_type"],
-    f["tool_subtype"],
-    f["cutting_diameter"],
-    f["cutting_length"],
-    f["overall_length"],
-    f["shank_type"],
-    f["shank_diameter"],
-    f["material"],
-    f["location"],
-    f["remarks"],
-    int(f["total_qty"]),
-    int(f.get("reorder_level", 2))
-))
-
-    con.commit()
     con.close()
     return redirect("/tools/")
 
 @tools_bp.route("/issue", methods=["GET", "POST"])
 def tool_issue_page():
     con = get_db()
-    machines = fetch_active_machines(con)
+    machines = master_data.active_machines(con)
     
     if request.method == "POST":
         f = request.form
-        qty = int(f["qty"])
-        tool_id = int(f["tool_id"])
-
-        available = con.execute("""
-            SELECT (total_qty - issued_qty - broken_qty)
-            FROM cutting_tools WHERE id=?
-        """, (tool_id,)).fetchone()[0]
-
-        if qty > available:
-            con.close()
-            return "Not enough stock", 400
-
-        con.execute("""
-            UPDATE cutting_tools
-            SET issued_qty = issued_qty + ?
-            WHERE id=?
-        """, (qty, tool_id))
-        con.execute("""
-            INSERT INTO tool_issue_txn
-            (tool_id, action, qty, operator, machine, shift, job_name, ts)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            tool_id,
-            "ISSUE",
-            qty,
-            f["operator"],
-            f["machine_code"],
-            f["shift"],
-            f["job_name"],
-            f["issue_date"]
-        ))
-
-        con.commit()
-        con.close()
+        try:
+            stock.move("tool", "ISSUE", int(f["tool_id"]), f["qty"], {
+                "action": "ISSUE",
+                "operator": f["operator"],
+                "machine": f["machine_code"],
+                "shift": f["shift"],
+                "job_name": f["job_name"],
+                "ts": f["issue_date"],
+            }, db=con)
+        except stock.StockError as e:
+            return str(e), 400
+
         return redirect("/tools")
 
     # GET
@@ -164,52 +139,26 @@ def tool_issue_page():
 @tools_bp.route("/return", methods=["GET", "POST"])
 def tool_return_page():
     con = get_db()
-    machines = fetch_active_machines(con)
+    machines = master_data.active_machines(con)
     if request.method == "POST":
         f = request.form
-        qty = int(f["qty"])
-        tool_id = int(f["tool_id"])
         condition = f["condition"]
 
-        if condition == "Good":
-            con.execute("""
-                UPDATE cutting_tools
-                SET issued_qty = issued_qty - ?
-                WHERE id=?
-            """, (qty, tool_id))
-
-        elif condition == "Blunt":
-            con.execute("""
-                UPDATE cutting_tools
-                SET issued_qty = issued_qty - ?
-                WHERE id=?
-            """, (qty, tool_id))
-
-        elif condition == "Broken":
-            con.execute("""
-                UPDATE cutting_tools
-                SET issued_qty = issued_qty - ?,
-                    broken_qty = broken_qty + ?
-                WHERE id=?
-            """, (qty, qty, tool_id))
-
-        con.execute("""
-           INSERT INTO tool_issue_txn
-           (tool_id, action, qty, operator, machine, shift, condition, remarks, ts)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-           tool_id,
-           "RETURN",
-           qty,
-           f["operator"],
-           f.get("machine_code", ""),   # optional
-           f["shift"],
-           condition,
-           f.get("remarks", ""),
-           f["return_date"]
-        ))
-        con.commit()
-        con.close()
+        # Good / Blunt go back to stock, Broken moves to broken_qty
+        movement = "RETURN_BROKEN" if condition == "Broken" else "RETURN"
+        try:
+            stock.move("tool", movement, int(f["tool_id"]), f["qty"], {
+                "action": "RETURN",
+                "operator": f["operator"],
+                "machine": f.get("machine_code", ""),   # optional
+                "shift": f["shift"],
+                "condition": condition,
+                "remarks": f.get("remarks", ""),
+                "ts": f["return_date"],
+            }, db=con)
+        except stock.StockError as e:
+            return str(e), 400
+
         return redirect("/tools")
 
     tools = con.execute("""
@@ -221,56 +170,62 @@ def tool_return_page():
 
     return render_template("tool_return.html", tools=tools,  machines=machines, today=date.today().isoformat())
 
-@tools_bp.route("/history")
-def tool_history():
-    con = get_db()
 
-    # Filters (optional)
-    tool_id = request.args.get("tool_id", "")
-    action = request.args.get("action", "")
-    date_from = request.args.get("date_from", "")
-    date_to = request.args.get("date_to", "")
-
-    query = """
-        SELECT
-            tx.ts,
-            ct.tool_type,
-            ct.material,
-            ct.cutting_diameter,
-            ct.cutting_length,
-            tx.action,
-            tx.qty,
-            tx.operator,
-            tx.machine,
-            tx.shift,
-            tx.job_name,
-            tx.condition,
-            tx.remarks
-        FROM tool_issue_txn tx
-        JOIN cutting_tools ct ON ct.id = tx.tool_id
-        WHERE 1=1
+TOOL_HISTORY_COLUMNS = (
+    ("Date", "ts"),
+    ("Tool", "tool_type"),
+    ("Material", "material"),
+    ("Diameter", "cutting_diameter"),
+    ("Length", "cutting_length"),
+    ("Action", "action"),
+    ("Qty", "qty"),
+    ("Operator", "operator"),
+    ("Machine", "machine"),
+    ("Shift", "shift"),
+    ("Job", "job_name"),
+    ("Condition", "condition"),
+    ("Remarks", "remarks"),
+)
+
+
+HISTORY = QuerySpec(
     """
-    params = []
-
-    if tool_id:
-        query += " AND tx.tool_id=?"
-        params.append(tool_id)
+    SELECT
+        tx.ts,
+        ct.tool_type,
+        ct.material,
+        ct.cutting_diameter,
+        ct.cutting_length,
+        tx.action,
+        tx.qty,
+        tx.operator,
+        tx.machine,
+        tx.shift,
+        tx.job_name,
+        tx.condition,
+        tx.remarks,
+        tx.id AS txn_id
+    FROM tool_issue_txn tx
+    JOIN cutting_tools ct ON ct.id = tx.tool_id
+    """,
+    filters=[
+        eq("tx.tool_id", "tool_id"),
+        eq("tx.action", "action"),
+        date_from("tx.ts", "date_from"),
+        date_to("tx.ts", "date_to"),
+    ],
+    order_by="tx.ts DESC, tx.id DESC",
+    keyset=[("tx.ts", "ts"), ("tx.id", "txn_id")],
+)
+
+exports.register("tool_history", "Tool History", TOOL_HISTORY_COLUMNS, HISTORY.ordered)
 
-    if action:
-        query += " AND tx.action=?"
-        params.append(action)
 
-    if date_from:
-        query += " AND date(tx.ts) >= date(?)"
-        params.append(date_from)
-
-    if date_to:
-        query += " AND date(tx.ts) <= date(?)"
-        params.append(date_to)
-
-    query += " ORDER BY tx.ts DESC"
+@tools_bp.route("/history")
+def tool_history():
+    con = get_db()
 
-    rows = con.execute(query, params).fetchall()
+    page = HISTORY.page(con, request.args)
 
     tools = con.execute("""
         SELECT id, tool_type, cutting_diameter, material
@@ -282,7 +237,8 @@ def tool_history():
 
     return render_template(
         "tool_history.html",
-        rows=rows,
+        rows=page.rows,
+        page=page,
         tools=tools
     )
 @tools_bp.route("/regrind", methods=["GET", "POST"])
@@ -291,27 +247,18 @@ def tool_regrind_page():
 
     if request.method == "POST":
         f = request.form
-        qty = int(f["qty"])
-        tool_id = int(f["tool_id"])
-
-        con.execute("""
-            UPDATE cutting_tools
-            SET issued_qty = issued_qty - ?
-            WHERE id=?
-        """, (qty, tool_id))
-
-        con.execute("""
-            INSERT INTO tool_issue_txn
-            (tool_id, action, qty, operator, remarks)
-            VALUES (?, 'REGRIND', ?, ?, ?)
-        """, (
-            tool_id, qty,
-            f["operator"],
-            f.get("remarks", "")
-        ))
+        try:
+            stock.move("tool", "REGRIND", int(f["tool_id"]), f["qty"], {
+                "action": "REGRIND",
+                "operator": f["operator"],
+                "remarks": f.get("remarks", ""),
+                # local time for both tool_issue_txn.ts and the ledger day
+                # (the column default CURRENT_TIMESTAMP is UTC)
+                "ts": datetime.now().isoformat(" ", timespec="seconds"),
+            }, db=con)
+        except stock.StockError as e:
+            return str(e), 400
 
-        con.commit()
-        con.close()
         return redirect("/tools")
 
     tools = con.execute("""
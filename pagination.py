@@ -0,0 +1,159 @@
+# pagination.py  (ELTA Workshop Suite)
+# --------------------------------------------
+# Keyset (seek) pagination for history / list pages.
+#
+# Instead of OFFSET (which still reads every skipped row) each page remembers
+# the sort key of its first and last row, and the next query starts right
+# after it:   WHERE ... AND (date, id) < (?, ?) ORDER BY date DESC, id DESC LIMIT n
+# With an index on (date) / (fk, date) every page costs the same, no matter
+# how many years of rows are behind it.
+# --------------------------------------------
+
+import base64
+import json
+
+from flask import request, url_for
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int):
+    """Returns the key values, or None for a missing / tampered cursor."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return values
+
+
+def page_size_arg(default: int = PAGE_SIZE) -> int:
+    try:
+        n = int(request.args.get("per_page") or default)
+    except ValueError:
+        n = default
+    return max(1, min(n, MAX_PAGE_SIZE))
+
+
+class Page:
+    """One page of rows plus the cursors needed to move around."""
+
+    def __init__(self, rows, page_size, next_cursor=None, prev_cursor=None):
+        self.rows = rows
+        self.page_size = page_size
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def _url(self, **cursor):
+        args = request.args.to_dict()
+        args.pop("after", None)
+        args.pop("before", None)
+        args.update(cursor)
+        return url_for(request.endpoint, **(request.view_args or {}), **args)
+
+    @property
+    def next_url(self):
+        return self._url(after=self.next_cursor) if self.has_next else None
+
+    @property
+    def prev_url(self):
+        return self._url(before=self.prev_cursor) if self.has_prev else None
+
+    @property
+    def first_url(self):
+        return self._url()
+
+
+def keyset_sql(query, order_by, seek=None):
+    """
+    Page SQL for `query` (see keyset_page). seek is None (first page),
+    "after" or "before"; the seek form expects the cursor values and then
+    the LIMIT as extra bind parameters.
+    """
+    exprs = [e for e, _ in order_by]
+    key_tuple = "(" + ", ".join(exprs) + ")"
+    marks = "(" + ", ".join("?" * len(exprs)) + ")"
+
+    if seek == "before":
+        # walk backwards (ascending) from the first row of the current page
+        sql = f"{query} AND {key_tuple} > {marks} ORDER BY " + ", ".join(f"{e} ASC" for e in exprs)
+    else:
+        sql = query
+        if seek == "after":
+            sql += f" AND {key_tuple} < {marks}"
+        sql += " ORDER BY " + ", ".join(f"{e} DESC" for e in exprs)
+    return sql + " LIMIT ?"
+
+
+def keyset_page(db, query, params, order_by, after="", before="", page_size=PAGE_SIZE):
+    """
+    query    : SELECT ... WHERE ...   (filters included; no ORDER BY / LIMIT)
+    params   : bind values for query
+    order_by : [(sql_expr, row_key), ...], newest first; the last one must be
+               unique (normally the id). row_key is the column name of that
+               value in the result rows.
+    after    : cursor of the last row seen  -> older rows (Next)
+    before   : cursor of the first row seen -> newer rows (Prev)
+    """
+    keys = [k for _, k in order_by]
+    after_vals = decode_cursor(after, len(keys))
+    before_vals = decode_cursor(before, len(keys)) if after_vals is None else None
+
+    params = list(params)
+    if before_vals is not None:
+        sql = keyset_sql(query, order_by, "before")
+        params.extend(before_vals)
+    elif after_vals is not None:
+        sql = keyset_sql(query, order_by, "after")
+        params.extend(after_vals)
+    else:
+        sql = keyset_sql(query, order_by)
+    params.append(page_size + 1)
+
+    rows = db.execute(sql, params).fetchall()
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    if before_vals is not None:
+        rows.reverse()
+        has_prev, has_next = more, True
+    else:
+        has_prev, has_next = after_vals is not None, more
+
+    def cursor_of(row):
+        return encode_cursor(row[k] for k in keys)
+
+    return Page(
+        rows,
+        page_size,
+        next_cursor=cursor_of(rows[-1]) if rows and has_next else None,
+        prev_cursor=cursor_of(rows[0]) if rows and has_prev else None,
+    )
+
+
+def page_from_request(db, query, params, order_by):
+    """keyset_page() driven by ?after= / ?before= / ?per_page= of the current request."""
+    return keyset_page(
+        db, query, params, order_by,
+        after=request.args.get("after", ""),
+        before=request.args.get("before", ""),
+        page_size=page_size_arg(),
+    )
@@ -0,0 +1,115 @@
+# query_spec.py  (ELTA Workshop Suite)
+# --------------------------------------------
+# Declarative list queries: one SELECT, its optional filters and its sort
+# order, shared by a page and every other output of the same list (PDF,
+# CSV / XLSX / JSON exports), so they can never drift apart.
+#
+#   COMPLAINTS = QuerySpec(
+#       "SELECT ... FROM customer_complaint cc JOIN customer_master c ...",
+#       filters=[eq("cc.status", "status"), date_from("cc.complaint_date")],
+#       order_by="cc.complaint_date DESC, cc.id DESC",
+#       keyset=[("cc.complaint_date", "complaint_date"), ("cc.id", "id")],
+#   )
+#   COMPLAINTS.rows(db, request.args)         ordered, fetchall()
+#   COMPLAINTS.page(db, request.args)         keyset page
+#   COMPLAINTS.ordered(args) / .where(args)   (sql, params) for reports / exports
+#
+# A filter is active when its request arg is non-blank (or its bind()
+# returns values). The SQL text depends only on WHICH filters are active,
+# so it is generated once per combination and cached on the spec: the same
+# filter combination always sends the identical string, and sqlite3's
+# per-connection statement cache reuses the prepared statement.
+# --------------------------------------------
+
+from dataclasses import dataclass
+
+from pagination import page_from_request
+
+
+@dataclass(frozen=True)
+class Filter:
+    sql: str                    # condition, one ? per bind value
+    arg: str = None             # request arg that switches it on
+    transform: object = None    # arg text -> bind value (default: the text)
+    default: str = None         # used when the arg is missing / blank
+    bind: object = None         # or: callable(args) -> bind values, None = off
+
+    def values(self, args):
+        """Bind values when active, else None."""
+        if self.bind is not None:
+            return self.bind(args)
+        text = (args.get(self.arg) or "").strip() or self.default
+        if not text:
+            return None
+        value = self.transform(text) if self.transform else text
+        return (value,) * self.sql.count("?")
+
+
+def eq(column, arg):
+    return Filter(f"{column} = ?", arg)
+
+
+def date_from(column, arg="from_date"):
+    return Filter(f"date({column}) >= date(?)", arg)
+
+
+def date_to(column, arg="to_date"):
+    return Filter(f"date({column}) <= date(?)", arg)
+
+
+def contains(columns, arg="q"):
+    """Substring match on any of `columns` (LIKE, case-insensitive)."""
+    return Filter("(" + " OR ".join(f"{c} LIKE ?" for c in columns) + ")", arg,
+                  transform=lambda text: f"%{text}%")
+
+
+class QuerySpec:
+    def __init__(self, select, filters=(), order_by=None, keyset=None):
+        """
+        select   : SELECT ... FROM ... [JOIN ...]  (no WHERE / ORDER BY)
+        filters  : Filter list, ANDed when active
+        order_by : ORDER BY text for full lists / reports / exports
+        keyset   : [(sql_expr, row_key), ...] for paginated pages
+        """
+        self.select = select.rstrip()
+        self.filters = tuple(filters)
+        self.order_by = order_by
+        self.keyset = keyset
+        self._sql = {}          # (active filter mask, order) -> SQL text
+
+    def _bind(self, args):
+        mask, params = 0, []
+        for i, f in enumerate(self.filters):
+            values = f.values(args)
+            if values is not None:
+                mask |= 1 << i
+                params.extend(values)
+        return mask, params
+
+    def _text(self, mask, order):
+        key = (mask, order)
+        sql = self._sql.get(key)
+        if sql is None:
+            conds = ["1=1"] + [f.sql for i, f in enumerate(self.filters) if mask >> i & 1]
+            sql = f"{self.select}\nWHERE " + "\n  AND ".join(conds)
+            if order:
+                sql += f"\nORDER BY {order}"
+            self._sql[key] = sql
+        return sql
+
+    def where(self, args):
+        """(sql, params), filtered, open-ended (keyset_page() / more AND terms)."""
+        mask, params = self._bind(args)
+        return self._text(mask, None), params
+
+    def ordered(self, args, order_by=None):
+        """(sql, params), filtered and sorted (order_by overrides the spec's)."""
+        mask, params = self._bind(args)
+        return self._text(mask, order_by or self.order_by), params
+
+    def rows(self, db, args, order_by=None):
+        return db.execute(*self.ordered(args, order_by)).fetchall()
+
+    def page(self, db, args):
+        """Keyset page of the current request (pagination.Page)."""
+        return page_from_request(db, *self.where(args), self.keyset)
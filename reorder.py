@@ -0,0 +1,147 @@
+# reorder.py  (ELTA Workshop Suite)
+# --------------------------------------------
+# Reorder queue for the tool crib (tools, holders, inserts, collets).
+#
+# low_stock holds exactly the items whose available qty is at or below
+# their reorder level. Triggers on the four crib tables add / update /
+# remove an item's row in the same statement that changes its counters, so
+# every stock path (add, issue, return, scrap, manual edit) keeps the queue
+# current and the home page / reorder view read it directly. Tables and
+# triggers live in migration v12 (a change to them ships as a new
+# migration step); rebuild_queue() refills the queue the same way.
+#
+# reorder_rate holds each item's usage over the last REORDER_USAGE_DAYS
+# days, computed from inventory_ledger by one GROUP BY in a daily job.
+# Suggested order qty = enough to get back above the reorder level plus
+# REORDER_COVER_DAYS of usage at that rate.
+# --------------------------------------------
+
+from datetime import date, timedelta
+
+import config
+import scheduler
+from db import get_db
+
+KIND_NAMES = {
+    "tool": "Cutting Tool",
+    "holder": "Holder",
+    "insert": "Insert",
+    "collet": "Collet",
+}
+
+# kind -> (table, available, label) as SQL on the crib row t (as in the v12 triggers)
+CRIBS = {
+    "tool": (
+        "cutting_tools",
+        "COALESCE(t.total_qty, 0) - COALESCE(t.issued_qty, 0) - COALESCE(t.broken_qty, 0)",
+        "t.tool_type || ' Ø' || t.cutting_diameter || ' x ' || t.cutting_length || ' ' || t.material",
+    ),
+    "holder": (
+        "holders",
+        "COALESCE(t.total_qty, 0) - COALESCE(t.issued_qty, 0)",
+        "t.holder_type || ' ' || t.interface || ' ' || t.size || ' / ' || t.projection",
+    ),
+    "insert": (
+        "inserts",
+        "COALESCE(t.available_qty, 0)",
+        "t.insert_type || ' ' || t.size || ' ' || t.grade",
+    ),
+    "collet": (
+        "collets",
+        "COALESCE(t.available_qty, 0)",
+        "t.collet_type || ' ' || t.interface || ' ' || t.size_range",
+    ),
+}
+
+# movements that use stock up (receipts / opening balances are not usage)
+USAGE_MOVEMENTS = ("ISSUE", "RETURN", "REGRIND", "RETURN_BROKEN", "SCRAP")
+
+
+# ================= REBUILD =================
+
+def rebuild_queue(con=None):
+    """Refill low_stock from the crib tables (verification / repair)."""
+    con = con or get_db()
+    con.execute("DELETE FROM low_stock")
+    for kind, (table, available, label) in CRIBS.items():
+        level = "COALESCE(t.reorder_level, 0)"
+        con.execute(f"""
+            INSERT INTO low_stock (kind, item_id, label, available, reorder_level, shortfall, suggested_qty)
+            SELECT '{kind}', t.id, COALESCE({label}, '#' || t.id),
+                   {available}, {level}, {level} - ({available}),
+                   MAX({level} + 1 - ({available}), {level} - ({available}) + COALESCE(r.cover_qty, 0))
+            FROM {table} t
+            LEFT JOIN reorder_rate r ON r.kind = '{kind}' AND r.item_id = t.id
+            WHERE {available} <= {level}
+        """)
+
+
+# ================= USAGE RATES (daily batch) =================
+
+def refresh_rates(today=None, db=None):
+    """
+    Recompute reorder_rate from the ledger window and re-price the queue.
+    Two set-based statements over idx_ledger_date; returns items with usage.
+    """
+    db = db or get_db()
+    today = today or date.today()
+    days = config.REORDER_USAGE_DAYS
+    cover = config.REORDER_COVER_DAYS
+    since = (today - timedelta(days=days)).isoformat()
+    marks = ", ".join("?" * len(USAGE_MOVEMENTS))
+
+    db.execute("DELETE FROM reorder_rate")
+    db.execute(f"""
+        INSERT INTO reorder_rate (kind, item_id, used_qty, daily_usage, cover_qty, computed_on)
+        SELECT kind, item_id, used, 1.0 * used / ?,
+               (used * ? + ? - 1) / ?,          -- ceil(used * cover / days)
+               ?
+        FROM (
+            SELECT kind, item_id, -SUM(d_available) AS used
+            FROM inventory_ledger
+            WHERE txn_date > ? AND txn_date <= ? AND movement IN ({marks})
+            GROUP BY kind, item_id
+        )
+        WHERE used > 0
+    """, (days, cover, days, days, today.isoformat(), since, today.isoformat(), *USAGE_MOVEMENTS))
+    count = db.execute("SELECT COUNT(*) FROM reorder_rate").fetchone()[0]
+
+    db.execute("""
+        UPDATE low_stock
+        SET suggested_qty = MAX(
+                reorder_level + 1 - available,
+                shortfall + COALESCE((SELECT cover_qty FROM reorder_rate r
+                                      WHERE r.kind = low_stock.kind AND r.item_id = low_stock.item_id), 0))
+    """)
+    return count
+
+
+@scheduler.daily("reorder usage rates")
+def _rates_job(db, today):
+    refresh_rates(today, db=db)
+
+
+# ================= READ =================
+
+def queue(kind=None, limit=None, db=None):
+    """Items at / below reorder level, biggest shortfall first."""
+    db = db or get_db()
+    sql, params = """
+        SELECT q.kind, q.item_id, q.label, q.available, q.reorder_level, q.shortfall,
+               q.suggested_qty, q.flagged_on, r.daily_usage
+        FROM low_stock q
+        LEFT JOIN reorder_rate r ON r.kind = q.kind AND r.item_id = q.item_id
+    """, []
+    if kind:
+        sql += " WHERE q.kind = ?"
+        params.append(kind)
+    sql += " ORDER BY q.shortfall DESC, q.kind, q.label"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return db.execute(sql, params).fetchall()
+
+
+def queue_size(db=None):
+    db = db or get_db()
+    return db.execute("SELECT COUNT(*) FROM low_stock").fetchone()[0]
@@ -0,0 +1,380 @@
+# reports.py  (ELTA Workshop Suite)
+# --------------------------------------------
+# PDF report engine.
+#
+#   PdfWriter    : flowing layout on a reportlab canvas (title, fields,
+#                  wrapped paragraphs, tables with wrapped columns and the
+#                  header repeated on every page). Tables take any row
+#                  iterator, so a report streams its cursor instead of
+#                  fetchall(), and the PDF is written to a file, not a
+#                  BytesIO. Memory still grows with the page count:
+#                  reportlab keeps every finished page (compressed) until
+#                  save(), so this cuts the peak rather than bounding it.
+#   @report(...) : registers render(pdf, con, params) with the tables it
+#                  reads.
+#   respond()    : serves a report for a view. Finished files are cached on
+#                  disk under a key of (report, params, data_version of its
+#                  tables), so an unchanged report is a file send. Otherwise
+#                  the report renders in a small worker pool; the request
+#                  waits up to REPORT_WAIT_SECONDS and then hands over to
+#                  the job page (/reports/jobs/<id>) instead of holding a
+#                  server thread.
+# --------------------------------------------
+
+import hashlib
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+
+from flask import redirect, send_file
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+import config
+import db as _db
+from db import app_data_dir, data_version, get_db
+
+REPORTS = {}            # name -> Report
+
+JOB_TTL_SECONDS = 3600  # finished jobs are forgotten after an hour
+
+_jobs = {}              # job id -> Job
+_lock = threading.Lock()
+_executor = None
+
+
+# ================= LAYOUT =================
+
+def wrap_text(text, max_width, font="Helvetica", size=9):
+    """Split text into lines no wider than max_width points ("-" when empty)."""
+    if text is None or str(text).strip() == "":
+        return ["-"]
+    lines, cur = [], ""
+    for w in str(text).split():
+        test = (cur + " " + w).strip()
+        if stringWidth(test, font, size) <= max_width:
+            cur = test
+        else:
+            if cur:
+                lines.append(cur)
+            cur = w
+    if cur:
+        lines.append(cur)
+    return lines
+
+
+@dataclass
+class Column:
+    header: str
+    x: float
+    value: object            # row key, or callable(row) -> value
+    width: float = 0         # > 0: wrap the text to this width
+    bold: bool = False
+
+    def text(self, row):
+        v = self.value(row) if callable(self.value) else row[self.value]
+        return "" if v is None else str(v)
+
+
+class PdfWriter:
+    """Top-down layout with automatic page breaks."""
+
+    def __init__(self, fileobj, title, pagesize=A4, margin=40, bottom=50):
+        self.c = canvas.Canvas(fileobj, pagesize=pagesize, pageCompression=1)
+        self.c.setTitle(title)
+        self.width, self.height = pagesize
+        self.margin = margin
+        self.bottom = bottom
+        self.y = self.height - margin
+        self.page_no = 1
+        self._on_new_page = None
+        self._font = None
+
+    def font(self, name="Helvetica", size=9):
+        """setFont only when it changes (it is the hot call on big tables)."""
+        if self._font != (name, size):
+            self.c.setFont(name, size)
+            self._font = (name, size)
+
+    def _footer(self):
+        self.font("Helvetica", 7)
+        self.c.drawRightString(self.width - self.margin, 25, f"Page {self.page_no}")
+
+    def new_page(self):
+        self._footer()
+        self.c.showPage()
+        self._font = None           # showPage resets the graphics state
+        self.page_no += 1
+        self.y = self.height - 50
+        if self._on_new_page:
+            self._on_new_page()
+
+    def ensure(self, needed):
+        """Start a new page unless `needed` points are left above the bottom margin."""
+        if self.y - needed < self.bottom:
+            self.new_page()
+
+    def text(self, x, s, font="Helvetica", size=9):
+        self.font(font, size)
+        self.c.drawString(x, self.y, s)
+
+    def down(self, points):
+        self.y -= points
+
+    def title(self, text, subtitle=None):
+        self.text(self.margin, text, "Helvetica-Bold", 14)
+        self.down(18)
+        if subtitle:
+            self.text(self.margin, subtitle)
+            self.down(18)
+
+    def heading(self, text, size=10, keep_with=60):
+        self.ensure(keep_with)
+        self.text(self.margin, text, "Helvetica-Bold", size)
+        self.down(size + 4)
+
+    def rule(self):
+        self.c.line(self.margin, self.y, self.width - self.margin, self.y)
+        self.down(18)
+
+    def fields(self, pairs, value_x=160, leading=14):
+        for k, v in pairs:
+            self.ensure(leading)
+            self.text(self.margin, f"{k}:", "Helvetica-Bold")
+            self.text(value_x, str(v) if v else "-")
+            self.down(leading)
+
+    def paragraph(self, text, x=None, width=None, size=9, leading=12):
+        x = self.margin if x is None else x
+        width = width or self.width - x - self.margin
+        for line in wrap_text(text, width, size=size):
+            self.ensure(leading)
+            self.text(x, line, size=size)
+            self.down(leading)
+
+    def table(self, columns, rows, size=9, leading=14, wrap_leading=12):
+        """Draw rows (any iterable) under a header that repeats on each page. Returns the row count."""
+        def header():
+            for col in columns:
+                self.text(col.x, col.header, "Helvetica-Bold", size)
+            self.down(leading)
+
+        self.ensure(2 * leading)
+        header()
+        self._on_new_page = header
+        count = 0
+        try:
+            for row in rows:
+                cells = [
+                    wrap_text(col.text(row), col.width, size=size) if col.width else [col.text(row)]
+                    for col in columns
+                ]
+                extra = max(len(lines) for lines in cells) - 1
+                self.ensure(leading + extra * wrap_leading)
+                for col, lines in zip(columns, cells):
+                    self.font("Helvetica-Bold" if col.bold else "Helvetica", size)
+                    for i, line in enumerate(lines):
+                        self.c.drawString(col.x, self.y - i * wrap_leading, line)
+                self.down(leading + extra * wrap_leading)
+                count += 1
+        finally:
+            self._on_new_page = None
+        return count
+
+    def save(self):
+        self._footer()
+        self.c.save()
+
+
+# ================= REGISTRY =================
+
+@dataclass
+class Report:
+    name: str
+    title: str
+    tables: tuple
+    filename: str            # download name; may use {params}
+    render: object           # render(pdf, con, params)
+
+
+def report(name, title, tables, filename):
+    """Decorator: register render(pdf: PdfWriter, con, params: dict) as report `name`."""
+    def register(render):
+        REPORTS[name] = Report(name, title, tuple(tables), filename, render)
+        return render
+    return register
+
+
+# ================= CACHE =================
+
+def cache_dir():
+    path = os.path.join(app_data_dir(), "report_cache")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def cache_key(rep, params, con):
+    # today's date too: reports print "Generated on"
+    versions = data_version(*rep.tables, db=con)
+    raw = json.dumps([rep.name, sorted(params.items()), versions, date.today().isoformat()])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _cache_path(key):
+    return os.path.join(cache_dir(), f"{key}.pdf")
+
+
+def _prune_cache():
+    """Keep the newest REPORT_CACHE_FILES PDFs; files of jobs still listed are never removed."""
+    with _lock:
+        live = {job.path for job in _jobs.values() if job.path}
+    files = []
+    for e in os.scandir(cache_dir()):
+        if e.name.endswith(".pdf") and e.path not in live:
+            try:
+                files.append((e.stat().st_mtime, e.path))
+            except OSError:
+                pass            # removed by another worker pruning at the same time
+    files.sort(reverse=True)
+    for _, path in files[config.REPORT_CACHE_FILES:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def render_to_file(rep, params, con):
+    """Render inside one read transaction (consistent snapshot); returns the cached file path."""
+    con.execute("BEGIN")
+    try:
+        path = _cache_path(cache_key(rep, params, con))
+        if os.path.exists(path):
+            return path
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                pdf = PdfWriter(f, rep.title)
+                rep.render(pdf, con, params)
+                pdf.save()
+            os.replace(tmp, path)
+        except BaseException:
+            # a failed render leaves no half-written file in the cache dir
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+    finally:
+        con.rollback()
+    _prune_cache()
+    return path
+
+
+# ================= JOBS =================
+
+@dataclass
+class Job:
+    id: str
+    report: str
+    params: dict
+    status: str = "queued"     # queued / running / done / failed
+    path: str = None
+    error: str = None
+    created: float = field(default_factory=time.time)
+    finished: float = None
+    done: threading.Event = field(default_factory=threading.Event)
+
+    def as_dict(self):
+        return {
+            "id": self.id,
+            "report": self.report,
+            "status": self.status,
+            "error": self.error,
+            "seconds": round((self.finished or time.time()) - self.created, 1),
+            "download": f"/reports/jobs/{self.id}/download" if self.status == "done" else None,
+        }
+
+
+def _run(job):
+    job.status = "running"
+    con = _db.connect()
+    try:
+        job.path = render_to_file(REPORTS[job.report], job.params, con)
+        job.status = "done"
+    except Exception as e:
+        traceback.print_exc()
+        job.error = str(e)
+        job.status = "failed"
+    finally:
+        con.really_close()
+        job.finished = time.time()
+        job.done.set()
+
+
+def submit(name, params):
+    """Queue report `name` in the worker pool; an identical queued / running job is reused."""
+    global _executor
+    now = time.time()
+    with _lock:
+        for job_id in [j.id for j in _jobs.values() if j.finished and now - j.finished > JOB_TTL_SECONDS]:
+            del _jobs[job_id]
+        for job in _jobs.values():
+            if job.report == name and job.params == params and not job.finished:
+                return job
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=config.REPORT_WORKERS, thread_name_prefix="report")
+        job = Job(uuid.uuid4().hex, name, dict(params))
+        _jobs[job.id] = job
+    _executor.submit(_run, job)
+    return job
+
+
+def get_job(job_id):
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def download_name(name, params):
+    return REPORTS[name].filename.format(**params)
+
+
+def send(name, params, path):
+    return send_file(
+        path,
+        as_attachment=True,
+        download_name=download_name(name, params),
+        mimetype="application/pdf",
+    )
+
+
+def respond(name, params, retry=True):
+    """
+    View helper: the cached PDF if the data did not change, else render it in
+    the pool and send it if it is ready within REPORT_WAIT_SECONDS; slower
+    reports redirect to their job page. A file pruned between the check and
+    the send is rendered again.
+    """
+    rep = REPORTS[name]
+    params = {k: str(v) for k, v in params.items()}
+    path = _cache_path(cache_key(rep, params, get_db()))
+    if not os.path.exists(path):
+        job = submit(name, params)
+        if not job.done.wait(config.REPORT_WAIT_SECONDS):
+            return redirect(f"/reports/jobs/{job.id}")
+        if job.status != "done":
+            return redirect(f"/reports/jobs/{job.id}")
+        path = job.path
+
+    try:
+        return send(name, params, path)
+    except FileNotFoundError:
+        if not retry:
+            raise
+        return respond(name, params, retry=False)
@@ -1,9 +1,11 @@
 
 import sys, os
 from app import app
+import scheduler
 
 if __name__ == "__main__":
     # IMPORTANT: host=0.0.0.0 lets LAN access if needed
+    scheduler.start()   # daily status rollovers (PM / gauges)
     app.run(host="127.0.0.1", port=5000, debug=False)
 
 
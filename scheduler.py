@@ -0,0 +1,91 @@
+# scheduler.py  (ELTA Workshop Suite)
+# --------------------------------------------
+# Background thread for once-a-day jobs (status rollovers at date change).
+#
+# Modules register jobs at import time:
+#
+#     @scheduler.daily("pm status rollover")
+#     def rollover(con, today): ...
+#
+# and the server entry points (desktop_main.py / run_suite.py / app.py) call
+# scheduler.start() next to the web server. Every job runs once at start-up
+# (catch-up after the PC was off) and again each time the local date changes.
+# Each run gets its own connection and its own transaction.
+# --------------------------------------------
+
+import threading
+import traceback
+from datetime import date, datetime, timedelta
+
+import db
+
+POLL_SECONDS = 300      # also re-check periodically (sleep / clock changes)
+
+_jobs = []              # [(name, fn)]
+_lock = threading.Lock()
+_stop = threading.Event()
+_thread = None
+_last_run = {}          # name -> date of the last successful run
+
+
+def daily(name):
+    """Decorator: run fn(con, today) once per calendar day."""
+    def decorator(fn):
+        _jobs.append((name, fn))
+        return fn
+    return decorator
+
+
+def run_pending(today: date | None = None, force: bool = False) -> list:
+    """Run every job that has not run for `today` yet; returns the names run."""
+    today = today or date.today()
+    ran = []
+    with _lock:
+        pending = [(n, fn) for n, fn in _jobs if force or _last_run.get(n) != today]
+        if not pending:
+            return ran
+
+        con = db.connect()
+        try:
+            for name, fn in pending:
+                try:
+                    with db.write_transaction(con):
+                        fn(con, today)
+                except Exception:
+                    print(f"Scheduled job failed: {name}")
+                    traceback.print_exc()
+                    continue
+                _last_run[name] = today
+                ran.append(name)
+        finally:
+            con.really_close()
+    return ran
+
+
+def _seconds_until_midnight() -> float:
+    now = datetime.now()
+    tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return (tomorrow - now).total_seconds() + 1
+
+
+def _loop():
+    while not _stop.is_set():
+        run_pending()
+        _stop.wait(min(_seconds_until_midnight(), POLL_SECONDS))
+
+
+def start():
+    """Start the scheduler thread (idempotent)."""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return _thread
+    _stop.clear()
+    _thread = threading.Thread(target=_loop, name="daily-scheduler", daemon=True)
+    _thread.start()
+    return _thread
+
+
+def stop(timeout: float = 5.0):
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout)
@@ -0,0 +1,35 @@
+# sequences.py  (ELTA Workshop Suite)
+# --------------------------------------------
+# Document number sequences (complaint numbers, gauge codes, ...).
+#
+# doc_sequence keeps the last number issued per (prefix, year); year 0 is a
+# sequence that never resets. next_value() bumps and returns it with one
+# UPSERT ... RETURNING inside the caller's write transaction, so:
+#   - two users saving at once get different numbers (BEGIN IMMEDIATE
+#     serialises them on the write lock)
+#   - a save that fails rolls the number back with it (no gaps)
+#   - there is no LIKE / ORDER BY over the documents, and numbers past 999
+#     keep counting (CC-2025-1000 follows CC-2025-999)
+# --------------------------------------------
+
+from db import get_db
+
+
+def next_value(db, prefix: str, year: int = 0) -> int:
+    """Allocate the next number. Call inside the transaction that inserts the document."""
+    if not db.in_transaction:
+        raise RuntimeError("sequences.next_value() needs an open write transaction")
+    return db.execute("""
+        INSERT INTO doc_sequence (prefix, year, last_no) VALUES (?, ?, 1)
+        ON CONFLICT (prefix, year) DO UPDATE SET last_no = last_no + 1
+        RETURNING last_no
+    """, (prefix, year)).fetchone()[0]
+
+
+def peek_value(prefix: str, year: int = 0, db=None) -> int:
+    """The number next_value() would hand out now (for display only)."""
+    db = db or get_db()
+    row = db.execute(
+        "SELECT last_no FROM doc_sequence WHERE prefix = ? AND year = ?", (prefix, year)
+    ).fetchone()
+    return (row[0] if row else 0) + 1
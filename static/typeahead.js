@@ -0,0 +1,94 @@
+// typeahead.js  (ELTA Workshop Suite)
+// --------------------------------------------
+// Search-as-you-type for master lists (item codes / customers / machines)
+// instead of rendering every row as an <option>.
+//
+//   <input name="item_code[]" data-typeahead="/api/search/item-codes">
+//       -> the picked value is submitted as typed
+//
+//   <input data-typeahead="/api/search/customers" data-target="customer_id" required>
+//   <input type="hidden" name="customer_id">
+//       -> the input shows the label, the hidden field gets the id
+//
+// Endpoints return [{value, label}]. Fetches are debounced, stale requests
+// are aborted and answers are kept per query for the life of the page.
+// A value that is not one of the suggestions is flagged invalid, so the
+// form cannot be submitted with a typo.
+// --------------------------------------------
+
+(function(){
+  const DEBOUNCE_MS = 200;
+  const cache = new Map();   // url?q= -> rows
+  let listSeq = 0;
+
+  async function search(url, q, signal){
+    const key = `${url}?q=${encodeURIComponent(q)}`;
+    if(cache.has(key)) return cache.get(key);
+    const res = await fetch(key, {signal});
+    if(!res.ok) return [];
+    const rows = await res.json();
+    cache.set(key, rows);
+    return rows;
+  }
+
+  function attach(input){
+    const url = input.dataset.typeahead;
+    const target = input.dataset.target ? input.form.elements[input.dataset.target] : null;
+    const list = document.createElement("datalist");
+    list.id = `typeahead-${++listSeq}`;
+    input.after(list);
+    input.setAttribute("list", list.id);
+    input.setAttribute("autocomplete", "off");
+
+    let known = new Map();   // shown text -> submitted value
+    let timer = null;
+    let inflight = null;
+
+    function render(rows){
+      known = new Map();
+      list.replaceChildren(...rows.map(r => {
+        const opt = document.createElement("option");
+        if(target){
+          opt.value = r.label;
+          known.set(r.label, String(r.value));
+        } else {
+          opt.value = r.value;
+          if(r.label !== r.value) opt.label = r.label;
+          known.set(String(r.value), String(r.value));
+        }
+        return opt;
+      }));
+    }
+
+    function check(){
+      const text = input.value.trim();
+      const value = known.get(text);
+      if(target) target.value = value || "";
+      const bad = text !== "" && value === undefined;
+      input.setCustomValidity(bad ? "Pick a value from the list" : "");
+    }
+
+    async function refresh(){
+      if(inflight) inflight.abort();
+      inflight = new AbortController();
+      try {
+        render(await search(url, input.value.trim(), inflight.signal));
+        check();
+      } catch(e){
+        if(e.name !== "AbortError") throw e;
+      }
+    }
+
+    input.addEventListener("input", () => {
+      check();
+      clearTimeout(timer);
+      timer = setTimeout(refresh, DEBOUNCE_MS);
+    });
+    input.addEventListener("focus", () => { if(!list.children.length) refresh(); });
+    input.addEventListener("change", check);
+  }
+
+  document.addEventListener("DOMContentLoaded", () => {
+    document.querySelectorAll("input[data-typeahead]").forEach(attach);
+  });
+})();
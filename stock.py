@@ -0,0 +1,113 @@
+# stock.py  (ELTA Workshop Suite)
+# --------------------------------------------
+# Stock movements for the tool crib: cutting tools, holders, inserts, collets.
+#
+# Every movement is ONE guarded counter UPDATE plus its ledger (*_txn) row,
+# in one BEGIN IMMEDIATE transaction:
+#
+#     UPDATE holders SET issued_qty = issued_qty + :qty
+#     WHERE id = :id AND total_qty - issued_qty >= :qty
+#
+# If the guard fails no row changes (changes() == 0) and nothing is written,
+# so two waitress threads can never both take the last piece, and a return
+# can never push a counter below zero. The same transaction appends the
+# movement to the unified inventory_ledger (ledger.py).
+# --------------------------------------------
+
+from dataclasses import dataclass
+
+import ledger
+from db import get_db, write_transaction
+
+
+class StockError(Exception):
+    """Movement refused (unknown item, bad qty, not enough stock)."""
+
+
+@dataclass(frozen=True)
+class Crib:
+    table: str          # counters table
+    ledger: str         # *_txn table
+    item_fk: str        # ledger column pointing at table.id
+    available: str      # SQL for the available qty
+    label: str
+
+
+CRIBS = {
+    "tool": Crib("cutting_tools", "tool_issue_txn", "tool_id",
+                 "total_qty - issued_qty - broken_qty", "Tool"),
+    "holder": Crib("holders", "holder_txn", "holder_id",
+                   "total_qty - issued_qty", "Holder"),
+    "insert": Crib("inserts", "insert_txn", "insert_id",
+                   "available_qty", "Insert"),
+    "collet": Crib("collets", "collet_txn", "collet_id",
+                   "available_qty", "Collet"),
+}
+
+# (kind, movement) -> (SET clause, guard); both see :qty
+MOVES = {
+    ("tool", "ISSUE"): ("issued_qty = issued_qty + :qty", "total_qty - issued_qty - broken_qty >= :qty"),
+    ("tool", "RETURN"): ("issued_qty = issued_qty - :qty", "issued_qty >= :qty"),
+    ("tool", "REGRIND"): ("issued_qty = issued_qty - :qty", "issued_qty >= :qty"),
+    ("tool", "RETURN_BROKEN"): ("issued_qty = issued_qty - :qty, broken_qty = broken_qty + :qty",
+                                "issued_qty >= :qty"),
+
+    ("holder", "ISSUE"): ("issued_qty = issued_qty + :qty", "total_qty - issued_qty >= :qty"),
+    ("holder", "RETURN"): ("issued_qty = issued_qty - :qty", "issued_qty >= :qty"),
+
+    ("insert", "ISSUE"): ("available_qty = available_qty - :qty", "available_qty >= :qty"),
+    ("insert", "SCRAP"): ("available_qty = available_qty - :qty", "available_qty >= :qty"),
+
+    ("collet", "ISSUE"): ("available_qty = available_qty - :qty", "available_qty >= :qty"),
+    ("collet", "RETURN"): ("available_qty = available_qty + :qty", "available_qty + :qty <= total_qty"),
+}
+
+
+def _refusal(db, crib, movement, item_id):
+    row = db.execute(
+        f"SELECT {crib.available} AS available FROM {crib.table} WHERE id=?", (item_id,)
+    ).fetchone()
+    if row is None:
+        return f"{crib.label} not found"
+    if movement == "ISSUE" or movement == "SCRAP":
+        return f"Insufficient stock. Available: {row['available']}"
+    return "Return qty is more than what is out / total stock"
+
+
+def move(kind: str, movement: str, item_id, qty, txn: dict, db=None):
+    """
+    Apply one movement and write its ledger row; returns the ledger row id.
+    txn: ledger columns besides the item FK and qty (action, operator, ...).
+    Raises StockError (nothing written) when the guard refuses it.
+    """
+    crib = CRIBS[kind]
+    set_sql, guard = MOVES[(kind, movement)]
+    db = db or get_db()
+
+    try:
+        qty = int(qty)
+    except (TypeError, ValueError):
+        raise StockError("Quantity must be a number")
+    if qty <= 0:
+        raise StockError("Quantity must be > 0")
+
+    row = {crib.item_fk: item_id, "qty": qty, **txn}
+    cols = ", ".join(row)
+    marks = ", ".join(f":{c}" for c in row)
+
+    with write_transaction(db):
+        changed = db.execute(f"""
+            UPDATE {crib.table}
+            SET {set_sql}
+            WHERE id = :id AND {guard}
+        """, {"id": item_id, "qty": qty}).rowcount
+
+        if changed == 0:
+            raise StockError(_refusal(db, crib, movement, item_id))
+
+        txn_id = db.execute(
+            f"INSERT INTO {crib.ledger} ({cols}) VALUES ({marks})", row
+        ).lastrowid
+        ledger.record(db, kind, item_id, movement, qty,
+                      txn.get("ts") or txn.get("txn_date"), crib.ledger, txn_id)
+        return txn_id
@@ -0,0 +1,139 @@
+# wip.py  (ELTA Workshop Suite)
+# --------------------------------------------
+# Customer material (job work) flow analytics.
+#
+# dispatch_daily keeps running totals per (day, process, customer, item):
+# OK / REJ / CD / ND / ND-PW / total qty, dispatch lines and
+# lead_qty_days = SUM(total_qty x days from customer challan to dispatch).
+# Every dispatch row already names the inward line it was taken from
+# (explicitly, or by dispatch.py's FIFO allocation), so that match is the
+# lead time. Triggers keep the rollup current:
+#   material_dispatch  insert / update / delete     (dispatch, manage edits)
+#   material_inward    item_code / process renamed  (manage inward edit)
+#   customer_challan   customer / date changed
+# A change is applied as "subtract the affected dispatch rows in a BEFORE
+# trigger, add them back in the AFTER trigger", so the dashboard reads a
+# few rollup rows by primary key range and never groups the raw dispatch
+# history. Table and triggers live in migration v18 (a change to them
+# ships as a new migration step); rebuild_rollups() recomputes the same
+# totals from scratch.
+#
+# Aging of open balances reads only the open inward lines (partial index
+# idx_challan_open); per-line lead times are an export (lead_times).
+# --------------------------------------------
+
+from db import get_db
+
+MEASURES = ("ok_qty", "rej_qty", "cd_qty", "nd_qty", "nd_pw_qty", "total_qty", "lines", "lead_qty_days")
+
+# rows with an empty / non-ISO dispatch_date (accepted before v18) roll up
+# under day '' instead of failing the NOT NULL key
+_DAY = "COALESCE(date(md.dispatch_date), '')"
+
+_LEAD_DAYS = """MAX(0, CAST(julianday(date(md.dispatch_date))
+                                 - julianday(date(ch.customer_challan_date)) AS INTEGER))"""
+
+# measure -> SQL summed over the dispatch rows `md`
+_SUMS = {
+    **{m: f"COALESCE(md.{m}, 0)" for m in MEASURES[:6]},
+    "lines": "1",
+    "lead_qty_days": f"COALESCE(md.total_qty * {_LEAD_DAYS}, 0)",
+}
+
+# ratio table dimension -> (rollup column, label SQL)
+DIMENSIONS = {
+    "customer": ("customer_id", "(SELECT c.customer_name FROM customer_master c WHERE c.id = r.customer_id)"),
+    "item": ("item_code", "r.item_code"),
+    "process": ("process", "r.process"),
+}
+
+# aging buckets of open balances: (label, max age in days, None = older)
+AGING_BUCKETS = (
+    ("0-7", 7),
+    ("8-15", 15),
+    ("16-30", 30),
+    ("31-60", 60),
+    ("61-90", 90),
+    ("90+", None),
+)
+
+
+# ================= REBUILD =================
+
+def rebuild_rollups(con=None):
+    """Recompute dispatch_daily from material_dispatch (same totals as the v18 triggers)."""
+    con = con or get_db()
+    con.execute("DELETE FROM dispatch_daily")
+    con.execute(f"""
+        INSERT INTO dispatch_daily (day, process, customer_id, item_code, {", ".join(MEASURES)})
+        SELECT {_DAY}, COALESCE(mi.process, ''), ch.customer_id, mi.item_code,
+               {", ".join(f"SUM({_SUMS[m]})" for m in MEASURES)}
+        FROM material_dispatch md
+        JOIN material_inward mi ON mi.id = md.inward_id
+        JOIN customer_challan ch ON ch.id = md.challan_id
+        GROUP BY 1, 2, 3, 4
+    """)
+
+
+# ================= READ =================
+
+def daily(days=30, db=None):
+    """Dispatch totals per day for the last `days` days, oldest first."""
+    db = db or get_db()
+    return db.execute(f"""
+        SELECT day, {", ".join(f"SUM({m}) AS {m}" for m in MEASURES)}
+        FROM dispatch_daily
+        WHERE day > date('now', 'localtime', ?)
+        GROUP BY day
+        ORDER BY day
+    """, (f"-{int(days)} days",)).fetchall()
+
+
+def ratios(dim, days=90, db=None):
+    """
+    OK / REJ / CD / ND share of dispatched qty and average lead time per
+    customer, item or process over the last `days` days, largest first.
+    """
+    if dim not in DIMENSIONS:
+        raise ValueError(dim)
+    column, label = DIMENSIONS[dim]
+    db = db or get_db()
+    return db.execute(f"""
+        SELECT {label} AS dim_value,
+               SUM(r.total_qty) AS total_qty,
+               SUM(r.lines) AS lines,
+               ROUND(1.0 * SUM(r.total_qty) / ?, 1) AS per_day,
+               ROUND(100.0 * SUM(r.ok_qty) / NULLIF(SUM(r.total_qty), 0), 1) AS ok_pct,
+               ROUND(100.0 * SUM(r.rej_qty) / NULLIF(SUM(r.total_qty), 0), 1) AS rej_pct,
+               ROUND(100.0 * SUM(r.cd_qty) / NULLIF(SUM(r.total_qty), 0), 1) AS cd_pct,
+               ROUND(100.0 * SUM(r.nd_qty + r.nd_pw_qty) / NULLIF(SUM(r.total_qty), 0), 1) AS nd_pct,
+               ROUND(1.0 * SUM(r.lead_qty_days) / NULLIF(SUM(r.total_qty), 0), 1) AS avg_lead_days
+        FROM dispatch_daily r
+        WHERE r.day > date('now', 'localtime', ?)
+        GROUP BY r.{column}
+        ORDER BY total_qty DESC, dim_value
+    """, (int(days), f"-{int(days)} days")).fetchall()
+
+
+def aging(db=None):
+    """Open balance qty per process split into AGING_BUCKETS (days since the customer challan)."""
+    db = db or get_db()
+    cases, low = [], -1
+    for n, (_, high) in enumerate(AGING_BUCKETS):
+        cond = f"age > {low}" if high is None else f"age BETWEEN {low + 1} AND {high}"
+        cases.append(f"SUM(CASE WHEN {cond} THEN qty ELSE 0 END) AS b{n}")
+        low = high
+    return db.execute(f"""
+        SELECT process, COUNT(*) AS lines, SUM(qty) AS open_qty, MAX(age) AS oldest_days,
+               {", ".join(cases)}
+        FROM (
+            SELECT COALESCE(mi.process, '') AS process, mi.available_qty AS qty,
+                   MAX(0, CAST(julianday('now', 'localtime')
+                               - julianday(date(ch.customer_challan_date)) AS INTEGER)) AS age
+            FROM customer_challan ch
+            JOIN material_inward mi ON mi.challan_id = ch.id AND mi.available_qty > 0
+            WHERE ch.open_line_count > 0
+        )
+        GROUP BY process
+        ORDER BY open_qty DESC, process
+    """).fetchall()